@@ -21,6 +21,31 @@ import {
   mergeByteRanges,
 } from './parquetWorkerUtils';
 
+/**
+ * Row range [start, end) spanned by the given (ascending) row group indices.
+ * Row groups are not all the same size: the pipelines cut them on parent_path
+ * boundaries, so offsets are accumulated from each group's num_rows.
+ */
+const rowRangeOfRowGroups = (
+  rowGroups: Array<{num_rows: bigint | number}>,
+  indices: number[]
+): [number, number] => {
+  if (!indices.length) {
+    return [0, 0];
+  }
+  const first = indices[0];
+  const last = indices[indices.length - 1];
+  let start = 0;
+  let end = 0;
+  for (let i = 0; i <= last; i++) {
+    if (i === first) {
+      start = end;
+    }
+    end += Number(rowGroups[i].num_rows);
+  }
+  return [start, end];
+};
+
 const ParquetWorker: ParquetWorkerClass = {
   _metaCache: {},
   _idRgCache: {},
@@ -84,10 +109,7 @@ const ParquetWorker: ParquetWorkerClass = {
     if (rowGroupIndices.length === 0) {
       throw new Error('No matching row groups found');
     }
-    const rg_length = Number(meta.metadata.row_groups[0].num_rows);
-    const rgRanges = rowGroupIndices.map(i => [i * rg_length, (i + 1) * rg_length]).flat();
-    const rowRange: [number, number] = [rgRanges[0], rgRanges[rgRanges.length - 1]];
-    return rowRange;
+    return rowRangeOfRowGroups(meta.metadata.row_groups, rowGroupIndices);
   },
 
   getRowGroupsFromChildValue(meta, values, values_col = 'path') {
@@ -98,7 +120,6 @@ const ParquetWorker: ParquetWorkerClass = {
     const path_col_index = meta.metadata.row_groups[0].columns.findIndex(f =>
       f.meta_data?.path_in_schema.includes(values_col)
     );
-    const rg_length = Number(meta.metadata.row_groups[0].num_rows);
     if (path_col_index === -1) {
       throw new Error('No path column found');
     }
@@ -125,9 +146,11 @@ const ParquetWorker: ParquetWorkerClass = {
         rowGroups.push(i);
       }
     }
-    const rgRanges = rowGroups.map(i => [i * rg_length, (i + 1) * rg_length]).flat();
-    const rowRange: [number, number] = [rgRanges[0], rgRanges[rgRanges.length - 1]];
-    return rowRange;
+    if (!rowGroups.length) {
+      // No single row group spans the values: read the whole file.
+      return [0, Number(meta.metadata.num_rows)];
+    }
+    return rowRangeOfRowGroups(meta.metadata.row_groups, rowGroups);
   },
 
   getByteRangesForRowGroups(meta, rowGroupIndices, columnNames) {
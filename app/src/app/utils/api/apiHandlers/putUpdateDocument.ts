@@ -11,8 +11,8 @@ export const putUpdateDocument = async ({
   metadata,
   comments,
 }: AssignmentsCreate) => {
+  // Assignments go last so the server can check the document before streaming rows.
   return await putMsgpack<AssignmentsCreate, AssignmentsCreateResponse>('assignments', {
-    assignments,
     document_id,
     last_updated_at,
     overwrite,
@@ -24,5 +24,6 @@ export const putUpdateDocument = async ({
       community_metadata_list: metadata?.community_metadata_list ?? null,
     },
     comments: comments ?? null,
+    assignments,
   });
 };
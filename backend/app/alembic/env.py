@@ -27,6 +27,7 @@ from app.comments.models import (
     DocumentComment,
 )
 from app.evaluation.models import Evaluation
+from app.exports.models import ExportJob
 
 dotenv.load_dotenv()
 
@@ -57,6 +58,7 @@ tables = [
     DistrictUnions,
     CommunityAssignments,
     Evaluation,
+    ExportJob,
 ]
 
 target_metadata = [SQLModel.metadata]
@@ -0,0 +1,71 @@
+"""comment full-text search
+
+Revision ID: a9c3e5f7b2d4
+Revises: e3b9c4d2a1f6
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a9c3e5f7b2d4"
+down_revision: Union[str, None] = "e3b9c4d2a1f6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Title outranks body text in ts_rank_cd.
+    op.execute(
+        sa.text("""
+        ALTER TABLE comments.comment
+        ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A')
+            || setweight(to_tsvector('english', coalesce(comment, '')), 'B')
+        ) STORED
+    """)
+    )
+    op.create_index(
+        "ix_comments_comment_search_vector",
+        "comment",
+        ["search_vector"],
+        schema="comments",
+        postgresql_using="gin",
+    )
+
+    # Substring (partial word) matches via ILIKE.
+    op.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    op.create_index(
+        "ix_comments_comment_title_trgm",
+        "comment",
+        ["title"],
+        schema="comments",
+        postgresql_using="gin",
+        postgresql_ops={"title": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_comments_comment_comment_trgm",
+        "comment",
+        ["comment"],
+        schema="comments",
+        postgresql_using="gin",
+        postgresql_ops={"comment": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_comments_comment_comment_trgm", table_name="comment", schema="comments"
+    )
+    op.drop_index(
+        "ix_comments_comment_title_trgm", table_name="comment", schema="comments"
+    )
+    op.drop_index(
+        "ix_comments_comment_search_vector", table_name="comment", schema="comments"
+    )
+    op.execute(sa.text("ALTER TABLE comments.comment DROP COLUMN search_vector"))
@@ -0,0 +1,65 @@
+"""add export_job table
+
+Revision ID: c7d2e1a4b9f0
+Revises: a30db9686b7c
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers, used by Alembic.
+revision: str = "c7d2e1a4b9f0"
+down_revision: Union[str, None] = "a30db9686b7c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "export_job",
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column("job_id", UUID(), nullable=False),
+        sa.Column("document_id", UUID(), nullable=False),
+        sa.Column("export_type", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), server_default="pending", nullable=False),
+        sa.Column("source_updated_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("artifact_key", sa.Text(), nullable=True),
+        sa.Column("file_name", sa.Text(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["document_id"], ["document.document.document_id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("job_id"),
+        schema="document",
+    )
+    op.create_index(
+        "idx_export_job_document_type_source",
+        "export_job",
+        ["document_id", "export_type", "source_updated_at"],
+        schema="document",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "idx_export_job_document_type_source",
+        table_name="export_job",
+        schema="document",
+    )
+    op.drop_table("export_job", schema="document")
@@ -0,0 +1,107 @@
+"""document list keyset and tag indexes
+
+Revision ID: e3b9c4d2a1f6
+Revises: c7d2e1a4b9f0
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from pathlib import Path
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.constants import SQL_DIR
+
+# revision identifiers, used by Alembic.
+revision: str = "e3b9c4d2a1f6"
+down_revision: Union[str, None] = "c7d2e1a4b9f0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keyset pagination for /api/documents/list: ORDER BY updated_at DESC,
+    # public_id DESC, with and without the gallery's draft_status filter.
+    op.create_index(
+        "idx_document_updated_at_public_id",
+        "document",
+        [sa.text("updated_at DESC"), sa.text("public_id DESC")],
+        schema="document",
+    )
+    op.create_index(
+        "idx_document_draft_status_updated_at_public_id",
+        "document",
+        [
+            sa.text("(map_metadata->>'draft_status')"),
+            sa.text("updated_at DESC"),
+            sa.text("public_id DESC"),
+        ],
+        schema="document",
+    )
+
+    op.create_table(
+        "document_tag",
+        sa.Column("tag_id", sa.Integer(), nullable=False),
+        sa.Column("document_id", UUID(), nullable=False),
+        sa.ForeignKeyConstraint(["tag_id"], ["comments.tag.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(
+            ["document_id"], ["document.document.document_id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("tag_id", "document_id"),
+        schema="comments",
+    )
+    op.create_index(
+        "ix_comments_document_tag_document_id",
+        "document_tag",
+        ["document_id"],
+        schema="comments",
+    )
+    op.execute(
+        sa.text("""
+        INSERT INTO comments.document_tag (tag_id, document_id)
+        SELECT DISTINCT ct.tag_id, dc.document_id
+        FROM comments.document_comment dc
+        JOIN comments.comment_tag ct ON ct.comment_id = dc.comment_id
+    """)
+    )
+
+    with Path(SQL_DIR, "document_tag_triggers.sql").open() as f:
+        op.execute(sa.text(f.read()))
+    op.execute(
+        sa.text("""
+        CREATE TRIGGER sync_document_tag
+            AFTER INSERT OR UPDATE OR DELETE ON comments.comment_tag
+            FOR EACH ROW EXECUTE FUNCTION comments.sync_document_tag_from_comment_tag();
+        CREATE TRIGGER sync_document_tag
+            AFTER INSERT OR UPDATE OR DELETE ON comments.document_comment
+            FOR EACH ROW EXECUTE FUNCTION comments.sync_document_tag_from_document_comment();
+    """)
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        sa.text("""
+        DROP TRIGGER IF EXISTS sync_document_tag ON comments.document_comment;
+        DROP TRIGGER IF EXISTS sync_document_tag ON comments.comment_tag;
+        DROP FUNCTION IF EXISTS comments.sync_document_tag_from_document_comment();
+        DROP FUNCTION IF EXISTS comments.sync_document_tag_from_comment_tag();
+    """)
+    )
+    op.drop_index(
+        "ix_comments_document_tag_document_id",
+        table_name="document_tag",
+        schema="comments",
+    )
+    op.drop_table("document_tag", schema="comments")
+    op.drop_index(
+        "idx_document_draft_status_updated_at_public_id",
+        table_name="document",
+        schema="document",
+    )
+    op.drop_index(
+        "idx_document_updated_at_public_id", table_name="document", schema="document"
+    )
@@ -4,6 +4,7 @@ from fastapi import Depends
 from sqlalchemy.sql.functions import count
 from app.core.db import get_session
 from sqlalchemy import cast, literal, text, Column, String, Integer, MetaData, Table
+from sqlalchemy.exc import NoResultFound
 from sqlmodel import Session, select
 from sqlalchemy.dialects.postgresql import insert, UUID as PG_UUID
 import logging
@@ -11,9 +12,9 @@ from networkx import Graph
 from app.models import (
     Assignments,
     CommunityAssignments,
-    DistrictrMap,
 )
 from app.core.config import settings
+from app.core.registry import REGISTRY
 from app.evaluation.graph import get_graph
 
 logger = logging.getLogger(__name__)
@@ -281,11 +282,9 @@ def batch_insert_assignments(
         session (Session): Optional database session. This function is to be used typically
             by a higher level interface and executed within its session.
     """
-    districtr_map = session.exec(
-        select(DistrictrMap).where(
-            DistrictrMap.districtr_map_slug == districtr_map_slug
-        )
-    ).one()
+    districtr_map = REGISTRY.districtr_map(session, districtr_map_slug)
+    if districtr_map is None:
+        raise NoResultFound(f"DistrictrMap {districtr_map_slug!r} not found")
 
     G = get_graph(districtr_map.gerrydb_table_name)
 
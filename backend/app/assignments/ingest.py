@@ -0,0 +1,284 @@
+"""
+Incremental decoding of PUT /api/assignments msgpack bodies.
+
+The request body is a msgpack map whose ``assignments`` value can hold
+hundreds of thousands of ``[geo_id, zone]`` pairs. Rather than buffering the
+whole body, unpacking it into Python lists and validating it with Pydantic
+before writing it to a temp table, ``AssignmentsStreamDecoder`` is fed body
+chunks as they arrive and hands back validated rows one at a time so they can
+go straight into a COPY. Every other key (document_id, last_updated_at,
+map_type, metadata, comments, ...) is small and is collected into ``header``
+for validation against ``AssignmentsUpdate``.
+
+``assignments`` must be the last key of the map (the decoder rejects bodies
+where it is not), so `read_until_assignments` hands the endpoint the complete
+header to validate and check the document against before a single row is
+copied. `copy_assignment_stream` then moves the rows into the
+temp table: the event loop decodes the body and passes row batches through a
+bounded queue to a worker thread that owns the cursor and the COPY, so neither
+side blocks the other and the body is never held in memory.
+"""
+
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
+
+import anyio
+import msgpack
+from anyio.abc import ObjectReceiveStream
+from sqlalchemy import Connection, text
+
+ASSIGNMENTS_KEY = "assignments"
+
+
+class AssignmentsDecodeError(ValueError):
+    """The body is not a well-formed msgpack map."""
+
+
+class AssignmentRowError(ValueError):
+    """An ``assignments`` entry is not a ``[geo_id, zone]`` pair."""
+
+    def __init__(self, index: int, msg: str, value=None):
+        super().__init__(msg)
+        self.index = index
+        self.msg = msg
+        self.value = value
+
+    def errors(self) -> list[dict]:
+        """Pydantic-style error list so the 422 detail matches model validation."""
+        return [
+            {
+                "type": "assignment_row",
+                "loc": [ASSIGNMENTS_KEY, self.index],
+                "msg": self.msg,
+                "input": repr(self.value),
+            }
+        ]
+
+
+def validate_assignment_row(index: int, row) -> tuple[str, int | None]:
+    """
+    Check a single decoded ``assignments`` entry.
+
+    Rows are ``[geo_id]`` or ``[geo_id, zone]`` where geo_id is a string and
+    zone is an integer or null (unassigned).
+
+    Raises:
+        AssignmentRowError: If the row has the wrong shape or types.
+    """
+    if not isinstance(row, (list, tuple)) or not 1 <= len(row) <= 2:
+        raise AssignmentRowError(index, "Expected [geo_id, zone]", row)
+    geo_id = row[0]
+    if not isinstance(geo_id, str):
+        raise AssignmentRowError(index, "geo_id must be a string", row)
+    zone = row[1] if len(row) > 1 else None
+    if zone is not None and (not isinstance(zone, int) or isinstance(zone, bool)):
+        raise AssignmentRowError(index, "zone must be an integer or null", row)
+    return geo_id, zone
+
+
+class AssignmentsStreamDecoder:
+    """
+    Push-style msgpack decoder for the PUT /api/assignments body, a map whose
+    last key is ``assignments``.
+
+    Usage::
+
+        decoder = AssignmentsStreamDecoder()
+        async for chunk in request.stream():
+            for geo_id, zone in decoder.feed(chunk):
+                copy.write_row((geo_id, zone))
+        decoder.close()
+        header = decoder.header
+
+    ``msgpack.Unpacker`` rewinds to the last complete object when it runs out
+    of buffered bytes, so each step below is simply retried on the next chunk.
+    """
+
+    def __init__(self, max_buffer_size: int = 100 * 1024 * 1024):
+        self._unpacker = msgpack.Unpacker(raw=False, max_buffer_size=max_buffer_size)
+        self._bytes_fed = 0
+        self._keys_remaining: int | None = None
+        self._current_key: str | None = None
+        self._rows_remaining = 0
+        self.header: dict = {}
+        self.row_count = 0
+        self.has_assignments_key = False
+
+    @property
+    def done(self) -> bool:
+        return self._keys_remaining == 0 and self._current_key is None
+
+    def feed(self, chunk: bytes) -> Iterator[tuple[str, int | None]]:
+        """Buffer ``chunk`` and yield every assignment row it completes."""
+        if not chunk:
+            return
+        if self.done:
+            raise AssignmentsDecodeError("Extra data after msgpack map")
+        try:
+            self._unpacker.feed(chunk)
+        except msgpack.BufferFull as e:
+            raise AssignmentsDecodeError("Request body too large") from e
+        self._bytes_fed += len(chunk)
+        try:
+            yield from self._drain()
+        except msgpack.OutOfData:
+            return
+        except AssignmentRowError:
+            raise
+        except (ValueError, TypeError, msgpack.UnpackException) as e:
+            raise AssignmentsDecodeError(str(e)) from e
+        if self.done and self._unpacker.tell() < self._bytes_fed:
+            raise AssignmentsDecodeError("Extra data after msgpack map")
+
+    def _drain(self) -> Iterator[tuple[str, int | None]]:
+        unpacker = self._unpacker
+        if self._keys_remaining is None:
+            self._keys_remaining = unpacker.read_map_header()
+        while not self.done:
+            if self._current_key is None:
+                key = unpacker.unpack()
+                if not isinstance(key, str):
+                    raise AssignmentsDecodeError(
+                        f"Map key must be a string, got {key!r}"
+                    )
+                if key == ASSIGNMENTS_KEY and self._keys_remaining > 1:
+                    # Keys after the rows could only be checked once they had
+                    # all been copied.
+                    raise AssignmentsDecodeError(
+                        "`assignments` must be the last key of the map"
+                    )
+                self._current_key = key
+            elif self._current_key != ASSIGNMENTS_KEY:
+                # Everything but the assignments list is small; decode it whole.
+                self.header[self._current_key] = unpacker.unpack()
+                self._finish_key()
+            elif not self.has_assignments_key:
+                self._rows_remaining = unpacker.read_array_header()
+                self.has_assignments_key = True
+                if not self._rows_remaining:
+                    self._finish_key()
+            else:
+                row = unpacker.unpack()
+                yield validate_assignment_row(self.row_count, row)
+                self.row_count += 1
+                self._rows_remaining -= 1
+                if not self._rows_remaining:
+                    self._finish_key()
+
+    def _finish_key(self) -> None:
+        self._current_key = None
+        self._keys_remaining -= 1
+
+    def close(self) -> None:
+        """
+        Raises:
+            AssignmentsDecodeError: If the body ended before the map was complete.
+        """
+        if not self.done:
+            raise AssignmentsDecodeError("Unexpected end of msgpack data")
+
+
+# Rows per batch handed to the COPY worker, and batches buffered between the
+# decoder and the worker before reading the body pauses.
+COPY_BATCH_ROWS = 5_000
+COPY_QUEUE_BATCHES = 8
+
+
+async def read_until_assignments(
+    decoder: AssignmentsStreamDecoder, chunks: AsyncIterator[bytes]
+) -> list[tuple[str, int | None]]:
+    """
+    Feed ``chunks`` to ``decoder`` until the ``assignments`` list starts (or
+    the body ends), so every other key is in ``decoder.header``.
+
+    Returns the rows decoded from the last chunk read, to be copied first.
+    """
+    rows: list[tuple[str, int | None]] = []
+    while not (decoder.has_assignments_key or decoder.done):
+        try:
+            chunk = await anext(chunks)
+        except StopAsyncIteration:
+            break
+        rows.extend(decoder.feed(chunk))
+    return rows
+
+
+def _copy_rows(
+    connection: Connection,
+    temp_table_name: str,
+    receive: ObjectReceiveStream[list[tuple[str, int | None]]],
+) -> None:
+    connection.execute(
+        text(
+            f"CREATE TEMP TABLE {temp_table_name} (geo_id TEXT, zone INT) ON COMMIT DROP"
+        )
+    )
+    cursor = connection.connection.cursor()
+    with cursor.copy(f"COPY {temp_table_name} (geo_id, zone) FROM STDIN") as copy:
+        while True:
+            try:
+                batch = anyio.from_thread.run(receive.receive)
+            except anyio.EndOfStream:
+                return
+            for row in batch:
+                copy.write_row(row)
+
+
+async def copy_assignment_stream(
+    decoder: AssignmentsStreamDecoder,
+    chunks: AsyncIterator[bytes],
+    rows: list[tuple[str, int | None]],
+    connection: Connection,
+    temp_table_name: str,
+) -> None:
+    """
+    Create ``temp_table_name`` (dropped on commit) and COPY ``rows`` followed
+    by the rest of the body's assignment rows into it.
+
+    The COPY runs in a worker thread fed through a bounded queue; reading the
+    body pauses while the queue is full. Decoding errors are raised once the
+    worker has finished, and so are database errors from the worker.
+
+    Raises:
+        AssignmentsDecodeError: If the body is not a well-formed msgpack map.
+        AssignmentRowError: If an assignment row is malformed.
+    """
+    send, receive = anyio.create_memory_object_stream[list[tuple[str, int | None]]](
+        COPY_QUEUE_BATCHES
+    )
+    errors: dict[str, Exception] = {}
+
+    def worker() -> None:
+        try:
+            _copy_rows(connection, temp_table_name, receive)
+        except Exception as error:
+            errors["copy"] = error
+        finally:
+            # Unblocks the sender if the COPY failed with batches pending.
+            anyio.from_thread.run_sync(receive.close)
+
+    async def send_batches(batch: list[Any]) -> None:
+        async with send:
+            try:
+                async for chunk in chunks:
+                    batch.extend(decoder.feed(chunk))
+                    if len(batch) >= COPY_BATCH_ROWS:
+                        await send.send(batch)
+                        batch = []
+                decoder.close()
+                if batch:
+                    await send.send(batch)
+            except anyio.BrokenResourceError:
+                # The worker stopped; its error is raised below.
+                pass
+            except Exception as error:
+                errors["stream"] = error
+
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(anyio.to_thread.run_sync, worker)
+        await send_batches(list(rows))
+
+    if "stream" in errors:
+        raise errors["stream"]
+    if "copy" in errors:
+        raise errors["copy"]
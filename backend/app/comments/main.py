@@ -10,11 +10,24 @@ from fastapi import (
 )
 from sqlmodel import Session, col
 from sqlalchemy.exc import IntegrityError, DataError
-from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy import text, func, select, String, Select, update, delete
+from sqlalchemy.dialects.postgresql import TSVECTOR, insert
+from sqlalchemy import (
+    Integer,
+    Row,
+    Select,
+    String,
+    column,
+    delete,
+    func,
+    null,
+    select,
+    text,
+    update,
+    values,
+)
 
 from app.core.security import auth, require_session, TokenScope
-from sqlalchemy.sql import or_, and_, exists, literal, cast, case
+from sqlalchemy.sql import or_, and_, exists, literal, literal_column, cast, case
 
 from app.core.dependencies import get_protected_document, validate_document_exists
 from app.core.db import get_session
@@ -51,11 +64,12 @@ from app.comments.moderation import (
     moderate_submission,
     moderate_commenter,
     moderate_comment,
-    moderate_comment_by_id,
+    moderate_comments_by_id,
     moderate_tag,
     MODERATION_THRESHOLD,
 )
 from app.models import Document, DistrictrMap
+from app.core.config import settings
 from app.core.security import recaptcha
 
 from app.comments.settings import (
@@ -217,6 +231,62 @@ def create_document_comment(
     return doc_comment
 
 
+def insert_scoped_comments(
+    source: Select,
+    document_id: str,
+    session: Session,
+    association_model=DocumentComment,
+    scope_column: str = "zone",
+) -> list[Row]:
+    """
+    Insert a Comment per row of `source` and link each one to `document_id`, in
+    a single statement regardless of the number of rows.
+
+    `source` must select `title`, `comment`, `commenter_id` and `scope` columns.
+    New ids are drawn from the comment sequence up front so both inserts can be
+    driven by the same materialized CTE; the association's foreign key is only
+    checked at the end of the statement.
+
+    Returns:
+        The new comments' `id`, `title`, `comment` and `scope`.
+    """
+    incoming = (
+        select(
+            func.nextval(
+                func.pg_get_serial_sequence(Comment.__table__.fullname, "id")
+            ).label("id"),
+            *source.subquery().c,
+        )
+        .cte("incoming")
+        .prefix_with("MATERIALIZED")
+    )
+    new_comments = insert(Comment).from_select(
+        ["id", "title", "comment", "commenter_id"],
+        select(
+            incoming.c.id,
+            incoming.c.title,
+            incoming.c.comment,
+            incoming.c.commenter_id,
+        ),
+        include_defaults=False,
+    )
+    new_links = insert(association_model).from_select(
+        ["comment_id", "document_id", scope_column],
+        select(
+            incoming.c.id,
+            literal(document_id, association_model.__table__.c.document_id.type),
+            incoming.c.scope,
+        ),
+    )
+    stmt = (
+        select(incoming.c.id, incoming.c.title, incoming.c.comment, incoming.c.scope)
+        .add_cte(new_comments.cte("new_comments"))
+        .add_cte(new_links.cte("new_links"))
+        .order_by(incoming.c.id)
+    )
+    return list(session.connection().execute(stmt))
+
+
 def _sync_scoped_comments(
     document_id: str,
     comments: list[DistrictCommentInput],
@@ -275,7 +345,8 @@ def _sync_scoped_comments(
                 detail=f"Maximum {max_comments_per_district} comments per zone (zone {zone_val})",
             )
 
-    kept_comment_ids = set()
+    updates: dict[int, tuple[str, str]] = {}
+    creates: list[tuple[str, str, int]] = []
     for c in comments:
         zone = c.zone
         # Comment text is required to be a string and have length > 0 by DB constraints
@@ -285,6 +356,7 @@ def _sync_scoped_comments(
         if zone is None:
             continue
 
+        title = f"{title_prefix} {zone} note"
         # Try to parse as existing comment id (integer from comments.comment)
         existing_id = None
         if comment_id_str is not None:
@@ -296,43 +368,50 @@ def _sync_scoped_comments(
                 pass
 
         if existing_id is not None:
-            # Update existing comment
-            title = f"{title_prefix} {zone} note"
-            stmt = (
-                update(Comment)
-                .where(col(Comment.id) == existing_id)
-                .values(comment=comment_text, title=title)
-            )
-            session.connection().execute(stmt)
-            kept_comment_ids.add(existing_id)
-            if background_tasks:
-                background_tasks.add_task(
-                    moderate_comment_by_id, existing_id, f"{title} {comment_text}"
-                )
+            updates[existing_id] = (title, comment_text)
         else:
-            # Create new comment
-            title = f"{title_prefix} {zone} note"
-            new_comment = Comment(
-                title=title,
-                comment=comment_text,
-                commenter_id=None,
-            )
-            session.add(new_comment)
-            session.flush()
-            stmt = insert(association_model).values(
-                comment_id=new_comment.id,
-                document_id=document_id,
-                **{scope_column: zone},
-            )
-            session.connection().execute(stmt)
-            kept_comment_ids.add(new_comment.id)
-            if background_tasks:
-                background_tasks.add_task(
-                    moderate_comment_by_id, new_comment.id, f"{title} {comment_text}"
-                )
+            creates.append((title, comment_text, zone))
+
+    to_moderate: list[tuple[int, str]] = []
+    if updates:
+        incoming = values(
+            column("id", Integer),
+            column("title", String),
+            column("comment", String),
+            name="incoming",
+        ).data([(cid, title, text_) for cid, (title, text_) in updates.items()])
+        session.connection().execute(
+            update(Comment)
+            .where(col(Comment.id) == incoming.c.id)
+            .values(title=incoming.c.title, comment=incoming.c.comment)
+        )
+        to_moderate.extend(
+            (cid, f"{title} {text_}") for cid, (title, text_) in updates.items()
+        )
+
+    if creates:
+        incoming = values(
+            column("title", String),
+            column("comment", String),
+            column("scope", Integer),
+            name="incoming",
+        ).data([(title, text_, zone) for title, text_, zone in creates])
+        created = insert_scoped_comments(
+            select(
+                incoming.c.title,
+                incoming.c.comment,
+                cast(null(), Integer).label("commenter_id"),
+                incoming.c.scope,
+            ),
+            document_id=document_id,
+            association_model=association_model,
+            scope_column=scope_column,
+            session=session,
+        )
+        to_moderate.extend((row.id, f"{row.title} {row.comment}") for row in created)
 
     # Delete scoped comments not in the kept set (association first, then Comment)
-    to_delete = [cid for cid in existing_dc if cid not in kept_comment_ids]
+    to_delete = [cid for cid in existing_dc if cid not in updates]
     if to_delete:
         session.connection().execute(
             delete(association_model).where(
@@ -346,6 +425,10 @@ def _sync_scoped_comments(
             delete(Comment).where(col(Comment.id).in_(to_delete))
         )
 
+    # One background task scores every touched comment in a single batch.
+    if background_tasks and to_moderate:
+        background_tasks.add_task(moderate_comments_by_id, to_moderate)
+
 
 def sync_district_comments(
     document_id: str,
@@ -643,6 +726,46 @@ def apply_public_id_filter_for_district(stmt: Select, public_id: int | None) ->
     return stmt.where(col(Document.public_id) == public_id)
 
 
+# Generated, GIN-indexed column (title weighted A, body B); see migration
+# a9c3e5f7b2d4. Not mapped on `Comment` since Postgres computes it and it is
+# never written or returned.
+COMMENT_SEARCH_VECTOR = literal_column("comments.comment.search_vector", TSVECTOR)
+COMMENT_SEARCH_CONFIG = literal_column("'english'::regconfig")
+
+
+def _like_pattern(search: str) -> str:
+    """Substring LIKE pattern matching `search` literally (``%``, ``_`` and the
+    backslash escape character are escaped)."""
+    escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def apply_search_filter(stmt: Select, search: str | None) -> Select:
+    """
+    Full-text search on title and comment text, best matches first.
+
+    `websearch_to_tsquery` accepts quoted phrases, `or` and `-term`. With
+    COMMENT_SEARCH_SUBSTRING set, substring matches (partial words) also count
+    via ILIKE, which the pg_trgm GIN indexes on title and comment serve
+    without a sequential scan.
+    """
+    if not search:
+        return stmt
+    query = func.websearch_to_tsquery(COMMENT_SEARCH_CONFIG, search)
+    match = COMMENT_SEARCH_VECTOR.op("@@")(query)
+    if settings.COMMENT_SEARCH_SUBSTRING:
+        pattern = _like_pattern(search)
+        match = or_(
+            match,
+            col(Comment.title).ilike(pattern, escape="\\"),
+            col(Comment.comment).ilike(pattern, escape="\\"),
+        )
+    return stmt.where(match).order_by(
+        func.ts_rank_cd(COMMENT_SEARCH_VECTOR, query).desc(),
+        col(Comment.id).desc(),
+    )
+
+
 def apply_exclude_district_comments(stmt: Select) -> Select:
     """Exclude district comments (DocumentComment with zone IS NOT NULL) from results."""
     return stmt.where(
@@ -728,15 +851,7 @@ def get_comments_base_query(
     stmt = apply_location_filters(stmt, params.place, params.state, params.zip_code)
     stmt = apply_tag_filter(stmt, tag_subquery, params.tags)
 
-    # Text search filter (ILIKE on title and comment)
-    if search:
-        search_pattern = f"%{search}%"
-        stmt = stmt.where(
-            or_(
-                col(Comment.title).ilike(search_pattern),
-                col(Comment.comment).ilike(search_pattern),
-            )
-        )
+    stmt = apply_search_filter(stmt, search)
 
     # Has map filter (comments with associated map)
     if has_map is not None:
@@ -782,7 +897,7 @@ def moderate_comments_query(
     stmt = stmt.where(or_(col(Commenter.id).is_(None), commenter_ok))
 
     # Tag moderation: exclude the entire comment if ANY attached tag fails.
-    # We phrase this as NOT EXISTS(bad_tag). score_text semantics: 0=clean, 1=offensive,
+    # We phrase this as NOT EXISTS(bad_tag). score_texts semantics: 0=clean, 1=offensive,
     # so "bad" means score at or above threshold.
     bad_tag_conds = [
         Tag.review_status == ReviewStatus.REJECTED,
@@ -813,6 +928,7 @@ def get_admin_query(
     params: CommentFilterParams,
     max_moderation_score: float,
     review_status: ReviewStatus | None,
+    search: str | None = None,
 ) -> Select:
     """
     Return admin comments query with all admin columns and moderation filtering.
@@ -863,6 +979,7 @@ def get_admin_query(
     stmt = apply_review_flagged_filter(stmt, params.review_flagged)
     stmt = apply_location_filters(stmt, params.place, params.state, params.zip_code)
     stmt = apply_tag_filter(stmt, tag_subquery, params.tags)
+    stmt = apply_search_filter(stmt, search)
 
     # Admin-specific moderation filtering
     stmt = stmt.where(
@@ -886,6 +1003,7 @@ def get_admin_district_comments_query(
     params: CommentFilterParams,
     max_moderation_score: float,
     review_status: ReviewStatus | None,
+    search: str | None = None,
 ) -> Select:
     """
     Return admin query for district comments only (DocumentComment with zone IS NOT NULL).
@@ -936,6 +1054,7 @@ def get_admin_district_comments_query(
     stmt = apply_comment_id_filter(stmt, params.comment_id)
     stmt = apply_review_flagged_filter(stmt, params.review_flagged)
     stmt = apply_location_filters(stmt, params.place, params.state, params.zip_code)
+    stmt = apply_search_filter(stmt, search)
 
     stmt = stmt.where(
         and_(
@@ -969,7 +1088,7 @@ async def list_comments(
     offset: int = Query(default=0, ge=0),
     limit: int = Query(default=100, le=100),
     search: str | None = Query(
-        default=None, description="Search in title and comment text"
+        default=None, description="Full-text search in title and comment text"
     ),
     has_map: bool | None = Query(
         default=None, description="Filter for comments with/without maps"
@@ -1010,6 +1129,9 @@ async def list_comments_admin(
     session: Session = Depends(get_session),
     auth_result: dict = Security(auth.verify, scopes=[TokenScope.review_content]),
     review_status: ReviewStatus = Query(default=None),
+    search: str | None = Query(
+        default=None, description="Full-text search in title and comment text"
+    ),
 ):
     params = CommentFilterParams(
         tags=tags if tags else None,
@@ -1026,6 +1148,7 @@ async def list_comments_admin(
         params,
         max_moderation_score=max_moderation_score,
         review_status=review_status,
+        search=search,
     )
     results = session.exec(stmt).all()  # type: ignore[no-matching-overload]
     return results
@@ -1056,6 +1179,9 @@ async def list_district_comments_admin(
     session: Session = Depends(get_session),
     auth_result: dict = Security(auth.verify, scopes=[TokenScope.review_content]),
     review_status: ReviewStatus = Query(default=None),
+    search: str | None = Query(
+        default=None, description="Full-text search in title and comment text"
+    ),
 ):
     """List district-level comments for moderation. Filter by document_id, public_id, or comment_id."""
     params = CommentFilterParams(
@@ -1073,6 +1199,7 @@ async def list_district_comments_admin(
         params,
         max_moderation_score=max_moderation_score,
         review_status=review_status,
+        search=search,
     )
     results = session.exec(stmt).all()  # type: ignore[no-matching-overload]
     return results
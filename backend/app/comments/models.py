@@ -282,6 +282,33 @@ class DocumentComment(SQLModel, table=True):
     )
 
 
+class DocumentTag(SQLModel, table=True):
+    """
+    Tags used by any comment on a document. Maintained by triggers on
+    comment_tag and document_comment (see sql/document_tag_triggers.sql);
+    never write to it directly.
+    """
+
+    metadata = MetaData(schema=COMMENTS_SCHEMA)
+    __tablename__ = "document_tag"
+
+    tag_id: int = Field(
+        sa_column=Column(
+            ForeignKey(Tag.id, ondelete="CASCADE"),  # type: ignore
+            primary_key=True,
+            nullable=False,
+        )
+    )
+    document_id: str = Field(
+        sa_column=Column(
+            ForeignKey(Document.document_id, ondelete="CASCADE"),
+            primary_key=True,
+            nullable=False,
+            index=True,
+        )
+    )
+
+
 class FullCommentFormCreate(BaseModel):
     comment: CommentCreate
     commenter: CommenterCreate
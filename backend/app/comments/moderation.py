@@ -1,6 +1,23 @@
-"""Profanity detection and scoring for comments system."""
-
+"""Profanity detection and scoring for comments system.
+
+Texts are scored in batches: `score_texts` de-duplicates its input, serves
+repeats from an in-process cache keyed by a hash of the normalized text, and
+sends the rest to the OpenAI moderation endpoint (which accepts arrays) in
+chunks of `MODERATION_BATCH_SIZE`, at most `MODERATION_MAX_CONCURRENCY`
+requests at a time. Anything the API could not score falls back to the local
+profanity check, whose scores are not cached. `moderate_items` writes a batch
+of scores back with one UPDATE per table and a single commit.
+"""
+
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from sqlalchemy import Float, Integer, column, values
 from sqlmodel import Session, Table, update
 
 from app.core.db import engine
@@ -21,12 +38,72 @@ logger = logging.getLogger(__name__)
 
 
 MODERATION_THRESHOLD: float = 0.2
+MODERATION_MODEL = "omni-moderation-latest"
+# Texts per moderation API request.
+MODERATION_BATCH_SIZE = 32
+# Moderation API requests in flight at once.
+MODERATION_MAX_CONCURRENCY = 4
+# Rows scored and written back per UPDATE/commit in `moderate_items`.
+MODERATION_WRITE_BATCH_SIZE = 500
+MODERATION_CACHE_SIZE = 10_000
+
+# (table, primary key, text to score)
+ModerationItem = tuple[Table, int, str]
+
+
+def _chunks(items: Iterable, size: int) -> Iterable[list]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def normalize_text(text: str) -> str:
+    """Casefolded text with runs of whitespace collapsed, used as the cache key."""
+    return " ".join(text.split()).casefold()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode()).hexdigest()
+
+
+class ScoreCache:
+    """Thread-safe LRU of moderation scores keyed by `text_hash`."""
 
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._scores: OrderedDict[str, float] = OrderedDict()
 
-def rate_offensive_text_ai(text: str) -> ModerationScore | None:
+    def get(self, key: str) -> float | None:
+        with self._lock:
+            score = self._scores.get(key)
+            if score is not None:
+                self._scores.move_to_end(key)
+            return score
+
+    def set(self, key: str, score: float) -> None:
+        with self._lock:
+            self._scores[key] = score
+            self._scores.move_to_end(key)
+            while len(self._scores) > self.maxsize:
+                self._scores.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._scores.clear()
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+
+SCORE_CACHE = ScoreCache(maxsize=MODERATION_CACHE_SIZE)
+
+
+def rate_offensive_texts_ai(texts: Sequence[str]) -> list[ModerationScore] | None:
     """
-    Rates how offensive or inappropriate the given text is.
-    Returns a float between 0 (not offensive) and 1 (certainly offensive).
+    Rates how offensive or inappropriate each of `texts` is in one API call.
+    Returns floats between 0 (not offensive) and 1 (certainly offensive), in
+    input order, or None when no OpenAI client is configured.
     """
     openai_client = settings.get_openai_client()
     if not openai_client:
@@ -34,15 +111,17 @@ def rate_offensive_text_ai(text: str) -> ModerationScore | None:
 
     try:
         response = openai_client.moderations.create(
-            input=text, model="omni-moderation-latest"
+            input=list(texts), model=MODERATION_MODEL
         )
-        scores = response.results[0].category_scores
-        # get all score values
-        score_values = list(scores.__dict__.values())
-        return ModerationScore(ok=True, score=max(score_values))
+        return [
+            ModerationScore(
+                ok=True, score=max(result.category_scores.__dict__.values())
+            )
+            for result in response.results
+        ]
     except Exception as e:
         logger.info(f"Error during moderation: {e}")
-        return ModerationScore(ok=False, score=1.0, error=str(e))
+        return [ModerationScore(ok=False, score=1.0, error=str(e)) for _ in texts]
 
 
 def check_profanity(text: str) -> ModerationScore:
@@ -57,61 +136,107 @@ def check_profanity(text: str) -> ModerationScore:
         return ModerationScore(ok=False, score=1.0, error=str(e))
 
 
-def score_text(text: str) -> float:
+def _score_ai(texts: list[str]) -> list[ModerationScore | None]:
+    """Moderation API scores for `texts`, None where the API is not configured
+    or could not score a text."""
+    results: list[ModerationScore | None] = [None] * len(texts)
+    if not settings.OPENAI_API_KEY:
+        return results
+
+    chunks = list(_chunks(range(len(texts)), MODERATION_BATCH_SIZE))
+    with ThreadPoolExecutor(
+        max_workers=min(MODERATION_MAX_CONCURRENCY, len(chunks))
+    ) as pool:
+        for indices, chunk_results in zip(
+            chunks,
+            pool.map(
+                lambda indices: rate_offensive_texts_ai([texts[i] for i in indices]),
+                chunks,
+            ),
+        ):
+            for i, result in zip(indices, chunk_results or []):
+                if result.ok:
+                    results[i] = result
+    return results
+
+
+def score_texts(texts: Sequence[str]) -> list[float]:
     """
-    Check profanity score for a given text using better-profanity library.
-    Returns 1.0 if profane, 0.0 if clean.
+    Moderation scores for `texts`, in input order.
+    0.0 is clean, 1.0 is offensive; blank texts score 0.0 and texts that
+    could not be scored at all score 1.0. Only moderation API scores are
+    cached, so texts scored by the local fallback are sent to the API again
+    once it is reachable.
     """
-    # TODO: add AI check and use this as a fallback
-    if not text or not text.strip():
-        return 0.0
-
-    if settings.OPENAI_API_KEY:
-        result = rate_offensive_text_ai(text)
-        if result and result.ok:
-            return result.score
-
-    result = check_profanity(text)
-    if result.ok:
-        return result.score
-
-    return 1.0
-
-
-def moderate_text(cls: Table, key: int, text: str, session: Session) -> float:
-    """
-    Check profanity score for save to database.
-    Returns the profanity score.
-    """
-    score = score_text(text)
-    update_moderation_score(cls, key, score, session)
-
-    return score
-
-
-def update_moderation_score(
-    cls: Table, key: int, score: float, session: Session
+    scores: list[float | None] = [None] * len(texts)
+    pending: dict[str, list[int]] = {}
+    for i, text in enumerate(texts):
+        if not text or not text.strip():
+            scores[i] = 0.0
+            continue
+        key = text_hash(text)
+        cached = SCORE_CACHE.get(key)
+        if cached is not None:
+            scores[i] = cached
+        else:
+            pending.setdefault(key, []).append(i)
+
+    if pending:
+        keys = list(pending)
+        pending_texts = [texts[pending[key][0]] for key in keys]
+        for key, text, result in zip(keys, pending_texts, _score_ai(pending_texts)):
+            if result is not None:
+                score = result.score
+                SCORE_CACHE.set(key, score)
+            else:
+                fallback = check_profanity(text)
+                score = fallback.score if fallback.ok else 1.0
+            for i in pending[key]:
+                scores[i] = score
+
+    return scores  # type: ignore[return-value]
+
+
+def update_moderation_scores(
+    cls: Table, scores: dict[int, float], session: Session
 ) -> None:
-    stmt = update(cls).where(cls.id == key).values(moderation_score=score)  # type: ignore
+    """Set `moderation_score` on every `cls` row in `scores` with one UPDATE."""
+    if not scores:
+        return
+    new_scores = values(
+        column("id", Integer), column("score", Float), name="new_scores"
+    ).data(list(scores.items()))
+    stmt = (
+        update(cls)
+        .where(cls.id == new_scores.c.id)  # type: ignore
+        .values(moderation_score=new_scores.c.score)
+    )
     session.execute(stmt)
 
+
+def _moderate_batch(items: list[ModerationItem], session: Session) -> None:
+    scores = score_texts([text for _, _, text in items])
+    by_table: dict[Table, dict[int, float]] = {}
+    for (cls, key, _), score in zip(items, scores):
+        by_table.setdefault(cls, {})[key] = score
+    for cls, table_scores in by_table.items():
+        update_moderation_scores(cls, table_scores, session)
+
     try:
         session.commit()
-        logger.info(
-            f"Saved {type(cls).__name__} moderation score: {key}, score={score}"
-        )
+        logger.info(f"Saved {len(items)} moderation scores")
     except Exception as e:
         session.rollback()
-        logger.error(
-            f"Failed to save moderation score for {type(cls).__name__} id={key}: {e}"
-        )
+        logger.error(f"Failed to save {len(items)} moderation scores: {e}")
         # Re-raise so background-task runners surface the failure instead of leaving
         # moderation_score silently NULL.
         raise
 
 
-def _moderate(cls: Table, key: int, text: str, session: Session | None) -> None:
-    """Score ``text`` and persist the result for ``cls``/``key``.
+def moderate_items(
+    items: Iterable[ModerationItem], session: Session | None = None
+) -> None:
+    """Score ``items`` and persist the results, one UPDATE per table per batch.
 
     When ``session`` is None (the background-task case) a dedicated session is
     opened and closed here. Background tasks must not reuse the request-scoped
@@ -119,15 +244,16 @@ def _moderate(cls: Table, key: int, text: str, session: Session | None) -> None:
     check out would never be returned to the pool (a leak).
     """
     if session is not None:
-        moderate_text(cls=cls, key=key, text=text, session=session)
+        for batch in _chunks(items, MODERATION_WRITE_BATCH_SIZE):
+            _moderate_batch(batch, session)
     else:
         with Session(engine) as owned_session:
-            moderate_text(cls=cls, key=key, text=text, session=owned_session)
+            moderate_items(items, owned_session)
 
 
 def moderate_comment(comment: Comment, session: Session | None = None) -> None:
     comment_text = f"{comment.title} {comment.comment}"
-    _moderate(Comment, comment.id, comment_text, session)
+    moderate_items([(Comment, comment.id, comment_text)], session)
 
 
 def moderate_comment_by_id(comment_id: int, comment_text: str) -> None:
@@ -135,15 +261,23 @@ def moderate_comment_by_id(comment_id: int, comment_text: str) -> None:
     Moderate a comment by ID. Use when the Comment object may be detached
     (e.g. in background tasks after request session is closed).
     """
-    _moderate(Comment, comment_id, comment_text, None)
+    moderate_items([(Comment, comment_id, comment_text)])
+
+
+def moderate_comments_by_id(comments: list[tuple[int, str]]) -> None:
+    """
+    Moderate many comments by ID in one batch, e.g. every comment touched by a
+    scoped-comment sync. Each entry is ``(comment_id, comment_text)``.
+    """
+    moderate_items([(Comment, comment_id, text) for comment_id, text in comments])
 
 
 def moderate_commenter(commenter: Commenter, session: Session | None = None) -> None:
-    _moderate(Commenter, commenter.id, str(commenter), session)
+    moderate_items([(Commenter, commenter.id, str(commenter))], session)
 
 
 def moderate_tag(tag: Tag, session: Session | None = None) -> None:
-    _moderate(Tag, tag.id, str(tag), session)
+    moderate_items([(Tag, tag.id, str(tag))], session)
 
 
 def moderate_submission(
@@ -152,9 +286,15 @@ def moderate_submission(
 ) -> None:
     """
     Background task to check moderation scores for a complete comment submission.
-    Each entity is scored on its own session when none is supplied.
+    The comment, commenter and tags are scored together and saved in one commit.
     """
-    moderate_comment(response.comment, session)
-    moderate_commenter(response.commenter, session)
-    for tag in response.tags:
-        moderate_tag(tag, session)
+    items: list[ModerationItem] = [
+        (
+            Comment,
+            response.comment.id,
+            f"{response.comment.title} {response.comment.comment}",
+        ),
+        (Commenter, response.commenter.id, str(response.commenter)),
+    ]
+    items.extend((Tag, tag.id, str(tag)) for tag in response.tags)
+    moderate_items(items, session)
@@ -3,9 +3,8 @@ from app.contiguity.main import (
     subgraph_number_connected_components,
     expand_non_contiguous_parents,
     get_assigned_nodes,
-    get_assigned_nodes_bboxes,
+    annotate_graph_bounds,
     ZoneContiguousNodes,
-    NodeWithBBoxes,
 )
 
 __all__ = [
@@ -13,7 +12,6 @@ __all__ = [
     "subgraph_number_connected_components",
     "expand_non_contiguous_parents",
     "get_assigned_nodes",
-    "get_assigned_nodes_bboxes",
+    "annotate_graph_bounds",
     "ZoneContiguousNodes",
-    "NodeWithBBoxes",
 ]
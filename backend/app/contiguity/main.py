@@ -1,5 +1,13 @@
 from networkx import Graph, is_connected, number_connected_components
 from typing import Iterable, Hashable, Any
+import numpy as np
+from app.evaluation.graph import (
+    GraphIndex,
+    component_bounds,
+    get_graph_index,
+    group_by_label,
+    label_components,
+)
 from app.models import UUIDType, DistrictrMap
 from app.utils import assert_safe_ident
 from sqlmodel import Session, Integer, ARRAY
@@ -131,101 +139,191 @@ def get_assigned_nodes(
     ]
 
 
-class NodeWithBBoxes(BaseModel):
-    node: str
-    xmin: float
-    xmax: float
-    ymin: float
-    ymax: float
+def _units_outside_graph(
+    session: Session, index: GraphIndex, parent_layer: str
+) -> list[str]:
+    """Top-level geo_ids with no node in the graph (no adjacency at all).
 
-
-def get_assigned_nodes_bboxes(
+    Read once per loaded graph and kept on the index, so only the first
+    request after a graph load scans the layer.
+    """
+    cached = index.units_outside_graph.get(parent_layer)
+    if cached is None:
+        safe_layer = assert_safe_ident(parent_layer)
+        paths = session.execute(
+            sa.text(f"SELECT path FROM gerrydb.{safe_layer}")
+        ).scalars()
+        cached = sorted(path for path in paths if path not in index.node_index)
+        index.units_outside_graph[parent_layer] = cached
+    return cached
+
+
+def get_unassigned_components(
     session: Session,
     document_id: str,
     districtr_map: DistrictrMap,
-    zone: int,
-    G: Graph | None = None,
-) -> list[NodeWithBBoxes] | None:
-    """Return contiguous assigned nodes with bounding boxes for a specific zone.
-
-    For shatterable maps (child_layer + parent_layer on districtr_map), unions both
-    geometry-bearing base tables so each geo_id finds its geometry regardless of level.
-    For non-shatterable maps, joins against gerrydb.{gerrydb_table_name} directly.
-
-    When G is provided, non-contiguous parent nodes are expanded to their block
-    children inline via a UNION ALL against parentchildedges, so the result already
-    contains block-level nodes and bboxes.
+    G: Graph,
+    exclude_ids: Iterable[str] = (),
+) -> list[list[str]]:
+    """Group a document's unassigned units into connected components of G.
+
+    Only the document's own assignment rows are read. They are turned into
+    assigned/present bitmaps over the graph's node indices, and a parent counts
+    as shattered when any of its children has a row (shattering writes every
+    block of the parent). The unassigned units are then:
+
+        - top-level units that are neither assigned nor shattered, and
+        - child blocks that have a row with a NULL zone.
+
+    Components come from `label_components`; each is sorted by geo_id.
+    Unassigned ids that are not graph nodes (isolated top-level units, data
+    gaps) are appended as singletons. Their parent/child structure is unknown,
+    so the client's `exclude_ids` is only consulted for them.
+    Non-contiguous unassigned parents are intentionally NOT expanded.
     """
-    gerrydb_table_name = districtr_map.gerrydb_table_name
-    child_layer = districtr_map.child_layer
-    parent_layer = districtr_map.parent_layer
-    map_uuid = str(districtr_map.uuid)
-
-    binds: list[sa.BindParameter] = [sa.bindparam(key="document_id", type_=UUIDType)]
-    params: dict[str, Any] = {"document_id": document_id}
+    index = get_graph_index(G)
+    present = np.zeros(len(index), dtype=bool)
+    assigned = np.zeros(len(index), dtype=bool)
+    rows_outside_graph: dict[str, bool] = {}
+
+    rows = session.execute(
+        sa.text(
+            "SELECT geo_id, zone IS NOT NULL FROM document.assignments "
+            "WHERE document_id = :document_id"
+        ).bindparams(sa.bindparam(key="document_id", type_=UUIDType)),
+        {"document_id": document_id},
+    )
+    node_index = index.node_index
+    for geo_id, has_zone in rows:
+        i = node_index.get(geo_id)
+        if i is None:
+            rows_outside_graph[geo_id] = has_zone
+            continue
+        present[i] = True
+        assigned[i] = has_zone
+
+    is_child = index.parent >= 0
+    shattered = np.zeros(len(index), dtype=bool)
+    shattered[index.parent[present & is_child]] = True
+    unassigned = ~assigned & np.where(is_child, present, ~shattered)
+
+    components = [
+        index.nodes[members].tolist()
+        for members in group_by_label(label_components(index.edges, unassigned))
+    ]
 
-    zone_filter = "AND a.zone = :zone"
-    binds.append(sa.bindparam(key="zone", type_=Integer))
-    params["zone"] = zone
+    excluded = set(exclude_ids)
+    singletons = {
+        geo_id for geo_id, has_zone in rows_outside_graph.items() if not has_zone
+    }
+    singletons.update(
+        geo_id
+        for geo_id in _units_outside_graph(session, index, districtr_map.parent_layer)
+        if not rows_outside_graph.get(geo_id, False)
+    )
+    components.extend([geo_id] for geo_id in sorted(singletons - excluded))
+    return components
 
-    if child_layer:
-        safe_child = assert_safe_ident(child_layer)
-        safe_parent = assert_safe_ident(parent_layer)
-        geo_source = (
-            f"(SELECT path, geometry FROM gerrydb.{safe_child} "
-            f"UNION ALL SELECT path, geometry FROM gerrydb.{safe_parent}) g"
-        )
-    else:
-        safe_table = assert_safe_ident(gerrydb_table_name)
-        geo_source = f"gerrydb.{safe_table} g"
 
-    non_contiguous: set[str] = (
-        G.graph.get("non_contiguous_parents", set()) if G else set()
-    )
-    ncp_paths = list(non_contiguous)
+def annotate_graph_bounds(
+    session: Session, G: Graph, districtr_map: DistrictrMap
+) -> int:
+    """Store EPSG:4326 bounds of the map's units on ``G.graph["bounds_4326"]``.
 
-    if ncp_paths and child_layer:
-        binds.append(sa.bindparam(key="ncp_paths", type_=ARRAY(sa.String)))
-        params["ncp_paths"] = ncp_paths
-        sql = sa.text(
-            _non_contiguous_parents_expand_ctes(map_uuid, zone_filter)
-            + f"""
-            SELECT
-                ids.geo_id,
-                st_xmin(Box2D(g.geometry)) AS xmin,
-                st_xmax(Box2D(g.geometry)) AS xmax,
-                st_ymin(Box2D(g.geometry)) AS ymin,
-                st_ymax(Box2D(g.geometry)) AS ymax
-            FROM ids
-            JOIN {geo_source} ON g.path = ids.geo_id"""
-        ).bindparams(*binds)
+    Same layout as the graph pipeline writes (parallel ``paths`` / ``bounds``
+    arrays, bounds ordered minx, miny, maxx, maxy), for backfilling graph files
+    built before it did; see ``cli.py backfill-graph-bounds``. Returns the
+    number of units with bounds.
+    """
+    if districtr_map.child_layer:
+        layers = [districtr_map.child_layer, districtr_map.parent_layer]
     else:
-        sql = sa.text(f"""SELECT
-            ids.geo_id,
-            st_xmin(Box2D(g.geometry)) AS xmin,
-            st_xmax(Box2D(g.geometry)) AS xmax,
-            st_ymin(Box2D(g.geometry)) AS ymin,
-            st_ymax(Box2D(g.geometry)) AS ymax
+        layers = [districtr_map.gerrydb_table_name]
+    sql = " UNION ALL ".join(
+        f"""SELECT path, st_xmin(b), st_ymin(b), st_xmax(b), st_ymax(b)
         FROM (
-            SELECT a.geo_id
-            FROM document.assignments a
-            WHERE a.document_id = :document_id
-                AND a.zone IS NOT NULL
-                {zone_filter}
-        ) ids
-        JOIN {geo_source} ON g.path = ids.geo_id""").bindparams(*binds)
+            SELECT path, Box2D(ST_Transform(ST_Envelope(geometry), 4326)) AS b
+            FROM gerrydb.{assert_safe_ident(layer)}
+        ) {assert_safe_ident(layer)}_bounds"""
+        for layer in layers
+    )
+    rows = [row for row in session.execute(sa.text(sql)).all() if row[0] in G]
+    G.graph["bounds_4326"] = {
+        "paths": np.array([row[0] for row in rows], dtype=str),
+        "bounds": np.array([row[1:] for row in rows], dtype=np.float64).reshape(-1, 4),
+    }
+    return len(rows)
+
+
+def _node_bounds(
+    session: Session, G: Graph, index: GraphIndex, districtr_map: DistrictrMap
+) -> np.ndarray:
+    """EPSG:4326 bounds for every node of the index, as stored on the graph.
+
+    Graphs built before the pipeline stored bounds get them from PostGIS once
+    per loaded graph, with a warning, until ``cli.py backfill-graph-bounds``
+    has been run for them.
+    """
+    if index.bounds is None:
+        logger.warning(
+            "Graph for %s has no stored bounds; reading them from PostGIS. "
+            "Run `cli.py backfill-graph-bounds` to store them on the graph.",
+            districtr_map.gerrydb_table_name,
+        )
+        annotate_graph_bounds(session, G, districtr_map)
+        stored_bounds = G.graph["bounds_4326"]
+        index.bounds = index.bounds_from_rows(
+            stored_bounds["paths"], stored_bounds["bounds"]
+        )
+    return index.bounds
 
-    rows = session.execute(sql, params).fetchall()
-    if not rows:
-        return None
 
-    return [
-        NodeWithBBoxes(
-            node=row.geo_id, xmin=row.xmin, xmax=row.xmax, ymin=row.ymin, ymax=row.ymax
+def get_zone_connected_component_bboxes(
+    session: Session,
+    document_id: str,
+    districtr_map: DistrictrMap,
+    zone: int,
+    G: Graph,
+) -> np.ndarray | None:
+    """EPSG:4326 bbox of each connected component of a zone.
+
+    Non-contiguous parents are expanded to their blocks first. Components are
+    labelled over the graph index and reduced against precomputed per-node
+    bounds, so once the graph has bounds the only query on the request path is
+    the zone's geo_ids.
+
+    Returns:
+        ``(n_components, 4)`` array of minx, miny, maxx, maxy (NaN rows for
+        components with no known bounds), or None when the zone has no
+        assignments.
+    """
+    geo_ids = (
+        session.execute(
+            sa.text(
+                "SELECT geo_id FROM document.assignments "
+                "WHERE document_id = :document_id AND zone = :zone"
+            ).bindparams(
+                sa.bindparam(key="document_id", type_=UUIDType),
+                sa.bindparam(key="zone", type_=Integer),
+            ),
+            {"document_id": document_id, "zone": zone},
         )
-        for row in rows
-    ]
-
+        .scalars()
+        .all()
+    )
+    if not geo_ids:
+        return None
 
-def get_zone_connected_component_bboxes():
-    pass
+    index = get_graph_index(G)
+    mask = np.zeros(len(index), dtype=bool)
+    node_index = index.node_index
+    positions = [
+        node_index[node]
+        for node in expand_non_contiguous_parents(G, geo_ids)
+        if node in node_index
+    ]
+    mask[positions] = True
+    return component_bounds(
+        label_components(index.edges, mask),
+        _node_bounds(session, G, index, districtr_map),
+    )
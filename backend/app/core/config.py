@@ -107,6 +107,15 @@ class Settings(BaseSettings):
     VERBOSE_LOGGING: bool = False
 
     ECHO_DB: bool = ENVIRONMENT not in (Environment.production, Environment.test)
+    # Send per-request database timing in a Server-Timing header on every
+    # response, not only to requests opting in with X-Debug-Timing (outside
+    # production, or with a debug:profile token; see app/core/db_timing.py).
+    SERVER_TIMING: bool = False
+
+    # Also match comment search terms as substrings of title and comment text
+    # (ILIKE, served by pg_trgm indexes), on top of full-text matches. Turn off
+    # to serve searches from the tsvector index alone.
+    COMMENT_SEARCH_SUBSTRING: bool = True
 
     # Moderation
 
@@ -155,6 +164,20 @@ class Settings(BaseSettings):
     # "S3 not configured", so this must stay opt-in for local dev.
     AWS_USE_DEFAULT_CREDENTIALS: bool = False
 
+    # Async export artifacts. Stored under `exports/` in R2_BUCKET_NAME when S3
+    # is configured and served via presigned URL; otherwise written to this
+    # local directory and streamed by the API.
+    EXPORT_ARTIFACT_DIR: str = "/tmp/districtr-exports"
+    EXPORT_URL_TTL_SECONDS: int = 15 * 60
+    # Pending/running jobs older than this are assumed lost (e.g. the worker
+    # restarted mid-build) and are re-enqueued by the next request.
+    EXPORT_JOB_STALE_SECONDS: int = 30 * 60
+
+    # Upper bound on how long app.core.registry serves map/gerrydb metadata
+    # without reloading. Normally entries are dropped sooner by NOTIFY from
+    # the CLI; this only matters if the listener connection is down.
+    REGISTRY_TTL_SECONDS: int = 5 * 60
+
     # SNS topic ARN for operational alerts (e.g. missing graph pkl files).
     # Populated by the ECS task definition; absent in local dev.
     ALARM_SNS_TOPIC_ARN: str | None = None
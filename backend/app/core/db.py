@@ -2,6 +2,7 @@ from sqlalchemy import event
 from sqlmodel import create_engine, Session
 
 from app.core.config import settings
+from app.core.db_timing import instrument_engine
 
 engine = create_engine(
     str(settings.SQLALCHEMY_DATABASE_URI),
@@ -13,6 +14,7 @@ engine = create_engine(
     pool_pre_ping=True,
     pool_recycle=3600,
 )
+instrument_engine(engine)
 
 
 @event.listens_for(engine, "checkout")
@@ -0,0 +1,183 @@
+"""
+Per-request database timing.
+
+Cursor execution hooks on the engine add each statement's duration to the
+`RequestDbStats` of the current request, held in a contextvar set by
+`db_timing_middleware`. The contextvar is copied into the threadpool that runs
+sync endpoints, so statements issued there are attributed to the request too.
+
+Per request, the middleware records the statement count and total database
+time in Prometheus histograms labelled by route template (exposed on
+/metrics), and, when asked, returns them in a Server-Timing header with the
+fingerprint of the slowest statement:
+
+    Server-Timing: db;dur=12.4, db_count;desc="7", db_slowest;dur=5.1;desc="SELECT ..."
+
+The header is sent on every response when SERVER_TIMING is set. Otherwise a
+request can opt in with an `X-Debug-Timing` header, so a single slow call can be
+inspected from the browser's network panel. In production the opt-in needs a
+bearer token with the `debug:profile` scope, since statement fingerprints
+reveal the schema and query shapes.
+"""
+
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from fastapi import HTTPException, Request
+from fastapi.security import HTTPAuthorizationCredentials, SecurityScopes
+from prometheus_client import Histogram
+from sqlalchemy import Engine, event
+
+from app.core.config import Environment, settings
+from app.core.security import TokenScope, auth
+
+DEBUG_TIMING_HEADER = "X-Debug-Timing"
+# Requests not matched to a route share a label to bound cardinality.
+UNMATCHED_ROUTE = "<unmatched>"
+EXCLUDED_PATHS = {"/metrics", "/_debug/cache", "/_debug/profile"}
+FINGERPRINT_LENGTH = 120
+
+DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Total database time per request, by route template.",
+    ["method", "route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+DB_STATEMENTS = Histogram(
+    "http_request_db_statements",
+    "Database statements executed per request, by route template.",
+    ["method", "route"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMETER_LIST = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|%s|:\w+)\s*,?)+\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class RequestDbStats:
+    count: int = 0
+    total_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: str | None = None
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+    @property
+    def slowest_fingerprint(self) -> str | None:
+        return fingerprint(self.slowest_statement) if self.slowest_statement else None
+
+    def server_timing(self) -> str:
+        """Server-Timing header value (durations in milliseconds)."""
+        metrics = [
+            f"db;dur={self.total_seconds * 1000:.1f}",
+            f'db_count;desc="{self.count}"',
+        ]
+        if self.slowest_fingerprint:
+            desc = self.slowest_fingerprint.replace("\\", "\\\\").replace('"', '\\"')
+            metrics.append(
+                f'db_slowest;dur={self.slowest_seconds * 1000:.1f};desc="{desc}"'
+            )
+        return ", ".join(metrics)
+
+
+_request_db_stats: ContextVar[RequestDbStats | None] = ContextVar(
+    "request_db_stats", default=None
+)
+
+
+def fingerprint(statement: str) -> str:
+    """Statement with literals and bind parameter lists collapsed, on one line,
+    truncated for display and log grouping."""
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _PARAMETER_LIST.sub("(...)", statement)
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    if len(statement) > FINGERPRINT_LENGTH:
+        statement = statement[: FINGERPRINT_LENGTH - 3] + "..."
+    # Header values must be latin-1.
+    return statement.encode("ascii", "replace").decode()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attribute the duration of every statement run on `engine` to the
+    current request's `RequestDbStats`."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, _cursor, _statement, _parameters, _context, _executemany):
+        conn.info.setdefault("db_timing_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop(conn, _cursor, statement, _parameters, _context, _executemany):
+        start = conn.info["db_timing_start"].pop()
+        stats = _request_db_stats.get()
+        if stats is not None:
+            stats.record(statement, time.perf_counter() - start)
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(exception_context):
+        conn = exception_context.connection
+        starts = conn.info.get("db_timing_start") if conn is not None else None
+        if not starts or exception_context.execution_context is None:
+            return
+        start = starts.pop()
+        stats = _request_db_stats.get()
+        if stats is not None and exception_context.statement:
+            stats.record(exception_context.statement, time.perf_counter() - start)
+
+
+def route_template(request: Request) -> str:
+    """Path template of the route that handled `request` (e.g.
+    ``/api/document/{document_id}``), set on the scope during routing."""
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+async def debug_timing_requested(request: Request) -> bool:
+    """Whether `request` opted in to the Server-Timing header with
+    `X-Debug-Timing`. Honoured outside production, and in production only with
+    a valid bearer token carrying the `debug:profile` scope."""
+    if DEBUG_TIMING_HEADER not in request.headers:
+        return False
+    if settings.ENVIRONMENT != Environment.production:
+        return True
+
+    scheme, _, credentials = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not credentials:
+        return False
+    try:
+        await auth.verify(
+            SecurityScopes(scopes=[TokenScope.profile_workers]),
+            HTTPAuthorizationCredentials(scheme=scheme, credentials=credentials),
+        )
+    except HTTPException:
+        return False
+    return True
+
+
+async def db_timing_middleware(request: Request, call_next):
+    if request.url.path in EXCLUDED_PATHS:
+        return await call_next(request)
+
+    stats = RequestDbStats()
+    token = _request_db_stats.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        _request_db_stats.reset(token)
+
+    route = route_template(request)
+    DB_DURATION.labels(request.method, route).observe(stats.total_seconds)
+    DB_STATEMENTS.labels(request.method, route).observe(stats.count)
+    if settings.SERVER_TIMING or await debug_timing_requested(request):
+        response.headers.append("Server-Timing", stats.server_timing())
+    return response
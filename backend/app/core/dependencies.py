@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from fastapi import Depends, HTTPException, status
 from sqlmodel import select, Session, literal, col
 from app.core.models import DocumentID
@@ -24,7 +25,8 @@ from app.comments.settings import (
     DEFAULT_MAX_COMMENTS_PER_DISTRICT,
 )
 from sqlalchemy.sql.functions import coalesce
-from sqlalchemy import or_, and_
+from sqlalchemy import String, and_, case, cast, exists, false, func, or_, true
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.exc import NoResultFound, MultipleResultsFound
 from app.core.db import get_session
 import logging
@@ -92,6 +94,56 @@ def get_protected_document(
     return document
 
 
+@dataclass
+class DocumentContext:
+    """The document a request targets plus its DistrictrMap, resolved together."""
+
+    document: Document
+    districtr_map: DistrictrMap | None
+
+    def require_districtr_map(self) -> DistrictrMap:
+        if self.districtr_map is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="DistrictrMap not found for document",
+            )
+        return self.districtr_map
+
+
+def get_document_context(
+    document_id: DocumentID = Depends(parse_document_id),
+    session: Session = Depends(get_session),
+) -> DocumentContext:
+    """
+    Resolve the document (by public or private ID, like `get_protected_document`)
+    and its map in a single query.
+
+    FastAPI caches dependency results per request, so endpoints and
+    sub-dependencies that take this share one lookup instead of calling
+    `get_protected_document` and `get_districtr_map` separately. The same
+    rule applies: never return the document from safe endpoints.
+    """
+    stmt = select(Document, DistrictrMap).join(
+        DistrictrMap,
+        col(Document.districtr_map_slug) == col(DistrictrMap.districtr_map_slug),
+        isouter=True,
+    )
+    if document_id.is_public:
+        stmt = stmt.where(Document.public_id == document_id.value)
+    else:
+        stmt = stmt.where(Document.document_id == document_id.value)
+
+    try:
+        document, districtr_map = session.exec(stmt).one()
+    except NoResultFound:
+        raise HTTPException(status_code=404, detail="Document not found")
+    except Exception as e:
+        logger.error(f"Error loading document: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error loading document")
+
+    return DocumentContext(document=document, districtr_map=districtr_map)
+
+
 def validate_document_exists(document_id: DocumentID, session: Session) -> bool:
     """
     Validate that the document exists. Raises HTTPException 404 if not found.
@@ -114,55 +166,159 @@ def get_document_public(
 
     if not document_id.is_public:
         access_type = DocumentShareStatus.edit
+    is_edit_access = not document_id.is_public
+
+    # Overlays attached to the document's map, as one JSON array (NULL if none).
+    overlays = (
+        select(
+            func.json_agg(
+                func.json_build_object(
+                    "overlay_id",
+                    cast(Overlay.overlay_id, String),
+                    "name",
+                    Overlay.name,
+                    "description",
+                    Overlay.description,
+                    "data_type",
+                    Overlay.data_type,
+                    "layer_type",
+                    Overlay.layer_type,
+                    "custom_style",
+                    Overlay.custom_style,
+                    "source",
+                    Overlay.source,
+                    "source_layer",
+                    Overlay.source_layer,
+                    "id_property",
+                    Overlay.id_property,
+                )
+            ).label("overlays")
+        )
+        .select_from(DistrictrMapOverlays)
+        .join(Overlay, col(Overlay.overlay_id) == col(DistrictrMapOverlays.overlay_id))
+        .where(col(DistrictrMapOverlays.districtr_map_id) == col(DistrictrMap.uuid))
+        .lateral("overlays")
+    )
 
-    stmt = select(  # type: ignore[no-matching-overload]
-        # Obsured document ID
-        literal(
-            "anonymous" if document_id.is_public else document_id.document_id
-        ).label("document_id"),
-        # Real document ID for internal use (fetching comments, etc.)
-        col(Document.document_id).label("real_document_id"),
-        col(Document.created_at),
-        col(Document.districtr_map_slug),
-        col(Document.updated_at),
-        col(Document.color_scheme),
-        col(Document.public_id),
-        col(DistrictrMap.gerrydb_table_name).label("gerrydb_table"),
-        col(DistrictrMap.parent_layer).label("parent_layer"),
-        col(DistrictrMap.child_layer).label("child_layer"),
-        col(DistrictrMap.tiles_s3_path).label("tiles_s3_path"),
-        col(DistrictrMap.name).label("map_module"),
-        coalesce(col(Document.num_districts), col(DistrictrMap.num_districts)).label(
-            "num_districts"
+    # Scoped map comments. Both district and community maps use
+    # DocumentComment.zone as the scoped identifier. A comment fails moderation
+    # if rejected, or scored over the threshold and not approved; edit access
+    # sees the full text with the moderated flag, public access the placeholder.
+    MODERATION_PLACEHOLDER = "Comment removed due to moderation."
+    fails_moderation = coalesce(
+        or_(
+            col(Comment.review_status).is_not_distinct_from(ReviewStatus.REJECTED),
+            and_(
+                col(Comment.moderation_score) > MODERATION_THRESHOLD,
+                col(Comment.review_status).is_distinct_from(ReviewStatus.APPROVED),
+            ),
         ),
-        col(Document.num_communities).label("num_communities"),
-        col(Document.community_metadata_list).label("community_metadata_list"),
-        col(DistrictrMap.num_districts_modifiable).label("num_districts_modifiable"),
-        col(DistrictrMap.extent).label("extent"),
-        col(Document.map_type).label("map_type"),
-        col(Document.document_type).label("document_type"),
-        col(DistrictrMap.parent_geo_unit_type).label("parent_geo_unit_type"),
-        col(DistrictrMap.child_geo_unit_type).label("child_geo_unit_type"),
-        col(DistrictrMap.data_source_name).label("data_source_name"),
-        col(DistrictrMap.comment).label("comment"),
-        col(DistrictrMap.uuid).label("districtr_map_uuid"),
-        col(DistrictrMap.statefps).label("statefps"),
-        literal(MAX_COMMUNITY_NAME_LENGTH).label("community_name_length_limit"),
-        coalesce(
-            col(DistrictrMap.comment_length_limit), DEFAULT_MAX_COMMENT_LENGTH
-        ).label("comment_length_limit"),
-        coalesce(
-            col(DistrictrMap.comment_count_limit), DEFAULT_MAX_COMMENTS_PER_DISTRICT
-        ).label("comment_count_limit"),
-        # get metadata as a json object
-        col(Document.map_metadata).label("map_metadata"),
-        coalesce(
-            access_type,
-        ).label("access"),
-    ).join(
-        DistrictrMap,
-        Document.districtr_map_slug == DistrictrMap.districtr_map_slug,
-        isouter=True,
+        false(),
+    )
+    comment_text = (
+        col(Comment.comment)
+        if is_edit_access
+        else case(
+            (fails_moderation, literal(MODERATION_PLACEHOLDER)),
+            else_=col(Comment.comment),
+        )
+    )
+    document_comments = (
+        select(
+            func.json_agg(
+                aggregate_order_by(
+                    func.json_build_object(
+                        "comment_id",
+                        cast(DocumentComment.comment_id, String),
+                        "zone",
+                        DocumentComment.zone,
+                        "text",
+                        comment_text,
+                        "moderated",
+                        fails_moderation,
+                        "created_at",
+                        Comment.created_at,
+                        "updated_at",
+                        Comment.updated_at,
+                    ),
+                    col(DocumentComment.comment_id),
+                )
+            ).label("document_comments")
+        )
+        .select_from(DocumentComment)
+        .join(Comment, col(Comment.id) == col(DocumentComment.comment_id))
+        .where(
+            and_(
+                col(DocumentComment.document_id) == col(Document.document_id),
+                col(DocumentComment.zone).is_not(None),
+            )
+        )
+        .lateral("document_comments")
+    )
+
+    # Surface whether this map is password-protected so read-only viewers can be
+    # offered an "unlock to edit" affordance. The hash itself is never exposed.
+    password_required = exists().where(
+        col(MapDocumentToken.document_id) == col(Document.document_id),
+        col(MapDocumentToken.password_hash).is_not(None),
+    )
+
+    stmt = (
+        select(  # type: ignore[no-matching-overload]
+            # Obsured document ID
+            literal(
+                "anonymous" if document_id.is_public else document_id.document_id
+            ).label("document_id"),
+            col(Document.created_at),
+            col(Document.districtr_map_slug),
+            col(Document.updated_at),
+            col(Document.color_scheme),
+            col(Document.public_id),
+            col(DistrictrMap.gerrydb_table_name).label("gerrydb_table"),
+            col(DistrictrMap.parent_layer).label("parent_layer"),
+            col(DistrictrMap.child_layer).label("child_layer"),
+            col(DistrictrMap.tiles_s3_path).label("tiles_s3_path"),
+            col(DistrictrMap.name).label("map_module"),
+            coalesce(
+                col(Document.num_districts), col(DistrictrMap.num_districts)
+            ).label("num_districts"),
+            col(Document.num_communities).label("num_communities"),
+            col(Document.community_metadata_list).label("community_metadata_list"),
+            col(DistrictrMap.num_districts_modifiable).label(
+                "num_districts_modifiable"
+            ),
+            col(DistrictrMap.extent).label("extent"),
+            col(Document.map_type).label("map_type"),
+            col(Document.document_type).label("document_type"),
+            col(DistrictrMap.parent_geo_unit_type).label("parent_geo_unit_type"),
+            col(DistrictrMap.child_geo_unit_type).label("child_geo_unit_type"),
+            col(DistrictrMap.data_source_name).label("data_source_name"),
+            col(DistrictrMap.comment).label("comment"),
+            col(DistrictrMap.statefps).label("statefps"),
+            literal(MAX_COMMUNITY_NAME_LENGTH).label("community_name_length_limit"),
+            coalesce(
+                col(DistrictrMap.comment_length_limit), DEFAULT_MAX_COMMENT_LENGTH
+            ).label("comment_length_limit"),
+            coalesce(
+                col(DistrictrMap.comment_count_limit),
+                DEFAULT_MAX_COMMENTS_PER_DISTRICT,
+            ).label("comment_count_limit"),
+            # get metadata as a json object
+            col(Document.map_metadata).label("map_metadata"),
+            coalesce(
+                access_type,
+            ).label("access"),
+            password_required.label("password_required"),
+            overlays.c.overlays,
+            document_comments.c.document_comments,
+        )
+        .join(
+            DistrictrMap,
+            Document.districtr_map_slug == DistrictrMap.districtr_map_slug,
+            isouter=True,
+        )
+        .join(overlays, true(), isouter=True)
+        .join(document_comments, true(), isouter=True)
     )
 
     if document_id.is_public:
@@ -172,95 +328,19 @@ def get_document_public(
 
     result = session.exec(stmt).one()
 
-    # Surface whether this map is password-protected so read-only viewers can be
-    # offered an "unlock to edit" affordance. The hash itself is never exposed.
-    password_hash = session.exec(
-        select(MapDocumentToken.password_hash).where(
-            MapDocumentToken.document_id == result.real_document_id
-        )
-    ).first()
-    password_required = password_hash is not None
-
-    # Fetch overlays via junction table if map has any
-    overlays_list = None
-    if result.districtr_map_uuid:
-        junction_overlay_ids = session.exec(
-            select(DistrictrMapOverlays.overlay_id).where(
-                DistrictrMapOverlays.districtr_map_id == result.districtr_map_uuid
-            )
-        ).all()
-        if junction_overlay_ids:
-            overlays = session.exec(
-                select(Overlay).where(col(Overlay.overlay_id).in_(junction_overlay_ids))
-            ).all()
-            overlays_list = [
-                OverlayPublic(
-                    overlay_id=str(overlay.overlay_id),
-                    name=overlay.name,
-                    description=overlay.description,
-                    data_type=overlay.data_type,
-                    layer_type=overlay.layer_type,
-                    custom_style=overlay.custom_style,
-                    source=overlay.source,
-                    source_layer=overlay.source_layer,
-                    id_property=overlay.id_property,
-                )
-                for overlay in overlays
-            ]
-
-    # Fetch scoped map comments from comments schema.
-    # Both district and community maps use DocumentComment.zone as the scoped identifier.
-    # Apply moderation: if comment fails threshold, show placeholder text.
-    MODERATION_PLACEHOLDER = "Comment removed due to moderation."
-    document_comments_list = None
-    if result.real_document_id:
-        stmt = (
-            select(  # type: ignore[n-matching-overload]
-                DocumentComment.comment_id,
-                DocumentComment.zone,
-                Comment.comment,
-                Comment.created_at,
-                Comment.updated_at,
-                Comment.moderation_score,
-                Comment.review_status,
-            )
-            .select_from(DocumentComment)
-            .join(Comment, Comment.id == DocumentComment.comment_id)
-            .where(
-                and_(
-                    col(DocumentComment.document_id) == result.real_document_id,
-                    col(DocumentComment.zone).is_not(None),
-                )
-            )
-        )
-        doc_comments = session.exec(stmt).all()
-        if len(doc_comments) > 0:
-            document_comments_list = []
-            is_edit_access = not document_id.is_public
-            for dc in doc_comments:
-                # Check moderation: show placeholder if rejected or exceeds threshold
-                fails_moderation = dc.review_status == ReviewStatus.REJECTED or (
-                    dc.moderation_score is not None
-                    and dc.moderation_score > MODERATION_THRESHOLD
-                    and dc.review_status != ReviewStatus.APPROVED
-                )
-                # Edit access: show full comment + moderated flag. Public: show placeholder only.
-                if fails_moderation:
-                    text = dc.comment if is_edit_access else MODERATION_PLACEHOLDER
-                    moderated = True
-                else:
-                    text = dc.comment
-                    moderated = False
-                document_comments_list.append(
-                    DocumentCommentPublic(
-                        comment_id=str(dc.comment_id),
-                        zone=dc.zone,
-                        text=text,
-                        moderated=moderated,
-                        created_at=dc.created_at,
-                        updated_at=dc.updated_at,
-                    )
-                )
+    overlays_list = (
+        [OverlayPublic.model_validate(overlay) for overlay in result.overlays]
+        if result.overlays
+        else None
+    )
+    document_comments_list = (
+        [
+            DocumentCommentPublic.model_validate(comment)
+            for comment in result.document_comments
+        ]
+        if result.document_comments
+        else None
+    )
 
     # Convert result to DocumentPublic with overlays and document comments
     return DocumentPublic(
@@ -280,7 +360,7 @@ def get_document_public(
         extent=result.extent,
         map_metadata=result.map_metadata,
         access=result.access,
-        password_required=password_required,
+        password_required=result.password_required,
         color_scheme=result.color_scheme,
         map_type=result.map_type,
         document_type=getattr(result, "document_type", DocumentType.DISTRICT),
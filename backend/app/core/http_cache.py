@@ -0,0 +1,67 @@
+"""
+Conditional GET helpers (ETag / If-None-Match / 304 Not Modified).
+
+Read endpoints whose payload is fully determined by a few cheap values (the
+document's timestamps, a payload version, query params) build a strong ETag
+from those values with `make_etag` and check it against the request's
+If-None-Match *before* running their heavy query. Endpoints without such a
+fingerprint hash the rendered body instead, which still saves serialization
+downstream and the transfer.
+
+Public (`public_id`) reads may be stored by shared caches but must be
+revalidated; private reads are only cacheable by the browser. Both use
+`no-cache`, so every reuse still goes through the endpoint's access checks.
+"""
+
+import hashlib
+
+from fastapi import Response, status
+
+PUBLIC_CACHE_CONTROL = "public, no-cache"
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+# Bodies are gzip-encoded by GZipMiddleware depending on the request.
+VARY = "Accept-Encoding"
+
+
+def make_etag(*parts: object) -> str:
+    """Strong ETag over the string form of `parts` (None-safe, order-sensitive)."""
+    digest = hashlib.sha256(
+        "\x1f".join("" if part is None else str(part) for part in parts).encode()
+    ).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """True when an If-None-Match header value matches `etag`.
+
+    Handles `*`, comma-separated lists and weak (`W/`) validators, which
+    If-None-Match compares weakly per RFC 9110.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def cache_headers(etag: str, is_public: bool) -> dict[str, str]:
+    return {
+        "ETag": etag,
+        "Cache-Control": PUBLIC_CACHE_CONTROL if is_public else PRIVATE_CACHE_CONTROL,
+        "Vary": VARY,
+    }
+
+
+def apply_cache_headers(response: Response, etag: str, is_public: bool) -> None:
+    response.headers.update(cache_headers(etag, is_public))
+
+
+def not_modified(etag: str, is_public: bool) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=cache_headers(etag, is_public),
+    )
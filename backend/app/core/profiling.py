@@ -0,0 +1,129 @@
+"""
+On-demand sampling profiler for a running worker.
+
+`SamplingProfiler` runs a daemon thread that snapshots the stack of every
+other thread with `sys._current_frames()` at a fixed interval: the event loop,
+the anyio worker threads sync endpoints run on, and background threads. No hook
+is installed in the profiled threads, so nothing is paid outside a profiling
+window and, during one, only the sampler's own GIL acquisitions.
+
+Samples are exported in speedscope's file format (https://www.speedscope.app),
+one sampled profile per thread, for `/_debug/profile`.
+"""
+
+import sys
+import threading
+import time
+from types import FrameType
+from typing import Any
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+# Stacks deeper than this are truncated at the root side.
+MAX_STACK_DEPTH = 256
+
+# One profile at a time per worker; a second request gets a 409.
+profile_lock = threading.Lock()
+
+
+class SamplingProfiler:
+    """Collects stack samples of all threads but its own.
+
+    Consecutive identical samples of a thread are merged into one weighted
+    sample, so idle threads cost little memory over long windows.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        # (name, file, line) -> index into the speedscope frame table.
+        self._frame_index: dict[tuple[str, str, int], int] = {}
+        # thread id -> ([stack], [weight in seconds])
+        self._samples: dict[int, tuple[list[list[int]], list[float]]] = {}
+        self._thread_names: dict[int, str] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._started = 0.0
+        self._duration = 0.0
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._duration = time.perf_counter() - self._started
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            frames = sys._current_frames()
+            for thread_id, frame in frames.items():
+                if thread_id != own_id:
+                    self._record(thread_id, frame, now - last)
+            last = now
+            # Frames keep their locals alive; drop them before sleeping.
+            del frames
+
+        for thread in threading.enumerate():
+            if thread.ident in self._samples:
+                self._thread_names[thread.ident] = thread.name
+
+    def _record(self, thread_id: int, frame: FrameType | None, weight: float) -> None:
+        stack = []
+        while frame is not None and len(stack) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            key = (
+                getattr(code, "co_qualname", code.co_name),
+                code.co_filename,
+                code.co_firstlineno,
+            )
+            index = self._frame_index.get(key)
+            if index is None:
+                index = self._frame_index[key] = len(self._frame_index)
+            stack.append(index)
+            frame = frame.f_back
+        # speedscope stacks run from the root to the leaf.
+        stack.reverse()
+
+        stacks, weights = self._samples.setdefault(thread_id, ([], []))
+        if stacks and stacks[-1] == stack:
+            weights[-1] += weight
+        else:
+            stacks.append(stack)
+            weights.append(weight)
+
+    def speedscope(self, name: str = "districtr-backend") -> dict[str, Any]:
+        """The collected samples as a speedscope file, threads with the most
+        distinct stacks first."""
+        frames = [
+            {"name": frame_name, "file": file, "line": line}
+            for frame_name, file, line in self._frame_index
+        ]
+        profiles = [
+            {
+                "type": "sampled",
+                "name": self._thread_names.get(thread_id, f"thread {thread_id}"),
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": self._duration,
+                "samples": stacks,
+                "weights": weights,
+            }
+            for thread_id, (stacks, weights) in sorted(
+                self._samples.items(), key=lambda item: -len(item[1][0])
+            )
+        ]
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": "districtr-backend sampling profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
@@ -0,0 +1,246 @@
+"""
+In-process cache of slowly changing map and gerrydb table metadata.
+
+DistrictrMap rows, gerrydb numeric columns, SRIDs and unit counts only change
+when an operator runs a CLI command (`update-districtr-map`, overlay and
+import commands, ...), yet hot paths used to re-query them on every request.
+`REGISTRY` loads each entry on first use and keeps it until the registry's
+version is bumped.
+
+Invalidation:
+  - Mutators call `notify_registry_changed(session)`, which clears this
+    process's registry and queues `NOTIFY districtr_registry` on the session's
+    transaction. Postgres delivers the notification only if that transaction
+    commits.
+  - `RegistryListener` (started in the app lifespan) LISTENs on the channel
+    and bumps the version of each web worker's registry.
+  - Entries older than `settings.REGISTRY_TTL_SECONDS` are dropped regardless,
+    which bounds staleness if the listener connection is down.
+
+Cached map rows are transient copies, not session-bound instances: treat them
+as read-only and select the row again before modifying it.
+"""
+
+import dataclasses
+import logging
+import select as _select
+import threading
+from time import monotonic
+
+import psycopg
+from sqlalchemy import inspect, text
+from sqlmodel import Session, select
+
+from app.constants import GERRY_DB_SCHEMA
+from app.core.config import settings
+from app.models import DistrictrMap
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_CHANNEL = "districtr_registry"
+
+
+@dataclasses.dataclass(frozen=True)
+class GerrydbTableInfo:
+    """Catalog metadata for a table or view in the gerrydb schema."""
+
+    name: str
+    # Numeric, non-geometry columns in attnum order (see get_gerrydb_numeric_cols).
+    numeric_cols: tuple[str, ...]
+    # From geometry_columns; None for views/tables without a registered geometry.
+    srid: int | None
+
+
+def _snapshot(districtr_map: DistrictrMap) -> DistrictrMap:
+    """Transient copy of a loaded row, safe to share across sessions."""
+    return DistrictrMap(
+        **{
+            attr.key: getattr(districtr_map, attr.key)
+            for attr in inspect(DistrictrMap).column_attrs
+        }
+    )
+
+
+class Registry:
+    """Versioned, thread-safe cache of map and gerrydb table metadata."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._version = 0
+        self._loaded_at = monotonic()
+        self._maps: dict[str, DistrictrMap] = {}
+        self._tables: dict[str, GerrydbTableInfo] = {}
+        self._unit_counts: dict[str, int] = {}
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def invalidate(self) -> None:
+        """Drop every entry and bump the version."""
+        with self._lock:
+            self._version += 1
+            self._loaded_at = monotonic()
+            self._maps.clear()
+            self._tables.clear()
+            self._unit_counts.clear()
+
+    def _lookup(self, cache: dict, key: str):
+        """Return (cached value or None, version to store a fresh load under)."""
+        if monotonic() - self._loaded_at > self.ttl_seconds:
+            self.invalidate()
+        with self._lock:
+            value = cache.get(key)
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+            return value, self._version
+
+    def _store(self, cache: dict, key: str, value, version: int) -> None:
+        # A load that raced an invalidation may have read the old data.
+        with self._lock:
+            if version == self._version:
+                cache[key] = value
+
+    def districtr_map(self, session: Session, slug: str) -> DistrictrMap | None:
+        """The DistrictrMap with `slug`, or None. Missing maps are not cached."""
+        cached, version = self._lookup(self._maps, slug)
+        if cached is not None:
+            return cached
+        row = session.exec(
+            select(DistrictrMap).where(DistrictrMap.districtr_map_slug == slug)
+        ).one_or_none()
+        if row is None:
+            return None
+        snapshot = _snapshot(row)
+        self._store(self._maps, slug, snapshot, version)
+        return snapshot
+
+    def gerrydb_table(self, session: Session, table: str) -> GerrydbTableInfo:
+        """Numeric columns and SRID of `gerrydb.<table>`."""
+        cached, version = self._lookup(self._tables, table)
+        if cached is not None:
+            return cached
+        cols = session.execute(
+            text("""
+                SELECT a.attname AS column_name
+                FROM pg_attribute a
+                JOIN pg_class t  ON a.attrelid = t.oid
+                JOIN pg_namespace s ON t.relnamespace = s.oid
+                WHERE a.attnum > 0
+                  AND NOT a.attisdropped
+                  AND t.relname = :mvname
+                  AND s.nspname = :schema
+                  AND a.attname NOT IN ('geometry', 'geography', 'fid', 'path')
+                  AND pg_catalog.format_type(a.atttypid, a.atttypmod) IN (
+                    'double precision','integer','smallint','bigint',
+                    'decimal','numeric','real','smallserial','bigserial','serial'
+                  )
+                ORDER BY a.attnum
+            """),
+            {"mvname": table, "schema": GERRY_DB_SCHEMA},
+        ).scalars()
+        srid = session.execute(
+            text("""
+                SELECT srid FROM public.geometry_columns
+                WHERE f_table_schema = :schema
+                  AND f_table_name = :table
+                  AND f_geometry_column = 'geometry'
+            """),
+            {"table": table, "schema": GERRY_DB_SCHEMA},
+        ).scalar_one_or_none()
+        info = GerrydbTableInfo(name=table, numeric_cols=tuple(cols), srid=srid)
+        self._store(self._tables, table, info, version)
+        return info
+
+    def unit_count(self, session: Session, table: str) -> int:
+        """Exact row count of `gerrydb.<table>`."""
+        cached, version = self._lookup(self._unit_counts, table)
+        if cached is not None:
+            return cached
+        quote = session.get_bind().dialect.identifier_preparer.quote
+        count = session.execute(
+            text(f"SELECT count(*) FROM {quote(GERRY_DB_SCHEMA)}.{quote(table)}")
+        ).scalar_one()
+        self._store(self._unit_counts, table, count, version)
+        return count
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "version": self._version,
+                "age_seconds": round(monotonic() - self._loaded_at, 1),
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "maps": len(self._maps),
+                "tables": len(self._tables),
+                "unit_counts": len(self._unit_counts),
+            }
+
+
+REGISTRY = Registry(ttl_seconds=settings.REGISTRY_TTL_SECONDS)
+
+
+def notify_registry_changed(session: Session) -> None:
+    """
+    Invalidate registries after map or gerrydb table metadata changes.
+
+    Clears this process's registry immediately; other processes are notified
+    when the session's transaction commits.
+    """
+    session.execute(
+        text("SELECT pg_notify(:channel, '')"), {"channel": REGISTRY_CHANNEL}
+    )
+    REGISTRY.invalidate()
+
+
+class RegistryListener:
+    """
+    Background thread that invalidates `REGISTRY` on `NOTIFY districtr_registry`.
+
+    Holds one dedicated autocommit connection outside the SQLAlchemy pool and
+    reconnects with a backoff if it drops. Invalidates on every (re)connect,
+    since notifications sent while disconnected are lost.
+    """
+
+    POLL_SECONDS = 5.0
+    RECONNECT_SECONDS = 5.0
+
+    def __init__(self, conninfo: str, registry: Registry = REGISTRY):
+        self.conninfo = conninfo
+        self.registry = registry
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="registry-listener", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=self.POLL_SECONDS + 1)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except psycopg.Error as e:
+                logger.warning("Registry listener disconnected: %s", e)
+                self._stop.wait(self.RECONNECT_SECONDS)
+
+    def _listen(self) -> None:
+        with psycopg.connect(self.conninfo, autocommit=True) as conn:
+            conn.add_notify_handler(lambda _notify: self.registry.invalidate())
+            conn.execute(f"LISTEN {REGISTRY_CHANNEL}")
+            self.registry.invalidate()
+            while not self._stop.is_set():
+                ready, _, _ = _select.select([conn.fileno()], [], [], self.POLL_SECONDS)
+                if ready:
+                    # Consumes pending notifications and dispatches the handler.
+                    conn.execute("SELECT 1")
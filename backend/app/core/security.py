@@ -28,6 +28,8 @@ class TokenScope:
     delete_content = "delete:content"
     delete_all_content = "delete:delete-all"
 
+    profile_workers = "debug:profile"
+
     review_content = "create:content_review"
 
 
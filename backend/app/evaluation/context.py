@@ -23,6 +23,7 @@ import shapely
 import sqlalchemy
 import sqlmodel
 from app.core.config import settings
+from app.core.registry import REGISTRY
 from app.evaluation.models import CountyDemographics
 from app.evaluation.types import Election, CountyGeoid, DistrictId
 from app.models import Assignments, DistrictUnionsResponse, DistrictrMap, Document
@@ -276,22 +277,14 @@ class DocumentEvaluationContext:
     @cached_property
     def num_parent_units(self) -> int:
         """Total number of units in the parent layer."""
-        return self.session.execute(
-            sqlalchemy.text(
-                f"SELECT count(*) FROM gerrydb.{assert_safe_ident(self.parent_layer)}"
-            )
-        ).scalar()
+        return REGISTRY.unit_count(self.session, self.parent_layer)
 
     @cached_property
     def num_child_units(self) -> int | None:
         """Total number of child (block) units, or None for non-shatterable maps."""
         if not self.is_shatterable:
             return None
-        return self.session.execute(
-            sqlalchemy.text(
-                f"SELECT count(*) FROM gerrydb.{assert_safe_ident(self.child_layer)}"
-            )
-        ).scalar()
+        return REGISTRY.unit_count(self.session, self.child_layer)
 
     @cached_property
     def zone_assignments(self) -> list[tuple[Geoid, DistrictId]]:
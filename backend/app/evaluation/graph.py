@@ -2,12 +2,16 @@
 
 import logging
 import pickle
+import threading
+from dataclasses import dataclass, field
 from functools import lru_cache
 from pathlib import Path
 from urllib.parse import urlparse
+from weakref import WeakKeyDictionary
 
 import botocore.exceptions
 import fastapi
+import numpy as np
 from networkx import Graph
 
 from app.core.config import settings
@@ -53,6 +57,24 @@ def get_gerrydb_graph(file_path: str) -> Graph:
         return pickle.load(f)
 
 
+def put_gerrydb_graph(G: Graph, file_path: str) -> None:
+    """Write a graph pkl to a local path or an S3 URI (the inverse of
+    `get_gerrydb_graph`)."""
+    url = urlparse(file_path)
+    body = pickle.dumps(G)
+
+    if url.scheme == "s3":
+        s3 = settings.get_s3_client()
+        assert s3, "S3 client is not available"
+        key = url.path.lstrip("/")
+        logger.info("Uploading graph to s3://%s/%s", url.netloc, key)
+        s3.put_object(Bucket=url.netloc, Key=key, Body=body)
+        return
+
+    with open(file_path, "wb") as f:
+        f.write(body)
+
+
 # Must exceed the distinct-map working set or evictions force multi-second
 # cold S3 reloads; each cached graph costs real memory, so raise with care.
 _GRAPH_CACHE_MAX_SIZE = 15
@@ -79,3 +101,147 @@ def get_graph(gerrydb_name: str) -> Graph:
         raise fastapi.HTTPException(
             status_code=500, detail=f"Something went wrong: {e}"
         )
+
+
+@dataclass
+class GraphIndex:
+    """Array view of a loaded graph for vectorized per-request work.
+
+    Nodes are numbered in sorted geo_id order, so any ascending run of node
+    indices is also sorted by geo_id. Built once per cached graph by
+    `get_graph_index` and dropped together with the graph on LRU eviction.
+    """
+
+    nodes: np.ndarray  # object array of geo_ids; position == node index
+    node_index: dict[str, int]
+    # Index of the owning parent for child (block) nodes, -1 for top-level units.
+    parent: np.ndarray
+    # (n_edges, 2) int64 node index pairs.
+    edges: np.ndarray
+    # (n_nodes, 4) float64 EPSG:4326 minx, miny, maxx, maxy per node (NaN when
+    # unknown). Read from the graph's ``bounds_4326`` when the pipeline stored
+    # it, else filled from PostGIS by callers until `backfill-graph-bounds` runs.
+    bounds: np.ndarray | None = None
+    # Per-layer cache of top-level geo_ids that have no node in the graph
+    # (e.g. islands with no adjacency); filled lazily by callers.
+    units_outside_graph: dict[str, list[str]] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def bounds_from_rows(self, paths, bounds) -> np.ndarray:
+        """Scatter ``(path, [minx, miny, maxx, maxy])`` rows into node order."""
+        out = np.full((len(self), 4), np.nan)
+        positions = np.fromiter(
+            (self.node_index.get(path, -1) for path in paths),
+            dtype=np.int64,
+            count=len(paths),
+        )
+        known = positions >= 0
+        out[positions[known]] = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)[
+            known
+        ]
+        return out
+
+
+_GRAPH_INDEXES: "WeakKeyDictionary[Graph, GraphIndex]" = WeakKeyDictionary()
+_GRAPH_INDEX_LOCK = threading.Lock()
+
+
+def build_graph_index(G: Graph) -> GraphIndex:
+    nodes = np.array(sorted(G.nodes), dtype=object)
+    node_index = {node: i for i, node in enumerate(nodes)}
+    parent = np.fromiter(
+        (node_index.get(G.nodes[node].get("parent"), -1) for node in nodes),
+        dtype=np.int64,
+        count=len(nodes),
+    )
+    edges = np.fromiter(
+        (node_index[node] for edge in G.edges for node in edge),
+        dtype=np.int64,
+        count=2 * G.number_of_edges(),
+    ).reshape(-1, 2)
+    index = GraphIndex(nodes=nodes, node_index=node_index, parent=parent, edges=edges)
+    stored_bounds = G.graph.get("bounds_4326")
+    if stored_bounds is not None:
+        index.bounds = index.bounds_from_rows(
+            stored_bounds["paths"], stored_bounds["bounds"]
+        )
+    return index
+
+
+def get_graph_index(G: Graph) -> GraphIndex:
+    """Return the (cached) `GraphIndex` for a graph returned by `get_graph`."""
+    index = _GRAPH_INDEXES.get(G)
+    if index is None:
+        with _GRAPH_INDEX_LOCK:
+            index = _GRAPH_INDEXES.get(G)
+            if index is None:
+                index = build_graph_index(G)
+                _GRAPH_INDEXES[G] = index
+    return index
+
+
+def label_components(edges: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Label the connected components of the subgraph induced by `mask`.
+
+    Vectorized union-find: every round hooks the larger root of each edge onto
+    the smaller one, then pointer-jumps until every node points at its root.
+    Returns an int64 array where each masked node holds the smallest node index
+    in its component and unmasked nodes hold -1.
+    """
+    labels = np.arange(len(mask), dtype=np.int64)
+    keep = mask[edges[:, 0]] & mask[edges[:, 1]]
+    u, v = edges[keep, 0], edges[keep, 1]
+    while len(u):
+        lu, lv = labels[u], labels[v]
+        crossing = lu != lv
+        if not crossing.any():
+            break
+        lo = np.minimum(lu[crossing], lv[crossing])
+        hi = np.maximum(lu[crossing], lv[crossing])
+        np.minimum.at(labels, hi, lo)
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+        u, v = u[crossing], v[crossing]
+    labels[~mask] = -1
+    return labels
+
+
+def group_by_label(labels: np.ndarray) -> list[np.ndarray]:
+    """Split labelled node indices (as from `label_components`) into one
+    ascending index array per component, ignoring -1."""
+    members = np.flatnonzero(labels >= 0)
+    if not len(members):
+        return []
+    order = np.argsort(labels[members], kind="stable")
+    members = members[order]
+    boundaries = np.flatnonzero(np.diff(labels[members])) + 1
+    return np.split(members, boundaries)
+
+
+def component_bounds(labels: np.ndarray, bounds: np.ndarray) -> np.ndarray:
+    """Per-component bboxes for labelled nodes (as from `label_components`).
+
+    Sorts members by label and reduces each run with ``fmin/fmax.reduceat``,
+    so nodes with unknown (NaN) bounds are ignored. Returns a
+    ``(n_components, 4)`` array of minx, miny, maxx, maxy in component order
+    of `group_by_label`; components with no known bounds come back as NaN.
+    """
+    members = np.flatnonzero(labels >= 0)
+    if not len(members):
+        return np.empty((0, 4))
+    members = members[np.argsort(labels[members], kind="stable")]
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(labels[members])) + 1))
+    member_bounds = bounds[members]
+    return np.column_stack(
+        (
+            np.fmin.reduceat(member_bounds[:, 0], starts),
+            np.fmin.reduceat(member_bounds[:, 1], starts),
+            np.fmax.reduceat(member_bounds[:, 2], starts),
+            np.fmax.reduceat(member_bounds[:, 3], starts),
+        )
+    )
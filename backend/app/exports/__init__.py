@@ -1,5 +1,7 @@
-from app.exports.models import DocumentExportType
+from app.exports.models import DocumentExportType, ExportJob, ExportJobStatus
 
 __all__ = [
     "DocumentExportType",
+    "ExportJob",
+    "ExportJobStatus",
 ]
@@ -1,3 +1,4 @@
+import anyio
 import csv
 import json
 import logging
@@ -6,17 +7,28 @@ import shapely
 import tempfile
 import zipfile
 import os
+import shutil
+from functools import partial
 from app.core.io import remove_file
 from datetime import datetime, UTC
+from pathlib import Path
 from typing import Annotated
+from uuid import UUID, uuid4
 from fastapi import APIRouter, status, BackgroundTasks, Depends, HTTPException
-from fastapi.responses import FileResponse
-from sqlmodel import Session, select, col
+from fastapi.responses import FileResponse, RedirectResponse
+from sqlalchemy.sql import func
+from sqlmodel import Session, select, col, update
+from app.core.config import settings
 from app.core.dependencies import get_protected_document
-from app.core.db import get_session
+from app.core.db import get_session, engine
 from app.core.security import require_session
 from app.models import Document, DistrictrMap, DistrictUnionsResponse, Assignments
-from app.exports.models import DocumentExportType
+from app.exports.models import (
+    DocumentExportType,
+    ExportJob,
+    ExportJobPublic,
+    ExportJobStatus,
+)
 from app.utils import update_or_select_district_stats
 from app.evaluation.graph import get_graph
 from app.evaluation.main import update_or_select_document_evaluation
@@ -106,6 +118,67 @@ def build_districts_shapefile(
                 zf.write(os.path.join(tmpdir, fname), arcname=fname)
 
 
+EXPORT_EXTENSIONS: dict[DocumentExportType, str] = {
+    DocumentExportType.block_assignments_csv: "csv",
+    DocumentExportType.districts_geojson: "geojson",
+    DocumentExportType.districts_shapefile: "zip",
+    DocumentExportType.evaluation_json: "json",
+}
+
+EXPORT_MEDIA_TYPES: dict[DocumentExportType, str] = {
+    DocumentExportType.block_assignments_csv: "text/csv; charset=utf-8",
+    DocumentExportType.districts_geojson: "application/json",
+    DocumentExportType.districts_shapefile: "application/zip",
+    DocumentExportType.evaluation_json: "application/json",
+}
+
+
+def parse_export_type(export_type: str) -> DocumentExportType:
+    try:
+        return DocumentExportType(export_type)
+    except ValueError as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(error),
+        )
+
+
+def build_export(
+    export_type: DocumentExportType,
+    document: Document,
+    session: Session,
+    background_tasks: BackgroundTasks,
+    out_file: str,
+) -> None:
+    """Write the requested export for `document` to out_file.
+
+    Raises:
+        ValueError: If the document has nothing to export for this type.
+    """
+    if export_type == DocumentExportType.block_assignments_csv:
+        build_block_assignments_csv(str(document.document_id), session, out_file)
+        return
+
+    if export_type == DocumentExportType.evaluation_json:
+        build_evaluation_json(document, session, background_tasks, out_file)
+        return
+
+    # District boundary exports — refresh the district_unions cache then build from results
+    district_rows = update_or_select_district_stats(
+        session, str(document.document_id), background_tasks
+    )
+    if not any(r.zone is not None and r.geometry is not None for r in district_rows):
+        raise ValueError(
+            "No district boundaries found — assign zones before exporting boundaries"
+        )
+
+    if export_type == DocumentExportType.districts_geojson:
+        build_districts_geojson(district_rows, out_file)
+        return
+
+    build_districts_shapefile(district_rows, out_file)
+
+
 @router.get(
     "/api/document/{document_id}/export",
     status_code=status.HTTP_200_OK,
@@ -119,60 +192,371 @@ async def export_document(
     export_type: str = "BlockAssignmentsCSV",
     session: Session = Depends(get_session),
 ) -> FileResponse:
-    try:
-        _export_type = DocumentExportType(export_type)
-    except ValueError as error:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(error),
-        )
+    _export_type = parse_export_type(export_type)
 
     timestamp = datetime.now(UTC).strftime("%Y%m%d%H%M%S")
-    ext = {
-        DocumentExportType.block_assignments_csv: "csv",
-        DocumentExportType.districts_geojson: "geojson",
-        DocumentExportType.districts_shapefile: "zip",
-        DocumentExportType.evaluation_json: "json",
-    }[_export_type]
+    ext = EXPORT_EXTENSIONS[_export_type]
     out_file_name = f"{document_id}_{_export_type.value}_{timestamp}.{ext}"
     _out_file = f"/tmp/{out_file_name}"
     background_tasks.add_task(remove_file, _out_file)
 
-    if _export_type == DocumentExportType.block_assignments_csv:
+    try:
+        build_export(_export_type, document, session, background_tasks, _out_file)
+    except ValueError as error:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(error)
+        )
+    return FileResponse(
+        path=_out_file,
+        media_type=EXPORT_MEDIA_TYPES[_export_type],
+        filename=out_file_name,
+    )
+
+
+def _export_source_updated_at(
+    export_type: DocumentExportType, document: Document
+) -> datetime:
+    """The document timestamp an export of this type is derived from.
+
+    Evaluation metrics are cached against `updated_at` (they also depend on
+    e.g. num_districts); every other export only changes with assignments.
+    """
+    if export_type == DocumentExportType.evaluation_json:
+        assert document.updated_at is not None
+        return document.updated_at
+    return document.assignments_updated_at
+
+
+def _is_stale(job: ExportJob) -> bool:
+    if job.status not in (ExportJobStatus.pending, ExportJobStatus.running):
+        return False
+    assert job.updated_at is not None
+    age = datetime.now(UTC) - job.updated_at
+    return age.total_seconds() > settings.EXPORT_JOB_STALE_SECONDS
+
+
+def _artifact_key(job: ExportJob, export_type: DocumentExportType) -> str:
+    return f"exports/{job.document_id}/{job.job_id}.{EXPORT_EXTENSIONS[export_type]}"
+
+
+def _local_artifact_path(artifact_key: str) -> Path:
+    return Path(settings.EXPORT_ARTIFACT_DIR) / artifact_key
+
+
+def _artifact_bucket():
+    """The S3 client and bucket artifacts are stored in, or None when they are
+    kept in the local artifact dir."""
+    s3 = settings.get_s3_client()
+    bucket = settings.R2_BUCKET_NAME
+    if s3 is None or bucket is None:
+        return None
+    return s3, bucket
+
+
+def store_export_artifact(local_path: str, artifact_key: str) -> None:
+    """Upload a built artifact to S3, or copy it to the local artifact dir."""
+    if (artifact_bucket := _artifact_bucket()) is not None:
+        s3, bucket = artifact_bucket
+        s3.upload_file(local_path, bucket, artifact_key)
+        return
+
+    out_path = _local_artifact_path(artifact_key)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(local_path, out_path)
+
+
+def delete_export_artifact(artifact_key: str) -> None:
+    """Remove a stored artifact from S3 or the local artifact dir."""
+    if (artifact_bucket := _artifact_bucket()) is not None:
+        s3, bucket = artifact_bucket
+        s3.delete_object(Bucket=bucket, Key=artifact_key)
+        return
+    _local_artifact_path(artifact_key).unlink(missing_ok=True)
+
+
+def export_download_url(job: ExportJob, document_id: str) -> str | None:
+    """Presigned S3 URL for a finished artifact, or the API download route.
+
+    `document_id` is the ID the caller used (possibly the public id), so the
+    private UUID is never leaked through the local download path.
+    """
+    if job.status != ExportJobStatus.succeeded or job.artifact_key is None:
+        return None
+
+    if (artifact_bucket := _artifact_bucket()) is not None:
+        s3, bucket = artifact_bucket
+        return s3.generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": bucket,
+                "Key": job.artifact_key,
+                "ResponseContentDisposition": f'attachment; filename="{job.file_name}"',
+            },
+            ExpiresIn=settings.EXPORT_URL_TTL_SECONDS,
+        )
+
+    return f"/api/document/{document_id}/export_jobs/{job.job_id}/download"
+
+
+def _export_job_public(job: ExportJob, document_id: str) -> ExportJobPublic:
+    assert job.created_at is not None and job.updated_at is not None
+    return ExportJobPublic(
+        job_id=str(job.job_id),
+        export_type=job.export_type,
+        status=job.status,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+        file_name=job.file_name,
+        download_url=export_download_url(job, document_id),
+        error=job.error,
+    )
+
+
+def run_export_job(job_id: str, session: Session | None = None) -> None:
+    """Build and store an export, owning the DB session unless one is given.
+
+    See ``generate_thumbnail`` for why background tasks must not reuse the
+    request-scoped session. Tests may pass a session to share their transaction.
+    """
+    if session is not None:
+        return _run_export_job(session, job_id)
+    with Session(engine) as owned_session:
+        return _run_export_job(owned_session, job_id)
+
+
+def _run_deferred_tasks(tasks: BackgroundTasks) -> None:
+    """Run the tasks a build queued (e.g. thumbnail regeneration) once the
+    job is recorded; there is no response to attach them to."""
+    for task in tasks.tasks:
         try:
-            build_block_assignments_csv(str(document.document_id), session, _out_file)
-        except ValueError as error:
-            raise HTTPException(
-                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(error)
+            if task.is_async:
+                anyio.run(partial(task.func, *task.args, **task.kwargs))
+            else:
+                task.func(*task.args, **task.kwargs)
+        except Exception:
+            logger.exception("Deferred task %s of an export job failed", task.func)
+
+
+def _remove_superseded_jobs(session: Session, job: ExportJob) -> None:
+    """Delete the finished jobs (and stored artifacts) of the same document and
+    export type built from the same or an older source than `job`, which
+    replaces them. Jobs still in flight are left alone."""
+    superseded = session.exec(
+        select(ExportJob)
+        .where(ExportJob.document_id == job.document_id)
+        .where(ExportJob.export_type == job.export_type)
+        .where(ExportJob.job_id != job.job_id)
+        .where(col(ExportJob.source_updated_at) <= job.source_updated_at)
+        .where(
+            col(ExportJob.status).in_(
+                [ExportJobStatus.succeeded.value, ExportJobStatus.failed.value]
             )
-        return FileResponse(
-            path=_out_file, media_type="text/csv; charset=utf-8", filename=out_file_name
         )
+    ).all()
+    for old_job in superseded:
+        if old_job.artifact_key is not None:
+            try:
+                delete_export_artifact(old_job.artifact_key)
+            except Exception:
+                logger.exception(
+                    "Failed to delete export artifact %s", old_job.artifact_key
+                )
+                continue
+        session.delete(old_job)
+    session.commit()
+
+
+def _run_export_job(session: Session, job_id: str) -> None:
+    # Claim the job atomically so a duplicate enqueue (or a re-enqueue of a
+    # stale job racing the original worker) builds it at most once.
+    claimed = session.execute(
+        update(ExportJob)
+        .where(col(ExportJob.job_id) == job_id)
+        .where(col(ExportJob.status) == ExportJobStatus.pending.value)
+        .values(status=ExportJobStatus.running.value, updated_at=func.now())
+        .returning(col(ExportJob.document_id), col(ExportJob.export_type))
+    ).one_or_none()
+    session.commit()
+    if claimed is None:
+        # In test environments the enqueuing request's transaction can be
+        # rolled back before this task runs — exit quietly in that case.
+        return
+    document_id, export_type_value = claimed
+    export_type = DocumentExportType(export_type_value)
+
+    tasks = BackgroundTasks()
+    tmpdir = tempfile.mkdtemp(prefix="export_")
+    local_path = os.path.join(tmpdir, f"{job_id}.{EXPORT_EXTENSIONS[export_type]}")
+    try:
+        document = session.exec(
+            select(Document).where(Document.document_id == document_id)
+        ).one()
+        build_export(export_type, document, session, tasks, local_path)
+        job = session.exec(select(ExportJob).where(ExportJob.job_id == job_id)).one()
+        artifact_key = _artifact_key(job, export_type)
+        store_export_artifact(local_path, artifact_key)
 
-    if _export_type == DocumentExportType.evaluation_json:
-        build_evaluation_json(document, session, background_tasks, _out_file)
-        return FileResponse(
-            path=_out_file, media_type="application/json", filename=out_file_name
+        timestamp = datetime.now(UTC).strftime("%Y%m%d%H%M%S")
+        session.execute(
+            update(ExportJob)
+            .where(col(ExportJob.job_id) == job_id)
+            .values(
+                status=ExportJobStatus.succeeded.value,
+                artifact_key=artifact_key,
+                file_name=(
+                    f"{document.public_id}_{export_type.value}_{timestamp}."
+                    f"{EXPORT_EXTENSIONS[export_type]}"
+                ),
+                updated_at=func.now(),
+            )
         )
+        session.commit()
+        session.refresh(job)
+    except Exception as error:
+        logger.exception("Export job %s failed", job_id)
+        session.rollback()
+        session.execute(
+            update(ExportJob)
+            .where(col(ExportJob.job_id) == job_id)
+            .values(
+                status=ExportJobStatus.failed.value,
+                error=str(error) if isinstance(error, ValueError) else "Export failed",
+                updated_at=func.now(),
+            )
+        )
+        session.commit()
+        return
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
 
-    # District boundary exports — refresh the district_unions cache then build from results
-    district_rows = update_or_select_district_stats(
-        session, str(document.document_id), background_tasks
-    )
-    if not any(r.zone is not None and r.geometry is not None for r in district_rows):
+    _remove_superseded_jobs(session, job)
+    _run_deferred_tasks(tasks)
+
+
+def _get_export_job(session: Session, document: Document, job_id: UUID) -> ExportJob:
+    job = session.exec(
+        select(ExportJob)
+        .where(ExportJob.job_id == str(job_id))
+        .where(ExportJob.document_id == document.document_id)
+    ).one_or_none()
+    if job is None:
         raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail="No district boundaries found — assign zones before exporting boundaries",
+            status_code=status.HTTP_404_NOT_FOUND, detail="Export job not found"
         )
+    return job
+
+
+@router.post(
+    "/api/document/{document_id}/export_jobs",
+    response_model=ExportJobPublic,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(require_session)],
+)
+async def create_export_job(
+    *,
+    document_id: str,
+    document: Annotated[Document, Depends(get_protected_document)],
+    background_tasks: BackgroundTasks,
+    export_type: str = "BlockAssignmentsCSV",
+    session: Session = Depends(get_session),
+) -> ExportJobPublic:
+    """
+    Enqueue an export build and return its job; poll the GET route for status.
+
+    An existing job built from the document's current state is returned
+    instead of enqueuing a new one — succeeded artifacts are reused until the
+    document's assignments (or, for evaluations, the document) change.
+    """
+    _export_type = parse_export_type(export_type)
+    source_updated_at = _export_source_updated_at(_export_type, document)
+
+    existing_jobs = session.exec(
+        select(ExportJob)
+        .where(ExportJob.document_id == document.document_id)
+        .where(ExportJob.export_type == _export_type.value)
+        .where(ExportJob.source_updated_at == source_updated_at)
+        .where(col(ExportJob.status) != ExportJobStatus.failed.value)
+        .order_by(col(ExportJob.created_at).desc())
+    ).all()
+    for job in existing_jobs:
+        if not _is_stale(job):
+            return _export_job_public(job, document_id)
+
+    job = ExportJob(
+        job_id=str(uuid4()),
+        document_id=document.document_id,
+        export_type=_export_type.value,
+        status=ExportJobStatus.pending.value,
+        source_updated_at=source_updated_at,
+    )
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+
+    background_tasks.add_task(run_export_job, job_id=job.job_id)
+    return _export_job_public(job, document_id)
+
+
+@router.get(
+    "/api/document/{document_id}/export_jobs/{job_id}",
+    response_model=ExportJobPublic,
+    dependencies=[Depends(require_session)],
+)
+async def get_export_job(
+    *,
+    document_id: str,
+    job_id: UUID,
+    document: Annotated[Document, Depends(get_protected_document)],
+    session: Session = Depends(get_session),
+) -> ExportJobPublic:
+    job = _get_export_job(session, document, job_id)
+    return _export_job_public(job, document_id)
 
-    if _export_type == DocumentExportType.districts_geojson:
-        build_districts_geojson(district_rows, _out_file)
-        return FileResponse(
-            path=_out_file, media_type="application/json", filename=out_file_name
+
+@router.get(
+    "/api/document/{document_id}/export_jobs/{job_id}/download",
+    dependencies=[Depends(require_session)],
+)
+async def download_export_job(
+    *,
+    document_id: str,
+    job_id: UUID,
+    document: Annotated[Document, Depends(get_protected_document)],
+    session: Session = Depends(get_session),
+):
+    job = _get_export_job(session, document, job_id)
+    download_url = export_download_url(job, document_id)
+    if download_url is None or job.artifact_key is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Export job is {ExportJobStatus(job.status).value}",
         )
 
-    # Shapefile exports
-    build_districts_shapefile(district_rows, _out_file)
+    if _artifact_bucket() is not None:
+        # Artifact lives in S3; hand the client the presigned URL.
+        return RedirectResponse(
+            url=download_url, status_code=status.HTTP_307_TEMPORARY_REDIRECT
+        )
+    local_path = _local_artifact_path(job.artifact_key)
+    if not local_path.exists():
+        # Lost with the worker's local disk. Fail the job so the next export
+        # request enqueues a rebuild instead of reusing it.
+        session.execute(
+            update(ExportJob)
+            .where(col(ExportJob.job_id) == job.job_id)
+            .values(
+                status=ExportJobStatus.failed.value,
+                error="Export artifact is no longer available",
+                updated_at=func.now(),
+            )
+        )
+        session.commit()
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Export artifact is no longer available",
+        )
     return FileResponse(
-        path=_out_file, media_type="application/zip", filename=out_file_name
+        path=local_path,
+        media_type=EXPORT_MEDIA_TYPES[DocumentExportType(job.export_type)],
+        filename=job.file_name,
     )
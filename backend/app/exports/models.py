@@ -1,4 +1,11 @@
+from datetime import datetime
 from enum import Enum
+from pydantic import BaseModel
+from sqlmodel import Column, Field, ForeignKey, Index, MetaData, String, Text
+from sqlalchemy.dialects.postgresql import TIMESTAMP
+from app.constants import DOCUMENT_SCHEMA
+from app.core.models import SQLModel, TimeStampMixin, UUIDType
+from app.models import Document
 
 
 class DocumentExportType(Enum):
@@ -6,3 +13,64 @@ class DocumentExportType(Enum):
     districts_geojson = "DistrictsGeoJSON"
     districts_shapefile = "DistrictsShapefile"
     evaluation_json = "EvaluationJSON"
+
+
+class ExportJobStatus(str, Enum):
+    pending = "pending"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
+class ExportJob(TimeStampMixin, SQLModel, table=True):
+    """
+    An asynchronous export build for a document.
+
+    `source_updated_at` is the document timestamp the artifact was built from
+    (`assignments_updated_at`, or `updated_at` for evaluation exports). A
+    succeeded job whose `source_updated_at` still matches the document is
+    reused instead of rebuilding the artifact.
+    """
+
+    __tablename__ = "export_job"
+    __table_args__ = (
+        Index(
+            "idx_export_job_document_type_source",
+            "document_id",
+            "export_type",
+            "source_updated_at",
+        ),
+    )
+    metadata = MetaData(schema=DOCUMENT_SCHEMA)
+
+    job_id: str = Field(sa_column=Column(UUIDType, primary_key=True, nullable=False))
+    document_id: str = Field(
+        sa_column=Column(
+            UUIDType,
+            ForeignKey(Document.document_id, ondelete="CASCADE"),
+            nullable=False,
+        )
+    )
+    export_type: str = Field(sa_column=Column(String, nullable=False))
+    status: ExportJobStatus = Field(
+        sa_column=Column(String, nullable=False, server_default="pending")
+    )
+    source_updated_at: datetime = Field(
+        sa_column=Column(TIMESTAMP(timezone=True), nullable=False)
+    )
+    # S3 key when the artifact lives in the bucket, else a path under
+    # settings.EXPORT_ARTIFACT_DIR.
+    artifact_key: str | None = Field(sa_column=Column(Text, nullable=True))
+    file_name: str | None = Field(sa_column=Column(Text, nullable=True))
+    error: str | None = Field(sa_column=Column(Text, nullable=True))
+
+
+class ExportJobPublic(BaseModel):
+    job_id: str
+    export_type: str
+    status: ExportJobStatus
+    created_at: datetime
+    updated_at: datetime
+    file_name: str | None = None
+    download_url: str | None = None
+    error: str | None = None
@@ -1,14 +1,19 @@
 from fastapi import (
     FastAPI,
+    Header,
     Request,
     status,
     Depends,
     HTTPException,
     Query,
+    Security,
 )
 from fastapi.responses import JSONResponse, Response
 from typing import Annotated, Any
 import anyio
+import base64
+import hashlib
+import math
 import msgpack
 import psutil
 import time
@@ -19,7 +24,7 @@ from sqlalchemy.exc import (
     DataError,
     OperationalError,
 )
-from sqlalchemy import text
+from sqlalchemy import literal_column, text, tuple_
 from sqlalchemy.types import Integer
 from sqlmodel import Session, String, select, true, update, col, literal
 from starlette.concurrency import run_in_threadpool
@@ -38,17 +43,36 @@ from app.assignments import (
     batch_insert_assignments,
     DuplicateGeoIdError,
 )
-from app.core.db import get_session
+from app.assignments.ingest import (
+    AssignmentRowError,
+    AssignmentsDecodeError,
+    AssignmentsStreamDecoder,
+    copy_assignment_stream,
+    read_until_assignments,
+)
+from app.core.db import engine, get_session
+from app.core.db_timing import db_timing_middleware
 from app.core.dependencies import (
     get_document,
+    DocumentContext,
+    get_document_context,
     get_document_public,
     get_protected_document,
-    get_districtr_map,
     parse_document_id,
 )
 from app.core.models import DocumentID
 from app.core.config import settings
+from app.core.registry import REGISTRY, RegistryListener
+from app.core.http_cache import (
+    apply_cache_headers,
+    etag_matches,
+    make_etag,
+    not_modified,
+)
+from app.core.profiling import SamplingProfiler, profile_lock
 from app.core.security import (
+    TokenScope,
+    auth,
     mint_session_token,
     require_session,
     verify_recaptcha_v3,
@@ -67,7 +91,6 @@ import app.evaluation.main as evaluation
 from app.evaluation.types import MetricsEnvelope
 import app.save_share.main as save_share
 import app.thumbnails.main as thumbnails
-from networkx import connected_components
 from app.models import (
     Assignments,
     ColorsSetResult,
@@ -86,14 +109,14 @@ from app.models import (
     ShatterResult,
     BBoxGeoJSONs,
     MapGroup,
-    AssignmentsCreate,
+    AssignmentsUpdate,
     NumDistrictsSetResult,
 )
 from app.comments.models import (
     Comment,
     DocumentComment as FormDocumentComment,
+    DocumentTag,
     Tag,
-    CommentTag,
 )
 from pydantic import BaseModel, ValidationError
 from pydantic_geojson import PolygonModel
@@ -110,7 +133,6 @@ from app.utils import (
 )
 from app.evaluation.graph import get_graph
 from contextlib import asynccontextmanager
-from fiona.transform import transform
 from fastapi.responses import RedirectResponse
 from fastapi import BackgroundTasks
 from ._sanitize import (
@@ -134,7 +156,12 @@ async def lifespan(app: FastAPI):
     # Sync-route concurrency; default 40 would cap below the DB pool
     # (60/task, app/core/db.py). Needs a running event loop, hence lifespan.
     anyio.to_thread.current_default_thread_limiter().total_tokens = 80
+    registry_listener = RegistryListener(
+        engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+    )
+    registry_listener.start()
     yield
+    registry_listener.stop()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -145,7 +172,7 @@ app.include_router(save_share.router)
 app.include_router(thumbnails.router)
 
 Instrumentator(
-    excluded_handlers=["/metrics", "/_debug/cache"],
+    excluded_handlers=["/metrics", "/_debug/cache", "/_debug/profile"],
 ).instrument(app).expose(app, include_in_schema=False)
 
 logger = logging.getLogger(__name__)
@@ -164,10 +191,11 @@ if settings.BACKEND_CORS_ORIGINS or settings.BACKEND_CORS_ORIGIN_REGEX:
         allow_methods=["*"],
         allow_headers=["*"],
         # Let the browser read export filenames cross-origin.
-        expose_headers=["Content-Disposition"],
+        expose_headers=["Content-Disposition", "X-Next-Cursor"],
     )
 
 app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.middleware("http")(db_timing_middleware)
 
 
 @app.middleware("http")
@@ -239,38 +267,24 @@ def duplicate_document_comments(
     Called from create_document when copying a map so that coverage validation on the
     first subsequent save can succeed.
     """
-    source_rows = session.exec(
+    source = (
         select(
-            Comment.title,
-            Comment.comment,
-            Comment.commenter_id,
-            col(FormDocumentComment.zone).label("zone"),
+            col(Comment.title).label("title"),
+            col(Comment.comment).label("comment"),
+            col(Comment.commenter_id).label("commenter_id"),
+            col(FormDocumentComment.zone).label("scope"),
         )
         .join(
             FormDocumentComment,
             col(FormDocumentComment.comment_id) == col(Comment.id),
         )
         .where(col(FormDocumentComment.document_id) == from_document_id)
-    ).all()
-
-    duplicated = 0
-    for row in source_rows:
-        new_comment = Comment(
-            title=row.title,
-            comment=row.comment,
-            commenter_id=row.commenter_id,
-        )
-        session.add(new_comment)
-        session.flush()
-        session.add(
-            FormDocumentComment(
-                comment_id=new_comment.id,
-                document_id=to_document_id,
-                zone=row.zone,
-            )
-        )
-        duplicated += 1
-    return duplicated
+        .order_by(col(Comment.id))
+    )
+    duplicated = comments.insert_scoped_comments(
+        source, document_id=to_document_id, session=session
+    )
+    return len(duplicated)
 
 
 @app.get("/")
@@ -373,13 +387,31 @@ async def get_document_stats(
 )
 def get_document_evaluation(
     background_tasks: BackgroundTasks,
+    response: Response,
+    document_id: Annotated[DocumentID, Depends(parse_document_id)],
     document: Annotated[Document, Depends(get_protected_document)],
     # TODO: consider using Annotated more consistently across dependencies.
     session: Annotated[Session, Depends(get_session)],
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
-    return evaluation.update_or_select_document_evaluation(
+    # Cached metrics are fresh iff computed after `updated_at` under the
+    # current payload version, so those two values identify the response.
+    etag = make_etag(
+        document.document_id, document.updated_at, evaluation.CURRENT_PAYLOAD_VERSION
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, document_id.is_public)
+
+    envelope = evaluation.update_or_select_document_evaluation(
         background_tasks, session, document
     )
+    # Partial results are never cached server-side; don't let clients keep them.
+    if (
+        not envelope["failed"]
+        and envelope["payload_version"] == evaluation.CURRENT_PAYLOAD_VERSION
+    ):
+        apply_cache_headers(response, etag, document_id.is_public)
+    return envelope
 
 
 # matches createMapObject in apiHandlers.ts
@@ -698,6 +730,80 @@ async def create_document(
     return doc_dict
 
 
+def _assignments_body_error(
+    error: AssignmentsDecodeError | AssignmentRowError,
+) -> HTTPException:
+    if isinstance(error, AssignmentRowError):
+        return HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=error.errors(),
+        )
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Could not decode msgpack body: {error}",
+    )
+
+
+def _validate_assignments_header(header: dict) -> AssignmentsUpdate:
+    try:
+        return AssignmentsUpdate.model_validate(header)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=e.errors(),
+        )
+
+
+def _check_document_for_update(session: Session, data: AssignmentsUpdate) -> str:
+    """
+    Check that the document of an assignments update exists, that the request's
+    map type matches it and that it was not updated by another client since
+    ``last_updated_at`` (unless ``overwrite``). Returns its map type.
+
+    Raises:
+        HTTPException: 404, 400 on a map type mismatch, or 409 on conflict.
+    """
+    document_id = data.document_id
+    document = session.exec(
+        select(Document.map_type, Document.updated_at).where(
+            Document.document_id == document_id
+        )
+    ).one_or_none()
+    if document is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Document not found: {document_id}",
+        )
+    actual_map_type, db_last_updated_at = document
+    requested_map_type = data.map_type or actual_map_type
+    if (requested_map_type == "community") != (actual_map_type == "community"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                "Map type mismatch: document uses "
+                f"`{actual_map_type}` save semantics but request specified "
+                f"`{requested_map_type}`."
+            ),
+        )
+
+    if (
+        db_last_updated_at is not None
+        and db_last_updated_at > data.last_updated_at
+        and not data.overwrite
+    ):
+        if VERBOSE_LOGGING:
+            logger.warning(
+                f"Conflict detected for document {document_id}: "
+                f"db_last_updated_at={db_last_updated_at!r} > "
+                f"last_updated_at={data.last_updated_at!r}"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Document has been updated since the last update",
+        )
+    return actual_map_type
+
+
 @app.put("/api/assignments", dependencies=[Depends(require_session)])
 async def update_assignments(
     request: Request,
@@ -715,12 +821,17 @@ async def update_assignments(
         This endpoint takes the raw ``request`` body instead of a Pydantic body
         parameter, so neither the request schema nor an example appears in OpenAPI.
         - REQUEST: ``Content-Type: application/msgpack``. The body is a msgpack-encoded
-          map that is decoded and then validated against ``AssignmentsCreate`` (see
-          ``app/models.py``). Sending JSON will fail to decode (400).
+          map matching ``AssignmentsCreate`` (see ``app/models.py``). Sending JSON will
+          fail to decode (400).
         - RESPONSE: plain JSON (a dict, serialized by FastAPI), NOT msgpack — see
           Returns below. The frontend sends ``Accept: application/json`` accordingly.
-        We bypass the body param to avoid Pydantic re-validating the full assignments
-        list twice and to keep the large payload off the JSON path.
+        We bypass the body param so the assignments list never has to be buffered:
+        the body is decoded incrementally as it streams in and each ``[geo_id, zone]``
+        row is type-checked and handed to a COPY running in a worker thread (see
+        ``app/assignments/ingest.py``). ``assignments`` must be the last key of the
+        map (400 otherwise), so the other keys are validated with Pydantic
+        (``AssignmentsUpdate``) and the document, map type and conflict checks run
+        before any row is copied.
 
     The last_updated_at parameter is used for conflict detection:
     - The client should provide the timestamp of the last known update to the document
@@ -751,28 +862,52 @@ async def update_assignments(
             - updated_at: New timestamp after the update
 
     Raises:
-        HTTPException: 400 if the body cannot be msgpack-decoded, or no changes provided
+        HTTPException: 400 if the body cannot be msgpack-decoded, ``assignments`` is
+            not its last key, or no changes provided
         HTTPException: 404 if the document does not exist
         HTTPException: 409 if document was updated by another client and overwrite=False
-        HTTPException: 422 if the decoded body fails AssignmentsCreate validation
+        HTTPException: 422 if an assignment row is malformed or the remaining keys
+            fail AssignmentsUpdate validation
     """
-    body_bytes = await request.body()
-    try:
-        raw = msgpack.unpackb(body_bytes, raw=False)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Could not decode msgpack body: {e}",
-        )
+    # `assignments` is the last key of the body (the decoder rejects it
+    # anywhere else), so the header is complete and the document is checked
+    # (404 / map type / 409) before any row is copied. The rows are then
+    # streamed into a temp table while the body is still arriving. Nothing is
+    # written to the document's rows until the checks below pass, and the temp
+    # table is dropped with the transaction either way.
+    decoder = AssignmentsStreamDecoder()
+    chunks = request.stream()
     try:
-        data = AssignmentsCreate.model_validate(raw)
-    except ValidationError as e:
+        rows = await read_until_assignments(decoder, chunks)
+        if not decoder.has_assignments_key:
+            decoder.close()
+    except (AssignmentsDecodeError, AssignmentRowError) as e:
+        raise _assignments_body_error(e)
+    if not decoder.has_assignments_key:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail=e.errors(),
+            detail=[
+                {
+                    "type": "missing",
+                    "loc": ["assignments"],
+                    "msg": "Field required",
+                    "input": decoder.header,
+                }
+            ],
+        )
+    data = _validate_assignments_header(decoder.header)
+    actual_map_type = _check_document_for_update(session, data)
+
+    load_id, _ = str(uuid4()).split("-", maxsplit=1)
+    temp_table_name = f"temp_assignments_{load_id}"
+    try:
+        await copy_assignment_stream(
+            decoder, chunks, rows, session.connection(), temp_table_name
         )
+    except (AssignmentsDecodeError, AssignmentRowError) as e:
+        raise _assignments_body_error(e)
 
-    has_assignments = len(data.assignments) > 0
+    has_assignments = decoder.row_count > 0
     has_metadata = data.metadata is not None
     has_comments = data.comments is not None
     if not has_assignments and not has_metadata and not has_comments:
@@ -782,30 +917,8 @@ async def update_assignments(
         )
 
     document_id = data.document_id
-    assignments = data.assignments  # [[geo_id, zone], ...]
-    last_updated_at = data.last_updated_at
-    actual_map_type = session.exec(
-        select(Document.map_type).where(Document.document_id == document_id)
-    ).one_or_none()
-    if actual_map_type is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Document not found: {document_id}",
-        )
     requested_map_type = data.map_type or actual_map_type
-    requested_is_community = requested_map_type == "community"
-    actual_is_community = actual_map_type == "community"
-    if requested_is_community != actual_is_community:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=(
-                "Map type mismatch: document uses "
-                f"`{actual_map_type}` save semantics but request specified "
-                f"`{requested_map_type}`."
-            ),
-        )
-
-    is_community_map = actual_is_community
+    is_community_map = actual_map_type == "community"
     assignment_table = (
         "document.community_assignments" if is_community_map else "document.assignments"
     )
@@ -824,7 +937,7 @@ async def update_assignments(
             f"PUT /api/assignments: document_id={document_id}, "
             f"requested_map_type={requested_map_type}, "
             f"actual_map_type={actual_map_type}, "
-            f"assignment_count={len(assignments)}, "
+            f"assignment_count={decoder.row_count}, "
             f"comment_count={len(data.comments) if data.comments else 0}, "
             f"has_metadata={data.metadata is not None}, "
             f"has_community_metadata_list="
@@ -850,24 +963,6 @@ async def update_assignments(
                 f"validated_metadata={'present' if validated_community_metadata else 'None'}"
             )
 
-    db_last_updated_at = session.exec(
-        select(Document.updated_at).where(Document.document_id == document_id)
-    ).one_or_none()
-
-    if (
-        db_last_updated_at is not None
-        and db_last_updated_at > last_updated_at
-        and not data.overwrite
-    ):
-        if VERBOSE_LOGGING:
-            logger.warning(
-                f"Conflict detected for document {document_id}: "
-                f"db_last_updated_at={db_last_updated_at!r} > last_updated_at={last_updated_at!r}"
-            )
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Document has been updated since the last update",
-        )
     # Track whether anything actually changed so we can skip the updated_at bump on
     # true no-op requests (which would otherwise break optimistic concurrency for
     # other clients).
@@ -926,39 +1021,28 @@ async def update_assignments(
             if effective_metadata:
                 valid_community_ids = {c.id for c in effective_metadata} | {0}
 
-        # Use COPY for faster bulk insert with partitioned tables
-        # Create a temporary table for bulk loading
-        load_id, _ = str(uuid4()).split("-", maxsplit=1)
-        temp_table_name = f"temp_assignments_{load_id}"
-        session.connection().execute(
-            text(
-                f"CREATE TEMP TABLE {temp_table_name} (document_id UUID, geo_id TEXT, zone INT) ON COMMIT DROP"
+        # Community maps store a missing/null zone as the 0 "unassigned" sentinel.
+        zone_expr = "COALESCE(zone, 0)" if is_community_map else "zone"
+        if valid_community_ids is not None:
+            unknown_community_id = (
+                session.connection()
+                .execute(
+                    text(
+                        f"SELECT {zone_expr} FROM {temp_table_name} "
+                        f"WHERE {zone_expr} <> ALL(:valid_ids) LIMIT 1"
+                    ),
+                    {"valid_ids": sorted(valid_community_ids)},
+                )
+                .scalar()
             )
-        )
-
-        # Use COPY to bulk load data into temp table
-        cursor = session.connection().connection.cursor()
-        with cursor.copy(
-            f"COPY {temp_table_name} (document_id, geo_id, zone) FROM STDIN"
-        ) as copy:
-            for assignment in assignments:
-                # assignment is [geo_id, zone]
-                geo_id = assignment[0]
-                zone_val = assignment[1] if len(assignment) > 1 else None
-                if is_community_map and zone_val is None:
-                    zone_val = 0
-                if (
-                    valid_community_ids is not None
-                    and zone_val not in valid_community_ids
-                ):
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=(
-                            f"Assignment references unknown community_id {zone_val!r}; "
-                            "it is not in the document's community metadata list."
-                        ),
-                    )
-                copy.write_row([document_id, geo_id, zone_val])
+            if unknown_community_id is not None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=(
+                        f"Assignment references unknown community_id {unknown_community_id!r}; "
+                        "it is not in the document's community metadata list."
+                    ),
+                )
 
         # Insert from temp table into partitioned assignments table
         # PostgreSQL will automatically route to the correct partition based on document_id
@@ -967,9 +1051,10 @@ async def update_assignments(
             .execute(
                 text(f"""
             INSERT INTO {assignment_table} (document_id, geo_id, {assignment_column})
-            SELECT document_id, geo_id, zone
+            SELECT CAST(:document_id AS UUID), geo_id, {zone_expr}
             FROM {temp_table_name}
             """),
+                {"document_id": document_id},
             )
             .rowcount
         )
@@ -1197,15 +1282,12 @@ async def get_children(
     parent_geoid: list[str] = Query(default=[]),
     session: Session = Depends(get_session),
 ):
-    db_districtr_map_uuid = (
-        session.connection()
-        .execute(
-            select(DistrictrMap.uuid).where(
-                DistrictrMap.districtr_map_slug == districtr_map_slug
-            )
+    districtr_map = REGISTRY.districtr_map(session, districtr_map_slug)
+    if districtr_map is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"DistrictrMap matching {districtr_map_slug} does not exist.",
         )
-        .scalar_one()
-    )
     stmt = text("""SELECT child_path, parent_path
         FROM parentchildedges pce
         WHERE pce.parent_path = ANY(:parent_geoids)
@@ -1218,7 +1300,7 @@ async def get_children(
         .execute(
             stmt,
             {
-                "districtr_map_uuid": db_districtr_map_uuid,
+                "districtr_map_uuid": districtr_map.uuid,
                 "parent_geoids": parent_geoid,
             },
         )
@@ -1278,13 +1360,11 @@ async def update_colors(
     session: Session = Depends(get_session),
 ):
     # Get num_districts from Document, with fallback to DistrictrMap
-    districtr_map = session.exec(
-        select(DistrictrMap).where(
-            DistrictrMap.districtr_map_slug == document.districtr_map_slug
-        )
-    ).one()
+    districtr_map = REGISTRY.districtr_map(session, document.districtr_map_slug)
 
-    num_districts = document.num_districts or districtr_map.num_districts
+    num_districts = document.num_districts or (
+        districtr_map.num_districts if districtr_map else None
+    )
 
     if num_districts is not None and num_districts != len(colors):
         raise HTTPException(
@@ -1321,11 +1401,7 @@ async def update_num_districts(
             detail="Number of districts must be at least 2 and at most 538",
         )
 
-    districtr_map = session.exec(
-        select(DistrictrMap).where(
-            DistrictrMap.districtr_map_slug == document.districtr_map_slug
-        )
-    ).first()
+    districtr_map = REGISTRY.districtr_map(session, document.districtr_map_slug)
     if districtr_map and not getattr(districtr_map, "num_districts_modifiable", True):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -1345,14 +1421,55 @@ async def update_num_districts(
     return NumDistrictsSetResult(num_districts=num_districts)
 
 
+# Bump when the get_assignments row shape changes so clients revalidate.
+ASSIGNMENTS_PAYLOAD_VERSION = 1
+
+
+def assignment_rows_statement(
+    document_id: str, districtr_map_uuid: str, is_community_map: bool
+):
+    """(geo_id, zone, parent_path) rows of a document, as served by get_assignments."""
+    if is_community_map:
+        return (
+            select(
+                CommunityAssignments.geo_id,
+                func.nullif(CommunityAssignments.community_id, 0).label("zone"),
+                ParentChildEdges.parent_path,
+            )
+            .outerjoin(
+                ParentChildEdges,
+                onclause=(
+                    col(CommunityAssignments.geo_id) == ParentChildEdges.child_path
+                )
+                & (col(ParentChildEdges.districtr_map) == districtr_map_uuid),
+            )
+            .where(CommunityAssignments.document_id == document_id)
+        )
+    return (
+        select(
+            Assignments.geo_id,
+            Assignments.zone,
+            ParentChildEdges.parent_path,
+        )
+        .outerjoin(
+            ParentChildEdges,
+            onclause=(col(Assignments.geo_id) == ParentChildEdges.child_path)
+            & (col(ParentChildEdges.districtr_map) == districtr_map_uuid),
+        )
+        .where(Assignments.document_id == document_id)
+    )
+
+
 @app.get("/api/get_assignments/{document_id}")
 async def get_assignments(
-    document: Annotated[Document, Depends(get_protected_document)],
+    context: Annotated[DocumentContext, Depends(get_document_context)],
+    document_id: Annotated[DocumentID, Depends(parse_document_id)],
     format: RowFormat = Query(
         default=RowFormat.msgpack,
         description="Response format: msgpack (default), json, or csv.",
     ),
     session: Session = Depends(get_session),
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
     """
     The primary endpoint to get a row-like list of assignments.
@@ -1375,50 +1492,31 @@ async def get_assignments(
 
     NOTE: there is no FastAPI `response_model` here (the body is a raw `Response`),
     so the msgpack shape above is the only place this contract is documented.
+
+    Responses carry an ETag derived from the document and map timestamps;
+    a matching If-None-Match short-circuits to 304 before any rows are read.
     """
-    districtr_map_uuid, map_type = session.exec(
-        select(DistrictrMap.uuid, Document.map_type)
-        .join(
-            Document,
-            onclause=col(Document.districtr_map_slug)
-            == DistrictrMap.districtr_map_slug,
-        )
-        .where(Document.document_id == document.document_id)
-    ).one()
-    is_community_map = map_type == "community"
+    document = context.document
+    districtr_map = context.require_districtr_map()
+    districtr_map_uuid = districtr_map.uuid
+    is_community_map = document.map_type == "community"
 
-    if is_community_map:
-        stmt = (
-            select(
-                CommunityAssignments.geo_id,
-                func.nullif(CommunityAssignments.community_id, 0).label("zone"),
-                ParentChildEdges.parent_path,
-            )
-            .outerjoin(
-                ParentChildEdges,
-                onclause=(
-                    col(CommunityAssignments.geo_id) == ParentChildEdges.child_path
-                )
-                & (col(ParentChildEdges.districtr_map) == districtr_map_uuid),
-            )
-            .where(CommunityAssignments.document_id == document.document_id)
-        )
-    else:
-        stmt = (
-            select(
-                Assignments.geo_id,
-                Assignments.zone,
-                ParentChildEdges.parent_path,
-            )
-            .outerjoin(
-                ParentChildEdges,
-                onclause=(col(Assignments.geo_id) == ParentChildEdges.child_path)
-                & (col(ParentChildEdges.districtr_map) == districtr_map_uuid),
-            )
-            .where(Assignments.document_id == document.document_id)
-        )
+    etag = make_etag(
+        ASSIGNMENTS_PAYLOAD_VERSION,
+        document.document_id,
+        document.updated_at,
+        document.assignments_updated_at,
+        districtr_map.updated_at,
+        format.value,
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, document_id.is_public)
+
+    stmt = assignment_rows_statement(
+        document.document_id, districtr_map_uuid, is_community_map
+    )
     rows = session.exec(stmt).all()
-    return package_rows(
+    response = package_rows(
         rows,
         fmt=format,
         columns=["geo_id", "zone", "parent_path"],
@@ -1428,15 +1526,20 @@ async def get_assignments(
             else None
         ),
     )
+    apply_cache_headers(response, etag, document_id.is_public)
+    return response
 
 
 @app.get("/api/document/{document_id}", response_model=DocumentPublic)
 async def get_document_object(
     document_id: DocumentID = Depends(parse_document_id),
     session: Session = Depends(get_session),
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
+    # Comments, moderation and map metadata change without touching the
+    # document's timestamps, so the ETag is taken over the rendered body.
     try:
-        return get_document_public(document_id=document_id, session=session)
+        document = get_document_public(document_id=document_id, session=session)
     except NoResultFound:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1448,15 +1551,58 @@ async def get_document_object(
             detail=f"Multiple documents found for ID: {document_id}",
         )
 
+    body = document.model_dump_json(by_alias=True).encode()
+    etag = make_etag(hashlib.sha256(body).hexdigest())
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, document_id.is_public)
+    response = Response(content=body, media_type="application/json")
+    apply_cache_headers(response, etag, document_id.is_public)
+    return response
+
+
+DOCUMENT_LIST_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _encode_document_list_cursor(updated_at: datetime, public_id: int) -> str:
+    raw = f"{updated_at.isoformat()}|{public_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_document_list_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        updated_at, public_id = raw.split("|")
+        return datetime.fromisoformat(updated_at), int(public_id)
+    except ValueError as e:  # binascii.Error and UnicodeDecodeError included
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        ) from e
+
 
 @app.get("/api/documents/list")
 async def get_document_list(
+    response: Response,
     session: Session = Depends(get_session),
     offset: int = Query(default=0, ge=0),
     limit: int = Query(default=100, le=100),
     ids: list[int] = Query(default=[]),
     tags: list[str] = Query(default=[]),
+    cursor: str | None = Query(
+        default=None,
+        description=(
+            f"Opaque keyset cursor from a previous page's {DOCUMENT_LIST_CURSOR_HEADER} "
+            "header. Takes precedence over `offset`."
+        ),
+    ),
 ):
+    """
+    List documents, most recently updated first.
+
+    When a page is full, the response carries an `X-Next-Cursor` header; pass
+    it back as `cursor` to fetch the next page. Cursor pages are an index
+    range scan on (updated_at, public_id) whatever their depth, while `offset`
+    is kept for existing callers and still costs O(offset).
+    """
     stmt = (
         select(  # type: ignore[no-matching-overload]
             Document.public_id,
@@ -1465,45 +1611,46 @@ async def get_document_list(
             Document.document_type,
             col(DistrictrMap.name).label("map_module"),
         )
-        .distinct(
-            Document.public_id,
-        )
         .join(
             DistrictrMap,
             col(Document.districtr_map_slug) == col(DistrictrMap.districtr_map_slug),
             isouter=True,
         )
-        .offset(offset)
+        .order_by(col(Document.updated_at).desc(), col(Document.public_id).desc())
         .limit(limit)
     )
 
+    if cursor is not None:
+        cursor_updated_at, cursor_public_id = _decode_document_list_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(col(Document.updated_at), col(Document.public_id))
+            < tuple_(literal(cursor_updated_at), literal(cursor_public_id))
+        )
+    else:
+        stmt = stmt.offset(offset)
+
     if len(tags) > 0:
-        stmt = (
-            stmt.join(
-                FormDocumentComment,
-                FormDocumentComment.document_id == Document.document_id,
-            )
-            .join(
-                CommentTag,
-                CommentTag.comment_id == FormDocumentComment.comment_id,
-            )
-            .join(
-                Tag,
-                Tag.id == CommentTag.tag_id,
-            )
-            .where(
-                col(Tag.slug).in_(tags),
-            )
-            .where(
-                # this is fine to keep as ->> because you're comparing to text
-                col(Document.map_metadata)["draft_status"].astext == "ready_to_share"
-            )
+        stmt = stmt.where(
+            # Inline literal so the predicate matches the expression index
+            # idx_document_draft_status_updated_at_public_id.
+            col(Document.map_metadata).op("->>")(literal_column("'draft_status'"))
+            == "ready_to_share",
+            col(Document.document_id).in_(
+                select(DocumentTag.document_id)
+                .join(Tag, col(Tag.id) == col(DocumentTag.tag_id))
+                .where(col(Tag.slug).in_(tags))
+            ),
         )
 
     if len(ids) > 0:
         stmt = stmt.where(col(Document.public_id).in_(ids))
 
     results = session.exec(stmt).all()
+    if len(results) == limit and results:
+        last = results[-1]
+        response.headers[DOCUMENT_LIST_CURSOR_HEADER] = _encode_document_list_cursor(
+            last[2], last[0]
+        )
     return [
         {
             "public_id": row[0],
@@ -1521,7 +1668,7 @@ async def get_document_list(
     dependencies=[Depends(require_session)],
 )
 async def get_unassigned_geoids(
-    document: Annotated[Document, Depends(get_protected_document)],
+    context: Annotated[DocumentContext, Depends(get_document_context)],
     exclude_ids: list[str] = Query(default=[]),
     session: Session = Depends(get_session),
 ):
@@ -1540,22 +1687,43 @@ async def get_unassigned_geoids(
     info (or when the graph is unavailable) come back as singletons. An empty
     `components` list means nothing is unassigned.
 
-    `exclude_ids` is a client-supplied set of already-shattered parent geo_ids
-    (see the SQL comment below) and is filtered out of the result.
+    Unassigned units are derived server-side from the document's assignment
+    rows and the graph's parent/children structure (see
+    `contiguity.get_unassigned_components`), so shattered parents no longer
+    depend on the client. `exclude_ids` (already-shattered parent geo_ids) is
+    still accepted and only consulted for units the graph cannot place, and
+    by the graph-unavailable fallback below.
     """
-    districtr_map = get_districtr_map(
-        document_id=DocumentID(document_id=document.document_id), session=session
-    )
-    parent_layer = districtr_map.parent_layer
+    document = context.document
+    districtr_map = context.require_districtr_map()
 
-    # Enumerate geo_ids that could be unassigned: the union of any rows already
-    # tracked in document.assignments (covers shattered children) and every parent
-    # path. Then keep only those whose effective assignment is NULL.
-    # IMPORTANT: This pathway relies on the client to explicitly provide `exclude_ids`.
-    # These IDs reflect the already shattered parent geos, allowing the unassigned query
-    # to know which parent units are shattered without joining on the parent/child edges.
-    # When we shatter a unit, we populate all blocks in the document, so we always have those
-    # fully listed.
+    try:
+        # Threadpool: a cold load (S3 fetch + unpickle) takes seconds and
+        # must not block the event loop (or ALB health checks).
+        G = await run_in_threadpool(get_graph, districtr_map.gerrydb_table_name)
+    except HTTPException:
+        G = None
+
+    if G is not None:
+        # Threadpool: the first request after a graph load also builds the
+        # graph's array index.
+        components = await run_in_threadpool(
+            contiguity.get_unassigned_components,
+            session,
+            document.document_id,
+            districtr_map,
+            G,
+            exclude_ids,
+        )
+        payload = msgpack.packb({"components": components}, use_bin_type=True)
+        return Response(content=payload, media_type="application/msgpack")
+
+    # Graph unavailable — enumerate unassigned ids in SQL and return one
+    # component per id. Without the graph's parent/children structure this
+    # path relies on the client's `exclude_ids` to know which parents are
+    # shattered. When we shatter a unit, we populate all blocks in the
+    # document, so we always have those fully listed.
+    parent_layer = districtr_map.parent_layer
     stmt = text(
         f"""
         WITH possible_ids AS (
@@ -1584,25 +1752,7 @@ async def get_unassigned_geoids(
         logger.warning("No results found for unassigned geoids")
         unassigned_ids = []
 
-    components: list[list[str]] = []
-    if unassigned_ids:
-        try:
-            # Threadpool: a cold load (S3 fetch + unpickle) takes seconds and
-            # must not block the event loop (or ALB health checks).
-            G = await run_in_threadpool(get_graph, districtr_map.gerrydb_table_name)
-            # Non-contiguous unassigned parents are intentionally NOT expanded
-            present = [gid for gid in unassigned_ids if gid in G.nodes]
-            components = [
-                sorted(component)
-                for component in connected_components(G.subgraph(present))
-            ]
-            # Ids absent from the graph (orphans / data gaps): keep as singletons.
-            missing = [gid for gid in unassigned_ids if gid not in G.nodes]
-            components.extend([gid] for gid in missing)
-        except HTTPException:
-            # Graph unavailable — fall back to one component per id.
-            components = [[gid] for gid in unassigned_ids]
-
+    components = [[gid] for gid in unassigned_ids]
     payload = msgpack.packb({"components": components}, use_bin_type=True)
     return Response(content=payload, media_type="application/msgpack")
 
@@ -1612,19 +1762,18 @@ async def get_unassigned_geoids(
     dependencies=[Depends(require_session)],
 )
 async def check_document_contiguity(
-    document: Annotated[Document, Depends(get_protected_document)],
+    context: Annotated[DocumentContext, Depends(get_document_context)],
     zone: list[int] = Query(default=[]),
     session: Session = Depends(get_session),
 ):
+    document = context.document
     if document.map_type == "community":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Contiguity checks are not supported for community maps",
         )
 
-    districtr_map = get_districtr_map(
-        document_id=DocumentID(document_id=document.document_id), session=session
-    )
+    districtr_map = context.require_districtr_map()
 
     gerrydb_name = districtr_map.gerrydb_table_name
     kwargs = {"zones": zone} if len(zone) > 0 else {}
@@ -1649,7 +1798,7 @@ async def check_document_contiguity(
 )
 async def get_connected_component_bboxes(
     zone: int,
-    document: Annotated[Document, Depends(get_protected_document)],
+    context: Annotated[DocumentContext, Depends(get_document_context)],
     session: Session = Depends(get_session),
 ):
     """
@@ -1662,83 +1811,51 @@ async def get_connected_component_bboxes(
     Each feature is a GeoJSON Polygon (5-point closed ring) giving the bbox of
     one connected component, with coordinates reprojected to EPSG:4326
     (lon/lat). A single connected zone yields one feature; N fragments yield N.
+    Bboxes are reduced from per-unit EPSG:4326 bounds kept on the graph index
+    (see `contiguity.get_zone_connected_component_bboxes`), so no geometry is
+    read or reprojected per request.
 
     Only supported for district maps — community maps return 400.
     """
+    document = context.document
     if document.map_type == "community":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Contiguity checks are not supported for community maps",
         )
 
-    districtr_map = get_districtr_map(
-        document_id=DocumentID(document_id=document.document_id), session=session
-    )
+    districtr_map = context.require_districtr_map()
     gerrydb_name = districtr_map.gerrydb_table_name
     G = await run_in_threadpool(get_graph, gerrydb_name)
-    node_bboxes = contiguity.get_assigned_nodes_bboxes(
+    # Threadpool: the first request after a graph load builds the graph index
+    # (and, for graphs without stored bounds, reads them from PostGIS once).
+    component_bounds = await run_in_threadpool(
+        contiguity.get_zone_connected_component_bboxes,
         session,
         document.document_id,
         districtr_map,
         zone,
-        G=G,
+        G,
     )
-    if not node_bboxes:
+    if component_bounds is None:
         raise HTTPException(status_code=404, detail="Zone not found")
 
-    node_data = {nb.node: nb for nb in node_bboxes}
-    subgraph = G.subgraph(nodes=list(node_data))
-    zone_connected_components = connected_components(subgraph)
-
-    srid_table = districtr_map.parent_layer
-    from_srid = (
-        session.connection()
-        .execute(
-            text("""SELECT srid
-                FROM geometry_columns
-                WHERE f_table_name = :table_name
-                    AND f_table_schema = 'gerrydb'
-                LIMIT 1"""),
-            {"table_name": srid_table},
-        )
-        .scalar()
-    )
-
-    bboxes = []
-    for zone_connected_component in zone_connected_components:
-        minx, miny, maxx, maxy = (
-            float("inf"),
-            float("inf"),
-            float("-inf"),
-            float("-inf"),
-        )
-        for node in zone_connected_component:
-            nb = node_data[node]
-            minx = min(minx, nb.xmin)
-            miny = min(miny, nb.ymin)
-            maxx = max(maxx, nb.xmax)
-            maxy = max(maxy, nb.ymax)
-
-        (_minx, _maxx), (_miny, _maxy) = transform(
-            xs=[minx, maxx],
-            ys=[miny, maxy],
-            src_crs=f"EPSG:{from_srid}",
-            dst_crs="EPSG:4326",
-        )
-
-        bboxes.append(
-            PolygonModel(
-                coordinates=[
-                    [
-                        Coordinates(lon=_minx, lat=_miny),
-                        Coordinates(lon=_maxx, lat=_miny),
-                        Coordinates(lon=_maxx, lat=_maxy),
-                        Coordinates(lon=_minx, lat=_maxy),
-                        Coordinates(lon=_minx, lat=_miny),
-                    ]
+    bboxes = [
+        PolygonModel(
+            coordinates=[
+                [
+                    Coordinates(lon=minx, lat=miny),
+                    Coordinates(lon=maxx, lat=miny),
+                    Coordinates(lon=maxx, lat=maxy),
+                    Coordinates(lon=minx, lat=maxy),
+                    Coordinates(lon=minx, lat=miny),
                 ]
-            )
+            ]
         )
+        for minx, miny, maxx, maxy in component_bounds.tolist()
+        # Components made only of units without geometry have no bbox.
+        if not math.isnan(minx)
+    ]
 
     payload = msgpack.packb(
         BBoxGeoJSONs(features=bboxes).model_dump(), use_bin_type=True
@@ -1825,7 +1942,8 @@ async def get_group(
 @app.get("/_debug/cache")
 async def debug_graph_lru_cache() -> dict[str, Any]:
     """
-    GerryDB graph LRU cache stats (hits/misses/size).
+    GerryDB graph LRU cache stats (hits/misses/size), plus the map/gerrydb
+    metadata registry's version and hit counts.
 
     Per-graph heap size is not available: the cache does not expose individual entries.
     ``process.rss_*`` is whole-worker RSS for rough correlation only.
@@ -1836,9 +1954,41 @@ async def debug_graph_lru_cache() -> dict[str, Any]:
     return {
         "cache": "gerrydb_graph_lru",
         "cache_info": info,
+        "registry": REGISTRY.stats(),
         "process": {
             "rss_bytes": rss,
             "rss_mb": round(rss / 1024 / 1024, 2),
             "note": "Resident set size of this worker process, not LRU cache only.",
         },
     }
+
+
+@app.get("/_debug/profile")
+async def debug_profile(
+    seconds: float = Query(default=10, gt=0, le=60),
+    interval_ms: float = Query(default=10, ge=1, le=1000),
+    auth_result: dict = Security(auth.verify, scopes=[TokenScope.profile_workers]),
+) -> dict[str, Any]:
+    """
+    Sample the stacks of every thread of this worker for ``seconds`` and return
+    them as a speedscope profile (open at https://www.speedscope.app).
+
+    Covers the event loop and the anyio worker threads sync endpoints run on.
+    Only the worker that serves this request is profiled; one profile runs at a
+    time per worker.
+    """
+    if not profile_lock.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A profile is already running on this worker",
+        )
+    try:
+        profiler = SamplingProfiler(interval=interval_ms / 1000)
+        profiler.start()
+        try:
+            await anyio.sleep(seconds)
+        finally:
+            await anyio.to_thread.run_sync(profiler.stop)
+        return profiler.speedscope()
+    finally:
+        profile_lock.release()
@@ -242,6 +242,21 @@ class DocumentType(str, Enum):
 
 class Document(TimeStampMixin, SQLModel, table=True):
     metadata = MetaData(schema=DOCUMENT_SCHEMA)
+    __table_args__ = (
+        # Keyset pagination of /api/documents/list, unfiltered and for the
+        # draft_status = 'ready_to_share' gallery.
+        Index(
+            "idx_document_updated_at_public_id",
+            text("updated_at DESC"),
+            text("public_id DESC"),
+        ),
+        Index(
+            "idx_document_draft_status_updated_at_public_id",
+            text("(map_metadata->>'draft_status')"),
+            text("updated_at DESC"),
+            text("public_id DESC"),
+        ),
+    )
     document_id: str = Field(
         sa_column=Column(UUIDType, unique=True, primary_key=True, nullable=False)
     )
@@ -423,9 +438,11 @@ class AssignmentsMetadata(BaseModel):
     community_metadata_list: list[CommunityMetadata] | None = None
 
 
-class AssignmentsCreate(BaseModel):
+class AssignmentsUpdate(BaseModel):
+    """PUT /api/assignments body minus the assignments list, which is decoded
+    and validated row by row as it streams in (see app/assignments/ingest.py)."""
+
     document_id: str
-    assignments: list[list[str | int | None]]  # [[geo_id, zone], ...]
     last_updated_at: datetime
     overwrite: bool = False
     map_type: str | None = None
@@ -433,6 +450,10 @@ class AssignmentsCreate(BaseModel):
     comments: list[DocumentCommentCreate] | None = None
 
 
+class AssignmentsCreate(AssignmentsUpdate):
+    assignments: list[list[str | int | None]]  # [[geo_id, zone], ...]
+
+
 class AssignmentsResponse(SQLModel):
     geo_id: str
     zone: int | None
@@ -0,0 +1,65 @@
+-- Keeps comments.document_tag equal to
+--   SELECT DISTINCT dc.document_id, ct.tag_id
+--   FROM comments.document_comment dc
+--   JOIN comments.comment_tag ct USING (comment_id)
+-- so tag-filtered document lists read one indexed table instead of joining
+-- through every comment on every listed document.
+--
+-- Triggers run AFTER the change, so a deleted link is already gone when the
+-- NOT EXISTS check looks for another path to the same (document, tag) pair.
+
+CREATE OR REPLACE FUNCTION comments.sync_document_tag_from_comment_tag()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        DELETE FROM comments.document_tag dt
+        USING comments.document_comment dc
+        WHERE dc.comment_id = OLD.comment_id
+          AND dt.document_id = dc.document_id
+          AND dt.tag_id = OLD.tag_id
+          AND NOT EXISTS (
+              SELECT 1
+              FROM comments.document_comment dc2
+              JOIN comments.comment_tag ct2 ON ct2.comment_id = dc2.comment_id
+              WHERE dc2.document_id = dt.document_id
+                AND ct2.tag_id = dt.tag_id
+          );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO comments.document_tag (tag_id, document_id)
+        SELECT NEW.tag_id, dc.document_id
+        FROM comments.document_comment dc
+        WHERE dc.comment_id = NEW.comment_id
+        ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION comments.sync_document_tag_from_document_comment()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        DELETE FROM comments.document_tag dt
+        USING comments.comment_tag ct
+        WHERE ct.comment_id = OLD.comment_id
+          AND dt.document_id = OLD.document_id
+          AND dt.tag_id = ct.tag_id
+          AND NOT EXISTS (
+              SELECT 1
+              FROM comments.document_comment dc2
+              JOIN comments.comment_tag ct2 ON ct2.comment_id = dc2.comment_id
+              WHERE dc2.document_id = dt.document_id
+                AND ct2.tag_id = dt.tag_id
+          );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO comments.document_tag (tag_id, document_id)
+        SELECT ct.tag_id, NEW.document_id
+        FROM comments.comment_tag ct
+        WHERE ct.comment_id = NEW.comment_id
+        ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
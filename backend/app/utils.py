@@ -7,8 +7,9 @@ import re
 import msgpack
 from enum import Enum
 from uuid import uuid4
-from typing import Callable, NewType
+from typing import Callable, Iterator, NewType
 
+import pyarrow.parquet as pq
 from fastapi import BackgroundTasks
 from sqlalchemy import text, update, Table, MetaData, func
 from sqlalchemy import bindparam, Text
@@ -29,11 +30,16 @@ from app.models import (
 from app.thumbnails.main import generate_thumbnail, THUMBNAIL_BUCKET
 from app.core.config import settings
 from app.core.db import engine
+from app.core.io import get_local_or_s3_path
+from app.core.registry import REGISTRY, notify_registry_changed
 
 metadata = MetaData()
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# Rows read from a parent-child artifact at a time while streaming it to COPY.
+PARENT_CHILD_ARTIFACT_BATCH_SIZE = 65_536
+
 
 class RowFormat(str, Enum):
     """Wire formats supported by `package_rows`."""
@@ -146,26 +152,10 @@ def infer_geo_unit_type(session: Session, layer_name: str) -> GeoUnitType:
 
 def get_gerrydb_numeric_cols(session: Session, gerrydb_table: str) -> list[str]:
     """Return validated numeric column names for a gerrydb table, excluding geometry columns."""
-    rows = session.execute(
-        text("""
-            SELECT a.attname AS column_name
-            FROM pg_attribute a
-            JOIN pg_class t  ON a.attrelid = t.oid
-            JOIN pg_namespace s ON t.relnamespace = s.oid
-            WHERE a.attnum > 0
-              AND NOT a.attisdropped
-              AND t.relname = :mvname
-              AND s.nspname = 'gerrydb'
-              AND a.attname NOT IN ('geometry', 'geography', 'fid', 'path')
-              AND pg_catalog.format_type(a.atttypid, a.atttypmod) IN (
-                'double precision','integer','smallint','bigint',
-                'decimal','numeric','real','smallserial','bigserial','serial'
-              )
-            ORDER BY a.attnum
-        """),
-        {"mvname": gerrydb_table},
-    ).fetchall()
-    return [assert_safe_ident(row.column_name) for row in rows]
+    return [
+        assert_safe_ident(column)
+        for column in REGISTRY.gerrydb_table(session, gerrydb_table).numeric_cols
+    ]
 
 
 def _quote_ident(name: str) -> str:
@@ -246,6 +236,7 @@ def create_districtr_map(
     )
     session.add(districtr_map)
     session.flush()
+    notify_registry_changed(session)
 
     if group_slug is not None:
         add_districtr_map_to_map_group(
@@ -288,6 +279,7 @@ def update_districtrmap(
         .returning(DistrictrMap)
     )
     (updated_districtrmap,) = session.execute(stmt).one()
+    notify_registry_changed(session)
 
     return updated_districtrmap
 
@@ -313,21 +305,20 @@ def create_shatterable_gerrydb_view(
             "gerrydb_table_name": gerrydb_table_name,
         },
     )
+    notify_registry_changed(session)
 
 
-def create_parent_child_edges(
-    session: Session,
-    districtr_map_uuid: str,
-    force: bool = False,
-) -> None:
+def _create_parent_child_partition(
+    session: Session, districtr_map_uuid: str, force: bool = False
+) -> tuple[DistrictrMap, str]:
     """
-    Create the parent child edges for a given gerrydb map.
+    Create the empty parentchildedges partition for a districtr map and bump
+    the map's ``updated_at``.
 
-    Args:
-        session: The database session.
-        districtr_map_uuid: The UUID of the districtr map.
-        force: If True, drop any previously loaded edges for this map and
-            recreate them instead of raising when they already exist.
+    Raises if edges were already loaded for the map, unless ``force`` is set,
+    in which case the existing partition is dropped first.
+
+    Returns the map and the name of the new partition.
     """
     stmt = select(DistrictrMap).where(DistrictrMap.uuid == districtr_map_uuid)
     map_row = session.exec(stmt).one_or_none()
@@ -335,8 +326,7 @@ def create_parent_child_edges(
     if not map_row:
         raise ValueError(f"No districtrmap found for UUID: {districtr_map_uuid}")
 
-    parent_layer, child_layer = (map_row.parent_layer, map_row.child_layer)
-    if not parent_layer or not child_layer:
+    if not map_row.parent_layer or not map_row.child_layer:
         raise ValueError("Districtr map must have both parent_layer and child_layer")
 
     # Check not already loaded
@@ -372,6 +362,37 @@ def create_parent_child_edges(
     )
     session.execute(create_sql)
 
+    # Assignment responses carry each row's parent_path from these edges, and
+    # their ETags include the map's updated_at; bump it so clients holding a
+    # response from before the (re)load revalidate instead of getting a 304.
+    session.execute(
+        update(DistrictrMap)
+        .where(DistrictrMap.uuid == districtr_map_uuid)  # type: ignore
+        .values(updated_at=func.clock_timestamp())
+    )
+    notify_registry_changed(session)
+    return map_row, partition_name
+
+
+def create_parent_child_edges(
+    session: Session,
+    districtr_map_uuid: str,
+    force: bool = False,
+) -> None:
+    """
+    Create the parent child edges for a given gerrydb map.
+
+    Args:
+        session: The database session.
+        districtr_map_uuid: The UUID of the districtr map.
+        force: If True, drop any previously loaded edges for this map and
+            recreate them instead of raising when they already exist.
+    """
+    map_row, partition_name = _create_parent_child_partition(
+        session, districtr_map_uuid, force
+    )
+    parent_layer, child_layer = (map_row.parent_layer, map_row.child_layer)
+
     # Use the session's connection for partition reflection so we see the
     # just-created table in the same transaction (other connections would not).
     conn = session.connection()
@@ -399,6 +420,99 @@ def create_parent_child_edges(
     session.execute(stmt, params={"uuid": districtr_map_uuid})
 
 
+def read_parent_child_artifact(
+    path: str, batch_size: int = PARENT_CHILD_ARTIFACT_BATCH_SIZE
+) -> tuple[int | None, Iterator[tuple[str, str]]]:
+    """
+    Stream ``(parent_path, child_path)`` rows from a parent-child artifact.
+
+    Artifacts are written by the pipelines (``transforms
+    create-parent-child-artifact``) as parquet with ``parent_path`` and
+    ``path`` (child) columns; CSV with the same header is also accepted.
+
+    Returns the row count recorded in the file (parquet only, else None) and
+    an iterator over the rows.
+    """
+    if path.endswith(".parquet"):
+        parquet = pq.ParquetFile(path)
+
+        def parquet_rows() -> Iterator[tuple[str, str]]:
+            for batch in parquet.iter_batches(
+                batch_size=batch_size, columns=["parent_path", "path"]
+            ):
+                yield from zip(
+                    batch.column("parent_path").to_pylist(),
+                    batch.column("path").to_pylist(),
+                )
+
+        return parquet.metadata.num_rows, parquet_rows()
+
+    def csv_rows() -> Iterator[tuple[str, str]]:
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                yield row["parent_path"], row["path"]
+
+    return None, csv_rows()
+
+
+def load_parent_child_edges_from_artifact(
+    session: Session,
+    districtr_map_uuid: str,
+    artifact_path: str,
+    force: bool = False,
+) -> int:
+    """
+    Load the parent child edges for a districtr map from a pipeline artifact.
+
+    Equivalent to `create_parent_child_edges`, but the containment join has
+    already been done by the pipelines, so the rows are streamed into the
+    map's partition with COPY instead of running ST_Contains in PostGIS.
+
+    Args:
+        session: The database session.
+        districtr_map_uuid: The UUID of the districtr map.
+        artifact_path: Local path or S3 URI of the artifact (see
+            `read_parent_child_artifact`).
+        force: If True, drop any previously loaded edges for this map first.
+
+    Returns the number of edges loaded.
+
+    Raises:
+        ValueError: If the number of rows in the partition does not match the
+            artifact. The session is left uncommitted.
+    """
+    _, partition_name = _create_parent_child_partition(
+        session, districtr_map_uuid, force
+    )
+    expected_rows, rows = read_parent_child_artifact(
+        get_local_or_s3_path(artifact_path)
+    )
+
+    uuid_str = str(districtr_map_uuid)
+    copied = 0
+    cursor = session.connection().connection.cursor()
+    with cursor.copy(
+        f"COPY {_quote_ident(partition_name)} "
+        "(districtr_map, parent_path, child_path) FROM STDIN"
+    ) as copy:
+        for parent_path, child_path in rows:
+            copy.write_row((uuid_str, parent_path, child_path))
+            copied += 1
+
+    loaded = session.execute(
+        text(f"SELECT COUNT(*) FROM {_quote_ident(partition_name)}")
+    ).scalar_one()
+    if expected_rows is None:
+        expected_rows = copied
+    if not loaded == copied == expected_rows:
+        raise ValueError(
+            f"Parent-child edge count mismatch for {districtr_map_uuid}: "
+            f"artifact has {expected_rows} rows, streamed {copied}, loaded {loaded}"
+        )
+    logger.info(f"Loaded {loaded} parent-child edges from {artifact_path}")
+    return loaded
+
+
 def add_extent_to_districtrmap(
     session: Session, districtr_map_uuid: str | UUID, bounds: list[float] | None = None
 ) -> None:
@@ -441,6 +555,7 @@ def add_extent_to_districtrmap(
                 "y_max": y_max,
             },
         ).one()
+        notify_registry_changed(session)
         logger.info(
             f"Updated extent for districtr map {districtr_map_uuid} to {result}"
         )
@@ -528,6 +643,7 @@ def add_extent_to_districtrmap(
         """
     )
     session.execute(stmt)
+    notify_registry_changed(session)
 
 
 def create_spatial_index(
@@ -551,6 +667,33 @@ def create_spatial_index(
         session.commit()
 
 
+def create_path_index(
+    session: Session,
+    table_name: str,
+    schema: str = GERRY_DB_SCHEMA,
+    autocommit: bool = False,
+):
+    """
+    Create a btree index on the `path` column of the specified table.
+
+    Every assignment, parent-child edge and summary-stat join on a gerrydb
+    table goes through `path`.
+
+    Args:
+        session (Session): The database session.
+        table_name (str): The name of the table to create the index on.
+        schema (str): The schema of the table.
+    """
+    session.execute(
+        text(
+            f"CREATE INDEX IF NOT EXISTS {_quote_ident(f'{table_name}_path_idx')} "
+            f"ON {_quote_ident(schema)}.{_quote_ident(table_name)} (path)"
+        ),
+    )
+    if autocommit:
+        session.commit()
+
+
 def create_map_group(
     session: Session,
     group_name: str,
@@ -0,0 +1,56 @@
+"""Evaluation metric hot paths: pure-Python loops over the graph and assignments."""
+
+import random
+
+from networkx import Graph
+
+from app.evaluation.compactness import block_cut_edges
+from app.evaluation.partisans import _wasted_votes
+from app.evaluation.splits import district_county_membership
+from app.evaluation.validity import assigned_units, contiguous
+from benchmarks.conftest import BenchContext, mixed_assignments
+
+
+def _context(G: Graph) -> BenchContext:
+    context = BenchContext(mixed_assignments(G), G)
+    # Resolved once per request in production, before any metric runs.
+    context.split_zone_assignments
+    return context
+
+
+def bench_block_cut_edges(benchmark, patched_graph: Graph):
+    context = _context(patched_graph)
+    result = benchmark(block_cut_edges, context)
+    assert result["cut_count"] > 0
+
+
+def bench_assigned_units(benchmark, patched_graph: Graph):
+    context = _context(patched_graph)
+    result = benchmark(assigned_units, context)
+    assert result["assigned_count"] > 0
+
+
+def bench_contiguous(benchmark, patched_graph: Graph):
+    context = _context(patched_graph)
+    result = benchmark(contiguous, context)
+    assert all(result.values())
+
+
+def bench_district_county_membership(benchmark, bench_graph: Graph):
+    context = BenchContext(mixed_assignments(bench_graph), bench_graph)
+    result = benchmark(district_county_membership, context)
+    assert result
+
+
+def bench_wasted_votes(benchmark, bench_graph: Graph):
+    """One (dem, rep) pair per block: the per-district loop at graph scale."""
+    rng = random.Random(0)
+    votes = [
+        (rng.randrange(1_000), rng.randrange(1_000))
+        for _ in range(bench_graph.number_of_nodes())
+    ]
+
+    def wasted_votes():
+        return [_wasted_votes(dem, rep) for dem, rep in votes]
+
+    assert len(benchmark(wasted_votes)) == len(votes)
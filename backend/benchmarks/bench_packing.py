@@ -0,0 +1,40 @@
+"""Assignment packing hot paths: response serialization and upload healing."""
+
+import pytest
+from networkx import Graph
+
+from app.assignments.assignments import _heal_or_fill
+from app.utils import RowFormat, package_rows
+from benchmarks.conftest import district_of
+
+
+@pytest.mark.parametrize("fmt", list(RowFormat), ids=[f.value for f in RowFormat])
+def bench_package_rows(benchmark, bench_graph: Graph, fmt: RowFormat):
+    side = bench_graph.graph["side"]
+    rows = [
+        (node, district_of(int(node[5:10]), int(node[10:]), side), parent)
+        for node, parent in bench_graph.nodes(data="parent")
+        if parent
+    ]
+    response = benchmark(
+        package_rows, rows, fmt, columns=["geo_id", "zone", "parent_path"]
+    )
+    assert response.body
+
+
+def bench_heal_or_fill(benchmark, bench_graph: Graph):
+    """Every block uploaded: strips heal whole VTDs, VTDs on strip boundaries
+    stay split, and every tenth VTD is only half uploaded (filled)."""
+    side = bench_graph.graph["side"]
+    zone_by_geo = {}
+    for i, (_parent, data) in enumerate(
+        (n, d) for n, d in bench_graph.nodes(data=True) if "children" in d
+    ):
+        children = sorted(data["children"])
+        if i % 10 == 0:
+            children = children[: len(children) // 2]
+        for child in children:
+            zone_by_geo[child] = district_of(int(child[5:10]), int(child[10:]), side)
+
+    result = benchmark(_heal_or_fill, zone_by_geo, bench_graph)
+    assert any(zone is None for zone in result.values())
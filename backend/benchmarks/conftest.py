@@ -0,0 +1,160 @@
+"""Fixtures for the micro-benchmark suite: synthetic graphs and plans, no database.
+
+Graphs mimic the combined (dual-level) graphs built by
+pipelines/transforms/graph.py: a square grid of census blocks grouped into
+8×8-block VTDs, with block-block edges, block-parent edges across VTD
+boundaries, parent-parent edges weighted by the number of block edges they
+replace, and ``parent``/``children`` node attributes. Counties are 32×32-block
+tiles of the grid.
+
+Sizes (block counts) come from ``--bench-sizes``; graphs are built once per
+size and shared by every benchmark of that size.
+"""
+
+import math
+from collections import Counter
+from pathlib import Path
+
+import pytest
+from networkx import Graph
+
+from app.evaluation.context import DocumentEvaluationContext
+from app.utils import GeoUnitType
+
+HERE = Path(__file__).parent
+DEFAULT_SIZES = "10000,100000,1000000"
+# Blocks per VTD side and VTDs per county side.
+VTD_SIDE = 8
+COUNTY_SIDE = 4
+NUM_DISTRICTS = 14
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--bench-sizes",
+        default=DEFAULT_SIZES,
+        help=f"Comma-separated block counts of the synthetic graphs (default {DEFAULT_SIZES})",
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Keep the JSON history next to the suite, wherever pytest is run from.
+    if config.getoption("benchmark_storage", None) == "file://./.benchmarks":
+        config.option.benchmark_storage = f"file://{HERE / '.history'}"
+
+
+def pytest_generate_tests(metafunc):
+    if "bench_graph" in metafunc.fixturenames:
+        sizes = [int(s) for s in metafunc.config.getoption("bench_sizes").split(",")]
+        metafunc.parametrize(
+            "bench_graph",
+            sizes,
+            indirect=True,
+            ids=[f"{s}" for s in sizes],
+            scope="session",
+        )
+
+
+def block_geoid(r: int, c: int) -> str:
+    """15-char block GEOID: 5-digit county FIPS + 10-digit within-county index."""
+    county = (r // (VTD_SIDE * COUNTY_SIDE)) * 1000 + c // (VTD_SIDE * COUNTY_SIDE)
+    return f"{county:05d}{r:05d}{c:05d}"
+
+
+def vtd_geoid(pr: int, pc: int) -> str:
+    county = (pr // COUNTY_SIDE) * 1000 + pc // COUNTY_SIDE
+    return f"vtd:{county:05d}{pr:03d}{pc:03d}"
+
+
+def build_combined_graph(num_blocks: int) -> Graph:
+    side = math.isqrt(num_blocks)
+    G = Graph()
+    G.add_nodes_from(
+        (block_geoid(r, c), {"parent": vtd_geoid(r // VTD_SIDE, c // VTD_SIDE)})
+        for r in range(side)
+        for c in range(side)
+    )
+    block_edges = [
+        (block_geoid(r, c), block_geoid(r, c + 1))
+        for r in range(side)
+        for c in range(side - 1)
+    ] + [
+        (block_geoid(r, c), block_geoid(r + 1, c))
+        for r in range(side - 1)
+        for c in range(side)
+    ]
+    G.add_edges_from(block_edges)
+
+    weights: Counter = Counter()
+    cross_edges = []
+    for u, v in block_edges:
+        p_u, p_v = G.nodes[u]["parent"], G.nodes[v]["parent"]
+        if p_u != p_v:
+            cross_edges += [(u, p_v), (v, p_u)]
+            weights[(p_u, p_v) if p_u < p_v else (p_v, p_u)] += 1
+    G.add_edges_from(cross_edges)
+    G.add_edges_from(weights)
+    G.graph["weighted_edges"] = dict(weights)
+    G.graph["non_contiguous_parents"] = set()
+
+    for node, parent in list(G.nodes(data="parent")):
+        if parent:
+            G.nodes[parent].setdefault("children", set()).add(node)
+    G.graph["side"] = side
+    return G
+
+
+@pytest.fixture(scope="session")
+def bench_graph(request) -> Graph:
+    return build_combined_graph(request.param)
+
+
+def district_of(r: int, c: int, side: int) -> int:
+    """Vertical strips of blocks, one per district."""
+    return c * NUM_DISTRICTS // side + 1
+
+
+def mixed_assignments(G: Graph) -> list[tuple[str, int]]:
+    """A shatterable plan: whole VTDs on the left half of the grid, individual
+    blocks on the right half, in vertical-strip districts."""
+    side = G.graph["side"]
+    assignments = []
+    for node, data in G.nodes(data=True):
+        if "children" in data:
+            pr, pc = int(node[-6:-3]), int(node[-3:])
+            if pc * VTD_SIDE < side // 2:
+                assignments.append(
+                    (node, district_of(pr * VTD_SIDE, pc * VTD_SIDE, side))
+                )
+        elif "parent" in data:
+            r, c = int(node[5:10]), int(node[10:])
+            if (c // VTD_SIDE) * VTD_SIDE >= side // 2:
+                assignments.append((node, district_of(r, c, side)))
+    return assignments
+
+
+class BenchContext(DocumentEvaluationContext):
+    """Evaluation context with the DB-backed properties filled in up front."""
+
+    def __init__(self, zone_assignments: list[tuple[str, int]], G: Graph):
+        super().__init__(background_tasks=None, session=None, document_id="bench")  # type: ignore[arg-type]
+        self.__dict__.update(
+            zone_assignments=zone_assignments,
+            gerrydb_table="bench_graph",
+            parent_layer="bench_vtd",
+            child_layer="bench_block",
+            parent_geo_unit_type=GeoUnitType.VTD,
+            num_parent_units=sum(1 for _, d in G.nodes(data=True) if "children" in d),
+            num_child_units=sum(1 for _, d in G.nodes(data=True) if "parent" in d),
+        )
+
+
+@pytest.fixture
+def patched_graph(bench_graph: Graph, monkeypatch) -> Graph:
+    """Serve ``bench_graph`` from every evaluation module's `get_graph`."""
+    for module in ("compactness", "validity"):
+        monkeypatch.setattr(
+            f"app.evaluation.{module}.get_graph", lambda _name: bench_graph
+        )
+    return bench_graph
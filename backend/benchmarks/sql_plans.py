@@ -0,0 +1,809 @@
+"""Plan and timing benchmarks for the SQL behind the hot endpoints.
+
+Seeds synthetic shatterable maps (a grid of census blocks grouped into 8×8-block
+VTDs, with a document assigned in vertical-strip districts) at several scales,
+runs each benchmarked statement against them and records, for every query the
+statement executes, its ``EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)`` plan and
+duration. Runs are stored as JSON under ``benchmarks/.history/sql`` and
+``diff`` compares two of them: a relation read by an index in the base run but
+only by a sequential scan in the head run, or a statement whose median time grew
+past ``--max-ratio``, fails the diff.
+
+Plans are captured with ``auto_explain`` (``log_analyze``, ``log_buffers``,
+``log_format = json``, ``log_nested_statements``) sent back to the client as
+notices, so the dynamic queries inside the PL/pgSQL functions and the ad-hoc
+statements issued by `update_or_select_district_stats` are captured as they
+run, without copies of their SQL. ``LOAD 'auto_explain'`` needs a superuser.
+
+Every statement runs inside a transaction that is rolled back, so the fixtures
+are seeded once per scale and reused until ``--reseed``.
+
+    python -m benchmarks.sql_plans run --scale 10000x10 --scale 100000x50
+    python -m benchmarks.sql_plans diff            # latest run vs the one before
+    python -m benchmarks.sql_plans diff BASE HEAD  # run files or commit prefixes
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import math
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterator
+from uuid import NAMESPACE_URL, uuid5
+
+from fastapi import BackgroundTasks
+from pydantic import BaseModel
+from sqlalchemy import Connection, text
+from sqlmodel import Session
+
+from app.constants import GERRY_DB_SCHEMA
+from app.core.db import engine
+from app.core.registry import REGISTRY
+from app.main import assignment_rows_statement
+from app.utils import (
+    create_districtr_map,
+    create_parent_child_edges,
+    create_shatterable_gerrydb_view,
+    update_or_select_district_stats,
+)
+from management.physical_layout import (
+    LayoutTarget,
+    assignments_target,
+    ensure_indexes,
+    gerrydb_layer_target,
+    parent_child_edges_target,
+)
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DIR = Path(__file__).parent / ".history" / "sql"
+# (units, districts): child-layer blocks and districts in the plan.
+DEFAULT_SCALES = [(10_000, 10), (100_000, 50), (1_000_000, 400)]
+FIXTURE_PREFIX = "sqlbench"
+# Blocks per VTD side, as in the micro-benchmark graphs.
+VTD_SIDE = 8
+# Side of a block in degrees.
+CELL_DEGREES = 0.001
+SRID = 4269
+
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Heap Scan"}
+_UUID_RE = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.I
+)
+_NOTICE_RE = re.compile(r"duration: ([\d.]+) ms\s+plan:\n(.*)", re.S)
+
+
+class SqlBenchFixture(BaseModel):
+    """A seeded map and document for one (units, districts) scale."""
+
+    units: int
+    districts: int
+    side: int
+    parent_layer: str
+    child_layer: str
+    gerrydb_table: str
+    districtr_map_slug: str
+    districtr_map_uuid: str
+    document_id: str
+    # Parents the document assigns block by block, i.e. already shattered.
+    shattered_parents: list[str]
+    # Whole-assigned parents passed to shatter_parent.
+    shatter_sample: list[str]
+
+
+class CapturedPlan(BaseModel):
+    key: str
+    query: str
+    duration_ms: float
+    plan: dict
+
+
+class StatementResult(BaseModel):
+    statement: str
+    units: int
+    districts: int
+    wall_ms: list[float]
+    plans: list[CapturedPlan]
+
+    @property
+    def median_ms(self) -> float:
+        return statistics.median(self.wall_ms)
+
+    @property
+    def label(self) -> str:
+        return f"{self.statement} [{self.units}x{self.districts}]"
+
+
+class SqlBenchRun(BaseModel):
+    created_at: str
+    commit: str | None
+    server_version: str
+    results: list[StatementResult]
+
+
+# Fixtures
+
+
+def _fixture_names(units: int) -> dict[str, str]:
+    prefix = f"{FIXTURE_PREFIX}_{units}"
+    return {
+        "parent_layer": f"{prefix}_vtd",
+        "child_layer": f"{prefix}_block",
+        "gerrydb_table": prefix,
+        "districtr_map_slug": prefix,
+    }
+
+
+def _document_id(units: int, districts: int) -> str:
+    return str(uuid5(NAMESPACE_URL, f"{FIXTURE_PREFIX}:{units}:{districts}"))
+
+
+def _grid_sql(side: int) -> str:
+    return (
+        f"SELECT r, c FROM generate_series(0, {side - 1}) r, "
+        f"generate_series(0, {side - 1}) c"
+    )
+
+
+def _block_path_sql(r: str, c: str) -> str:
+    # 15 digits, recognised as a block GEOID by GEOID_PREDICATES.
+    return f"lpad({r}::text, 7, '0') || lpad({c}::text, 8, '0')"
+
+
+def _vtd_path_sql(pr: str, pc: str) -> str:
+    return f"'vtd:' || lpad({pr}::text, 4, '0') || lpad({pc}::text, 4, '0')"
+
+
+def _envelope_sql(c0: str, r0: str, c1: str, r1: str) -> str:
+    d = CELL_DEGREES
+    return (
+        f"ST_MakeEnvelope({c0} * {d}, {r0} * {d}, {c1} * {d}, {r1} * {d}, {SRID})"
+        f"::geometry(Polygon, {SRID})"
+    )
+
+
+def _create_layers(session: Session, names: dict[str, str], side: int) -> None:
+    """Block layer with deterministic populations and a VTD layer whose rows are
+    the sums and envelopes of their blocks, as ogr2ogr would load them."""
+    pop = "((r * 31 + c * 17) % 50)"
+    session.execute(
+        text(
+            f"CREATE TABLE {GERRY_DB_SCHEMA}.{names['child_layer']} AS "
+            f"SELECT {_block_path_sql('r', 'c')} AS path, "
+            f"{pop}::integer AS total_pop_20, ({pop} * 3 / 4)::integer AS total_vap_20, "
+            f"{_envelope_sql('c', 'r', 'c + 1', 'r + 1')} AS geometry "
+            f"FROM ({_grid_sql(side)}) grid"
+        )
+    )
+    session.execute(
+        text(
+            f"CREATE TABLE {GERRY_DB_SCHEMA}.{names['parent_layer']} AS "
+            f"SELECT {_vtd_path_sql(f'r / {VTD_SIDE}', f'c / {VTD_SIDE}')} AS path, "
+            f"sum({pop})::integer AS total_pop_20, "
+            f"sum({pop} * 3 / 4)::integer AS total_vap_20, "
+            f"{_envelope_sql('min(c)', 'min(r)', 'max(c) + 1', 'max(r) + 1')} AS geometry "
+            f"FROM ({_grid_sql(side)}) grid "
+            f"GROUP BY r / {VTD_SIDE}, c / {VTD_SIDE}"
+        )
+    )
+
+
+def _zone_sql(c: str, side: int, districts: int) -> str:
+    return f"({c}) * {districts} / {side} + 1"
+
+
+def _create_document(
+    session: Session, fixture_slug: str, document_id: str, side: int, districts: int
+) -> None:
+    """Whole VTDs on the left half of the grid, blocks of shattered VTDs on the
+    right half, in vertical-strip districts. The bottom row of VTDs is left
+    unassigned and the bottom row of shattered VTDs has NULL-zone blocks."""
+    parent_side = math.ceil(side / VTD_SIDE)
+    half = side // 2
+    session.execute(
+        text(
+            "INSERT INTO document.document (document_id, districtr_map_slug, num_districts) "
+            "VALUES (:document_id, :slug, :districts)"
+        ),
+        {"document_id": document_id, "slug": fixture_slug, "districts": districts},
+    )
+    session.execute(
+        text(
+            "INSERT INTO document.assignments (document_id, geo_id, zone) "
+            f"SELECT CAST(:document_id AS UUID), {_vtd_path_sql('pr', 'pc')}, "
+            f"{_zone_sql(f'pc * {VTD_SIDE}', side, districts)} "
+            f"FROM generate_series(0, {parent_side - 2}) pr, "
+            f"generate_series(0, {parent_side - 1}) pc "
+            f"WHERE (pc + 1) * {VTD_SIDE} <= {half}"
+        ),
+        {"document_id": document_id},
+    )
+    session.execute(
+        text(
+            "INSERT INTO document.assignments (document_id, geo_id, zone) "
+            f"SELECT CAST(:document_id AS UUID), {_block_path_sql('r', 'c')}, "
+            f"CASE WHEN r / {VTD_SIDE} < {parent_side - 1} "
+            f"THEN {_zone_sql('c', side, districts)} END "
+            f"FROM ({_grid_sql(side)}) grid "
+            f"WHERE (c / {VTD_SIDE} + 1) * {VTD_SIDE} > {half}"
+        ),
+        {"document_id": document_id},
+    )
+
+
+def _shattered_parents(side: int) -> list[str]:
+    parent_side = math.ceil(side / VTD_SIDE)
+    return [
+        f"vtd:{pr:04d}{pc:04d}"
+        for pr in range(parent_side)
+        for pc in range(parent_side)
+        if (pc + 1) * VTD_SIDE > side // 2
+    ]
+
+
+def _shatter_sample(side: int) -> list[str]:
+    """1% of the whole-assigned VTDs (at least one, at most 100)."""
+    parent_side = math.ceil(side / VTD_SIDE)
+    whole = [
+        f"vtd:{pr:04d}{pc:04d}"
+        for pr in range(parent_side - 1)
+        for pc in range(parent_side)
+        if (pc + 1) * VTD_SIDE <= side // 2
+    ]
+    count = min(100, max(1, len(whole) // 100))
+    return whole[:: max(1, len(whole) // count)][:count]
+
+
+def _map_uuid(session: Session, slug: str) -> str | None:
+    return session.execute(
+        text("SELECT uuid::text FROM districtrmap WHERE districtr_map_slug = :slug"),
+        {"slug": slug},
+    ).scalar_one_or_none()
+
+
+def drop_fixture(session: Session, units: int) -> None:
+    """Remove the documents, map, edges, view and layers seeded for ``units``."""
+    names = _fixture_names(units)
+    map_uuid = _map_uuid(session, names["districtr_map_slug"])
+    document_filter = (
+        "document_id IN (SELECT document_id FROM document.document "
+        "WHERE districtr_map_slug = :slug)"
+    )
+    for table in ("document.district_unions", "document.assignments"):
+        session.execute(
+            text(f"DELETE FROM {table} WHERE {document_filter}"),
+            {"slug": names["districtr_map_slug"]},
+        )
+    session.execute(
+        text("DELETE FROM document.document WHERE districtr_map_slug = :slug"),
+        {"slug": names["districtr_map_slug"]},
+    )
+    if map_uuid:
+        session.execute(text(f'DROP TABLE IF EXISTS "parentchildedges_{map_uuid}"'))
+    session.execute(
+        text("DELETE FROM districtrmap WHERE districtr_map_slug = :slug"),
+        {"slug": names["districtr_map_slug"]},
+    )
+    session.execute(
+        text(
+            f"DROP MATERIALIZED VIEW IF EXISTS "
+            f"{GERRY_DB_SCHEMA}.{names['gerrydb_table']}"
+        )
+    )
+    session.execute(
+        text("DELETE FROM gerrydbtable WHERE name = :name"),
+        {"name": names["gerrydb_table"]},
+    )
+    for layer in (names["parent_layer"], names["child_layer"]):
+        session.execute(text(f"DROP TABLE IF EXISTS {GERRY_DB_SCHEMA}.{layer}"))
+    session.commit()
+    REGISTRY.invalidate()
+
+
+def _ensure_layout(
+    conn: Connection, targets: list[LayoutTarget], analyze: list[str] | None = None
+) -> None:
+    for target in targets:
+        ensure_indexes(conn, target)
+    for relation in analyze or []:
+        conn.execute(text(f"ANALYZE {relation}"))
+
+
+def seed_fixture(units: int, districts: int, reseed: bool = False) -> SqlBenchFixture:
+    """Create (or reuse) the map for ``units`` blocks and the document for
+    ``districts`` districts, with the indexes `ensure-indexes` would create and
+    fresh statistics."""
+    names = _fixture_names(units)
+    side = math.isqrt(units)
+    document_id = _document_id(units, districts)
+
+    with Session(engine) as session:
+        if reseed:
+            drop_fixture(session, units)
+        map_uuid = _map_uuid(session, names["districtr_map_slug"])
+
+    if map_uuid is None:
+        logger.info(f"Seeding {side}x{side} blocks into {names['gerrydb_table']}")
+        with Session(engine) as session:
+            _create_layers(session, names, side)
+            session.commit()
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            _ensure_layout(
+                conn,
+                [
+                    gerrydb_layer_target(names["parent_layer"]),
+                    gerrydb_layer_target(names["child_layer"]),
+                ],
+            )
+        with Session(engine) as session:
+            create_shatterable_gerrydb_view(
+                session,
+                parent_layer=names["parent_layer"],
+                child_layer=names["child_layer"],
+                gerrydb_table_name=names["gerrydb_table"],
+            )
+            map_uuid = create_districtr_map(
+                session,
+                name=f"SQL benchmark {units} blocks",
+                districtr_map_slug=names["districtr_map_slug"],
+                parent_layer=names["parent_layer"],
+                child_layer=names["child_layer"],
+                gerrydb_table_name=names["gerrydb_table"],
+                visibility=False,
+            )
+            create_parent_child_edges(session=session, districtr_map_uuid=map_uuid)
+            session.commit()
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            _ensure_layout(
+                conn,
+                [parent_child_edges_target(f"parentchildedges_{map_uuid}")],
+                analyze=[f"{GERRY_DB_SCHEMA}.{names['gerrydb_table']}"],
+            )
+
+    with Session(engine) as session:
+        exists = session.execute(
+            text("SELECT 1 FROM document.document WHERE document_id = :document_id"),
+            {"document_id": document_id},
+        ).first()
+        if exists is None:
+            logger.info(f"Seeding document {document_id} ({districts} districts)")
+            _create_document(
+                session, names["districtr_map_slug"], document_id, side, districts
+            )
+            session.commit()
+            with engine.connect().execution_options(
+                isolation_level="AUTOCOMMIT"
+            ) as conn:
+                _ensure_layout(
+                    conn, [assignments_target()], analyze=["document.assignments"]
+                )
+
+    return SqlBenchFixture(
+        units=units,
+        districts=districts,
+        side=side,
+        districtr_map_uuid=str(map_uuid),
+        document_id=document_id,
+        shattered_parents=_shattered_parents(side),
+        shatter_sample=_shatter_sample(side),
+        **names,
+    )
+
+
+# Statements
+
+STATEMENTS: dict[str, Callable[[Session, SqlBenchFixture], None]] = {}
+
+
+def statement(name: str):
+    def register(fn: Callable[[Session, SqlBenchFixture], None]):
+        STATEMENTS[name] = fn
+        return fn
+
+    return register
+
+
+@statement("get_unassigned_bboxes")
+def _get_unassigned_bboxes(session: Session, fixture: SqlBenchFixture) -> None:
+    session.execute(
+        text(
+            "SELECT * FROM get_unassigned_bboxes("
+            "CAST(:document_id AS UUID), CAST(:exclude_ids AS VARCHAR[]))"
+        ),
+        {
+            "document_id": fixture.document_id,
+            "exclude_ids": fixture.shattered_parents,
+        },
+    ).all()
+
+
+@statement("get_zone_assignments_geo")
+def _get_zone_assignments_geo(session: Session, fixture: SqlBenchFixture) -> None:
+    session.execute(
+        text("SELECT * FROM get_zone_assignments_geo(CAST(:document_id AS UUID))"),
+        {"document_id": fixture.document_id},
+    ).all()
+
+
+@statement("shatter_parent")
+def _shatter_parent(session: Session, fixture: SqlBenchFixture) -> None:
+    session.execute(
+        text(
+            "SELECT * FROM shatter_parent("
+            "CAST(:document_id AS UUID), CAST(:parent_geoids AS VARCHAR[]))"
+        ),
+        {"document_id": fixture.document_id, "parent_geoids": fixture.shatter_sample},
+    ).all()
+
+
+@statement("create_shatterable_gerrydb_view")
+def _create_shatterable_gerrydb_view(
+    session: Session, fixture: SqlBenchFixture
+) -> None:
+    create_shatterable_gerrydb_view(
+        session,
+        parent_layer=fixture.parent_layer,
+        child_layer=fixture.child_layer,
+        gerrydb_table_name=f"{fixture.gerrydb_table}_probe",
+    )
+
+
+@statement("update_or_select_district_stats")
+def _update_or_select_district_stats(
+    session: Session, fixture: SqlBenchFixture
+) -> None:
+    # The cache is empty in the seeded document, so every zone is rebuilt.
+    update_or_select_district_stats(session, fixture.document_id, BackgroundTasks())
+
+
+@statement("get_assignments")
+def _get_assignments(session: Session, fixture: SqlBenchFixture) -> None:
+    session.exec(
+        assignment_rows_statement(
+            fixture.document_id, fixture.districtr_map_uuid, is_community_map=False
+        )
+    ).all()
+
+
+# Capture
+
+
+def normalize_query(query: str) -> str:
+    return _UUID_RE.sub("<uuid>", " ".join(query.split()))
+
+
+def parse_auto_explain(message: str) -> tuple[float, dict] | None:
+    """Duration and plan of an auto_explain notice, or None for other notices."""
+    match = _NOTICE_RE.match(message)
+    if match is None:
+        return None
+    return float(match.group(1)), json.loads(match.group(2))
+
+
+def _capture_plans(messages: list[str]) -> list[CapturedPlan]:
+    plans = []
+    seen: Counter = Counter()
+    for message in messages:
+        parsed = parse_auto_explain(message)
+        if parsed is None:
+            continue
+        duration_ms, explained = parsed
+        query = normalize_query(explained.get("Query Text", ""))
+        fingerprint = hashlib.sha1(query.encode()).hexdigest()[:12]
+        seen[fingerprint] += 1
+        plans.append(
+            CapturedPlan(
+                key=f"{fingerprint}#{seen[fingerprint]}",
+                query=query,
+                duration_ms=duration_ms,
+                plan=explained["Plan"],
+            )
+        )
+    return plans
+
+
+def _enable_auto_explain(conn: Connection) -> None:
+    """Session-level auto_explain settings; committed so that rolling back the
+    benchmarked statements does not revert them."""
+    for setting in (
+        "LOAD 'auto_explain'",
+        "SET auto_explain.log_min_duration = 0",
+        "SET auto_explain.log_analyze = on",
+        "SET auto_explain.log_buffers = on",
+        "SET auto_explain.log_timing = on",
+        "SET auto_explain.log_nested_statements = on",
+        "SET auto_explain.log_format = 'json'",
+        "SET auto_explain.log_level = 'notice'",
+        "SET client_min_messages = 'notice'",
+    ):
+        conn.execute(text(setting))
+    conn.commit()
+
+
+def run_statement(
+    conn: Connection,
+    messages: list[str],
+    name: str,
+    fixture: SqlBenchFixture,
+    repeat: int = 3,
+) -> StatementResult:
+    """Run ``name`` ``repeat`` times, each in a transaction that is rolled back.
+
+    Plans are kept from the last (warm) run.
+    """
+    wall_ms = []
+    for _ in range(repeat):
+        messages.clear()
+        REGISTRY.invalidate()
+        transaction = conn.begin()
+        # Commits inside the statement only release a savepoint.
+        session = Session(bind=conn, join_transaction_mode="create_savepoint")
+        try:
+            start = time.perf_counter()
+            STATEMENTS[name](session, fixture)
+            wall_ms.append(round((time.perf_counter() - start) * 1000, 3))
+        finally:
+            session.close()
+            transaction.rollback()
+    return StatementResult(
+        statement=name,
+        units=fixture.units,
+        districts=fixture.districts,
+        wall_ms=wall_ms,
+        plans=_capture_plans(messages),
+    )
+
+
+def _current_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(
+    scales: list[tuple[int, int]],
+    statements: list[str] | None = None,
+    repeat: int = 3,
+    reseed: bool = False,
+) -> SqlBenchRun:
+    # Scales sharing a unit count share the map: reseed it only once.
+    reseeded: set[int] = set()
+    fixtures = []
+    for units, districts in scales:
+        fixtures.append(
+            seed_fixture(units, districts, reseed=reseed and units not in reseeded)
+        )
+        reseeded.add(units)
+
+    results = []
+    with engine.connect() as conn:
+        messages: list[str] = []
+        conn.connection.driver_connection.add_notice_handler(  # pyright: ignore
+            lambda diagnostic: messages.append(diagnostic.message_primary or "")
+        )
+        _enable_auto_explain(conn)
+        server_version = conn.execute(text("SHOW server_version")).scalar_one()
+        conn.commit()
+        for fixture in fixtures:
+            for name in statements or list(STATEMENTS):
+                result = run_statement(conn, messages, name, fixture, repeat=repeat)
+                logger.info(
+                    f"{result.label}: median {result.median_ms:.1f} ms, "
+                    f"{len(result.plans)} plans"
+                )
+                results.append(result)
+
+    return SqlBenchRun(
+        created_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        commit=_current_commit(),
+        server_version=server_version,
+        results=results,
+    )
+
+
+# History and diff
+
+
+def save_run(run: SqlBenchRun, history_dir: Path = HISTORY_DIR) -> Path:
+    history_dir.mkdir(parents=True, exist_ok=True)
+    stamp = run.created_at.replace(":", "").replace("-", "")[:15]
+    path = history_dir / f"{stamp}_{run.commit or 'nocommit'}.json"
+    path.write_text(run.model_dump_json(indent=2))
+    return path
+
+
+def load_run(path: Path) -> SqlBenchRun:
+    return SqlBenchRun.model_validate_json(path.read_text())
+
+
+def resolve_run(ref: str | None, history_dir: Path = HISTORY_DIR) -> Path:
+    """A run file path, or the latest run recorded at a commit starting with ``ref``
+    (the latest run overall if ``ref`` is None)."""
+    if ref is not None and Path(ref).is_file():
+        return Path(ref)
+    runs = sorted(history_dir.glob("*.json"))
+    if ref is not None:
+        runs = [p for p in runs if p.stem.split("_", 1)[1].startswith(ref)]
+    if not runs:
+        raise FileNotFoundError(
+            f"No SQL benchmark run matching {ref!r} in {history_dir}"
+        )
+    return runs[-1]
+
+
+def _walk(node: dict) -> Iterator[dict]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def relation_scans(plan: dict) -> dict[str, set[str]]:
+    """Scan node types reading each relation in a plan tree."""
+    scans: dict[str, set[str]] = {}
+    for node in _walk(plan):
+        relation = node.get("Relation Name")
+        if relation:
+            scans.setdefault(normalize_query(relation), set()).add(node["Node Type"])
+    return scans
+
+
+def plan_shape(plan: dict) -> list[str]:
+    """Pre-order node types, with the relation or index each one reads."""
+    shape = []
+    for node in _walk(plan):
+        target = node.get("Index Name") or node.get("Relation Name")
+        label = node["Node Type"]
+        shape.append(f"{label} on {normalize_query(target)}" if target else label)
+    return shape
+
+
+class PlanDiff(BaseModel):
+    label: str
+    # Relations that moved from an index to a sequential scan (fail the diff).
+    flips: list[str] = []
+    # Other plan shape changes (reported only).
+    changes: list[str] = []
+    base_ms: float | None = None
+    head_ms: float | None = None
+    regressed: bool = False
+
+    @property
+    def failed(self) -> bool:
+        return bool(self.flips) or self.regressed
+
+
+def diff_results(
+    base: StatementResult,
+    head: StatementResult,
+    max_ratio: float = 1.5,
+    min_ms: float = 5.0,
+) -> PlanDiff:
+    diff = PlanDiff(label=head.label, base_ms=base.median_ms, head_ms=head.median_ms)
+    diff.regressed = (
+        head.median_ms > base.median_ms * max_ratio
+        and head.median_ms - base.median_ms > min_ms
+    )
+    base_plans = {p.key: p for p in base.plans}
+    head_plans = {p.key: p for p in head.plans}
+    for key in sorted(base_plans.keys() - head_plans.keys()):
+        diff.changes.append(f"query no longer run: {base_plans[key].query[:80]}")
+    for key in sorted(head_plans.keys() - base_plans.keys()):
+        diff.changes.append(f"new query: {head_plans[key].query[:80]}")
+    for key in sorted(base_plans.keys() & head_plans.keys()):
+        before, after = base_plans[key].plan, head_plans[key].plan
+        query = head_plans[key].query[:80]
+        before_scans, after_scans = relation_scans(before), relation_scans(after)
+        for relation in sorted(before_scans.keys() & after_scans.keys()):
+            if (
+                before_scans[relation] & INDEX_SCANS
+                and "Seq Scan" in after_scans[relation]
+                and not after_scans[relation] & INDEX_SCANS
+            ):
+                was = "/".join(sorted(before_scans[relation]))
+                diff.flips.append(f"{relation}: {was} -> Seq Scan in {query}")
+        if not diff.flips and plan_shape(before) != plan_shape(after):
+            diff.changes.append(f"plan changed: {query}")
+    return diff
+
+
+def diff_runs(
+    base: SqlBenchRun, head: SqlBenchRun, max_ratio: float = 1.5, min_ms: float = 5.0
+) -> list[PlanDiff]:
+    base_results = {r.label: r for r in base.results}
+    return [
+        diff_results(base_results[result.label], result, max_ratio, min_ms)
+        for result in head.results
+        if result.label in base_results
+    ]
+
+
+def format_diffs(diffs: list[PlanDiff]) -> str:
+    lines = []
+    for diff in diffs:
+        status = "FAIL" if diff.failed else ("changed" if diff.changes else "ok")
+        lines.append(
+            f"{status:<8} {diff.label:<56} "
+            f"{diff.base_ms or 0:>10.1f} ms -> {diff.head_ms or 0:>10.1f} ms"
+        )
+        lines.extend(f"    plan flip: {flip}" for flip in diff.flips)
+        lines.extend(f"    {change}" for change in diff.changes)
+    return "\n".join(lines)
+
+
+def _parse_scale(value: str) -> tuple[int, int]:
+    units, _, districts = value.partition("x")
+    return int(units), int(districts)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Seed fixtures, run statements, save plans")
+    run.add_argument(
+        "--scale",
+        type=_parse_scale,
+        action="append",
+        help="UNITSxDISTRICTS, repeatable "
+        f"(default {' '.join(f'{u}x{d}' for u, d in DEFAULT_SCALES)})",
+    )
+    run.add_argument(
+        "--statement", choices=list(STATEMENTS), action="append", dest="statements"
+    )
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument("--reseed", action="store_true", help="Drop and reseed fixtures")
+
+    diff = commands.add_parser("diff", help="Compare two saved runs")
+    diff.add_argument("base", nargs="?", help="Run file or commit prefix")
+    diff.add_argument("head", nargs="?", help="Run file or commit prefix")
+    diff.add_argument("--max-ratio", type=float, default=1.5)
+    diff.add_argument(
+        "--min-ms", type=float, default=5.0, help="Ignore slowdowns smaller than this"
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        result = run_benchmarks(
+            args.scale or DEFAULT_SCALES,
+            statements=args.statements,
+            repeat=args.repeat,
+            reseed=args.reseed,
+        )
+        print(f"Saved {save_run(result)}")
+        return 0
+
+    head_path = resolve_run(args.head)
+    if args.base is None:
+        earlier = sorted(p for p in HISTORY_DIR.glob("*.json") if p < head_path)
+        if not earlier:
+            print("Nothing to compare against: only one run saved", file=sys.stderr)
+            return 1
+        base_path = earlier[-1]
+    else:
+        base_path = resolve_run(args.base)
+    print(f"{base_path.name} -> {head_path.name}")
+    diffs = diff_runs(
+        load_run(base_path), load_run(head_path), args.max_ratio, args.min_ms
+    )
+    print(format_diffs(diffs))
+    return 1 if any(d.failed for d in diffs) else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -15,13 +15,21 @@ from app.utils import (
     create_map_group as _create_map_group,
     create_shatterable_gerrydb_view as _create_shatterable_gerrydb_view,
     create_parent_child_edges as _create_parent_child_edges,
+    load_parent_child_edges_from_artifact as _load_parent_child_edges_from_artifact,
     add_extent_to_districtrmap as _add_extent_to_districtrmap,
     add_districtr_map_to_map_group as _add_districtr_map_to_map_group,
     update_districtrmap as _update_districtrmap,
     create_spatial_index as _create_spatial_index,
 )
 from app.core.io import get_local_or_s3_path
-from app.evaluation.graph import S3_GRAPH_PREFIX
+from app.core.registry import notify_registry_changed
+from app.contiguity import annotate_graph_bounds as _annotate_graph_bounds
+from app.evaluation.graph import (
+    S3_GRAPH_PREFIX,
+    get_gerrydb_graph,
+    get_gerrydb_graph_file,
+    put_gerrydb_graph,
+)
 from app.constants import GERRY_DB_SCHEMA
 from functools import wraps
 from contextlib import contextmanager
@@ -30,10 +38,20 @@ from typing import Callable, TypeVar, Any, Literal
 from management.load_data import (
     load_sample_data,
     Config,
+    GERRYDB_IMPORT_WORKERS,
     import_gerrydb_view as _import_gerrydb_view,
 )
+from management.physical_layout import (
+    audit_layout as _audit_layout,
+    cluster_layer as _cluster_layer,
+    ensure_indexes as _ensure_indexes,
+    format_layout_report as _format_layout_report,
+    layout_targets as _layout_targets,
+)
 from os import environ
 from app.models import DistrictrMap, Overlay
+from app.comments.models import Comment, Commenter, Tag
+from app.comments.moderation import moderate_items as _moderate_items
 from datetime import datetime, timezone
 from stress_test.config import settings as stress_settings
 from stress_test.seed import (
@@ -82,6 +100,22 @@ def with_session(f: Callable[..., T]) -> Callable[..., T]:
     return decorator
 
 
+def invalidates_registry(f: Callable[..., T]) -> Callable[..., T]:
+    """
+    Decorator for commands that change map or overlay metadata: invalidates the
+    API's in-process registry (app.core.registry) when the session commits.
+    Place it below `with_session`.
+    """
+
+    @wraps(f)
+    def decorator(*args: Any, session: Session, **kwargs: Any) -> T:
+        result = f(*args, session=session, **kwargs)
+        notify_registry_changed(session)
+        return result
+
+    return decorator
+
+
 @click.group()
 def cli():
     pass
@@ -111,16 +145,28 @@ def import_gerrydb_view(session: Session, layer: str, gpkg: str, rm: bool):
     default=False,
     help="Drop and recreate edges if they were already loaded for this map",
 )
+@click.option(
+    "--from-artifact",
+    "-a",
+    help="Parent-child artifact (parquet/CSV) written by the pipelines. Can be an S3 URI",
+    required=False,
+)
 @with_session
 def create_parent_child_edges(
     session: Session,
     districtr_map_slug: str | None,
     districtr_map_uuid: str | None,
     force: bool,
+    from_artifact: str | None,
 ):
     """
     Create parent-child edges for a districtr map.
     Inlined equivalent of add_parent_child_relationships (parent_child_relationships.sql).
+
+    With --from-artifact, the edges computed by the pipelines
+    (`transforms create-parent-child-artifact`) are streamed in with COPY and
+    checked against the artifact's row count instead of running the PostGIS
+    containment join.
     """
     if not districtr_map_slug and not districtr_map_uuid:
         raise ValueError(
@@ -136,10 +182,19 @@ def create_parent_child_edges(
         if not districtr_map_uuid:
             raise ValueError(f"Districtr map with slug {districtr_map_slug} not found")
 
-    logger.info("Creating parent-child edges...")
-    _create_parent_child_edges(
-        session=session, districtr_map_uuid=districtr_map_uuid, force=force
-    )
+    if from_artifact:
+        logger.info(f"Loading parent-child edges from {from_artifact}...")
+        _load_parent_child_edges_from_artifact(
+            session=session,
+            districtr_map_uuid=districtr_map_uuid,
+            artifact_path=from_artifact,
+            force=force,
+        )
+    else:
+        logger.info("Creating parent-child edges...")
+        _create_parent_child_edges(
+            session=session, districtr_map_uuid=districtr_map_uuid, force=force
+        )
     logger.info("Parent-child relationship upserted successfully.")
 
 
@@ -445,8 +500,20 @@ def add_extent_to_districtr_map(
     help="Create every map with visible=false, overriding the config; "
     "a later UPDATE flips visibility to launch",
 )
+@click.option(
+    "--import-workers",
+    "-j",
+    type=int,
+    default=GERRYDB_IMPORT_WORKERS,
+    show_default=True,
+    help="GerryDB views imported concurrently",
+)
 def batch_create_districtr_maps(
-    config_file: str, data_dir: str, skip_gerrydb_loads: bool, hidden: bool
+    config_file: str,
+    data_dir: str,
+    skip_gerrydb_loads: bool,
+    hidden: bool,
+    import_workers: int,
 ):
     logger.info(f"Loading data from {config_file}")
 
@@ -459,6 +526,7 @@ def batch_create_districtr_maps(
         data_dir=data_dir,
         skip_gerrydb_loads=skip_gerrydb_loads,
         visibility_override=False if hidden else None,
+        import_workers=import_workers,
     )
 
     logger.info("Successfully loaded new data")
@@ -491,6 +559,66 @@ def create_spatial_index(
         logger.info(f"Created spatial index successfully for table {table}.")
 
 
+@cli.command("ensure-indexes")
+@click.option(
+    "--table-name",
+    "-t",
+    help="Only this gerrydb table (default: every layer referenced by a districtr "
+    "map, plus parentchildedges partitions and document.assignments)",
+    multiple=True,
+)
+@click.option(
+    "--cluster",
+    is_flag=True,
+    help="Also CLUSTER gerrydb layers in GeoHash order (locks each table while "
+    "it is rewritten)",
+)
+@click.option(
+    "--dry-run", is_flag=True, help="Report and print statements without running them"
+)
+def ensure_indexes(table_name: tuple[str, ...], cluster: bool, dry_run: bool):
+    """Audit the indexes the hot queries rely on and create missing ones
+    CONCURRENTLY, then print a before/after table of size and index coverage."""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        targets = _layout_targets(conn, list(table_name) or None)
+        before = _audit_layout(conn, targets)
+        for target in targets:
+            _ensure_indexes(conn, target, dry_run=dry_run)
+            if cluster and target.has_geometry:
+                _cluster_layer(conn, target, dry_run=dry_run)
+        after = None if dry_run else _audit_layout(conn, targets)
+    click.echo(_format_layout_report(before, after))
+
+
+@cli.command("cluster-layers")
+@click.option(
+    "--table-name",
+    "-t",
+    help="Only this gerrydb table (default: every layer referenced by a districtr map)",
+    multiple=True,
+)
+@click.option(
+    "--dry-run", is_flag=True, help="Report and print statements without running them"
+)
+def cluster_layers(table_name: tuple[str, ...], dry_run: bool):
+    """Rewrite gerrydb layers in GeoHash order so spatially close rows share
+    pages, then print a before/after table of size and index coverage.
+
+    Each table is locked while it is rewritten: run during a maintenance window.
+    """
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        targets = [
+            target
+            for target in _layout_targets(conn, list(table_name) or None)
+            if target.has_geometry
+        ]
+        before = _audit_layout(conn, targets)
+        for target in targets:
+            _cluster_layer(conn, target, dry_run=dry_run)
+        after = None if dry_run else _audit_layout(conn, targets)
+    click.echo(_format_layout_report(before, after))
+
+
 @cli.command("create-group")
 @click.option("--name", "-n", help="Group name", required=True)
 @click.option("--map-group-slug", "-s", help="Group slug", required=False)
@@ -563,6 +691,7 @@ def add_districtr_map_to_map_group(
     required=False,
 )
 @with_session
+@invalidates_registry
 def create_overlay(
     session: Session,
     name: str,
@@ -631,6 +760,7 @@ def create_overlay(
 @click.option("--districtr-map-slug", "-d", help="DistrictrMap slug", required=True)
 @click.option("--overlay-id", "-o", help="Overlay ID to add", required=True)
 @with_session
+@invalidates_registry
 def add_overlay_to_map(session: Session, districtr_map_slug: str, overlay_id: str):
     # Validate UUID format
     try:
@@ -709,6 +839,7 @@ def add_overlay_to_map(session: Session, districtr_map_slug: str, overlay_id: st
     required=False,
 )
 @with_session
+@invalidates_registry
 def link_overlays_to_maps(
     session: Session,
     overlay_names: tuple[str, ...],
@@ -799,6 +930,7 @@ def link_overlays_to_maps(
 @click.option("--districtr-map-slug", "-d", help="DistrictrMap slug", required=True)
 @click.option("--overlay-id", "-o", help="Overlay ID to remove", required=True)
 @with_session
+@invalidates_registry
 def remove_overlay_from_map(session: Session, districtr_map_slug: str, overlay_id: str):
     # Validate UUID format
     try:
@@ -859,6 +991,7 @@ def remove_overlay_from_map(session: Session, districtr_map_slug: str, overlay_i
     required=False,
 )
 @with_session
+@invalidates_registry
 def update_overlay(
     session: Session,
     overlay_id: str,
@@ -958,6 +1091,7 @@ def update_overlay(
 @cli.command("delete-overlay")
 @click.option("--overlay-id", "-o", help="Overlay ID to delete", required=True)
 @with_session
+@invalidates_registry
 def delete_overlay(session: Session, overlay_id: str):
     # Validate UUID format
     try:
@@ -995,6 +1129,7 @@ def delete_overlay(session: Session, overlay_id: str):
     help="Log what would change without writing",
 )
 @with_session
+@invalidates_registry
 def sync_overlay_metadata(session: Session, metadata: str, dry_run: bool):
     """Bulk-update overlay name and description from a published metadata JSON file.
 
@@ -1132,6 +1267,69 @@ def check_missing_graphs(session: Session, skip_alert: bool):
     logger.info("Alert published to SNS topic %s", topic_arn)
 
 
+@cli.command("backfill-graph-bounds")
+@click.option(
+    "--districtr-map",
+    "districtr_maps",
+    multiple=True,
+    help="Districtr map slug (repeatable); defaults to every visible map",
+)
+@click.option("--force", is_flag=True, help="Recompute bounds already stored")
+@with_session
+def backfill_graph_bounds(
+    session: Session, districtr_maps: tuple[str, ...], force: bool
+):
+    """Store per-unit EPSG:4326 bounds on graph pkls built without them.
+
+    Until this has run for a graph produced before the pipeline stored bounds,
+    the connected component bbox endpoint reads them from PostGIS after every
+    graph load. Each graph is rewritten where it was found (local volume or S3).
+    """
+    stmt = select(DistrictrMap).where(col(DistrictrMap.gerrydb_table_name).isnot(None))
+    if districtr_maps:
+        stmt = stmt.where(col(DistrictrMap.districtr_map_slug).in_(districtr_maps))
+    else:
+        stmt = stmt.where(col(DistrictrMap.visible).is_(True))
+
+    for districtr_map in session.scalars(stmt).all():
+        assert districtr_map.gerrydb_table_name is not None
+        path = get_gerrydb_graph_file(districtr_map.gerrydb_table_name)
+        G = get_gerrydb_graph(path)
+        if "bounds_4326" in G.graph and not force:
+            logger.info("Graph %s already has bounds, skipping", path)
+            continue
+        count = _annotate_graph_bounds(session, G, districtr_map)
+        put_gerrydb_graph(G, path)
+        logger.info(
+            "Stored bounds for %d/%d nodes in %s", count, G.number_of_nodes(), path
+        )
+
+
+@cli.command("moderate-comments")
+@click.option(
+    "--all",
+    "rescore_all",
+    is_flag=True,
+    help="Re-score every comment, commenter and tag, not just unscored rows",
+)
+@with_session
+def moderate_comments(session: Session, rescore_all: bool):
+    """Score comments, commenters and tags in batches, e.g. after a bulk import."""
+    items = []
+    for model in (Comment, Commenter, Tag):
+        stmt = select(model)
+        if not rescore_all:
+            stmt = stmt.where(col(model.moderation_score).is_(None))
+        for row in session.scalars(stmt):
+            text_to_score = (
+                f"{row.title} {row.comment}" if model is Comment else str(row)
+            )
+            items.append((model, row.id, text_to_score))
+
+    logger.info(f"Scoring {len(items)} rows")
+    _moderate_items(items, session)
+
+
 @cli.command("stress-test-seed")
 @click.option(
     "--config-url",
@@ -8,12 +8,16 @@ from app.utils import (
     create_shatterable_gerrydb_view,
     add_extent_to_districtrmap,
     create_spatial_index,
+    create_path_index,
     add_districtr_map_to_map_group,
     create_map_group,
 )
 from app.core.io import get_local_or_s3_path
+from app.core.registry import notify_registry_changed
 from app.main import get_session
 from app.core.config import settings
+from app.core.db import engine
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from functools import wraps
 import logging
 from sqlmodel import Session, select
@@ -21,6 +25,7 @@ from app.models import DistrictrMapPublic, DistrictrMap, ConfigMapGroup
 from pydantic import BaseModel, computed_field
 from app.constants import GERRY_DB_SCHEMA
 import subprocess
+import time
 import json
 import yaml
 
@@ -28,13 +33,94 @@ logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 
+# Layers imported at once by `import_gerrydb_views`. Each runs its own ogr2ogr
+# process and database connection.
+GERRYDB_IMPORT_WORKERS = 4
+# Features per ogr2ogr transaction; with PG_USE_COPY each is a single COPY.
+OGR2OGR_GROUP_SIZE = 100_000
+
+
+class GerryDBImportStats(BaseModel):
+    """Timings of one gerrydb layer import."""
+
+    table_name: str
+    rows: int
+    load_seconds: float
+    index_seconds: float
+    analyze_seconds: float
+
+    @computed_field
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.load_seconds if self.load_seconds else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.table_name}: {self.rows} rows loaded in {self.load_seconds:.1f}s "
+            f"({self.rows_per_second:,.0f} rows/s), indexes built in "
+            f"{self.index_seconds:.1f}s, analyzed in {self.analyze_seconds:.1f}s"
+        )
+
+
+def ogr2ogr_import_args(path: str, layer: str, table_name: str) -> list[str]:
+    """
+    ogr2ogr arguments loading ``layer`` of ``path`` into gerrydb.``table_name``.
+
+    Rows are streamed with COPY, and ogr2ogr's own spatial index is disabled:
+    `index_gerrydb_table` builds the indexes once the table is full, which is
+    much faster than maintaining them row by row.
+    """
+    return [
+        "ogr2ogr",
+        "--config",
+        "PG_USE_COPY",
+        "YES",
+        "-f",
+        "PostgreSQL",
+        f"PG:host={settings.POSTGRES_SERVER} port={settings.POSTGRES_PORT} dbname={settings.POSTGRES_DB} user={settings.POSTGRES_USER} password={settings.POSTGRES_PASSWORD}",
+        path,
+        layer,  # must match layer name in gpkg
+        "-lco",
+        "OVERWRITE=no",  # overwriting drops materialized views
+        "-lco",
+        "GEOMETRY_NAME=geometry",
+        "-lco",
+        "SPATIAL_INDEX=NONE",
+        "-gt",
+        str(OGR2OGR_GROUP_SIZE),
+        "-nlt",
+        "MULTIPOLYGON",
+        "-nln",
+        f"{GERRY_DB_SCHEMA}.{table_name}",
+    ]
+
+
+def index_gerrydb_table(session: Session, table_name: str) -> tuple[float, float]:
+    """
+    Build the `path` btree and geometry GIST indexes on a freshly loaded
+    gerrydb table, then ANALYZE it so the planner sees the new rows.
+
+    Returns the seconds spent building indexes and analyzing.
+    """
+    start = time.perf_counter()
+    create_path_index(session, table_name=table_name)
+    create_spatial_index(session, table_name=table_name)
+    session.commit()
+    index_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    session.execute(sa.text(f"ANALYZE {GERRY_DB_SCHEMA}.{table_name}"))
+    session.commit()
+    return index_seconds, time.perf_counter() - start
+
+
 def import_gerrydb_view(
     session: Session,
     layer: str,
     gpkg: str,
     rm: bool = False,
     table_name: str | None = None,
-):
+) -> GerryDBImportStats:
     logger.info("Importing GerryDB view...")
 
     path = get_local_or_s3_path(gpkg)
@@ -42,29 +128,15 @@ def import_gerrydb_view(
     if table_name is None:
         table_name = layer
 
-    result = subprocess.run(
-        args=[
-            "ogr2ogr",
-            "-f",
-            "PostgreSQL",
-            f"PG:host={settings.POSTGRES_SERVER} port={settings.POSTGRES_PORT} dbname={settings.POSTGRES_DB} user={settings.POSTGRES_USER} password={settings.POSTGRES_PASSWORD}",
-            path,
-            layer,  # must match layer name in gpkg
-            "-lco",
-            "OVERWRITE=no",  # overwriting drops materialized views
-            "-lco",
-            "GEOMETRY_NAME=geometry",
-            "-nlt",
-            "MULTIPOLYGON",
-            "-nln",
-            f"{GERRY_DB_SCHEMA}.{table_name}",
-        ],
-    )
+    start = time.perf_counter()
+    result = subprocess.run(args=ogr2ogr_import_args(path, layer, table_name))
 
     if result.returncode != 0:
         logger.error("ogr2ogr failed. Got %s", result)
         raise ValueError(f"ogr2ogr failed with return code {result.returncode}")
+    load_seconds = time.perf_counter() - start
 
+    notify_registry_changed(session)
     # Commit before trying to build index
     session.commit()
     logger.info(f"GerryDB view {table_name} imported successfully")
@@ -73,13 +145,13 @@ def import_gerrydb_view(
         os.remove(path)
         logger.info("Deleted file %s", path)
 
-    logger.info(f"GerryDB view {table_name} imported successfully")
+    rows = session.execute(
+        sa.text(f"SELECT COUNT(*) FROM {GERRY_DB_SCHEMA}.{table_name}")
+    ).scalar_one()
 
-    logger.info("Creating index")
-    create_spatial_index(session, table_name=table_name)
-    logger.info("Index created successfully")
-
-    session.commit()
+    logger.info("Creating indexes")
+    index_seconds, analyze_seconds = index_gerrydb_table(session, table_name)
+    logger.info("Indexes created successfully")
 
     upsert_query = sa.text(
         """
@@ -99,6 +171,82 @@ def import_gerrydb_view(
     )
     logger.info("GerryDB view upserted successfully.")
 
+    stats = GerryDBImportStats(
+        table_name=table_name,
+        rows=rows,
+        load_seconds=load_seconds,
+        index_seconds=index_seconds,
+        analyze_seconds=analyze_seconds,
+    )
+    logger.info(str(stats))
+    return stats
+
+
+def _import_gerrydb_view_in_own_session(
+    view: "GerryDBViewImport", gpkg: str, rm: bool
+) -> GerryDBImportStats:
+    with Session(engine) as session:
+        stats = import_gerrydb_view(
+            session=session,
+            layer=view.layer,
+            gpkg=gpkg,
+            rm=rm,
+            table_name=view._table_name,
+        )
+        session.commit()
+        return stats
+
+
+def import_gerrydb_views(
+    views: list[tuple["GerryDBViewImport", str]],
+    max_workers: int = GERRYDB_IMPORT_WORKERS,
+    rm: bool = False,
+) -> list[GerryDBImportStats]:
+    """
+    Import several gerrydb layers at once.
+
+    Each layer is loaded by its own ogr2ogr process and then indexed and
+    analyzed on its own connection, at most ``max_workers`` layers at a time.
+    Every layer is attempted even if another fails.
+
+    Args:
+        views: ``(view, gpkg)`` pairs, where ``gpkg`` is the local path or S3
+            URI of the view's GeoPackage.
+        max_workers: Maximum layers imported concurrently.
+        rm: Delete each GeoPackage after it is loaded.
+
+    Returns per-layer stats, in input order.
+
+    Raises:
+        RuntimeError: If any layer failed to import.
+    """
+    results: dict[str, GerryDBImportStats] = {}
+    failures: dict[str, BaseException] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(_import_gerrydb_view_in_own_session, view, gpkg, rm): view
+            for view, gpkg in views
+        }
+        for future in as_completed(futures):
+            table_name = futures[future]._table_name
+            try:
+                results[table_name] = future.result()
+            except Exception as e:
+                logger.error(f"Failed to import GerryDB view {table_name}: {e}")
+                failures[table_name] = e
+
+    stats = [
+        results[view._table_name] for view, _ in views if view._table_name in results
+    ]
+    if stats:
+        logger.info("GerryDB import summary:\n%s", "\n".join(f"  {s}" for s in stats))
+    if failures:
+        raise RuntimeError(
+            f"{len(failures)} GerryDB view(s) failed to import: "
+            f"{', '.join(sorted(failures))}"
+        )
+    return stats
+
 
 def continue_on_previous_load(func):
     @wraps(func)
@@ -294,6 +442,7 @@ def load_sample_data(
     data_dir: str,
     skip_gerrydb_loads: bool = False,
     visibility_override: bool | None = None,
+    import_workers: int = GERRYDB_IMPORT_WORKERS,
 ) -> None:
     """
     Load sample data from the specified data directory.
@@ -312,7 +461,9 @@ def load_sample_data(
         config: Configuration dictionary
         data_dir: Volume path
         skip_gerrydb_loads: Whether to skip loading GerryDB views
+        import_workers: GerryDB views imported concurrently
     """
+    pending_views: list[tuple[GerryDBViewImport, str]] = []
     for view in config._gerrydb_views:
         if skip_gerrydb_loads:
             continue
@@ -335,15 +486,13 @@ def load_sample_data(
         if table_exists:
             logger.info(f"GerryDB view {view.table_name} already exists.")
         else:
-            import_gerrydb_view(
-                session=session,
-                layer=view.layer,
-                gpkg=gpkg,
-                table_name=view._table_name,
-            )
+            pending_views.append((view, gpkg))
 
         session.commit()
 
+    if pending_views:
+        import_gerrydb_views(pending_views, max_workers=import_workers)
+
     for view in config._shatterable_views:
         session = next(get_session())
         gerrydb_table_exists = session.execute(
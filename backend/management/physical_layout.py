@@ -0,0 +1,391 @@
+"""
+Audit and repair the physical layout of the tables the hot queries read.
+
+Every gerrydb layer referenced by a districtr map needs a btree on ``path`` and
+a GIST index on ``geometry``; every ``parentchildedges`` partition needs
+``(districtr_map, parent_path)`` and ``(child_path, districtr_map)``; and
+``document.assignments`` needs ``(document_id, geo_id)``. Layers loaded by hand
+or by older versions of the loader can be missing some of them.
+
+`audit_layout` reports what each relation has, `ensure_indexes` creates what
+is missing with ``CREATE INDEX CONCURRENTLY`` (so it can run against a live
+database) and `cluster_layer` rewrites a layer in GeoHash order so that
+spatially close rows share pages.
+
+All functions take a connection in AUTOCOMMIT mode: ``CONCURRENTLY`` cannot run
+inside a transaction block.
+"""
+
+import logging
+from typing import Literal
+
+from pydantic import BaseModel
+from sqlalchemy import Connection, select, text
+
+from app.constants import DOCUMENT_SCHEMA, GERRY_DB_SCHEMA
+from app.models import DistrictrMap
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL truncates longer identifiers.
+MAX_IDENTIFIER_LENGTH = 63
+# GeoHash precision used to order rows by `cluster_layer` (~4cm cells).
+CLUSTER_GEOHASH_PRECISION = 12
+
+
+def _quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _index_name(table_name: str, suffix: str) -> str:
+    return f"{table_name}_{suffix}"[:MAX_IDENTIFIER_LENGTH]
+
+
+class IndexSpec(BaseModel):
+    """An index a relation must have.
+
+    Any valid index of the same method whose leading key columns are
+    ``columns`` satisfies it; ``name`` is used only when creating it.
+    """
+
+    name: str
+    columns: tuple[str, ...]
+    method: Literal["btree", "gist"] = "btree"
+
+    def create_statement(self, schema: str, table_name: str) -> str:
+        columns = ", ".join(_quote_ident(c) for c in self.columns)
+        return (
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {_quote_ident(self.name)} "
+            f"ON {_quote_ident(schema)}.{_quote_ident(table_name)} "
+            f"USING {self.method} ({columns})"
+        )
+
+
+class LayoutTarget(BaseModel):
+    schema_name: str
+    table_name: str
+    indexes: list[IndexSpec]
+    has_geometry: bool = False
+
+    @property
+    def qualified_name(self) -> str:
+        return f"{_quote_ident(self.schema_name)}.{_quote_ident(self.table_name)}"
+
+
+class RelationLayout(BaseModel):
+    """Size, index coverage and statistics of one relation."""
+
+    schema_name: str
+    table_name: str
+    total_bytes: int
+    table_bytes: int
+    index_bytes: int
+    required_indexes: list[str]
+    missing_indexes: list[str]
+    invalid_indexes: list[str]
+    analyzed: bool
+    clustered_on: str | None
+
+    @property
+    def relation(self) -> str:
+        return f"{self.schema_name}.{self.table_name}"
+
+    @property
+    def coverage(self) -> str:
+        present = len(self.required_indexes) - len(self.missing_indexes)
+        return f"{present}/{len(self.required_indexes)}"
+
+
+def gerrydb_layer_target(table_name: str) -> LayoutTarget:
+    return LayoutTarget(
+        schema_name=GERRY_DB_SCHEMA,
+        table_name=table_name,
+        has_geometry=True,
+        indexes=[
+            # Same name as `app.utils.create_path_index`
+            IndexSpec(name=_index_name(table_name, "path_idx"), columns=("path",)),
+            # Same name PostgreSQL gives `app.utils.create_spatial_index`'s index
+            IndexSpec(
+                name=_index_name(table_name, "geometry_idx"),
+                columns=("geometry",),
+                method="gist",
+            ),
+        ],
+    )
+
+
+def parent_child_edges_target(partition_name: str) -> LayoutTarget:
+    return LayoutTarget(
+        schema_name="public",
+        table_name=partition_name,
+        indexes=[
+            IndexSpec(
+                name=_index_name(partition_name, "districtr_map_parent_path_idx"),
+                columns=("districtr_map", "parent_path"),
+            ),
+            IndexSpec(
+                name=_index_name(partition_name, "child_path_districtr_map_idx"),
+                columns=("child_path", "districtr_map"),
+            ),
+        ],
+    )
+
+
+def assignments_target() -> LayoutTarget:
+    return LayoutTarget(
+        schema_name=DOCUMENT_SCHEMA,
+        table_name="assignments",
+        indexes=[
+            IndexSpec(
+                name="assignments_document_id_geo_id_idx",
+                columns=("document_id", "geo_id"),
+            )
+        ],
+    )
+
+
+def _relation_exists(conn: Connection, schema: str, table_name: str) -> bool:
+    return (
+        conn.execute(
+            text("SELECT to_regclass(:relation)"),
+            {"relation": f"{_quote_ident(schema)}.{_quote_ident(table_name)}"},
+        ).scalar()
+        is not None
+    )
+
+
+def referenced_gerrydb_layers(conn: Connection) -> list[str]:
+    """Parent and child layers of every districtr map, sorted."""
+    rows = conn.execute(
+        select(DistrictrMap.parent_layer, DistrictrMap.child_layer)  # pyright: ignore
+    ).all()
+    return sorted({layer for row in rows for layer in row if layer})
+
+
+def layout_targets(
+    conn: Connection, tables: list[str] | None = None
+) -> list[LayoutTarget]:
+    """
+    Relations to audit: the gerrydb layers referenced by districtr maps (or
+    only ``tables`` if given), every ``parentchildedges`` partition and
+    ``document.assignments``.
+    """
+    layers = tables if tables is not None else referenced_gerrydb_layers(conn)
+    targets = []
+    for layer in layers:
+        if _relation_exists(conn, GERRY_DB_SCHEMA, layer):
+            targets.append(gerrydb_layer_target(layer))
+        else:
+            logger.warning(f"GerryDB table {layer} does not exist, skipping")
+    if tables is not None:
+        return targets
+
+    partitions = conn.execute(
+        text(
+            """
+            SELECT child.relname::text
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = 'public.parentchildedges'::regclass
+            ORDER BY child.relname
+            """
+        )
+    ).scalars()
+    targets.extend(parent_child_edges_target(p) for p in partitions)
+    targets.append(assignments_target())
+    return targets
+
+
+def _existing_indexes(conn: Connection, target: LayoutTarget) -> list[dict]:
+    rows = conn.execute(
+        text(
+            """
+            SELECT
+                i.relname::text AS name,
+                am.amname::text AS method,
+                x.indisvalid AS valid,
+                x.indisclustered AS clustered,
+                array_agg(coalesce(a.attname::text, '') ORDER BY k.ord) AS columns
+            FROM pg_index x
+            JOIN pg_class i ON i.oid = x.indexrelid
+            JOIN pg_am am ON am.oid = i.relam
+            CROSS JOIN LATERAL unnest(x.indkey::int2[]) WITH ORDINALITY AS k(attnum, ord)
+            LEFT JOIN pg_attribute a
+                ON a.attrelid = x.indrelid AND a.attnum = k.attnum AND k.attnum > 0
+            WHERE x.indrelid = to_regclass(:relation) AND k.ord <= x.indnkeyatts
+            GROUP BY i.relname, am.amname, x.indisvalid, x.indisclustered
+            """
+        ),
+        {"relation": target.qualified_name},
+    ).mappings()
+    return [dict(row) for row in rows]
+
+
+def _satisfies(index: dict, spec: IndexSpec) -> bool:
+    return (
+        index["valid"]
+        and index["method"] == spec.method
+        and tuple(index["columns"][: len(spec.columns)]) == spec.columns
+    )
+
+
+def audit_relation(conn: Connection, target: LayoutTarget) -> RelationLayout:
+    indexes = _existing_indexes(conn, target)
+    sizes = conn.execute(
+        text(
+            """
+            SELECT
+                pg_total_relation_size(to_regclass(:relation)) AS total_bytes,
+                pg_relation_size(to_regclass(:relation)) AS table_bytes,
+                pg_indexes_size(to_regclass(:relation)) AS index_bytes
+            """
+        ),
+        {"relation": target.qualified_name},
+    ).one()
+    analyzed = conn.execute(
+        text(
+            """
+            SELECT EXISTS (
+                SELECT 1 FROM pg_stats
+                WHERE schemaname = :schema AND tablename = :table_name
+            )
+            """
+        ),
+        {"schema": target.schema_name, "table_name": target.table_name},
+    ).scalar_one()
+
+    return RelationLayout(
+        schema_name=target.schema_name,
+        table_name=target.table_name,
+        total_bytes=sizes.total_bytes,
+        table_bytes=sizes.table_bytes,
+        index_bytes=sizes.index_bytes,
+        required_indexes=[spec.name for spec in target.indexes],
+        missing_indexes=[
+            spec.name
+            for spec in target.indexes
+            if not any(_satisfies(index, spec) for index in indexes)
+        ],
+        invalid_indexes=[index["name"] for index in indexes if not index["valid"]],
+        analyzed=analyzed,
+        clustered_on=next(
+            (index["name"] for index in indexes if index["clustered"]), None
+        ),
+    )
+
+
+def audit_layout(conn: Connection, targets: list[LayoutTarget]) -> list[RelationLayout]:
+    return [audit_relation(conn, target) for target in targets]
+
+
+def ensure_indexes(
+    conn: Connection, target: LayoutTarget, dry_run: bool = False
+) -> list[str]:
+    """
+    Create ``target``'s missing indexes concurrently and ANALYZE it if it has
+    no statistics.
+
+    An invalid index left behind by an interrupted ``CREATE INDEX
+    CONCURRENTLY`` under the same name is dropped and rebuilt.
+
+    Returns the statements run (or that would run, with ``dry_run``).
+    """
+    layout = audit_relation(conn, target)
+    statements = []
+    for spec in target.indexes:
+        if spec.name not in layout.missing_indexes:
+            continue
+        if spec.name in layout.invalid_indexes:
+            statements.append(
+                f"DROP INDEX CONCURRENTLY IF EXISTS "
+                f"{_quote_ident(target.schema_name)}.{_quote_ident(spec.name)}"
+            )
+        statements.append(spec.create_statement(target.schema_name, target.table_name))
+    if statements or not layout.analyzed:
+        statements.append(f"ANALYZE {target.qualified_name}")
+
+    for statement in statements:
+        logger.info(("Would run: " if dry_run else "Running: ") + statement)
+        if not dry_run:
+            conn.execute(text(statement))
+    return statements
+
+
+def cluster_layer(
+    conn: Connection, target: LayoutTarget, dry_run: bool = False
+) -> list[str]:
+    """
+    Rewrite a gerrydb layer in GeoHash (Z-order) order of its centroids, then
+    ANALYZE it.
+
+    Aggregates over a zone (e.g. ``ST_Union`` of its geometries) then read far
+    fewer pages, since neighbouring geometries are stored together. The
+    ordering index is kept, so the table can later be re-clustered with a
+    plain ``CLUSTER``.
+
+    ``CLUSTER`` takes an ACCESS EXCLUSIVE lock and rewrites the table: run it
+    during a maintenance window.
+
+    Returns the statements run (or that would run, with ``dry_run``).
+    """
+    if not target.has_geometry:
+        raise ValueError(f"{target.table_name} has no geometry to cluster on")
+
+    index_name = _quote_ident(_index_name(target.table_name, "geohash_idx"))
+    statements = [
+        f"CREATE INDEX IF NOT EXISTS {index_name} ON {target.qualified_name} ("
+        "(CASE WHEN ST_IsEmpty(geometry) THEN NULL ELSE ST_GeoHash("
+        f"ST_Transform(ST_Centroid(geometry), 4326), {CLUSTER_GEOHASH_PRECISION}"
+        ") END))",
+        f"CLUSTER {target.qualified_name} USING {index_name}",
+        f"ANALYZE {target.qualified_name}",
+    ]
+    for statement in statements:
+        logger.info(("Would run: " if dry_run else "Running: ") + statement)
+        if not dry_run:
+            conn.execute(text(statement))
+    return statements
+
+
+def _format_bytes(n: int) -> str:
+    size = float(n)
+    for unit in ("B", "kB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def format_layout_report(
+    before: list[RelationLayout], after: list[RelationLayout] | None = None
+) -> str:
+    """Fixed-width table of relation size and index coverage, before and after."""
+    after_by_relation = {layout.relation: layout for layout in after or []}
+    header = ["relation", "size", "indexes", "analyzed", "clustered on"]
+    rows = []
+    for layout in before:
+        new = after_by_relation.get(layout.relation, layout)
+
+        def change(old: str, new: str) -> str:
+            return old if old == new else f"{old} -> {new}"
+
+        rows.append(
+            [
+                layout.relation,
+                change(
+                    _format_bytes(layout.total_bytes), _format_bytes(new.total_bytes)
+                ),
+                change(layout.coverage, new.coverage),
+                change(
+                    "yes" if layout.analyzed else "no", "yes" if new.analyzed else "no"
+                ),
+                change(layout.clustered_on or "-", new.clustered_on or "-"),
+            ]
+        )
+
+    widths = [max(len(row[i]) for row in [header, *rows]) for i in range(len(header))]
+    lines = [
+        "  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip()
+        for row in [header, ["-" * w for w in widths], *rows]
+    ]
+    return "\n".join(lines)
@@ -105,8 +105,9 @@ class StressClient:
         self, document_id: str, assignments: list, last_updated_at: str
     ) -> tuple[str, str | None]:
         """Full-replacement save (main.py:643). Body is msgpack
-        {document_id, assignments: [[geo_id, zone], ...], last_updated_at,
-        overwrite: false}; response is JSON {assignments_inserted, updated_at}.
+        {document_id, last_updated_at, overwrite: false,
+        assignments: [[geo_id, zone], ...]}, assignments last; response is
+        JSON {assignments_inserted, updated_at}.
 
         Returns ("ok", new_updated_at), ("conflict", None) for 409 (recorded
         on stats as a success — expected-but-noteworthy), or ("error", None).
@@ -114,9 +115,10 @@ class StressClient:
         body = msgpack.packb(
             {
                 "document_id": document_id,
-                "assignments": assignments,
                 "last_updated_at": last_updated_at,
                 "overwrite": False,
+                # Must be the last key.
+                "assignments": assignments,
             }
         )
         with self.http.put(
@@ -37,11 +37,28 @@ class StressSettings(BaseSettings):
     # When true, locustfile asserts on quit that every request class succeeded
     # and editor saves round-tripped updated_at (exit code 1 otherwise).
     SMOKE_ASSERT: bool = False
+    # SLO regression mode (slo.py, runner/slo.sh): when set, per-route results
+    # are written here on quit.
+    SLO_RESULTS: str = ""
+    # When true, results are checked against SLO_FILE and SLO_BASELINE on quit
+    # (exit code 1 on any violation). Empty paths mean slo.py's defaults.
+    SLO_CHECK: bool = False
+    SLO_FILE: str = ""
+    SLO_BASELINE: str = ""
 
     @property
     def user_agent(self) -> str:
         return f"districtr-stress-test/{self.RUN_ID}"
 
+    @property
+    def scenario(self) -> dict:
+        """Parameters that fix the traffic a run generates."""
+        return {
+            "scale": self.SCALE,
+            "window_seconds": self.WINDOW_SECONDS,
+            "rng_seed": self.RNG_SEED,
+        }
+
     @property
     def seed_manifest_path(self) -> str:
         return self.SEED_MANIFEST or f"stress_test_manifest_{self.RUN_ID}.json"
@@ -25,6 +25,7 @@ from locust import FastHttpUser, events, task
 from locust.exception import StopUser
 
 import client as api_names
+import slo
 from client import StressClient
 from config import load_config_rows, load_seed_manifest, settings
 from scenario import (
@@ -255,6 +256,31 @@ SMOKE_CHECKS = [
 ]
 
 
+def _check_slo(environment) -> None:
+    """SLO regression mode (slo.py): write per-route results and, with
+    STRESS_SLO_CHECK, fail the run on any SLO or baseline regression."""
+    if not settings.SLO_RESULTS and not settings.SLO_CHECK:
+        return
+    results = slo.collect_results(environment.stats, settings.RUN_ID, settings.scenario)
+    if settings.SLO_RESULTS:
+        slo.write_json(settings.SLO_RESULTS, results)
+        logger.info("SLO results written to %s", settings.SLO_RESULTS)
+    if not settings.SLO_CHECK:
+        return
+
+    baseline_path = settings.SLO_BASELINE or slo.DEFAULT_BASELINE_PATH
+    baseline = slo.load_json(baseline_path) if os.path.exists(baseline_path) else None
+    logger.info("SLO results [baseline]:\n%s", slo.format_results(results, baseline))
+    problems = slo.check(
+        results, slo.load_json(settings.SLO_FILE or slo.DEFAULT_SLO_PATH), baseline
+    )
+    if problems:
+        logger.error("SLO CHECK FAILED:\n  %s", "\n  ".join(problems))
+        environment.process_exit_code = 1
+    else:
+        logger.info("SLO CHECK PASSED")
+
+
 @events.quitting.add_listener
 def _on_quit(environment, **kwargs):
     _flush_manifest()
@@ -266,6 +292,7 @@ def _on_quit(environment, **kwargs):
         _conflicts,
         _editor_roundtrips,
     )
+    _check_slo(environment)
     if not settings.SMOKE_ASSERT:
         return
     problems = []
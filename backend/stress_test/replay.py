@@ -0,0 +1,372 @@
+"""Replay an exported slice of production ALB access logs against a local stack.
+
+Synthetic Locust mixes cannot reproduce incidents such as an evaluation
+stampede after a share link goes viral; the ALB logs can, because they record
+the real mix of routes, documents and timing. This tool:
+
+- reads a log slice: raw ALB log files (``.log`` or ``.gz``, as delivered to
+  the ALB logs bucket) or a CSV export of ``infra/athena/replay_slice.sql``;
+- keeps the replayable requests: GETs under ``/api/`` (bodies of writes are
+  not logged), excluding the stress harness's own traffic;
+- anonymizes documents: every production document id (UUID or numeric
+  public id) is mapped, consistently and in first-seen order, onto one of the
+  seeded stress documents (``cli.py stress-test-seed`` / ``smoke_seed.py``),
+  so a document that was hot in production is equally hot in the replay;
+  export job ids are likewise swapped for random stand-ins (the jobs do not
+  exist locally, so those requests exercise the not-found path), so no
+  production id leaves the slice;
+- sends each request at its original offset from the first one, divided by
+  ``--speedup``, and writes per-route results in the same shape as
+  ``slo.py`` (so ``slo.format_results`` / ``slo.check`` apply).
+
+    STRESS_SEED_MANIFEST=stress_test_manifest_smoke.json \\
+        python replay.py slice.csv --speedup 4 --results replay_results.json
+
+Requests go out with the harness User-Agent (``districtr-stress-test/<run-id>``).
+"""
+
+from gevent import monkey
+
+monkey.patch_all()
+
+import argparse  # noqa: E402
+import csv  # noqa: E402
+import gzip  # noqa: E402
+import logging  # noqa: E402
+import re  # noqa: E402
+import shlex  # noqa: E402
+import statistics  # noqa: E402
+import time  # noqa: E402
+import uuid  # noqa: E402
+from dataclasses import dataclass  # noqa: E402
+from datetime import datetime  # noqa: E402
+from itertools import cycle  # noqa: E402
+from urllib.parse import urlsplit  # noqa: E402
+
+import gevent  # noqa: E402
+import requests  # noqa: E402
+from gevent.pool import Pool  # noqa: E402
+
+import slo  # noqa: E402
+from config import load_seed_manifest, settings  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+UUID_PATTERN = (
+    r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+)
+# Path segments that are followed by a document id (UUID or numeric public id).
+DOCUMENT_ID_PATH = re.compile(
+    r"^(/api/(?:document|get_assignments)/)(" + UUID_PATTERN + r"|\d+)(?=/|$)"
+)
+EXPORT_JOB_ID_PATH = re.compile(r"(/export_jobs/)(" + UUID_PATTERN + r")(?=/|$)")
+UUID = re.compile(UUID_PATTERN)
+NUMBER_SEGMENT = re.compile(r"(?<=/)\d+(?=/|$)")
+# Field positions in a raw ALB access log line (see alb_access_logs_ddl.sql).
+ALB_TIME, ALB_REQUEST, ALB_USER_AGENT, ALB_REQUEST_CREATION_TIME = 1, 12, 13, 21
+DEFAULT_MAX_CONCURRENCY = 500
+
+
+@dataclass
+class LoggedRequest:
+    at: float  # seconds since the epoch
+    method: str
+    path: str  # path + query string
+    user_agent: str = ""
+
+
+def _parse_time(value: str) -> float:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def _path_of(url: str) -> str:
+    parts = urlsplit(url)
+    return parts.path + (f"?{parts.query}" if parts.query else "")
+
+
+def parse_alb_line(line: str) -> LoggedRequest | None:
+    """One raw ALB access log entry, or None if it is malformed."""
+    try:
+        fields = shlex.split(line)
+        method, url, _proto = fields[ALB_REQUEST].split(" ", 2)
+        created = fields[ALB_REQUEST_CREATION_TIME]
+        at = _parse_time(created if created != "-" else fields[ALB_TIME])
+    except (ValueError, IndexError):
+        return None
+    return LoggedRequest(at, method, _path_of(url), fields[ALB_USER_AGENT])
+
+
+def read_slice(path: str) -> list[LoggedRequest]:
+    """Requests in a log slice, sorted by arrival time.
+
+    CSV files must have a header with ``request_verb``, ``request_url`` and
+    ``request_creation_time`` or ``time`` (the Athena export); anything else is
+    read as raw ALB log lines.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", newline="") as f:
+        if path.endswith((".csv", ".csv.gz")):
+            entries = []
+            for row in csv.DictReader(f):
+                created = row.get("request_creation_time") or ""
+                entries.append(
+                    LoggedRequest(
+                        at=_parse_time(
+                            created if created not in ("", "-") else row["time"]
+                        ),
+                        method=row["request_verb"],
+                        path=_path_of(row["request_url"]),
+                        user_agent=row.get("user_agent", ""),
+                    )
+                )
+        else:
+            entries = [e for e in map(parse_alb_line, f) if e is not None]
+    return sorted(entries, key=lambda e: e.at)
+
+
+def is_replayable(entry: LoggedRequest) -> bool:
+    return (
+        entry.method == "GET"
+        and entry.path.startswith("/api/")
+        and not entry.user_agent.startswith("districtr-stress-test/")
+    )
+
+
+def route_name(path: str) -> str:
+    """Route of an (anonymized) path, named like the harness's Locust stats."""
+    path = UUID.sub("{id}", path.split("?", 1)[0])
+    path = DOCUMENT_ID_PATH.sub(r"\1{id}", path)
+    return NUMBER_SEGMENT.sub("{n}", path)
+
+
+class DocumentMapper:
+    """Consistent production -> seeded document id mapping.
+
+    Documents are assigned to seed documents round-robin in the order they
+    first appear. Numeric public ids map to the seed document's public id
+    (when it has one), so public reads still take the public code path.
+    Export job ids map to random UUIDs, one per production job, so polling
+    the same job repeatedly still hits the same (replayed) path.
+    """
+
+    def __init__(self, seed_documents: list[dict]):
+        if not seed_documents:
+            raise ValueError("no seed documents to map production documents onto")
+        self._seeds = cycle(seed_documents)
+        self._mapping: dict[str, dict] = {}
+        self._export_jobs: dict[str, str] = {}
+
+    def _seed_for(self, document_id: str) -> dict:
+        if document_id not in self._mapping:
+            self._mapping[document_id] = next(self._seeds)
+        return self._mapping[document_id]
+
+    def _export_job_for(self, job_id: str) -> str:
+        if job_id not in self._export_jobs:
+            self._export_jobs[job_id] = str(uuid.uuid4())
+        return self._export_jobs[job_id]
+
+    def anonymize(self, path: str) -> str:
+        def replace_document(match: re.Match) -> str:
+            original = match.group(2)
+            seed = self._seed_for(original)
+            if original.isdigit() and seed.get("public_id") is not None:
+                return match.group(1) + str(seed["public_id"])
+            return match.group(1) + seed["document_id"]
+
+        path, _, query = path.partition("?")
+        path = DOCUMENT_ID_PATH.sub(replace_document, path)
+        path = EXPORT_JOB_ID_PATH.sub(
+            lambda m: m.group(1) + self._export_job_for(m.group(2).lower()), path
+        )
+        if not query:
+            return path
+        # A UUID in the query string is a document id too.
+        query = UUID.sub(lambda m: self._seed_for(m.group(0))["document_id"], query)
+        return f"{path}?{query}"
+
+    @property
+    def documents_seen(self) -> int:
+        return len(self._mapping)
+
+
+def resolve_public_ids(
+    http: requests.Session, base_url: str, seed_documents: list[dict]
+) -> None:
+    """Fill in ``public_id`` of each seed document from the API."""
+    for doc in seed_documents:
+        if "public_id" in doc:
+            continue
+        resp = http.get(f"{base_url}/api/document/{doc['document_id']}", timeout=60)
+        resp.raise_for_status()
+        doc["public_id"] = resp.json().get("public_id")
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[round(q * 100) - 1]
+
+
+def summarize(samples: dict[str, list[tuple[float, bool]]], duration: float) -> dict:
+    """Per-route stats in the shape of ``slo.route_stats``."""
+    routes = {}
+    for route, results in samples.items():
+        latencies = [ms for ms, _ok in results]
+        failures = sum(1 for _ms, ok in results if not ok)
+        stats = {
+            "requests": len(results),
+            "failures": failures,
+            "error_rate": round(failures / len(results), 4),
+            "rps": round(len(results) / duration, 3) if duration else 0.0,
+        }
+        for key, q in slo.PERCENTILES.items():
+            stats[key] = round(_percentile(latencies, q))
+        routes[route] = stats
+    return routes
+
+
+def replay(
+    entries: list[LoggedRequest],
+    mapper: DocumentMapper,
+    base_url: str,
+    speedup: float = 1.0,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    timeout: float = 180.0,
+) -> dict:
+    """Send ``entries`` on their original (compressed) schedule.
+
+    Returns slo-style results plus the schedule lag: how late requests went
+    out relative to their planned offset. A growing lag means the replay
+    client, not the server, is the bottleneck (raise ``max_concurrency``).
+    """
+    http = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=max_concurrency, pool_maxsize=max_concurrency
+    )
+    http.mount("http://", adapter)
+    http.mount("https://", adapter)
+    headers = {"User-Agent": f"{settings.user_agent}-replay"}
+
+    samples: dict[str, list[tuple[float, bool]]] = {}
+    lags: list[float] = []
+    pool = Pool(max_concurrency)
+    t0 = entries[0].at
+    start = time.monotonic()
+
+    def send(entry: LoggedRequest, path: str, due: float) -> None:
+        lags.append(max(0.0, time.monotonic() - due))
+        begin = time.monotonic()
+        try:
+            resp = http.get(
+                base_url + path, headers=headers, timeout=timeout, allow_redirects=False
+            )
+            ok = resp.status_code < 400
+        except requests.RequestException:
+            ok = False
+        samples.setdefault(slo.route_key("GET", route_name(path)), []).append(
+            ((time.monotonic() - begin) * 1000, ok)
+        )
+
+    for entry in entries:
+        due = start + (entry.at - t0) / speedup
+        gevent.sleep(max(0.0, due - time.monotonic()))
+        pool.spawn(send, entry, mapper.anonymize(entry.path), due)
+    pool.join()
+
+    duration = time.monotonic() - start
+    return {
+        "run_id": settings.RUN_ID,
+        "scenario": {
+            "replay_requests": len(entries),
+            "speedup": speedup,
+            "slice_seconds": round(entries[-1].at - t0, 3),
+        },
+        "routes": summarize(samples, duration),
+        "schedule_lag_ms": {
+            "p50": round(_percentile(lags, 0.5) * 1000),
+            "p99": round(_percentile(lags, 0.99) * 1000),
+            "max": round(max(lags) * 1000),
+        },
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("slice", help="ALB log file (.log/.gz) or Athena CSV export")
+    parser.add_argument("--base-url", default=settings.BASE_URL)
+    parser.add_argument(
+        "--seed-manifest",
+        default=settings.seed_manifest_path,
+        help="Seed manifest whose documents production documents are mapped onto",
+    )
+    parser.add_argument(
+        "--speedup",
+        type=float,
+        default=1.0,
+        help="Time compression: 4 replays an hour of traffic in 15 minutes",
+    )
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY)
+    parser.add_argument("--limit", type=int, help="Replay only the first N requests")
+    parser.add_argument("--results", help="Write slo-style results JSON here")
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print the anonymized route mix without sending anything",
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    entries = read_slice(args.slice)
+    replayable = [e for e in entries if is_replayable(e)][: args.limit]
+    if not replayable:
+        logger.error("No replayable requests in %s", args.slice)
+        return 1
+    logger.info(
+        "%d of %d logged requests are replayable (GET /api/*, non-harness), "
+        "spanning %.0fs; replaying at %gx",
+        len(replayable),
+        len(entries),
+        replayable[-1].at - replayable[0].at,
+        args.speedup,
+    )
+
+    seeds = [
+        doc
+        for doc in load_seed_manifest(args.seed_manifest)
+        if "view" in doc.get("use", ["view"])
+    ]
+    mapper = DocumentMapper(seeds)
+
+    if args.dry_run:
+        mix: dict[str, int] = {}
+        for entry in replayable:
+            route = slo.route_key("GET", route_name(mapper.anonymize(entry.path)))
+            mix[route] = mix.get(route, 0) + 1
+        for route, count in sorted(mix.items(), key=lambda item: -item[1]):
+            print(f"{count:>8}  {route}")
+        print(f"{mapper.documents_seen} documents -> {len(seeds)} seed documents")
+        return 0
+
+    with requests.Session() as http:
+        resolve_public_ids(http, args.base_url, seeds)
+    results = replay(
+        replayable,
+        mapper,
+        args.base_url,
+        speedup=args.speedup,
+        max_concurrency=args.max_concurrency,
+    )
+    print(slo.format_results(results))
+    print(
+        "schedule lag (ms): "
+        + ", ".join(f"{k}={v}" for k, v in results["schedule_lag_ms"].items())
+    )
+    if args.results:
+        slo.write_json(args.results, results)
+        logger.info("Results written to %s", args.results)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
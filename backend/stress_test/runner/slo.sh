@@ -0,0 +1,57 @@
+#!/usr/bin/env bash
+# SLO regression run against the LOCAL docker-compose stack: seeds the fixture
+# plans, replays the fixed scenario from slo.json headless, writes per-route
+# p50/p95/p99, error rate and throughput to artifacts/<RUN_ID>/slo_results.json
+# and exits non-zero if any route breaks its SLO or regressed against
+# fixtures/slo_baseline.json (see slo.py).
+#
+#   ./runner/slo.sh                     # check against the committed baseline
+#   UPDATE_BASELINE=1 ./runner/slo.sh   # re-record the baseline (commit it)
+set -euo pipefail
+
+cd "$(dirname "$0")/.."  # backend/stress_test
+PY="${PY:-venv/bin/python}"
+LOCUST="${LOCUST:-venv/bin/locust}"
+
+RUN_ID="${RUN_ID:-slo-$(date +%Y%m%d%H%M%S)}"
+ART="artifacts/${RUN_ID}"
+mkdir -p "$ART"
+
+# The scenario is fixed by slo.json so runs are comparable with the baseline.
+read -r SCALE WINDOW_SECONDS RNG_SEED TOTAL < <("$PY" -c "
+import json, scenario as s
+c = json.load(open('slo.json'))['scenario']
+scale = c['scale']
+total = s.scaled(s.VIEWERS, scale) + s.scaled(s.EVAL_USERS, scale) + s.scaled(s.EDITORS, scale)
+print(scale, c['window_seconds'], c['rng_seed'], total)
+")
+DURATION=$(( WINDOW_SECONDS + 60 ))  # tail for in-flight sessions
+
+export STRESS_RUN_ID="$RUN_ID" STRESS_SCALE="$SCALE" \
+  STRESS_WINDOW_SECONDS="$WINDOW_SECONDS" STRESS_RNG_SEED="$RNG_SEED" \
+  STRESS_BASE_URL="${BASE_URL:-http://localhost:8000}" \
+  STRESS_CONFIG_URL="${CONFIG_URL:-fixtures/local_config.json}" \
+  STRESS_SLO_RESULTS="$ART/slo_results.json"
+# When re-recording, the check runs once below against the SLOs only.
+if [ -z "${UPDATE_BASELINE:-}" ]; then
+  export STRESS_SLO_CHECK=1
+fi
+echo "run_id=$RUN_ID scale=$SCALE window=${WINDOW_SECONDS}s users=$TOTAL -> $ART/"
+
+"$PY" smoke_seed.py
+
+set +e
+"$LOCUST" --headless -f locustfile.py \
+  -u "$TOTAL" -r "$TOTAL" -t "${DURATION}s" \
+  --csv "$ART/$RUN_ID" --html "$ART/$RUN_ID.html" 2>&1 | tee "$ART/locust.log"
+LOCUST_EXIT=${PIPESTATUS[0]}
+set -e
+
+if [ -n "${UPDATE_BASELINE:-}" ]; then
+  [ "$LOCUST_EXIT" -eq 0 ] || { echo "locust exit code: $LOCUST_EXIT" >&2; exit "$LOCUST_EXIT"; }
+  "$PY" slo.py "$ART/slo_results.json" --update-baseline
+  exit $?
+fi
+
+echo "locust exit code: $LOCUST_EXIT"
+exit "$LOCUST_EXIT"
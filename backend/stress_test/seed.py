@@ -102,8 +102,8 @@ def seed_documents(
             data=msgpack.packb(
                 {
                     "document_id": doc["document_id"],
-                    "assignments": assignments,
                     "last_updated_at": doc["updated_at"],
+                    "assignments": assignments,
                 }
             ),
             headers={**headers, "Content-Type": "application/msgpack"},
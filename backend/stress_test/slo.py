@@ -0,0 +1,185 @@
+"""SLO regression check for headless stress runs.
+
+A regression run (`runner/slo.sh`) replays the fixed scenario in `slo.json`
+against a local docker-compose stack. On exit the locustfile writes per-route
+p50/p95/p99 latency, error rate and throughput to ``STRESS_SLO_RESULTS`` and,
+with ``STRESS_SLO_CHECK=1``, compares them with:
+
+- the absolute per-route thresholds in `slo.json` (``max_p95_ms``,
+  ``max_p99_ms``, ``max_error_rate``), and
+- the committed baseline (`fixtures/slo_baseline.json`): a latency percentile
+  may not exceed ``baseline * latency_ratio + latency_slack_ms`` and
+  throughput may not drop below ``baseline * throughput_ratio``.
+
+Any violation makes Locust exit 1. The same check runs standalone on a saved
+results file, which is also how the baseline is refreshed:
+
+    python slo.py artifacts/<run-id>/slo_results.json
+    python slo.py artifacts/<run-id>/slo_results.json --update-baseline
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SLO_PATH = os.path.join(HERE, "slo.json")
+DEFAULT_BASELINE_PATH = os.path.join(HERE, "fixtures", "slo_baseline.json")
+PERCENTILES = {"p50_ms": 0.5, "p95_ms": 0.95, "p99_ms": 0.99}
+
+
+def route_key(method: str, name: str) -> str:
+    return f"{method} {name}"
+
+
+def load_json(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_json(path: str, data: dict) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def route_stats(entry) -> dict:
+    """Summary of one Locust `StatsEntry`."""
+    stats = {
+        "requests": entry.num_requests,
+        "failures": entry.num_failures,
+        "error_rate": round(entry.fail_ratio, 4),
+        "rps": round(entry.total_rps, 3),
+    }
+    for key, percentile in PERCENTILES.items():
+        stats[key] = (
+            entry.get_response_time_percentile(percentile)
+            if entry.num_requests
+            else None
+        )
+    return stats
+
+
+def collect_results(stats, run_id: str, scenario: dict) -> dict:
+    """Per-route results of a finished run from Locust's `RequestStats`."""
+    return {
+        "run_id": run_id,
+        "finished_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "scenario": scenario,
+        "routes": {
+            route_key(entry.method, entry.name): route_stats(entry)
+            for entry in stats.entries.values()
+        },
+    }
+
+
+def check(results: dict, slo: dict, baseline: dict | None) -> list[str]:
+    """Problems with ``results`` against ``slo`` and ``baseline``; empty if none."""
+    problems = []
+    regression = slo.get("regression", {})
+    latency_ratio = regression.get("latency_ratio", 1.25)
+    latency_slack_ms = regression.get("latency_slack_ms", 0)
+    throughput_ratio = regression.get("throughput_ratio", 0.8)
+
+    if baseline is not None and baseline.get("scenario") != results.get("scenario"):
+        problems.append(
+            f"baseline scenario {baseline.get('scenario')} does not match "
+            f"run scenario {results.get('scenario')}; re-record the baseline"
+        )
+        baseline = None
+    baseline_routes = (baseline or {}).get("routes", {})
+
+    for route, limits in slo["routes"].items():
+        stats = results["routes"].get(route)
+        if not stats or not stats["requests"]:
+            problems.append(f"{route}: no requests")
+            continue
+
+        if stats["error_rate"] > limits.get("max_error_rate", 0):
+            problems.append(
+                f"{route}: error rate {stats['error_rate']:.2%} > "
+                f"{limits.get('max_error_rate', 0):.2%}"
+            )
+        for key in ("p95_ms", "p99_ms"):
+            limit = limits.get(f"max_{key}")
+            if limit is not None and stats[key] > limit:
+                problems.append(f"{route}: {key} {stats[key]:.0f} > SLO {limit:.0f}")
+
+        base = baseline_routes.get(route)
+        if not base:
+            continue
+        for key in PERCENTILES:
+            if base.get(key) is None:
+                continue
+            allowed = base[key] * latency_ratio + latency_slack_ms
+            if stats[key] > allowed:
+                problems.append(
+                    f"{route}: {key} {stats[key]:.0f} > {allowed:.0f} "
+                    f"(baseline {base[key]:.0f})"
+                )
+        if base.get("rps") and stats["rps"] < base["rps"] * throughput_ratio:
+            problems.append(
+                f"{route}: throughput {stats['rps']:.2f}/s < "
+                f"{base['rps'] * throughput_ratio:.2f}/s (baseline {base['rps']:.2f}/s)"
+            )
+    return problems
+
+
+def format_results(results: dict, baseline: dict | None = None) -> str:
+    """Fixed-width table of per-route results, with baseline values in brackets."""
+    baseline_routes = (baseline or {}).get("routes", {})
+    columns = ["requests", "error_rate", "rps", *PERCENTILES]
+    header = ["route", *columns]
+    rows = []
+    for route, stats in sorted(results["routes"].items()):
+        base = baseline_routes.get(route, {})
+        row = [route]
+        for column in columns:
+            value = "-" if stats[column] is None else f"{stats[column]:g}"
+            if base.get(column) is not None:
+                value += f" [{base[column]:g}]"
+            row.append(value)
+        rows.append(row)
+    widths = [max(len(r[i]) for r in [header, *rows]) for i in range(len(header))]
+    return "\n".join(
+        "  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip()
+        for row in [header, *rows]
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("results", help="slo_results.json written by the locustfile")
+    parser.add_argument("--slo", default=DEFAULT_SLO_PATH)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH)
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Replace the baseline with these results if they meet the SLOs",
+    )
+    args = parser.parse_args(argv)
+
+    results = load_json(args.results)
+    slo = load_json(args.slo)
+    baseline = load_json(args.baseline) if os.path.exists(args.baseline) else None
+    print(format_results(results, baseline))
+
+    problems = check(results, slo, None if args.update_baseline else baseline)
+    if problems:
+        print("SLO CHECK FAILED:\n  " + "\n  ".join(problems), file=sys.stderr)
+        return 1
+    if args.update_baseline:
+        write_json(args.baseline, results)
+        print(f"Baseline updated: {args.baseline}")
+    else:
+        print("SLO CHECK PASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
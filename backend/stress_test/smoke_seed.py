@@ -49,8 +49,8 @@ def main() -> None:
             data=msgpack.packb(
                 {
                     "document_id": doc["document_id"],
-                    "assignments": pairs,
                     "last_updated_at": doc["updated_at"],
+                    "assignments": pairs,
                 }
             ),
             headers={**headers, "Content-Type": "application/msgpack"},
@@ -4,6 +4,7 @@ import pytest
 import msgpack
 from app.main import app
 from app.core.db import get_session
+from app.core.registry import REGISTRY
 from app.core.security import auth
 from fastapi.testclient import TestClient
 from sqlalchemy.event import listens_for
@@ -49,6 +50,11 @@ class MsgpackAwareTestClient(TestClient):
     def put(self, url, *args, **kwargs):
         if url.rstrip("/").endswith("/api/assignments") and "json" in kwargs:
             payload = kwargs.pop("json")
+            if isinstance(payload, dict) and "assignments" in payload:
+                # Encode assignments last, as the frontend does.
+                assignments = payload["assignments"]
+                payload = {k: v for k, v in payload.items() if k != "assignments"}
+                payload["assignments"] = assignments
             kwargs["content"] = msgpack.packb(payload, use_bin_type=True)
             headers = dict(kwargs.get("headers") or {})
             headers["Content-Type"] = "application/msgpack"
@@ -260,6 +266,8 @@ def rollback_session(engine):
 
 @pytest.fixture
 def session(request):
+    # Map rows and gerrydb tables are recreated per test; drop cached metadata.
+    REGISTRY.invalidate()
     if TEARDOWN_TEST_DB:
         return request.getfixturevalue("rollback_session")
     else:
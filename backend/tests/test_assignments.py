@@ -1,7 +1,17 @@
+import anyio
+import msgpack
 import networkx as nx
 import pytest
 
 from app.assignments.assignments import _detect_outlier_labels, _heal_or_fill
+from app.assignments.ingest import (
+    COPY_BATCH_ROWS,
+    AssignmentRowError,
+    AssignmentsDecodeError,
+    AssignmentsStreamDecoder,
+    copy_assignment_stream,
+    read_until_assignments,
+)
 
 
 @pytest.fixture
@@ -113,3 +123,147 @@ def test_dense_plan_untouched():
 
 def test_non_numeric_labels_ignored_by_detection():
     assert _detect_outlier_labels({"District A", "District B"}, 8) == set()
+
+
+# --- streaming PUT /api/assignments decoder ---
+
+
+def _decode(body: bytes, chunk_size: int):
+    decoder = AssignmentsStreamDecoder()
+    rows = []
+    for i in range(0, len(body), chunk_size):
+        rows.extend(decoder.feed(body[i : i + chunk_size]))
+    decoder.close()
+    return decoder, rows
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 17, 1 << 20])
+def test_stream_decoder_any_chunking(chunk_size):
+    payload = {
+        "document_id": "abc",
+        "last_updated_at": "2025-01-01T00:00:00",
+        "comments": [{"zone": 1, "text": "hi"}],
+        "assignments": [["g1", 1], ["g2", None], ["g3"]]
+        + [[f"x{i}", i % 7] for i in range(500)],
+    }
+    decoder, rows = _decode(msgpack.packb(payload), chunk_size)
+    assert rows[:3] == [("g1", 1), ("g2", None), ("g3", None)]
+    assert len(rows) == decoder.row_count == 503
+    assert decoder.has_assignments_key
+    assert decoder.header == {k: v for k, v in payload.items() if k != "assignments"}
+
+
+@pytest.mark.parametrize(
+    "row", [[1, 2], ["g1", "2"], ["g1", True], ["g1", 1, 2], [], "g1"]
+)
+def test_stream_decoder_rejects_bad_rows(row):
+    body = msgpack.packb({"assignments": [["ok", 1], row]})
+    with pytest.raises(AssignmentRowError) as exc:
+        _decode(body, 1 << 20)
+    assert exc.value.errors()[0]["loc"] == ["assignments", 1]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b"\xc1",
+        msgpack.packb([["g1", 1]]),
+        msgpack.packb({"assignments": []})[:-1],
+        msgpack.packb({"assignments": []}) + b"\x00",
+        msgpack.packb({1: "a"}),
+        # `assignments` must be the last key.
+        msgpack.packb({"assignments": [], "map_type": "community"}),
+    ],
+)
+def test_stream_decoder_rejects_malformed_bodies(body):
+    with pytest.raises(AssignmentsDecodeError):
+        _decode(body, 1 << 20)
+
+
+async def _chunks(body: bytes, chunk_size: int):
+    for i in range(0, len(body), chunk_size):
+        yield body[i : i + chunk_size]
+
+
+def test_read_until_assignments_returns_header_first():
+    payload = {
+        "document_id": "abc",
+        "last_updated_at": "2025-01-01T00:00:00",
+        "assignments": [[f"g{i}", 1] for i in range(100)],
+    }
+
+    async def read():
+        decoder = AssignmentsStreamDecoder()
+        chunks = _chunks(msgpack.packb(payload), 64)
+        rows = await read_until_assignments(decoder, chunks)
+        return decoder, rows, chunks
+
+    decoder, rows, chunks = anyio.run(read)
+    assert decoder.header == {
+        "document_id": "abc",
+        "last_updated_at": "2025-01-01T00:00:00",
+    }
+    assert len(rows) < 100 and not decoder.done
+
+
+class _RecordingCopy:
+    """Stands in for the psycopg cursor/COPY pair of a SQLAlchemy Connection."""
+
+    def __init__(self, fail_after: int | None = None):
+        self.rows = []
+        self.statements = []
+        self.fail_after = fail_after
+        self.connection = self
+
+    def execute(self, statement):
+        self.statements.append(str(statement))
+
+    def cursor(self):
+        return self
+
+    def copy(self, statement):
+        self.statements.append(statement)
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def write_row(self, row):
+        if self.fail_after is not None and len(self.rows) >= self.fail_after:
+            raise RuntimeError("copy failed")
+        self.rows.append(row)
+
+
+def _copy(body: bytes, connection: _RecordingCopy):
+    async def copy():
+        decoder = AssignmentsStreamDecoder()
+        chunks = _chunks(body, 1024)
+        rows = await read_until_assignments(decoder, chunks)
+        await copy_assignment_stream(decoder, chunks, rows, connection, "temp_x")
+        return decoder
+
+    return anyio.run(copy)
+
+
+def test_copy_assignment_stream_copies_every_row():
+    assignments = [[f"g{i}", i % 5] for i in range(3 * COPY_BATCH_ROWS + 7)]
+    connection = _RecordingCopy()
+    decoder = _copy(msgpack.packb({"assignments": assignments}), connection)
+    assert decoder.row_count == len(assignments)
+    assert connection.rows == [tuple(row) for row in assignments]
+    assert "CREATE TEMP TABLE temp_x" in connection.statements[0]
+
+
+def test_copy_assignment_stream_raises_decode_errors_after_copy():
+    body = msgpack.packb({"assignments": [["ok", 1]] * 10 + [[1, 2]]})
+    with pytest.raises(AssignmentRowError):
+        _copy(body, _RecordingCopy())
+
+
+def test_copy_assignment_stream_raises_copy_errors():
+    assignments = [[f"g{i}", 1] for i in range(20 * COPY_BATCH_ROWS)]
+    with pytest.raises(RuntimeError, match="copy failed"):
+        _copy(msgpack.packb({"assignments": assignments}), _RecordingCopy(10))
@@ -1,6 +1,17 @@
-from sqlmodel import Session, select, insert
+from sqlalchemy import event
+from sqlmodel import Session, select, insert, update
 from unittest.mock import patch
-from app.comments.models import Commenter, Comment, Tag, CommentTag, DocumentComment
+from app.core.config import settings
+from app.comments.main import _like_pattern, sync_district_comments
+from app.comments.models import (
+    Commenter,
+    Comment,
+    Tag,
+    CommentTag,
+    DocumentComment,
+    DistrictCommentInput,
+)
+from tests.utils import fixed_moderation_scores
 from tests.test_utils import (
     patch_recaptcha,
     override_auth_dependency,
@@ -18,8 +29,11 @@ REQUIRED_AUTO_FIXTURES = [
 class TestCommenterEndpoint:
     """Tests for the /api/comments/commenter endpoint"""
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
-    def test_create_commenter_success(self, mock_score_text, client, session: Session):
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
+    def test_create_commenter_success(self, mock_score_texts, client, session: Session):
         """Test successful commenter creation"""
         commenter_data = {
             "first_name": "John",
@@ -58,7 +72,10 @@ class TestCommenterEndpoint:
         assert db_commenter.first_name == "John"
         assert db_commenter.email == "john@example.com"
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_create_commenter_minimal_data(
         self, mock_score_test, client, session: Session
     ):
@@ -81,7 +98,10 @@ class TestCommenterEndpoint:
         assert data["state"] is None
         assert data["zip_code"] is None
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_create_commenter_upsert_on_conflict(
         self, mock_score_test, client, session: Session
     ):
@@ -124,10 +144,13 @@ class TestCommenterEndpoint:
         assert len(commenters) == 1
         assert commenters[0].place == "Los Angeles"
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_create_commenter_invalid_email(
         self,
-        mock_score_text,
+        mock_score_texts,
         client,
     ):
         """Test commenter creation with invalid email format"""
@@ -140,10 +163,13 @@ class TestCommenterEndpoint:
         # Should fail due to database email validation constraint
         assert response.status_code in [400, 422, 500]  # Various possible error codes
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_create_commenter_empty_required_fields(
         self,
-        mock_score_text,
+        mock_score_texts,
         client,
     ):
         """Test commenter creation with empty required fields"""
@@ -160,10 +186,13 @@ class TestCommenterEndpoint:
             )
             assert response.status_code in [400, 422, 500]
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_create_commenter_missing_required_fields(
         self,
-        mock_score_text,
+        mock_score_texts,
         client,
     ):
         """Test commenter creation with missing required fields"""
@@ -184,7 +213,10 @@ class TestCommenterEndpoint:
 class TestCommentEndpoint:
     """Tests for the /api/comments/comment endpoint"""
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_create_comment_success(self, mock_score_test, client, session: Session):
         """Test successful comment creation"""
         comment_data = {
@@ -212,7 +244,10 @@ class TestCommentEndpoint:
         assert db_comment.comment == "This is a test comment with some content."
         assert db_comment.commenter_id is None  # Should be null as specified
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_create_comment_on_document_success(
         self, mock_score_test, client, document_id, session: Session
     ):
@@ -248,7 +283,10 @@ class TestCommentEndpoint:
         assert db_document_comment.comment_id == db_comment.id
         assert db_document_comment.document_id == document_id, response.json()
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_create_comment_long_content(
         self, mock_score_test, client, session: Session
     ):
@@ -265,10 +303,13 @@ class TestCommentEndpoint:
         data = response.json()
         assert data["comment"] == long_content
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_create_comment_too_long_content(
         self,
-        mock_score_text,
+        mock_score_texts,
         client,
     ):
         """Test comment creation with content exceeding limit"""
@@ -282,10 +323,13 @@ class TestCommentEndpoint:
         # Should fail due to database constraint
         assert response.status_code in [400, 422, 500]
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_create_comment_missing_required_fields(
         self,
-        mock_score_text,
+        mock_score_texts,
         client,
     ):
         """Test comment creation with missing required fields"""
@@ -302,10 +346,13 @@ class TestCommentEndpoint:
             )
             assert response.status_code == 422
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_create_comment_with_zone_and_document(
         self,
-        mock_score_text,
+        mock_score_texts,
         document_id,
         client,
         session,
@@ -334,10 +381,62 @@ class TestCommentEndpoint:
         assert document_info2["document_comments"][0]["zone"] == 1
         assert document_info2["document_comments"][0]["text"] == "Hello, world!"
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
+    def test_document_comment_moderation_placeholder(
+        self,
+        mock_score_texts,
+        document_id,
+        client,
+        session,
+    ):
+        """Edit reads see a moderated comment's text; public reads the placeholder."""
+        document_info = client.get(f"/api/document/{document_id}").json()
+        response = client.put(
+            "/api/assignments",
+            json={
+                "assignments": [["geo_id", 1]],
+                "document_id": document_id,
+                "comments": [{"text": "Hello, world!", "zone": 1}],
+                "last_updated_at": document_info["updated_at"],
+            },
+        )
+        assert response.status_code == 200
+        comment_id = client.get(f"/api/document/{document_id}").json()[
+            "document_comments"
+        ][0]["comment_id"]
+        session.exec(
+            update(Comment)
+            .where(Comment.id == int(comment_id))
+            .values(moderation_score=0.99)
+        )
+        session.commit()
+
+        edit_view = client.get(f"/api/document/{document_id}").json()
+        assert edit_view["document_comments"][0]["text"] == "Hello, world!"
+        assert edit_view["document_comments"][0]["moderated"] is True
+
+        public_view = client.get(f"/api/document/{document_info['public_id']}").json()
+        assert public_view["document_comments"] == [
+            {
+                "comment_id": comment_id,
+                "zone": 1,
+                "text": "Comment removed due to moderation.",
+                "moderated": True,
+                "created_at": public_view["document_comments"][0]["created_at"],
+                "updated_at": public_view["document_comments"][0]["updated_at"],
+            }
+        ]
+
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_create_comment_empty_required_fields(
         self,
-        mock_score_text,
+        mock_score_texts,
         client,
     ):
         """Test comment creation with empty required fields"""
@@ -358,7 +457,10 @@ class TestCommentEndpoint:
 class TestTagEndpoint:
     """Tests for the /api/comments/tag endpoint"""
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_create_tag_success(self, mock_score_test, client, session: Session):
         """Test successful tag creation"""
         tag_data = {"tag": "Important Issue"}
@@ -378,7 +480,10 @@ class TestTagEndpoint:
         db_tag = session.exec(stmt).one()
         assert db_tag.slug == "important-issue"
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_create_tag_conflict_success(
         self, mock_score_test, client, session: Session
     ):
@@ -406,7 +511,10 @@ class TestTagEndpoint:
         db_tag = session.exec(stmt).one()
         assert db_tag.slug == "important-issue"
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_create_tag_with_special_characters(
         self, mock_score_test, client, session: Session
     ):
@@ -423,7 +531,10 @@ class TestTagEndpoint:
         # Special characters should be removed, spaces converted to dashes
         assert data["slug"] == "budget-finance"
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_create_tag_with_multiple_spaces(
         self, mock_score_test, client, session: Session
     ):
@@ -440,7 +551,10 @@ class TestTagEndpoint:
         # Multiple spaces should be converted to single dashes
         assert data["slug"] == "housing-and-development"
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_create_tag_duplicate_returns_existing(
         self, mock_score_test, client, session: Session
     ):
@@ -470,7 +584,10 @@ class TestTagEndpoint:
         tags = session.exec(stmt).all()
         assert len(tags) == 1
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_create_tag_mixed_case_and_spacing(
         self, mock_score_test, client, session: Session
     ):
@@ -487,10 +604,13 @@ class TestTagEndpoint:
         # Should be lowercased, trimmed, and slugified
         assert data["slug"] == "public-safety-security"
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_create_tag_empty_string(
         self,
-        mock_score_text,
+        mock_score_texts,
         client,
     ):
         """Test tag creation with empty string"""
@@ -508,10 +628,13 @@ class TestTagEndpoint:
             # Should fail because slugify returns null/empty for invalid input
             assert response.status_code in [400, 422, 500], response.json()
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_create_tag_missing_required_field(
         self,
-        mock_score_text,
+        mock_score_texts,
         client,
     ):
         """Test tag creation with missing required field"""
@@ -520,7 +643,10 @@ class TestTagEndpoint:
         )
         assert response.status_code == 422
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_create_tag_numbers_and_hyphens(
         self, mock_score_test, client, session: Session
     ):
@@ -541,7 +667,10 @@ class TestTagEndpoint:
 class TestIntegrationTests:
     """Integration tests for the comments system"""
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_create_full_comment_system_flow(
         self, mock_score_test, client, session: Session
     ):
@@ -603,9 +732,12 @@ class TestIntegrationTests:
 class TestFullCommentSubmissionEndpoint:
     """Tests for the /api/comments/submit endpoint"""
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_submit_full_comment_success(
-        self, mock_score_text, client, session: Session
+        self, mock_score_texts, client, session: Session
     ):
         """Test successful full comment submission"""
         form_data = {
@@ -668,9 +800,12 @@ class TestFullCommentSubmissionEndpoint:
         associations = session.exec(associations_stmt).all()
         assert len(associations) == 3
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_submit_full_comment_minimal_data(
-        self, mock_score_text, client, session: Session
+        self, mock_score_texts, client, session: Session
     ):
         """Test full comment submission with minimal required data"""
         form_data = {
@@ -693,9 +828,12 @@ class TestFullCommentSubmissionEndpoint:
         assert len(data["tags"]) == 1
         assert data["tags"][0]["slug"] == "general"
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_submit_full_comment_no_tags(
-        self, mock_score_text, client, session: Session
+        self, mock_score_texts, client, session: Session
     ):
         """Test full comment submission with empty tags list"""
         form_data = {
@@ -717,9 +855,12 @@ class TestFullCommentSubmissionEndpoint:
         assert data["comment"]["title"] == "No Tags Comment"
         assert len(data["tags"]) == 0
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_submit_full_comment_upsert_commenter(
-        self, mock_score_text, client, session: Session
+        self, mock_score_texts, client, session: Session
     ):
         """Test that submitting with existing commenter updates their info"""
         # First submission
@@ -770,9 +911,12 @@ class TestFullCommentSubmissionEndpoint:
         assert len(commenters) == 1
         assert commenters[0].place == "Los Angeles"
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_submit_full_comment_duplicate_tags(
-        self, mock_score_text, client, session: Session
+        self, mock_score_texts, client, session: Session
     ):
         """Test submission with duplicate tag names"""
         form_data = {
@@ -800,10 +944,13 @@ class TestFullCommentSubmissionEndpoint:
         assert "environment" in tag_slugs
         assert "environment-climate" in tag_slugs
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_submit_full_comment_invalid_commenter_email(
         self,
-        mock_score_text,
+        mock_score_texts,
         client,
     ):
         """Test submission with invalid commenter email"""
@@ -817,10 +964,13 @@ class TestFullCommentSubmissionEndpoint:
         response = client.post("/api/comments/submit", json=form_data)
         assert response.status_code == 422
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_submit_full_comment_missing_required_fields(
         self,
-        mock_score_text,
+        mock_score_texts,
         client,
     ):
         """Test submission with missing required fields"""
@@ -850,10 +1000,13 @@ class TestFullCommentSubmissionEndpoint:
             response = client.post("/api/comments/submit", json=form_data)
             assert response.status_code == 422
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_submit_full_comment_too_long_content(
         self,
-        mock_score_text,
+        mock_score_texts,
         client,
     ):
         """Test submission with comment content exceeding limit"""
@@ -875,9 +1028,12 @@ class TestFullCommentSubmissionEndpoint:
 class TestCommentListEndpoints:
     """Tests for the comment list endpoints with moderation filtering"""
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_list_comments_clean_content_only(
-        self, mock_score_text, client, session: Session, document_id
+        self, mock_score_texts, client, session: Session, document_id
     ):
         """Test that /list endpoint only returns comments with low moderation scores"""
         # Create a clean comment submission
@@ -911,13 +1067,13 @@ class TestCommentListEndpoints:
         assert comments[0]["title"] == "Clean Comment"
         assert comments[0]["first_name"] == "John"
 
-    @patch("app.comments.moderation.score_text")
+    @patch("app.comments.moderation.score_texts")
     def test_list_comments_filters_profane_content(
-        self, mock_score_text, client, session: Session, document_id
+        self, mock_score_texts, client, session: Session, document_id
     ):
         """Test that /list endpoint filters out comments with high moderation scores"""
         # First comment - profane (score 1.0)
-        mock_score_text.return_value = 1.0
+        mock_score_texts.side_effect = fixed_moderation_scores(1.0)
         profane_form_data = {
             "commenter": {
                 "first_name": "Bob",
@@ -937,7 +1093,7 @@ class TestCommentListEndpoints:
         assert response.status_code == 201
 
         # Second comment - clean (score TEST_MODERATION_SCORE)
-        mock_score_text.return_value = TEST_MODERATION_SCORE
+        mock_score_texts.side_effect = fixed_moderation_scores(TEST_MODERATION_SCORE)
         clean_form_data = {
             "commenter": {
                 "first_name": "Alice",
@@ -959,7 +1115,7 @@ class TestCommentListEndpoints:
 
         # Moderation runs in a background task on its own DB session, which cannot
         # write to this test's uncommitted rows; set the profane score on the shared
-        # session directly (score_text is mocked above regardless).
+        # session directly (score_texts is mocked above regardless).
         profane_comment = session.exec(
             select(Comment).where(Comment.title == "Profane Comment")
         ).one()
@@ -975,9 +1131,12 @@ class TestCommentListEndpoints:
         assert comments[0]["title"] == "Clean Comment"
         assert comments[0]["first_name"] == "Alice"
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_list_comments_with_filters(
-        self, mock_score_text, client, session: Session, document_id
+        self, mock_score_texts, client, session: Session, document_id
     ):
         """Test /list endpoint with various filters"""
         # Create comments with different attributes
@@ -1050,9 +1209,85 @@ class TestCommentListEndpoints:
         assert len(comments) == 1
         assert "education" in comments[0]["tags"]
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
+    def test_list_comments_search(
+        self, mock_score_texts, client, session: Session, document_id, monkeypatch
+    ):
+        """Test /list and /admin/list full-text search"""
+        for first_name, title, comment in [
+            ("Alice", "Keep the river together", "The districts split Riverside."),
+            ("Bob", "Transit corridor", "Please follow the bus lines."),
+        ]:
+            form_data = {
+                "commenter": {
+                    "first_name": first_name,
+                    "email": f"{first_name.lower()}@example.com",
+                },
+                "comment": {
+                    "title": title,
+                    "comment": comment,
+                    "document_id": document_id,
+                },
+                "recaptcha_token": "test_token",
+            }
+            response = client.post("/api/comments/submit", json=form_data)
+            assert response.status_code == 201
+            handle_full_submission_approve(client, response.json())
+
+        # Stemmed match on the comment body
+        response = client.get("/api/comments/list?search=district")
+        assert response.status_code == 200
+        comments = response.json()
+        assert len(comments) == 1
+        assert comments[0]["first_name"] == "Alice"
+
+        # Partial words match the trigram-indexed ILIKE
+        response = client.get("/api/comments/list?search=corrid")
+        assert response.status_code == 200
+        comments = response.json()
+        assert len(comments) == 1
+        assert comments[0]["title"] == "Transit corridor"
+
+        # LIKE wildcards in the search term are matched literally
+        response = client.get("/api/comments/list?search=%25")
+        assert response.status_code == 200
+        assert response.json() == []
+        response = client.get("/api/comments/list?search=bu_")
+        assert response.status_code == 200
+        assert response.json() == []
+
+        # Without substring search only full-text matches count
+        monkeypatch.setattr(settings, "COMMENT_SEARCH_SUBSTRING", False)
+        response = client.get("/api/comments/list?search=corrid")
+        assert response.status_code == 200
+        assert response.json() == []
+
+        # Searches title and comment text together
+        response = client.get("/api/comments/list?search=river")
+        assert response.status_code == 200
+        comments = response.json()
+        assert len(comments) == 1
+        assert comments[0]["first_name"] == "Alice"
+
+        response = client.get("/api/comments/admin/list?search=bus")
+        assert response.status_code == 200
+        comments = response.json()
+        assert len(comments) == 1
+        assert comments[0]["first_name"] == "Bob"
+
+        response = client.get("/api/comments/list?search=nonexistentterm")
+        assert response.status_code == 200
+        assert response.json() == []
+
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_admin_list_comments_success(
-        self, mock_score_text, client, session: Session, document_id
+        self, mock_score_texts, client, session: Session, document_id
     ):
         """Test /admin/list endpoint with authentication"""
         # Create a comment
@@ -1082,14 +1317,14 @@ class TestCommentListEndpoints:
         assert len(comments) == 1
         assert comments[0]["title"] == "Admin Test Comment"
 
-    @patch("app.comments.moderation.score_text")
+    @patch("app.comments.moderation.score_texts")
     def test_admin_list_comments_custom_moderation_threshold(
-        self, mock_score_text, client, session: Session, document_id
+        self, mock_score_texts, client, session: Session, document_id
     ):
         """Test /admin/list endpoint with custom moderation threshold"""
 
         # Create comment with moderate score (0.3)
-        mock_score_text.return_value = 0.3
+        mock_score_texts.side_effect = fixed_moderation_scores(0.3)
         moderate_form_data = {
             "commenter": {
                 "first_name": "Moderate",
@@ -1107,7 +1342,7 @@ class TestCommentListEndpoints:
         assert response.status_code == 201
 
         # Create comment with high score (0.8)
-        mock_score_text.return_value = 0.8
+        mock_score_texts.side_effect = fixed_moderation_scores(0.8)
         high_form_data = {
             "commenter": {
                 "first_name": "High",
@@ -1157,9 +1392,12 @@ class TestCommentListEndpoints:
         comments = response.json()
         assert len(comments) == 0
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_admin_list_comments_with_filters(
-        self, mock_score_text, client, session: Session, document_id
+        self, mock_score_texts, client, session: Session, document_id
     ):
         """Test /admin/list endpoint with query filters"""
         # Create test comment
@@ -1203,9 +1441,12 @@ class TestCommentListEndpoints:
         assert len(comments) == 1
         assert "testing" in comments[0]["tags"]
 
-    @patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+    @patch(
+        "app.comments.moderation.score_texts",
+        side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+    )
     def test_list_comments_empty_results(
-        self, mock_score_text, client, session: Session, document_id
+        self, mock_score_texts, client, session: Session, document_id
     ):
         """Test /list endpoint with no matching results"""
         # Create a comment
@@ -1411,3 +1652,69 @@ class TestListingComments:
         list_result = client.get("/api/comments/list")
         assert list_result.status_code == 200
         assert len(list_result.json()) == 0
+
+
+class TestScopedCommentSync:
+    """Tests for set-based district comment sync"""
+
+    @staticmethod
+    def count_statements(session: Session):
+        statements = []
+        event.listen(
+            session.connection(),
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+        return statements
+
+    def test_sync_uses_constant_statements(self, session: Session, document_id):
+        comments = [
+            DistrictCommentInput(zone=zone, text=f"Zone {zone} note {i}")
+            for zone in range(1, 5)
+            for i in range(5)
+        ]
+        statements = self.count_statements(session)
+        sync_district_comments(document_id, comments, session)
+        created_statements = len(statements)
+
+        rows = session.exec(
+            select(DocumentComment.comment_id, DocumentComment.zone, Comment.comment)
+            .join(Comment, Comment.id == DocumentComment.comment_id)
+            .where(DocumentComment.document_id == document_id)
+            .order_by(Comment.id)
+        ).all()
+        assert len(rows) == 20
+        assert [(zone, text) for _, zone, text in rows] == [
+            (c.zone, c.text) for c in comments
+        ]
+
+        # Update half, drop the rest
+        statements.clear()
+        kept = [
+            DistrictCommentInput(comment_id=comment_id, zone=zone, text="Updated")
+            for comment_id, zone, _ in rows[:10]
+        ]
+        sync_district_comments(document_id, kept, session)
+        assert len(statements) <= created_statements + 2
+
+        rows = session.exec(
+            select(Comment.title, Comment.comment)
+            .join(DocumentComment, Comment.id == DocumentComment.comment_id)
+            .where(DocumentComment.document_id == document_id)
+        ).all()
+        assert len(rows) == 10
+        assert {comment for _, comment in rows} == {"Updated"}
+        assert {title for title, _ in rows} == {"District 1 note", "District 2 note"}
+
+        # Statement count does not grow with the number of comments
+        statements.clear()
+        sync_district_comments(document_id, comments[:1], session)
+        few_statements = len(statements)
+        statements.clear()
+        sync_district_comments(document_id, comments, session)
+        assert len(statements) == few_statements
+
+
+def test_like_pattern_escapes_wildcards():
+    assert _like_pattern("corrid") == "%corrid%"
+    assert _like_pattern("50%_off\\") == "%50\\%\\_off\\\\%"
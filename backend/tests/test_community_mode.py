@@ -6,6 +6,7 @@ from unittest.mock import patch
 from app.models import MAX_COMMUNITY_NAME_LENGTH
 from app.utils import create_districtr_map
 from tests.constants import GERRY_DB_FIXTURE_NAME
+from tests.utils import fixed_moderation_scores
 
 COMMUNITY_MAP_SLUG = "ks_demo_view_census_blocks_community"
 TEST_MODERATION_SCORE = 0.001
@@ -112,9 +113,12 @@ def test_non_community_document_rejects_community_save(client, document_id: str)
     assert get_assignments_by_geoid(client, document_id) == {}
 
 
-@patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+@patch(
+    "app.comments.moderation.score_texts",
+    side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+)
 def test_put_community_assignments_round_trip_with_metadata_and_comments(
-    _mock_score_text, client, community_document_id: str, session: Session
+    _mock_score_texts, client, community_document_id: str, session: Session
 ):
     document_info = client.get(f"/api/document/{community_document_id}").json()
     community_metadata_list = build_community_metadata_list()
@@ -178,9 +182,12 @@ def test_put_community_assignments_round_trip_with_metadata_and_comments(
     assert {row[0] for row in comment_rows} == {1, 2}
 
 
-@patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+@patch(
+    "app.comments.moderation.score_texts",
+    side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+)
 def test_copy_community_document_duplicates_assignments_and_metadata(
-    _mock_score_text, client, community_document_id: str, community_map_slug: str
+    _mock_score_texts, client, community_document_id: str, community_map_slug: str
 ):
     document_info = client.get(f"/api/document/{community_document_id}").json()
     community_metadata_list = build_community_metadata_list()
@@ -233,9 +240,12 @@ def test_copy_community_document_duplicates_assignments_and_metadata(
     assert copied_assignments == original_assignments
 
 
-@patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+@patch(
+    "app.comments.moderation.score_texts",
+    side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+)
 def test_put_community_assignments_conflict_requires_overwrite(
-    _mock_score_text, client, community_document_id: str
+    _mock_score_texts, client, community_document_id: str
 ):
     document_info = client.get(f"/api/document/{community_document_id}").json()
     first_metadata = [build_community_metadata_list()[0]]
@@ -304,9 +314,12 @@ def test_put_community_assignments_conflict_requires_overwrite(
     assert updated_document["community_metadata_list"] == full_metadata
 
 
-@patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+@patch(
+    "app.comments.moderation.score_texts",
+    side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+)
 def test_reset_community_assignments_preserves_metadata_and_comments(
-    _mock_score_text, client, community_document_id: str, session: Session
+    _mock_score_texts, client, community_document_id: str, session: Session
 ):
     document_info = client.get(f"/api/document/{community_document_id}").json()
     community_metadata_list = build_community_metadata_list()
@@ -377,9 +390,12 @@ def test_reset_community_assignments_preserves_metadata_and_comments(
     assert comment_count == 2
 
 
-@patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+@patch(
+    "app.comments.moderation.score_texts",
+    side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+)
 def test_community_name_is_sanitized_before_save(
-    _mock_score_text, client, community_document_id: str
+    _mock_score_texts, client, community_document_id: str
 ):
     document_info = client.get(f"/api/document/{community_document_id}").json()
     community_metadata_list = [
@@ -416,9 +432,12 @@ def test_community_name_is_sanitized_before_save(
     )
 
 
-@patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+@patch(
+    "app.comments.moderation.score_texts",
+    side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+)
 def test_community_name_longer_than_40_chars_is_rejected_before_mutation(
-    _mock_score_text, client, community_document_id: str
+    _mock_score_texts, client, community_document_id: str
 ):
     initial_document = client.get(f"/api/document/{community_document_id}").json()
     initial_metadata = [build_community_metadata_list()[0]]
@@ -470,9 +489,12 @@ def test_community_name_longer_than_40_chars_is_rejected_before_mutation(
     assert final_document["community_metadata_list"] == initial_metadata
 
 
-@patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+@patch(
+    "app.comments.moderation.score_texts",
+    side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+)
 def test_community_save_allows_partial_comment_coverage(
-    _mock_score_text, client, community_document_id: str
+    _mock_score_texts, client, community_document_id: str
 ):
     initial_document = client.get(f"/api/document/{community_document_id}").json()
     metadata = build_community_metadata_list()
@@ -508,9 +530,12 @@ def test_community_save_allows_partial_comment_coverage(
     } == {1: "Only one community comment"}
 
 
-@patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+@patch(
+    "app.comments.moderation.score_texts",
+    side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+)
 def test_community_save_allows_draw_without_any_comments(
-    _mock_score_text, client, community_document_id: str
+    _mock_score_texts, client, community_document_id: str
 ):
     initial_document = client.get(f"/api/document/{community_document_id}").json()
     metadata = build_community_metadata_list()
@@ -533,9 +558,12 @@ def test_community_save_allows_draw_without_any_comments(
     assert final_document["community_metadata_list"] == metadata
 
 
-@patch("app.comments.moderation.score_text", return_value=TEST_MODERATION_SCORE)
+@patch(
+    "app.comments.moderation.score_texts",
+    side_effect=fixed_moderation_scores(TEST_MODERATION_SCORE),
+)
 def test_sync_community_comments_updates_and_deletes_existing_rows(
-    _mock_score_text, client, community_document_id: str, session: Session
+    _mock_score_texts, client, community_document_id: str, session: Session
 ):
     document_info = client.get(f"/api/document/{community_document_id}").json()
 
@@ -16,12 +16,15 @@ from sqlmodel import Session
 from app.core.db import engine
 from app.comments.moderation import moderate_comment_by_id
 from app.thumbnails.main import generate_thumbnail
+from tests.utils import fixed_moderation_scores
 
 
 @pytest.fixture(autouse=True)
 def no_external_moderation(monkeypatch):
     # Keep moderation off the network: score the text locally without calling OpenAI.
-    monkeypatch.setattr("app.comments.moderation.score_text", lambda _text: 0.0)
+    monkeypatch.setattr(
+        "app.comments.moderation.score_texts", fixed_moderation_scores(0.0)
+    )
 
 
 def test_self_owned_moderation_returns_connection():
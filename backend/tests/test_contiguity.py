@@ -3,7 +3,9 @@ from pytest import fixture
 from networkx import Graph
 
 import pickle
+from pathlib import Path
 from app.contiguity.main import (
+    annotate_graph_bounds,
     check_subgraph_contiguity,
     subgraph_number_connected_components,
     get_assigned_nodes,
@@ -12,7 +14,7 @@ import app.evaluation.graph as graph
 from app.models import DistrictrMap
 from app.utils import create_parent_child_edges
 from tests.constants import FIXTURES_PATH
-from sqlmodel import Session
+from sqlmodel import Session, select
 from datetime import datetime
 
 
@@ -138,12 +140,33 @@ def test_subset_of_zones_contiguous(
     assert check_subgraph_contiguity(G, zone_assignment.nodes)
 
 
-@fixture
-def mock_gerrydb_graph_file(monkeypatch):
-    def mock_get_file(gerrydb_name: str) -> str:
-        return f"{FIXTURES_PATH}/graph/{gerrydb_name}.pkl"
+def _mock_get_file(gerrydb_name: str) -> str:
+    return f"{FIXTURES_PATH}/graph/{gerrydb_name}.pkl"
+
 
-    monkeypatch.setattr(graph, "get_gerrydb_graph_file", mock_get_file)
+@fixture
+def mock_gerrydb_graph_file(monkeypatch, session: Session):
+    load_graph = graph.get_gerrydb_graph
+
+    def load_graph_with_bounds(file_path: str) -> Graph:
+        # The fixture graphs predate stored bounds; backfill them on load as
+        # `cli.py backfill-graph-bounds` does for deployed graphs.
+        G = load_graph(file_path)
+        districtr_map = session.exec(
+            select(DistrictrMap).where(
+                DistrictrMap.gerrydb_table_name == Path(file_path).stem
+            )
+        ).first()
+        if districtr_map is not None:
+            annotate_graph_bounds(session, G, districtr_map)
+        return G
+
+    monkeypatch.setattr(graph, "get_gerrydb_graph_file", _mock_get_file)
+    monkeypatch.setattr(graph, "get_gerrydb_graph", load_graph_with_bounds)
+    # Graphs cached by other tests may have been loaded without bounds.
+    graph.get_graph.cache_clear()
+    yield
+    graph.get_graph.cache_clear()
 
 
 def test_simple_geos_contiguity(
@@ -180,6 +203,25 @@ def test_simple_geos_contiguity_subgraph_bboxes(
     assert len(data["features"]) == 1
 
 
+def test_subgraph_bboxes_without_stored_bounds_fall_back_to_postgis(
+    client: TestClient, simple_contiguous_assignments: str, monkeypatch, caplog
+):
+    monkeypatch.setattr(graph, "get_gerrydb_graph_file", _mock_get_file)
+    # Drop graphs cached with bounds by tests using `mock_gerrydb_graph_file`.
+    graph.get_graph.cache_clear()
+    document_id = simple_contiguous_assignments
+    try:
+        response = client.get(
+            f"/api/document/{document_id}/contiguity/1/connected_component_bboxes",
+        )
+        assert "bounds_4326" in graph.get_graph("simple_geos").graph
+    finally:
+        graph.get_graph.cache_clear()
+    assert response.status_code == 200
+    assert len(response.json()["features"]) == 1
+    assert "backfill-graph-bounds" in caplog.text
+
+
 def test_simple_geos_contiguity_subgraph_bboxes_nonexistent_zone(
     client: TestClient, simple_contiguous_assignments: str, mock_gerrydb_graph_file
 ):
@@ -0,0 +1,120 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import Environment, settings
+from app.core.db_timing import (
+    RequestDbStats,
+    db_timing_middleware,
+    fingerprint,
+    instrument_engine,
+)
+from app.core.security import TokenScope, UnauthorizedException, auth
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    return engine
+
+
+@pytest.fixture
+def client(engine):
+    app = FastAPI()
+    app.middleware("http")(db_timing_middleware)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        # Sequential queries, as an N+1 pattern would issue.
+        with engine.connect() as conn:
+            for i in range(item_id):
+                conn.execute(text("SELECT :i"), {"i": i}).scalar_one()
+        return {"item_id": item_id}
+
+    @app.get("/broken")
+    def broken():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT * FROM missing_table"))
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def _statement_count(route: str) -> float:
+    return (
+        REGISTRY.get_sample_value(
+            "http_request_db_statements_sum", {"method": "GET", "route": route}
+        )
+        or 0
+    )
+
+
+def test_fingerprint():
+    assert (
+        fingerprint(
+            "SELECT *\n  FROM document.document WHERE document_id = 'abc' AND n IN (%s, %s)"
+            " LIMIT 10"
+        )
+        == "SELECT * FROM document.document WHERE document_id = ? AND n IN (...) LIMIT ?"
+    )
+    assert len(fingerprint("SELECT " + "x, " * 100)) == 120
+
+
+def test_server_timing_header():
+    stats = RequestDbStats()
+    stats.record('SELECT "a" FROM t', 0.002)
+    stats.record("SELECT 1", 0.001)
+    assert stats.server_timing() == (
+        'db;dur=3.0, db_count;desc="2", db_slowest;dur=2.0;desc="SELECT \\"a\\" FROM t"'
+    )
+
+
+def test_request_stats_by_route(client):
+    before = _statement_count("/items/{item_id}")
+    response = client.get("/items/3", headers={"X-Debug-Timing": "1"})
+    assert response.status_code == 200
+    timing = response.headers["Server-Timing"]
+    assert 'db_count;desc="3"' in timing
+    assert "db_slowest;dur=" in timing and 'desc="SELECT ?"' in timing
+    assert _statement_count("/items/{item_id}") == before + 3
+
+
+def test_server_timing_opt_in(client, monkeypatch):
+    assert "Server-Timing" not in client.get("/items/1").headers
+    monkeypatch.setattr(settings, "SERVER_TIMING", True)
+    assert "Server-Timing" in client.get("/items/1").headers
+
+
+def test_debug_timing_needs_debug_token_in_production(client, monkeypatch):
+    monkeypatch.setattr(settings, "ENVIRONMENT", Environment.production)
+    requested_scopes = []
+
+    async def fake_verify(security_scopes, token):
+        if token.credentials != "debug-token":
+            raise UnauthorizedException("Invalid token")
+        requested_scopes.extend(security_scopes.scopes)
+        return {"sub": "admin"}
+
+    monkeypatch.setattr(auth, "verify", fake_verify)
+
+    def server_timing(headers):
+        headers = {"X-Debug-Timing": "1", **headers}
+        return client.get("/items/1", headers=headers).headers.get("Server-Timing")
+
+    assert server_timing({}) is None
+    assert server_timing({"Authorization": "Bearer other-token"}) is None
+    assert server_timing({"Authorization": "Bearer debug-token"}) is not None
+    assert requested_scopes == [TokenScope.profile_workers]
+
+
+def test_failed_statement_releases_timer(client, engine):
+    response = client.get("/broken", headers={"X-Debug-Timing": "1"})
+    assert response.status_code == 500
+    # Outside a request, statements run untracked.
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM missing_table"))
+        assert conn.info["db_timing_start"] == []
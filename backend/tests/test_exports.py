@@ -1,6 +1,7 @@
 import pytest
 from fastapi.testclient import TestClient
 from datetime import datetime
+from sqlalchemy import text
 
 
 @pytest.fixture(name="assignments_document_id")
@@ -87,3 +88,171 @@ def test_get_block_assignments_csv_export(
         response.text
         == "geo_id,zone\n000010000000001,1\n000010000000002,1\n000010000000003,2\n"
     )
+
+
+@pytest.fixture
+def deferred_export_jobs(monkeypatch, tmp_path):
+    """Capture enqueued export jobs instead of running them on the app engine.
+
+    Tests run the captured jobs with `run_export_job(job_id, session=session)`
+    so the build shares the test transaction.
+    """
+    import app.exports.main as exports_main
+
+    enqueued: list[str] = []
+    monkeypatch.setattr(
+        exports_main, "run_export_job", lambda job_id: enqueued.append(job_id)
+    )
+    monkeypatch.setattr(
+        exports_main.settings, "EXPORT_ARTIFACT_DIR", str(tmp_path / "exports")
+    )
+    return enqueued
+
+
+def test_export_job_lifecycle(
+    client: TestClient, session, assignments_document_id: str, deferred_export_jobs
+):
+    from app.exports.main import run_export_job
+
+    response = client.post(
+        f"/api/document/{assignments_document_id}/export_jobs?export_type=BlockAssignmentsCSV",
+    )
+    assert response.status_code == 202, response.json()
+    job = response.json()
+    assert job["status"] == "pending"
+    assert job["download_url"] is None
+    assert deferred_export_jobs == [job["job_id"]]
+
+    run_export_job(job["job_id"], session=session)
+
+    response = client.get(
+        f"/api/document/{assignments_document_id}/export_jobs/{job['job_id']}"
+    )
+    assert response.status_code == 200, response.json()
+    finished = response.json()
+    assert finished["status"] == "succeeded"
+    assert finished["file_name"].endswith(".csv")
+    assert finished["download_url"] == (
+        f"/api/document/{assignments_document_id}/export_jobs/{job['job_id']}/download"
+    )
+
+    response = client.get(finished["download_url"])
+    assert response.status_code == 200
+    lines = response.text.strip().splitlines()
+    assert lines[0] == "geo_id,zone"
+    assert len(lines) == 4
+
+
+def test_export_job_reused_until_assignments_change(
+    client: TestClient, session, assignments_document_id: str, deferred_export_jobs
+):
+    from app.exports.main import run_export_job
+
+    url = f"/api/document/{assignments_document_id}/export_jobs"
+    first = client.post(url).json()
+    run_export_job(first["job_id"], session=session)
+
+    second = client.post(url).json()
+    assert second["job_id"] == first["job_id"]
+    assert second["status"] == "succeeded"
+    assert deferred_export_jobs == [first["job_id"]]
+
+    # NOW() is frozen inside the test transaction, so simulate a later save.
+    session.execute(
+        text(
+            "UPDATE document.document "
+            "SET assignments_updated_at = assignments_updated_at + interval '1 second' "
+            "WHERE document_id = :document_id"
+        ),
+        {"document_id": assignments_document_id},
+    )
+    session.commit()
+
+    third = client.post(url).json()
+    assert third["job_id"] != first["job_id"]
+    assert third["status"] == "pending"
+
+
+def test_export_job_failure_is_recorded(
+    client: TestClient, session, document_id: str, deferred_export_jobs
+):
+    from app.exports.main import run_export_job
+
+    job = client.post(
+        f"/api/document/{document_id}/export_jobs?export_type=DistrictsGeoJSON"
+    ).json()
+    run_export_job(job["job_id"], session=session)
+
+    response = client.get(f"/api/document/{document_id}/export_jobs/{job['job_id']}")
+    assert response.json()["status"] == "failed"
+    assert "No district boundaries found" in response.json()["error"]
+
+    response = client.get(
+        f"/api/document/{document_id}/export_jobs/{job['job_id']}/download"
+    )
+    assert response.status_code == 409
+
+
+def test_export_job_not_found(client: TestClient, document_id: str):
+    response = client.get(
+        f"/api/document/{document_id}/export_jobs/00000000-0000-0000-0000-000000000000"
+    )
+    assert response.status_code == 404
+
+
+def test_export_job_unsupported_type(client: TestClient, document_id: str):
+    response = client.post(
+        f"/api/document/{document_id}/export_jobs?export_type=NiceSocks"
+    )
+    assert response.status_code == 400
+
+
+def test_export_job_replacement_removes_superseded_artifact(
+    client: TestClient, session, assignments_document_id: str, deferred_export_jobs
+):
+    from app.exports.main import _local_artifact_path, run_export_job
+    from app.exports.models import ExportJob
+
+    url = f"/api/document/{assignments_document_id}/export_jobs"
+    first = client.post(url).json()
+    run_export_job(first["job_id"], session=session)
+    first_job = session.get(ExportJob, first["job_id"])
+    first_artifact = _local_artifact_path(first_job.artifact_key)
+    assert first_artifact.exists()
+
+    session.execute(
+        text(
+            "UPDATE document.document "
+            "SET assignments_updated_at = assignments_updated_at + interval '1 second' "
+            "WHERE document_id = :document_id"
+        ),
+        {"document_id": assignments_document_id},
+    )
+    session.commit()
+
+    second = client.post(url).json()
+    run_export_job(second["job_id"], session=session)
+    assert not first_artifact.exists()
+    response = client.get(f"{url}/{first['job_id']}")
+    assert response.status_code == 404
+
+
+def test_export_job_missing_local_artifact_is_gone(
+    client: TestClient, session, assignments_document_id: str, deferred_export_jobs
+):
+    from app.exports.main import _local_artifact_path, run_export_job
+    from app.exports.models import ExportJob
+
+    url = f"/api/document/{assignments_document_id}/export_jobs"
+    job = client.post(url).json()
+    run_export_job(job["job_id"], session=session)
+    artifact_key = session.get(ExportJob, job["job_id"]).artifact_key
+    _local_artifact_path(artifact_key).unlink()
+
+    response = client.get(f"{url}/{job['job_id']}/download", follow_redirects=False)
+    assert response.status_code == 410
+
+    # The lost artifact is rebuilt by the next export request.
+    rebuilt = client.post(url).json()
+    assert rebuilt["job_id"] != job["job_id"]
+    assert rebuilt["status"] == "pending"
@@ -1,10 +1,21 @@
 """Tests for app.evaluation.graph."""
 
+import pickle
 from unittest.mock import MagicMock
 
+import networkx as nx
+import numpy as np
+import pytest
+
 from tests.constants import FIXTURES_PATH
 import app.evaluation.graph as graph_module
-from app.evaluation.graph import get_gerrydb_graph
+from app.evaluation.graph import (
+    component_bounds,
+    get_gerrydb_graph,
+    get_graph_index,
+    group_by_label,
+    label_components,
+)
 
 
 def test_get_gerrydb_graph_streams_from_s3(monkeypatch):
@@ -43,3 +54,60 @@ def test_get_gerrydb_graph():
     assert set(G.nodes()) == block_nodes | vtd_nodes
     assert "weighted_edges" in G.graph
     assert "non_contiguous_parents" in G.graph
+
+
+def test_graph_index_orders_nodes_and_parents():
+    with open(FIXTURES_PATH / "graph" / "simple_geos.pkl", "rb") as f:
+        G = pickle.load(f)
+    index = get_graph_index(G)
+
+    assert index.nodes.tolist() == sorted(G.nodes)
+    assert get_graph_index(G) is index
+    for node, data in G.nodes(data=True):
+        parent = index.parent[index.node_index[node]]
+        if "parent" in data:
+            assert index.nodes[parent] == data["parent"]
+        else:
+            assert parent == -1
+    assert len(index.edges) == G.number_of_edges()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_label_components_matches_networkx(seed):
+    rng = np.random.default_rng(seed)
+    G = nx.gnm_random_graph(200, 260, seed=seed)
+    G = nx.relabel_nodes(G, {i: f"n{i:03d}" for i in G})
+    index = get_graph_index(G)
+    mask = rng.random(len(index)) < 0.7
+
+    components = [
+        index.nodes[members].tolist()
+        for members in group_by_label(label_components(index.edges, mask))
+    ]
+
+    expected = nx.connected_components(G.subgraph(index.nodes[mask].tolist()))
+    assert sorted(components) == sorted(sorted(c) for c in expected)
+    assert all(component == sorted(component) for component in components)
+
+
+def test_component_bounds_reduces_per_component():
+    G = nx.Graph([("a", "b"), ("c", "d")])
+    G.add_node("e")
+    G.graph["bounds_4326"] = {
+        "paths": np.array(["a", "b", "c", "d", "e"]),
+        "bounds": np.array(
+            [
+                [0, 0, 1, 1],
+                [1, 0, 2, 3],
+                [5, 5, 6, 6],
+                [np.nan] * 4,
+                [9, 9, 10, 10],
+            ]
+        ),
+    }
+    index = get_graph_index(G)
+    mask = np.array([True, True, True, True, False])
+
+    result = component_bounds(label_components(index.edges, mask), index.bounds)
+
+    assert result.tolist() == [[0, 0, 2, 3], [5, 5, 6, 6]]
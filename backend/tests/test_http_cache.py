@@ -0,0 +1,29 @@
+from app.core.http_cache import etag_matches, make_etag, not_modified
+
+
+def test_make_etag_is_quoted_and_order_sensitive():
+    etag = make_etag("a", 1, None)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag("a", 1, None)
+    assert etag != make_etag(1, "a", None)
+
+
+def test_etag_matches():
+    etag = make_etag("doc", 1)
+    assert etag_matches(etag, etag)
+    assert etag_matches(f"W/{etag}", etag)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches("", etag)
+    assert not etag_matches('"other"', etag)
+
+
+def test_not_modified_headers():
+    etag = make_etag("doc")
+    response = not_modified(etag, is_public=True)
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["ETag"] == etag
+    assert response.headers["Cache-Control"] == "public, no-cache"
+    assert response.headers["Vary"] == "Accept-Encoding"
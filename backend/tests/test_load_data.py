@@ -0,0 +1,65 @@
+from management.load_data import (
+    GerryDBImportStats,
+    index_gerrydb_table,
+    ogr2ogr_import_args,
+)
+from sqlalchemy import text
+from sqlmodel import Session
+
+
+def test_ogr2ogr_import_args_use_copy_without_spatial_index():
+    args = ogr2ogr_import_args("/tmp/ks.gpkg", "ks_layer", "ks_table")
+
+    assert args[:4] == ["ogr2ogr", "--config", "PG_USE_COPY", "YES"]
+    assert "SPATIAL_INDEX=NONE" in args
+    assert "OVERWRITE=no" in args
+    assert args[args.index("-gt") + 1] == "100000"
+    assert args[-1] == "gerrydb.ks_table"
+    assert args.index("/tmp/ks.gpkg") + 1 == args.index("ks_layer")
+
+
+def test_gerrydb_import_stats():
+    stats = GerryDBImportStats(
+        table_name="ks_table",
+        rows=1000,
+        load_seconds=2.0,
+        index_seconds=0.5,
+        analyze_seconds=0.25,
+    )
+    assert stats.rows_per_second == 500
+    assert str(stats) == (
+        "ks_table: 1000 rows loaded in 2.0s (500 rows/s), "
+        "indexes built in 0.5s, analyzed in 0.2s"
+    )
+    assert stats.model_dump()["rows_per_second"] == 500
+
+    empty = GerryDBImportStats(
+        table_name="empty", rows=0, load_seconds=0, index_seconds=0, analyze_seconds=0
+    )
+    assert empty.rows_per_second == 0
+
+
+def test_index_gerrydb_table(session: Session, ks_ellis_county_vtd):
+    index_seconds, analyze_seconds = index_gerrydb_table(session, "ks_ellis_county_vtd")
+    assert index_seconds >= 0
+    assert analyze_seconds >= 0
+
+    indexes = session.execute(
+        text(
+            """
+            SELECT indexname, indexdef FROM pg_indexes
+            WHERE schemaname = 'gerrydb' AND tablename = 'ks_ellis_county_vtd'
+            """
+        )
+    ).all()
+    indexes = {name: definition for name, definition in indexes}
+    assert "(path)" in indexes["ks_ellis_county_vtd_path_idx"]
+    assert any("USING gist (geometry)" in d for d in indexes.values())
+
+    # ANALYZE ran, so the planner has row estimates for the table
+    reltuples = session.execute(
+        text(
+            "SELECT reltuples FROM pg_class WHERE oid = 'gerrydb.ks_ellis_county_vtd'::regclass"
+        )
+    ).scalar_one()
+    assert reltuples > 0
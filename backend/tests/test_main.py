@@ -3,6 +3,7 @@ from sqlmodel import Session, select
 from app.core.db import get_session
 from app.constants import GERRY_DB_SCHEMA
 from sqlalchemy import text
+import msgpack
 import subprocess
 import uuid
 from tests.constants import (
@@ -507,6 +508,51 @@ def test_patch_reset_assignments(client, document_id):
     assert len(assignments.json()) == 0
 
 
+def test_get_assignments_conditional_get(client, document_id):
+    test_put_assignments(client, document_id)
+    first = client.get(f"/api/get_assignments/{document_id}")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+    assert first.headers["Vary"] == "Accept-Encoding"
+
+    second = client.get(
+        f"/api/get_assignments/{document_id}", headers={"If-None-Match": etag}
+    )
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["ETag"] == etag
+
+    # The ETag covers the serialization, not just the document.
+    as_json = client.get(
+        f"/api/get_assignments/{document_id}?format=json",
+        headers={"If-None-Match": etag},
+    )
+    assert as_json.status_code == 200
+    assert as_json.headers["ETag"] != etag
+
+
+def test_get_document_conditional_get(client, document_id):
+    first = client.get(f"/api/document/{document_id}")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    second = client.get(
+        f"/api/document/{document_id}", headers={"If-None-Match": f"W/{etag}"}
+    )
+    assert second.status_code == 304
+
+    response = client.put(
+        f"/api/document/{document_id}/metadata", json={"name": "Renamed"}
+    )
+    assert response.status_code == 200
+
+    third = client.get(f"/api/document/{document_id}", headers={"If-None-Match": etag})
+    assert third.status_code == 200
+    assert third.headers["ETag"] != etag
+    assert third.json()["map_metadata"]["name"] == "Renamed"
+
+
 def test_list_gerydb_views(client, districtr_maps):
     response = client.get("/api/gerrydb/views")
     assert response.status_code == 200
@@ -1422,6 +1468,60 @@ def test_document_list(
     assert data[0].get("public_id") == public_id
 
 
+def test_document_list_cursor(client, document_id_total_vap, document_id_all_stats):
+    response = client.get("/api/documents/list?limit=1")
+    assert response.status_code == 200
+    first_page = response.json()
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get(f"/api/documents/list?limit=1&cursor={cursor}")
+    assert response.status_code == 200
+    second_page = response.json()
+    assert len(second_page) == 1
+    assert second_page[0]["public_id"] != first_page[0]["public_id"]
+    assert (
+        second_page[0]["updated_at"],
+        second_page[0]["public_id"],
+    ) < (first_page[0]["updated_at"], first_page[0]["public_id"])
+
+    response = client.get("/api/documents/list?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+def test_document_tag_follows_comment_links(
+    client, session: Session, document_id_total_vap
+):
+    comment_data = {
+        "commenter": {"first_name": "Test", "email": "test@example.com"},
+        "comment": {
+            "title": "Tagged",
+            "comment": "Comment with a tag.",
+            "document_id": document_id_total_vap,
+        },
+        "tags": [{"tag": "gallery-tag"}],
+        "recaptcha_token": "test_token",
+    }
+    response = client.post("/api/comments/submit", json=comment_data)
+    assert response.status_code == 201
+    comment_id = response.json()["comment"]["id"]
+
+    def document_tags():
+        stmt = text("""
+            SELECT t.slug FROM comments.document_tag dt
+            JOIN comments.tag t ON t.id = dt.tag_id
+            WHERE dt.document_id = :document_id
+        """)
+        return session.scalars(stmt, {"document_id": document_id_total_vap}).all()
+
+    assert document_tags() == ["gallery-tag"]
+
+    session.execute(
+        text("DELETE FROM comments.document_comment WHERE comment_id = :comment_id"),
+        {"comment_id": comment_id},
+    )
+    assert document_tags() == []
+
+
 def test_get_district_unions(client, document_id_total_vap):
     response = client.put(
         "/api/assignments",
@@ -1633,6 +1733,34 @@ def test_get_document_evaluation_uses_cached_row(
     assert get_compute_calls() == 1
 
 
+def test_get_document_evaluation_conditional_get(
+    client, assignments_document_id_total_vap, patch_evaluation_metric
+):
+    get_compute_calls = patch_evaluation_metric
+    document_id = assignments_document_id_total_vap
+
+    first = client.get(f"/api/document/{document_id}/evaluation")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert get_compute_calls() == 1
+
+    second = client.get(
+        f"/api/document/{document_id}/evaluation", headers={"If-None-Match": etag}
+    )
+    assert second.status_code == 304
+    assert get_compute_calls() == 1
+
+
+def test_get_document_evaluation_failure_is_not_cacheable(
+    client, assignments_document_id_total_vap, patch_evaluation_metric_with_failure
+):
+    document_id = assignments_document_id_total_vap
+    response = client.get(f"/api/document/{document_id}/evaluation")
+    assert response.status_code == 200
+    assert response.json()["failed"]
+    assert "ETag" not in response.headers
+
+
 def test_get_document_evaluation_refreshes_stale_cache(
     client,
     assignments_document_id_total_vap,
@@ -2129,6 +2257,27 @@ def test_put_assignments_rejects_truly_empty_request(client, document_id: str):
     assert "No changes provided" in response.json()["detail"]
 
 
+def test_put_assignments_rejects_keys_after_assignments(client, document_id: str):
+    """Keys after `assignments` could only be checked once every row had been
+    copied, so such bodies are rejected before any row is read."""
+    document_info = client.get(f"/api/document/{document_id}").json()
+    body = msgpack.packb(
+        {
+            "document_id": document_id,
+            "last_updated_at": document_info["updated_at"],
+            "assignments": [["202090416004010", 1]],
+            "map_type": "community",
+        }
+    )
+    response = client.put(
+        "/api/assignments",
+        content=body,
+        headers={"Content-Type": "application/msgpack"},
+    )
+    assert response.status_code == 400
+    assert "must be the last key" in response.json()["detail"]
+
+
 def test_put_assignments_with_only_assignments_returns_valid_updated_at(
     client, document_id: str
 ):
@@ -0,0 +1,113 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.comments import moderation
+from app.comments.models import Comment, ModerationScore
+
+
+@pytest.fixture(autouse=True)
+def clear_score_cache():
+    moderation.SCORE_CACHE.clear()
+    yield
+    moderation.SCORE_CACHE.clear()
+
+
+@pytest.fixture
+def ai_calls(monkeypatch):
+    """Record moderation API batches; texts containing "bad" score 0.9."""
+    calls: list[list[str]] = []
+
+    def fake_rate(texts):
+        calls.append(list(texts))
+        return [
+            ModerationScore(ok=True, score=0.9 if "bad" in text else 0.01)
+            for text in texts
+        ]
+
+    monkeypatch.setattr(moderation.settings, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(moderation, "rate_offensive_texts_ai", fake_rate)
+    return calls
+
+
+def test_score_texts_batches_and_dedupes(ai_calls, monkeypatch):
+    monkeypatch.setattr(moderation, "MODERATION_BATCH_SIZE", 2)
+    texts = ["fine", "bad words", "  FINE ", "other", "", "third"]
+
+    scores = moderation.score_texts(texts)
+
+    assert scores == [0.01, 0.9, 0.01, 0.01, 0.0, 0.01]
+    # "  FINE " normalizes to "fine" and the blank text is never sent.
+    assert sorted(len(batch) for batch in ai_calls) == [2, 2]
+    assert sorted(text for batch in ai_calls for text in batch) == [
+        "bad words",
+        "fine",
+        "other",
+        "third",
+    ]
+
+
+def test_score_texts_uses_cache(ai_calls):
+    assert moderation.score_texts(["hello there"]) == [0.01]
+    assert moderation.score_texts(["Hello   there"]) == [0.01]
+    assert len(ai_calls) == 1
+
+
+def test_score_texts_falls_back_to_profanity_check(monkeypatch):
+    monkeypatch.setattr(moderation.settings, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(
+        moderation,
+        "rate_offensive_texts_ai",
+        lambda texts: [ModerationScore(ok=False, score=1.0) for _ in texts],
+    )
+    monkeypatch.setattr(
+        moderation,
+        "check_profanity",
+        lambda text: ModerationScore(ok=True, score=0.0),
+    )
+
+    assert moderation.score_texts(["a", "b"]) == [0.0, 0.0]
+    # Fallback scores are not cached: the API is asked again next time.
+    assert len(moderation.SCORE_CACHE) == 0
+
+
+def test_failed_scores_are_not_cached(monkeypatch):
+    monkeypatch.setattr(moderation.settings, "OPENAI_API_KEY", None)
+    monkeypatch.setattr(
+        moderation,
+        "check_profanity",
+        lambda text: ModerationScore(ok=False, score=1.0, error="boom"),
+    )
+
+    assert moderation.score_texts(["text"]) == [1.0]
+    assert len(moderation.SCORE_CACHE) == 0
+
+
+def test_score_cache_evicts_least_recently_used():
+    cache = moderation.ScoreCache(maxsize=2)
+    cache.set("a", 0.1)
+    cache.set("b", 0.2)
+    assert cache.get("a") == 0.1
+    cache.set("c", 0.3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 0.1
+    assert cache.get("c") == 0.3
+
+
+def test_update_moderation_scores_is_one_statement():
+    class RecordingSession:
+        statements = []
+
+        def execute(self, stmt):
+            self.statements.append(stmt)
+
+    session = RecordingSession()
+    moderation.update_moderation_scores(Comment, {1: 0.5, 2: 0.1}, session)
+
+    assert len(session.statements) == 1
+    sql = str(
+        session.statements[0].compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+    assert "UPDATE comments.comment SET moderation_score=new_scores.score" in sql
+    assert "VALUES (1, 0.5), (2, 0.1)" in sql
@@ -0,0 +1,155 @@
+import pytest
+from management.physical_layout import (
+    IndexSpec,
+    RelationLayout,
+    _satisfies,
+    audit_relation,
+    cluster_layer,
+    ensure_indexes,
+    format_layout_report,
+    gerrydb_layer_target,
+    parent_child_edges_target,
+    assignments_target,
+)
+
+
+def _layout(**kwargs) -> RelationLayout:
+    defaults = dict(
+        schema_name="gerrydb",
+        table_name="ks",
+        total_bytes=2048,
+        table_bytes=1024,
+        index_bytes=1024,
+        required_indexes=["ks_path_idx", "ks_geometry_idx"],
+        missing_indexes=["ks_path_idx"],
+        invalid_indexes=[],
+        analyzed=False,
+        clustered_on=None,
+    )
+    return RelationLayout(**{**defaults, **kwargs})
+
+
+def test_index_spec_create_statement():
+    spec = IndexSpec(name="ks_geometry_idx", columns=("geometry",), method="gist")
+    assert spec.create_statement("gerrydb", "ks") == (
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS "ks_geometry_idx" '
+        'ON "gerrydb"."ks" USING gist ("geometry")'
+    )
+
+
+def test_index_names_are_truncated():
+    partition = "parentchildedges_" + "0" * 36
+    for spec in parent_child_edges_target(partition).indexes:
+        assert len(spec.name) <= 63
+        assert spec.name.startswith(partition)
+
+
+def test_satisfies_matches_method_and_leading_columns():
+    spec = IndexSpec(name="edges_idx", columns=("districtr_map", "parent_path"))
+    pk = {
+        "valid": True,
+        "method": "btree",
+        "columns": ["districtr_map", "parent_path", "child_path"],
+    }
+    assert _satisfies(pk, spec)
+    assert not _satisfies({**pk, "valid": False}, spec)
+    assert not _satisfies({**pk, "method": "gist"}, spec)
+    assert not _satisfies(
+        {**pk, "columns": ["child_path", "districtr_map", "parent_path"]}, spec
+    )
+
+
+def test_format_layout_report():
+    before = [_layout()]
+    after = [
+        _layout(
+            total_bytes=3 * 1024 * 1024,
+            missing_indexes=[],
+            analyzed=True,
+            clustered_on="ks_geohash_idx",
+        )
+    ]
+    lines = format_layout_report(before, after).splitlines()
+    assert lines[0].split() == [
+        "relation",
+        "size",
+        "indexes",
+        "analyzed",
+        "clustered",
+        "on",
+    ]
+    assert lines[2].split() == [
+        "gerrydb.ks",
+        "2.0",
+        "kB",
+        "->",
+        "3.0",
+        "MB",
+        "1/2",
+        "->",
+        "2/2",
+        "no",
+        "->",
+        "yes",
+        "-",
+        "->",
+        "ks_geohash_idx",
+    ]
+
+    # Without an "after" audit (dry run) only the current state is shown
+    assert format_layout_report(before).splitlines()[2].split() == [
+        "gerrydb.ks",
+        "2.0",
+        "kB",
+        "1/2",
+        "no",
+        "-",
+    ]
+
+
+@pytest.fixture
+def autocommit_connection(engine):
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        yield conn
+
+
+def test_ensure_indexes(autocommit_connection, ks_ellis_county_vtd):
+    conn = autocommit_connection
+    target = gerrydb_layer_target("ks_ellis_county_vtd")
+    conn.exec_driver_sql('DROP INDEX IF EXISTS gerrydb."ks_ellis_county_vtd_path_idx"')
+
+    layout = audit_relation(conn, target)
+    assert layout.missing_indexes == ["ks_ellis_county_vtd_path_idx"]
+
+    statements = ensure_indexes(conn, target, dry_run=True)
+    assert statements[0].startswith(
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS "ks_ellis_county_vtd_path_idx"'
+    )
+    assert audit_relation(conn, target).missing_indexes == layout.missing_indexes
+
+    ensure_indexes(conn, target)
+    layout = audit_relation(conn, target)
+    assert layout.missing_indexes == []
+    assert layout.coverage == "2/2"
+    assert layout.analyzed
+
+    # Nothing left to do
+    assert ensure_indexes(conn, target) == []
+
+
+def test_ensure_indexes_assignments_covered_by_primary_key(autocommit_connection):
+    layout = audit_relation(autocommit_connection, assignments_target())
+    assert layout.missing_indexes == []
+
+
+def test_cluster_layer(autocommit_connection, ks_ellis_county_vtd):
+    conn = autocommit_connection
+    target = gerrydb_layer_target("ks_ellis_county_vtd")
+
+    cluster_layer(conn, target)
+    layout = audit_relation(conn, target)
+    assert layout.clustered_on == "ks_ellis_county_vtd_geohash_idx"
+    assert layout.analyzed
+
+    with pytest.raises(ValueError, match="no geometry"):
+        cluster_layer(conn, assignments_target())
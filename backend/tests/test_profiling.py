@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.profiling import SamplingProfiler, profile_lock
+from app.core.security import auth
+from app.main import app
+
+
+def _spin(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1_000))
+
+
+def _profile_busy_thread(seconds: float = 0.2) -> dict:
+    stop = threading.Event()
+    worker = threading.Thread(target=_spin, args=(stop,), name="busy-worker")
+    worker.start()
+    profiler = SamplingProfiler(interval=0.002)
+    profiler.start()
+    time.sleep(seconds)
+    profiler.stop()
+    stop.set()
+    worker.join()
+    return profiler.speedscope()
+
+
+def test_speedscope_profile_covers_threads():
+    profile = _profile_busy_thread()
+    assert profile["$schema"] == "https://www.speedscope.app/file-format-schema.json"
+    frames = profile["shared"]["frames"]
+    by_thread = {p["name"]: p for p in profile["profiles"]}
+    assert "sampling-profiler" not in by_thread
+
+    busy = by_thread["busy-worker"]
+    assert busy["type"] == "sampled" and busy["unit"] == "seconds"
+    assert len(busy["samples"]) == len(busy["weights"])
+    assert sum(busy["weights"]) == pytest.approx(0.2, abs=0.1)
+    # Stacks run from the root to the leaf.
+    leaf_names = {frames[stack[-1]]["name"] for stack in busy["samples"]}
+    assert "_spin" in leaf_names
+    assert all(
+        frames[stack[0]]["name"] == "Thread._bootstrap" for stack in busy["samples"]
+    )
+
+
+def test_idle_samples_are_merged():
+    profile = _profile_busy_thread()
+    main = next(p for p in profile["profiles"] if p["name"] == "MainThread")
+    # The main thread sleeps in one frame for the whole window.
+    assert len(main["samples"]) <= 2
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[auth.verify] = lambda: {"sub": "admin"}
+    yield TestClient(app)
+    app.dependency_overrides.pop(auth.verify)
+
+
+def test_debug_profile_endpoint(client):
+    response = client.get("/_debug/profile", params={"seconds": 0.1, "interval_ms": 5})
+    assert response.status_code == 200
+    profile = response.json()
+    assert profile["profiles"] and profile["shared"]["frames"]
+
+
+def test_debug_profile_endpoint_one_at_a_time(client):
+    with profile_lock:
+        response = client.get("/_debug/profile", params={"seconds": 0.1})
+    assert response.status_code == 409
+    assert client.get("/_debug/profile", params={"seconds": 100}).status_code == 422
+
+
+def test_debug_profile_requires_auth():
+    assert TestClient(app).get("/_debug/profile").status_code in (401, 403)
@@ -0,0 +1,164 @@
+import json
+
+from benchmarks.sql_plans import (
+    CapturedPlan,
+    SqlBenchRun,
+    StatementResult,
+    _capture_plans,
+    _shatter_sample,
+    _shattered_parents,
+    diff_results,
+    diff_runs,
+    normalize_query,
+    parse_auto_explain,
+    plan_shape,
+    relation_scans,
+    resolve_run,
+    save_run,
+)
+
+DOC = "0b9f3a64-3c1e-4e58-9c67-7d2f0b1e5a10"
+OTHER_DOC = "5d0e2c71-8a4b-4f03-b1d6-2e9c7f4a8b35"
+
+
+def _notice(query: str, plan: dict, duration: float = 1.5) -> str:
+    body = json.dumps({"Query Text": query, "Plan": plan}, indent=2)
+    return f"duration: {duration:.3f} ms  plan:\n{body}"
+
+
+def _index_plan(relation: str = "assignments_p1") -> dict:
+    return {
+        "Node Type": "Hash Join",
+        "Plans": [
+            {
+                "Node Type": "Index Scan",
+                "Relation Name": relation,
+                "Index Name": f"{relation}_pkey",
+            },
+            {"Node Type": "Seq Scan", "Relation Name": "sqlbench_10000_vtd"},
+        ],
+    }
+
+
+def _seq_plan(relation: str = "assignments_p1") -> dict:
+    return {
+        "Node Type": "Hash Join",
+        "Plans": [
+            {"Node Type": "Seq Scan", "Relation Name": relation},
+            {"Node Type": "Seq Scan", "Relation Name": "sqlbench_10000_vtd"},
+        ],
+    }
+
+
+def _result(plan: dict, wall_ms: list[float]) -> StatementResult:
+    return StatementResult(
+        statement="get_zone_assignments_geo",
+        units=10000,
+        districts=10,
+        wall_ms=wall_ms,
+        plans=[CapturedPlan(key="abc#1", query="SELECT ...", duration_ms=1, plan=plan)],
+    )
+
+
+def test_parse_auto_explain():
+    duration, explained = parse_auto_explain(
+        _notice("SELECT 1", {"Node Type": "Result"})
+    )
+    assert duration == 1.5
+    assert explained["Plan"] == {"Node Type": "Result"}
+    assert parse_auto_explain("relation already exists, skipping") is None
+
+
+def test_capture_plans_keys_repeated_queries():
+    query = f"SELECT * FROM document.assignments WHERE document_id = '{DOC}'"
+    plans = _capture_plans(
+        [
+            _notice(query, _index_plan()),
+            "some other notice",
+            _notice(query.replace(DOC, OTHER_DOC), _index_plan()),
+            _notice("SELECT 2", {"Node Type": "Result"}),
+        ]
+    )
+    assert len(plans) == 3
+    # Document ids are normalized away, so both runs share a fingerprint.
+    assert plans[0].key.split("#")[0] == plans[1].key.split("#")[0]
+    assert [p.key.split("#")[1] for p in plans] == ["1", "2", "1"]
+    assert "<uuid>" in plans[0].query
+
+
+def test_normalize_query():
+    assert normalize_query(f"SELECT *\n   FROM x WHERE id = '{DOC}'") == (
+        "SELECT * FROM x WHERE id = '<uuid>'"
+    )
+
+
+def test_relation_scans_and_shape():
+    assert relation_scans(_index_plan()) == {
+        "assignments_p1": {"Index Scan"},
+        "sqlbench_10000_vtd": {"Seq Scan"},
+    }
+    assert plan_shape(_index_plan()) == [
+        "Hash Join",
+        "Index Scan on assignments_p1_pkey",
+        "Seq Scan on sqlbench_10000_vtd",
+    ]
+
+
+def test_diff_flags_seq_scan_replacing_index_scan():
+    diff = diff_results(_result(_index_plan(), [10]), _result(_seq_plan(), [10]))
+    assert diff.failed
+    assert diff.flips == ["assignments_p1: Index Scan -> Seq Scan in SELECT ..."]
+    assert not diff.regressed
+
+
+def test_diff_reports_index_scan_replacing_seq_scan_without_failing():
+    diff = diff_results(_result(_seq_plan(), [10]), _result(_index_plan(), [10]))
+    assert not diff.failed
+    assert diff.changes == ["plan changed: SELECT ..."]
+
+
+def test_diff_flags_time_regression():
+    base = _result(_index_plan(), [10, 11, 12])
+    assert diff_results(base, _result(_index_plan(), [30, 31, 32])).regressed
+    # Below --min-ms, a large ratio is noise.
+    assert not diff_results(
+        _result(_index_plan(), [1]), _result(_index_plan(), [4])
+    ).regressed
+    assert not diff_results(base, _result(_index_plan(), [14, 15, 16])).failed
+
+
+def test_diff_runs_matches_by_statement_and_scale(tmp_path):
+    base = SqlBenchRun(
+        created_at="2026-01-01T00:00:00+00:00",
+        commit="aaaaaaa",
+        server_version="16.4",
+        results=[_result(_index_plan(), [10])],
+    )
+    head = base.model_copy(
+        update={
+            "created_at": "2026-01-02T00:00:00+00:00",
+            "commit": "bbbbbbb",
+            "results": [
+                _result(_seq_plan(), [10]),
+                _result(_seq_plan(), [10]).model_copy(update={"units": 100000}),
+            ],
+        }
+    )
+    diffs = diff_runs(base, head)
+    assert [d.label for d in diffs] == ["get_zone_assignments_geo [10000x10]"]
+    assert diffs[0].flips
+
+    base_path = save_run(base, tmp_path)
+    head_path = save_run(head, tmp_path)
+    assert resolve_run(None, tmp_path) == head_path
+    assert resolve_run("aaa", tmp_path) == base_path
+    assert resolve_run(str(base_path), tmp_path) == base_path
+
+
+def test_fixture_parent_selection():
+    # 100x100 blocks: 13x13 VTDs, columns 0-5 whole on the left half.
+    shattered = _shattered_parents(100)
+    assert len(shattered) == 13 * 7
+    assert "vtd:00000006" in shattered and "vtd:00000005" not in shattered
+    sample = _shatter_sample(100)
+    assert sample and not set(sample) & set(shattered)
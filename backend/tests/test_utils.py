@@ -5,6 +5,8 @@ from app.utils import (
     create_map_group,
     create_shatterable_gerrydb_view,
     create_parent_child_edges,
+    load_parent_child_edges_from_artifact,
+    read_parent_child_artifact,
     add_extent_to_districtrmap,
     update_districtrmap,
     GEOID_PREDICATES,
@@ -16,6 +18,7 @@ from app.models import DistrictrMap, GeoUnitType
 from tests.constants import OGR2OGR_PG_CONNECTION_STRING, FIXTURES_PATH
 from sqlalchemy import text
 from sqlalchemy.exc import IntegrityError
+from app.core.registry import REGISTRY
 from app.core.security import recaptcha, auth
 from pytest import MonkeyPatch, fixture
 from tests.utils import fake_verify_recaptcha
@@ -23,6 +26,8 @@ from fastapi.security import SecurityScopes
 from app.main import app
 from app.comments.models import FullCommentFormResponse
 from datetime import datetime
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 GERRY_DB_TOTPOP_FIXTURE_NAME = "ks_demo_view_census_blocks_summary_stats"
 
@@ -126,6 +131,50 @@ def test_update_districtr_map(session: Session, simple_parent_geos_districtrmap)
     assert not districtr_map.visible
 
 
+def test_registry_caches_until_districtr_map_update(
+    session: Session, simple_parent_geos_districtrmap
+):
+    first = REGISTRY.districtr_map(session, simple_parent_geos_districtrmap)
+    assert first is not None and first.num_districts == 10
+    version = REGISTRY.version
+
+    # A write that bypasses the mutators is not seen until invalidation...
+    session.execute(
+        text(
+            "UPDATE districtrmap SET num_districts = 4 WHERE districtr_map_slug = :slug"
+        ),
+        {"slug": simple_parent_geos_districtrmap},
+    )
+    assert REGISTRY.districtr_map(session, simple_parent_geos_districtrmap) is first
+
+    # ...while update_districtrmap bumps the version and the next read reloads.
+    update_districtrmap(
+        session=session,
+        districtr_map_slug=simple_parent_geos_districtrmap,
+        visible=False,
+    )
+    assert REGISTRY.version > version
+    reloaded = REGISTRY.districtr_map(session, simple_parent_geos_districtrmap)
+    assert reloaded is not first
+    assert reloaded.num_districts == 4
+    assert not reloaded.visible
+    assert REGISTRY.districtr_map(session, "does_not_exist") is None
+
+
+def test_registry_gerrydb_table_and_unit_count(
+    session: Session, simple_parent_geos_districtrmap
+):
+    info = REGISTRY.gerrydb_table(session, "simple_parent_geos")
+    assert "geometry" not in info.numeric_cols
+    assert "path" not in info.numeric_cols
+    assert REGISTRY.gerrydb_table(session, "simple_parent_geos") is info
+
+    count = session.execute(
+        text("SELECT count(*) FROM gerrydb.simple_parent_geos")
+    ).scalar()
+    assert REGISTRY.unit_count(session, "simple_parent_geos") == count
+
+
 def test_create_map_group(session: Session):
     map_group_slug = "testgroup"
     create_map_group(
@@ -309,6 +358,75 @@ def test_create_parent_child_edges(
     session.commit()
 
 
+def _parent_child_edges(session: Session, districtr_map_uuid: str) -> set:
+    return set(
+        session.execute(
+            text(
+                "SELECT parent_path, child_path FROM parentchildedges "
+                "WHERE districtr_map = :uuid"
+            ),
+            {"uuid": districtr_map_uuid},
+        ).all()
+    )
+
+
+def test_load_parent_child_edges_from_artifact(
+    session: Session,
+    simple_shatterable_districtr_map_no_edges_yet: str,
+    tmp_path,
+):
+    uuid = simple_shatterable_districtr_map_no_edges_yet
+    create_parent_child_edges(session=session, districtr_map_uuid=uuid)
+    expected = _parent_child_edges(session, uuid)
+    assert expected
+
+    parents, children = zip(*sorted(expected))
+    artifact = tmp_path / "simple_geos.parquet"
+    pq.write_table(
+        pa.table({"parent_path": list(parents), "path": list(children)}), artifact
+    )
+
+    with pytest.raises(ValueError, match="already loaded"):
+        load_parent_child_edges_from_artifact(session, uuid, str(artifact))
+
+    def map_updated_at():
+        return session.execute(
+            text("SELECT updated_at FROM districtrmap WHERE uuid = :uuid"),
+            {"uuid": uuid},
+        ).scalar_one()
+
+    updated_at = map_updated_at()
+    loaded = load_parent_child_edges_from_artifact(
+        session, uuid, str(artifact), force=True
+    )
+    session.commit()
+
+    assert loaded == len(expected)
+    assert _parent_child_edges(session, uuid) == expected
+    # Reloading edges changes assignment ETags, which include the map's updated_at.
+    assert map_updated_at() > updated_at
+
+
+def test_read_parent_child_artifact(tmp_path):
+    rows = [("vtd:1", "block:1"), ("vtd:1", "block:2"), ("vtd:2", "block:3")]
+    parents, children = zip(*rows)
+
+    parquet_path = tmp_path / "edges.parquet"
+    pq.write_table(
+        pa.table({"parent_path": list(parents), "path": list(children)}),
+        parquet_path,
+    )
+    num_rows, parquet_rows = read_parent_child_artifact(str(parquet_path), batch_size=2)
+    assert num_rows == 3
+    assert list(parquet_rows) == rows
+
+    csv_path = tmp_path / "edges.csv"
+    csv_path.write_text("parent_path,path\n" + "".join(f"{p},{c}\n" for p, c in rows))
+    num_rows, csv_rows = read_parent_child_artifact(str(csv_path))
+    assert num_rows is None
+    assert list(csv_rows) == rows
+
+
 @pytest.fixture(name="document_id")
 def document_id_fixture(
     client, session: Session, simple_shatterable_districtr_map, gerrydb_simple_geos_view
@@ -4,3 +4,8 @@ def string_to_bool(booly: str):
 
 async def fake_verify_recaptcha(*args, **kwargs):
     return True
+
+
+def fixed_moderation_scores(score: float):
+    """`side_effect` for a patched `score_texts`: every text scores `score`."""
+    return lambda texts: [score] * len(texts)
@@ -0,0 +1,21 @@
+-- A slice of real-user traffic for backend/stress_test/replay.py. Set the
+-- window (UTC, ISO 8601) around the incident, run, and download the result
+-- CSV from the query-results location. Only replayable requests are kept:
+-- GETs under /api/ (write bodies are not in the logs) from real users, i.e.
+-- excluding the stress harness's own User-Agent. Document ids in the export
+-- are production ids: keep the CSV off shared storage; replay.py maps them
+-- onto seeded stress documents before sending anything.
+SELECT
+  time,
+  request_creation_time,
+  request_verb,
+  request_url,
+  user_agent,
+  elb_status_code,
+  target_processing_time
+FROM alb_access_logs
+WHERE request_creation_time BETWEEN '2024-01-01T00:00:00' AND '2024-01-01T01:00:00'
+  AND request_verb = 'GET'
+  AND url_extract_path(request_url) LIKE '/api/%'
+  AND user_agent NOT LIKE 'districtr-stress-test/%'
+ORDER BY request_creation_time;
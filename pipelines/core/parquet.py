@@ -0,0 +1,232 @@
+"""Parquet writing tuned for HTTP range reads.
+
+The tabular and points parquets are read by the frontend with range requests,
+one row group at a time. `write_parquet` streams Arrow record batches (e.g.
+from a DuckDB query) into a file that:
+
+- cuts row groups on changes of a cluster column (``parent_path``), so the rows
+  of one parent sit in as few row groups as possible instead of straddling a
+  fixed-size boundary;
+- writes column/offset (page) indexes, sorting-column metadata and bloom
+  filters (on ``path`` by default);
+- optionally writes a sidecar JSON index (`sidecar_path`) mapping each cluster
+  value to the byte and row ranges of its row groups, plus the footer range, so
+  a client can fetch exactly what it needs without scanning row group stats.
+"""
+
+import json
+import logging
+import os
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+LOGGER = logging.getLogger(__name__)
+
+# Target rows per row group. Groups end at the last cluster boundary before the
+# target, so they are usually a little smaller.
+ROW_GROUP_SIZE = 10_000
+# A single cluster value larger than this is split across row groups.
+MAX_ROW_GROUP_SIZE = 4 * ROW_GROUP_SIZE
+BLOOM_FILTER_FPP = 0.05
+SIDECAR_VERSION = 1
+
+
+def sidecar_path(parquet_path: str | Path) -> Path:
+    """``foo.parquet`` -> ``foo.index.json``."""
+    parquet_path = Path(parquet_path)
+    return parquet_path.with_name(f"{parquet_path.stem}.index.json")
+
+
+def _cut_point(
+    values: np.ndarray, target: int, max_rows: int, final: bool
+) -> int | None:
+    """Rows to put in the next row group, or None to wait for more rows.
+
+    ``values`` is the cluster column of the buffered rows.
+    """
+    if len(values) <= target and not final:
+        return None
+    if len(values) <= target:
+        return len(values)
+
+    # Positions i where a new cluster value starts.
+    boundaries = np.flatnonzero(values[1:] != values[:-1]) + 1
+    before = boundaries[boundaries <= target]
+    if len(before):
+        return int(before[-1])
+    # The first value alone fills the target: keep it whole up to max_rows.
+    after = boundaries[boundaries <= max_rows]
+    if len(after):
+        return int(after[0])
+    if len(values) >= max_rows:
+        return max_rows
+    return len(values) if final else None
+
+
+def _row_group_byte_range(row_group: pq.RowGroupMetaData) -> tuple[int, int]:
+    start, end = None, 0
+    for i in range(row_group.num_columns):
+        column = row_group.column(i)
+        column_start = (
+            column.dictionary_page_offset
+            if column.has_dictionary_page
+            else column.data_page_offset
+        )
+        start = column_start if start is None else min(start, column_start)
+        end = max(end, column_start + column.total_compressed_size)
+    return start or 0, end
+
+
+def build_sidecar_index(
+    parquet_path: str | Path, cluster_column: str, row_group_values: list[list]
+) -> dict:
+    """
+    Sidecar index for a parquet written by `write_parquet`.
+
+    Args:
+        parquet_path: The parquet file.
+        cluster_column: Column the row groups are clustered on.
+        row_group_values: Distinct non-null ``cluster_column`` values of each row
+            group, in row group order.
+
+    Returns a dict with the file size, the ``[start, end)`` byte range of the
+    footer, and for every cluster value the ``[start, end)`` byte range of its
+    row groups, the ``[start, end)`` row range, and the row group indices.
+    """
+    parquet_path = Path(parquet_path)
+    file_size = os.path.getsize(parquet_path)
+    with open(parquet_path, "rb") as f:
+        f.seek(file_size - 8)
+        footer_length = int.from_bytes(f.read(4), "little")
+    metadata = pq.read_metadata(parquet_path)
+
+    values: dict[str, dict] = {}
+    row_start = 0
+    for i in range(metadata.num_row_groups):
+        row_group = metadata.row_group(i)
+        byte_start, byte_end = _row_group_byte_range(row_group)
+        row_end = row_start + row_group.num_rows
+        for value in row_group_values[i]:
+            entry = values.get(value)
+            if entry is None:
+                values[value] = {
+                    "bytes": [byte_start, byte_end],
+                    "rows": [row_start, row_end],
+                    "row_groups": [i, i],
+                }
+            else:
+                entry["bytes"][1] = byte_end
+                entry["rows"][1] = row_end
+                entry["row_groups"][1] = i
+        row_start = row_end
+
+    return {
+        "version": SIDECAR_VERSION,
+        "column": cluster_column,
+        "file_size": file_size,
+        "footer": [file_size - 8 - footer_length, file_size],
+        "num_rows": metadata.num_rows,
+        "values": values,
+    }
+
+
+def write_parquet(
+    batches: pa.RecordBatchReader | Iterable[pa.RecordBatch],
+    out_path: str | Path,
+    schema: pa.Schema | None = None,
+    cluster_column: str | None = None,
+    sort_columns: Iterable[str] = (),
+    bloom_filter_columns: Iterable[str] = ("path",),
+    row_group_size: int = ROW_GROUP_SIZE,
+    max_row_group_size: int = MAX_ROW_GROUP_SIZE,
+) -> Path:
+    """
+    Stream ``batches`` (already sorted by ``sort_columns``) to a zstd parquet.
+
+    Args:
+        batches: Record batches to write, e.g. ``DuckDBPyConnection.fetch_record_batch()``.
+        out_path: Output parquet path.
+        schema: Schema of ``batches``; defaults to ``batches.schema``.
+        cluster_column: If set, row groups are cut where this column changes
+            value and a sidecar index (`sidecar_path`) is written next to the
+            parquet.
+        sort_columns: Columns the rows are sorted on (ascending, nulls last),
+            recorded as sorting-column metadata.
+        bloom_filter_columns: Columns to write bloom filters for.
+        row_group_size: Target rows per row group.
+        max_row_group_size: Hard cap on rows per row group.
+
+    Returns the path to the parquet.
+    """
+    out_path = Path(out_path)
+    schema = schema or batches.schema  # type: ignore[union-attr]
+    sorting_columns = (
+        pq.SortingColumn.from_ordering(
+            schema,
+            [(column, "ascending") for column in sort_columns],
+            null_placement="at_end",
+        )
+        if sort_columns
+        else None
+    )
+    bloom_filter_options = {
+        column: {"ndv": max_row_group_size, "fpp": BLOOM_FILTER_FPP}
+        for column in bloom_filter_columns
+        if column in schema.names
+    }
+
+    row_group_values: list[list] = []
+    # Write to a temporary file so readers never see a half-written parquet.
+    tmp_path = out_path.with_suffix(".tmp")
+    with pq.ParquetWriter(
+        tmp_path,
+        schema,
+        compression="zstd",
+        compression_level=12,
+        write_statistics=True,
+        write_page_index=True,
+        sorting_columns=sorting_columns,
+        bloom_filter_options=bloom_filter_options or None,
+    ) as writer:
+
+        def write(table: pa.Table, final: bool) -> pa.Table:
+            while table.num_rows:
+                if cluster_column is None:
+                    if table.num_rows < row_group_size and not final:
+                        break
+                    cut = min(row_group_size, table.num_rows)
+                else:
+                    values = table[cluster_column].to_numpy(zero_copy_only=False)
+                    cut = _cut_point(values, row_group_size, max_row_group_size, final)
+                    if cut is None:
+                        break
+                    row_group_values.append(
+                        [v for v in dict.fromkeys(values[:cut]) if v is not None]
+                    )
+                writer.write_table(table.slice(0, cut), row_group_size=cut)
+                table = table.slice(cut)
+            return table
+
+        pending = schema.empty_table()
+        for batch in batches:
+            pending = pa.concat_tables([pending, pa.Table.from_batches([batch])])
+            if pending.num_rows >= row_group_size:
+                pending = write(pending.combine_chunks(), final=False)
+        write(pending.combine_chunks(), final=True)
+    os.replace(tmp_path, out_path)
+
+    if cluster_column is not None:
+        index = build_sidecar_index(out_path, cluster_column, row_group_values)
+        with open(sidecar_path(out_path), "w") as f:
+            json.dump(index, f, separators=(",", ":"))
+        LOGGER.info(
+            "Wrote %s with %d row groups and index %s",
+            out_path,
+            len(row_group_values),
+            sidecar_path(out_path),
+        )
+    return out_path
@@ -0,0 +1,354 @@
+"""Parallel, incremental execution of batch pipeline entries.
+
+Batch configs (graphs, tilesets, tabular parquets) describe one entry per map.
+Each entry is turned into a `PipelineTask` and handed to `run_tasks`, which:
+
+- fingerprints the task's inputs (by content hash) and parameters, and skips
+  entries whose fingerprint matches the manifest and whose outputs exist;
+- fetches S3 inputs once into a shared download cache (`InputCache`), so
+  batches that read the same gpkg do not download it again;
+- runs the remaining entries in a process pool, capped both by ``jobs`` and by
+  an estimate of each entry's memory use against the memory available.
+
+Entries that write the same output file run one after another in a single
+worker. Manifests live in ``OUT_SCRATCH/manifests`` and are rewritten after
+every finished entry, so an interrupted batch resumes where it stopped.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import urlparse
+
+from core.settings import settings
+
+LOGGER = logging.getLogger(__name__)
+
+MANIFEST_DIR = "manifests"
+INPUTS_MANIFEST = "inputs"
+# Peak resident memory of an entry, as a multiple of its inputs' size on disk.
+# GeoPackages expand several-fold once loaded into GeoDataFrames.
+DEFAULT_MEMORY_FACTOR = 8.0
+# Share of currently available memory the pool may plan to use.
+MEMORY_HEADROOM = 0.8
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class PipelineTask:
+    """One independently buildable batch entry.
+
+    ``func`` must be a module-level function (it is pickled to a worker). It is
+    called as ``func(**inputs, **params, **options, replace=...)`` with each
+    input replaced by a local path, and returns a JSON-serializable list of
+    results that is stored in the manifest and returned again when the entry
+    is skipped.
+
+    Only ``inputs`` (by content) and ``params`` are fingerprinted; ``options``
+    (e.g. whether to upload) do not trigger a rebuild.
+    """
+
+    key: str
+    func: Callable[..., list]
+    inputs: dict[str, str]
+    outputs: list[str]
+    params: dict[str, Any] = field(default_factory=dict)
+    options: dict[str, Any] = field(default_factory=dict)
+    memory_factor: float = DEFAULT_MEMORY_FACTOR
+
+
+def _read_json(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_json(path: Path, data: dict) -> None:
+    """Write atomically so a crash never leaves a truncated manifest."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def manifest_path(name: str) -> Path:
+    return Path(settings.OUT_SCRATCH) / MANIFEST_DIR / f"{name}.json"
+
+
+def file_sha256(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class InputCache:
+    """Local copies and content hashes of pipeline inputs, shared by all batches.
+
+    S3 objects are downloaded to ``OUT_SCRATCH/<key>`` (the same location
+    `core.io.download_file_from_s3` uses) and re-downloaded only when their
+    ETag changes. File hashes are cached by size and mtime, so unchanged
+    multi-gigabyte GeoPackages are hashed once.
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path or manifest_path(INPUTS_MANIFEST)
+        data = _read_json(self.path)
+        self._etags: dict[str, str] = data.get("etags", {})
+        self._hashes: dict[str, dict] = data.get("hashes", {})
+
+    def save(self) -> None:
+        _write_json(self.path, {"etags": self._etags, "hashes": self._hashes})
+
+    def fetch(self, uri: str) -> str:
+        """Local path for ``uri``, downloading S3 objects if needed."""
+        url = urlparse(uri)
+        if url.scheme != "s3":
+            return uri
+
+        s3 = settings.get_s3_client()
+        assert s3, "S3 client is not available"
+        key = url.path.lstrip("/")
+        local_path = Path(settings.OUT_SCRATCH) / key
+        etag = s3.head_object(Bucket=url.netloc, Key=key)["ETag"]
+        if not local_path.exists() or self._etags.get(uri) != etag:
+            LOGGER.info("Downloading %s", uri)
+            local_path.parent.mkdir(parents=True, exist_ok=True)
+            s3.download_file(url.netloc, key, str(local_path))
+            self._etags[uri] = etag
+        return str(local_path)
+
+    def content_hash(self, local_path: str) -> str:
+        stat = os.stat(local_path)
+        cached = self._hashes.get(local_path)
+        if (
+            cached
+            and cached["size"] == stat.st_size
+            and cached["mtime_ns"] == stat.st_mtime_ns
+        ):
+            return cached["sha256"]
+        sha256 = file_sha256(local_path)
+        self._hashes[local_path] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": sha256,
+        }
+        return sha256
+
+
+class Manifest:
+    """Fingerprints and results of the entries of one kind of batch."""
+
+    def __init__(self, name: str):
+        self.path = manifest_path(name)
+        self.entries: dict[str, dict] = _read_json(self.path).get("entries", {})
+
+    def save(self) -> None:
+        _write_json(self.path, {"entries": self.entries})
+
+    def is_current(self, task: PipelineTask, fingerprint: str) -> bool:
+        entry = self.entries.get(task.key)
+        return (
+            entry is not None
+            and entry["fingerprint"] == fingerprint
+            and all(os.path.exists(output) for output in task.outputs)
+        )
+
+    def record(self, task: PipelineTask, fingerprint: str, results: list) -> None:
+        self.entries[task.key] = {
+            "fingerprint": fingerprint,
+            "outputs": task.outputs,
+            "results": results,
+            "built_at": datetime.now(timezone.utc).isoformat(),
+        }
+        self.save()
+
+
+def task_fingerprint(task: PipelineTask, input_hashes: dict[str, str]) -> str:
+    payload = {
+        "func": f"{task.func.__module__}.{task.func.__qualname__}",
+        "inputs": input_hashes,
+        "params": task.params,
+    }
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def available_memory() -> int:
+    """Bytes of memory available to new processes (MemAvailable on Linux)."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+
+
+def _run_group(tasks: list[tuple[PipelineTask, dict[str, str]]]) -> list:
+    """Worker entry point: run tasks that share outputs, in order.
+
+    Tasks always run with ``replace=True``: they are only scheduled when stale,
+    and their own "output exists" checks would otherwise keep outputs built
+    from the old inputs.
+    """
+    return [
+        task.func(**local_inputs, **task.params, **task.options, replace=True)
+        for task, local_inputs in tasks
+    ]
+
+
+def _group_by_outputs(tasks: list[PipelineTask]) -> list[list[PipelineTask]]:
+    """Partition tasks so that any two writing the same output share a group.
+
+    Groups keep the tasks' original order.
+    """
+    group_of = list(range(len(tasks)))
+
+    def root(i: int) -> int:
+        while group_of[i] != i:
+            i = group_of[i]
+        return i
+
+    owner: dict[str, int] = {}
+    for i, task in enumerate(tasks):
+        for output in task.outputs:
+            if output in owner:
+                group_of[root(i)] = root(owner[output])
+            else:
+                owner[output] = i
+
+    groups: dict[int, list[PipelineTask]] = {}
+    for i, task in enumerate(tasks):
+        groups.setdefault(root(i), []).append(task)
+    return list(groups.values())
+
+
+def run_tasks(
+    name: str,
+    tasks: list[PipelineTask],
+    replace: bool = False,
+    jobs: int | None = None,
+    memory_budget: int | None = None,
+) -> dict[str, list]:
+    """Build every stale task in ``tasks``; return results by task key.
+
+    Args:
+        name: Manifest name, one per kind of batch (e.g. ``"graphs"``).
+        tasks: Entries to build, in config order.
+        replace: Rebuild every entry regardless of the manifest.
+        jobs: Maximum worker processes. Defaults to the CPU count; ``1`` runs
+            in this process.
+        memory_budget: Bytes the running entries may use together. Defaults to
+            `MEMORY_HEADROOM` of the currently available memory. An entry
+            larger than the budget still runs, but alone.
+
+    Raises:
+        RuntimeError: If any entry failed. Every other entry is still built
+            and recorded first.
+    """
+    manifest = Manifest(name)
+    cache = InputCache()
+
+    results: dict[str, list] = {}
+    stale: list[tuple[PipelineTask, dict[str, str], str]] = []
+    for task in tasks:
+        local_inputs = {
+            arg: cache.fetch(uri) for arg, uri in task.inputs.items() if uri
+        }
+        fingerprint = task_fingerprint(
+            task, {arg: cache.content_hash(p) for arg, p in local_inputs.items()}
+        )
+        if not replace and manifest.is_current(task, fingerprint):
+            LOGGER.info("%s is up to date, skipping", task.key)
+            results[task.key] = manifest.entries[task.key]["results"]
+        else:
+            stale.append((task, local_inputs, fingerprint))
+    cache.save()
+
+    if not stale:
+        return results
+
+    by_key = {task.key: (task, local_inputs, fp) for task, local_inputs, fp in stale}
+    groups = _group_by_outputs([task for task, _, _ in stale])
+    jobs = jobs or os.cpu_count() or 1
+    LOGGER.info(
+        "Building %d of %d %s entries with up to %d worker(s)",
+        len(stale),
+        len(tasks),
+        name,
+        jobs,
+    )
+
+    failures: dict[str, BaseException] = {}
+
+    def finish(group: list[PipelineTask], group_results: list) -> None:
+        for task, task_results in zip(group, group_results):
+            results[task.key] = task_results
+            manifest.record(task, by_key[task.key][2], task_results)
+            LOGGER.info("Built %s", task.key)
+
+    def payload(group: list[PipelineTask]):
+        return [(task, by_key[task.key][1]) for task in group]
+
+    if jobs == 1:
+        for group in groups:
+            try:
+                finish(group, _run_group(payload(group)))
+            except Exception as e:
+                LOGGER.exception("Failed to build %s", [t.key for t in group])
+                for task in group:
+                    failures[task.key] = e
+    else:
+        budget = memory_budget or int(available_memory() * MEMORY_HEADROOM)
+
+        def estimate(group: list[PipelineTask]) -> int:
+            return max(
+                int(
+                    sum(os.path.getsize(p) for p in by_key[t.key][1].values())
+                    * t.memory_factor
+                )
+                for t in group
+            )
+
+        pending = list(groups)
+        running: dict[Future, tuple[list[PipelineTask], int]] = {}
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            while pending or running:
+                in_use = sum(size for _, size in running.values())
+                while pending and len(running) < jobs:
+                    size = estimate(pending[0])
+                    if running and in_use + size > budget:
+                        break
+                    group = pending.pop(0)
+                    running[pool.submit(_run_group, payload(group))] = (group, size)
+                    in_use += size
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    group, _ = running.pop(future)
+                    try:
+                        finish(group, future.result())
+                    except Exception as e:
+                        LOGGER.error(
+                            "Failed to build %s: %s", [t.key for t in group], e
+                        )
+                        for task in group:
+                            failures[task.key] = e
+
+    if failures:
+        raise RuntimeError(
+            f"{len(failures)} {name} entries failed: {', '.join(sorted(failures))}"
+        )
+    return results
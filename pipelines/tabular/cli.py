@@ -1,8 +1,7 @@
 import click
 import logging
 from core.settings import settings
-from core.constants import S3_TABULAR_PREFIX
-from tabular.models import TabularBatch
+from tabular.models import TabularBatch, upload_tabular
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -26,33 +25,33 @@ def tabular() -> None:
     required=True,
 )
 @click.option("--out-path", "-o", help="Path to the output parquet file", required=True)
+@click.option(
+    "--parent-child",
+    help="Parquet or CSV mapping child path to parent_path. Skips the spatial join. Can be an S3 URI",
+    default=None,
+)
 @click.option("--replace", "-f", help="Replace files if they exist", is_flag=True)
 @click.option("--upload", "-u", help="Upload to S3", is_flag=True)
 def build_parquet(
     parent_layer: str,
     child_layer: str,
     out_path: str,
+    parent_child: str | None,
     replace: bool,
     upload: bool,
 ) -> None:
     """
     Build a parquet file from a parent and child layer.
     """
-    df = TabularBatch.merge_and_melt_df(parent_layer, child_layer, out_path, replace)
-    if df is not None:
-        TabularBatch.output_parquet(df, out_path)
-    else:
-        logger.info("File already exists. Skipping creation.")
+    TabularBatch.build_parquet(
+        parent_layer, child_layer, out_path, replace, parent_child=parent_child
+    )
 
     if upload:
         logger.info(f"Uploading {out_path} to S3.")
         s3_client = settings.get_s3_client()
         assert s3_client is not None, "S3 client is not initialized"
-        s3_client.upload_file(
-            settings.OUT_SCRATCH / out_path,
-            settings.S3_BUCKET,
-            f"{S3_TABULAR_PREFIX}/{out_path}",
-        )
+        upload_tabular(s3_client, out_path)
 
 
 @tabular.command("batch-build-parquet")
@@ -60,13 +59,21 @@ def build_parquet(
 @click.option("--data-dir", help="Path to the data directory", required=True)
 @click.option("--replace", "-f", help="Replace files they exist", is_flag=True)
 @click.option("--upload", "-u", help="Upload to S3", is_flag=True)
+@click.option(
+    "--jobs",
+    "-j",
+    type=int,
+    default=None,
+    help="Maximum entries built in parallel (default: CPU count, capped by memory)",
+)
 def batch_build_parquet(
-    config_path: str, data_dir: str, replace: bool, upload: bool
+    config_path: str, data_dir: str, replace: bool, upload: bool, jobs: int | None
 ) -> None:
     """
     Build a parquet file from a config file.
+    Only datasets whose inputs changed since the last run are rebuilt.
     """
     tabular_batch = TabularBatch.from_file(file_path=config_path)
-    tabular_batch.create_all(replace=replace, data_dir=data_dir)
+    tabular_batch.create_all(replace=replace, data_dir=data_dir, jobs=jobs)
     if upload:
         tabular_batch.upload_all()
@@ -3,19 +3,28 @@ from pydantic import BaseModel, ConfigDict
 import os
 import logging
 from core.settings import settings
-import pandas as pd
-import geopandas as gpd
+from pathlib import Path
+from urllib.parse import urlparse
 import duckdb
 from core.constants import S3_TABULAR_PREFIX
+from core.io import download_file_from_s3
+from core.parquet import ROW_GROUP_SIZE, sidecar_path, write_parquet
+from core.runner import PipelineTask, run_tasks
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# parent_path of the parent layer's own rows in the long-format parquet.
+PARENT_PATH = "__parent"
+
 
 class TabularConfig(BaseModel):
     parent_gpkg: str
     child_gpkg: str
     out_path: str
+    # Optional precomputed child -> parent mapping (parquet or CSV with `path`
+    # and `parent_path`); replaces the spatial join when set.
+    parent_child: str | None = None
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -27,102 +36,106 @@ class TabularBatch(Config):
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     @classmethod
-    def merge_and_melt_df(
-        cls, parent_layer: str, child_layer: str, out_path: str, replace: bool = False
-    ) -> pd.DataFrame | None:
-        if not replace and os.path.exists(settings.OUT_SCRATCH / out_path):
+    def build_parquet(
+        cls,
+        parent_layer: str,
+        child_layer: str,
+        out_path: str,
+        replace: bool = False,
+        parent_child: str | None = None,
+    ) -> str | None:
+        """
+        Build the long-format tabular parquet for a parent and child layer.
+
+        The layers are streamed from the GeoPackages by DuckDB (spatial) and
+        written straight to the zstd parquet in one multi-threaded query, so
+        neither layer is ever loaded into pandas.
+
+        Args:
+            parent_layer: Path or S3 URI of the parent GeoPackage.
+            child_layer: Path or S3 URI of the child GeoPackage.
+            out_path: Output file name, relative to OUT_SCRATCH.
+            replace: Rebuild the parquet if it already exists.
+            parent_child: Optional parquet or CSV with ``path`` and
+                ``parent_path`` columns mapping each child to its parent. When
+                omitted the mapping is computed with a spatial join.
+
+        Returns the path to the parquet, or None if it already existed.
+        """
+        out_file = settings.OUT_SCRATCH / out_path
+        if not replace and os.path.exists(out_file):
             logger.info("File already exists. Skipping creation.")
             return None
-        else:
-            logger.info(
-                f"Building tabular parquet from {parent_layer} and {child_layer}."
-            )
 
-            parent_gdf = gpd.read_file(parent_layer)
-            logger.info(f"Read parent layer :: {len(parent_gdf)} rows")
-            child_gdf = gpd.read_file(child_layer)
-            logger.info(f"Read child layer :: {len(child_gdf)} rows")
-            # sjoin to find parent
-            parents_min = parent_gdf[["geometry", "path"]].rename(
-                columns={"path": "parent_path"}
-            )
-            child_gdf = gpd.sjoin(
-                child_gdf, parents_min, how="left", predicate="within"
-            )
-            logger.info(
-                f"Joined child layer with parent layer :: {len(child_gdf)} rows"
-            )
-            parent_gdf["parent_path"] = "__parent"
-            # drop geometry
-            parent_gdf = parent_gdf.drop(columns=["geometry"])
-            child_gdf = child_gdf.drop(columns=["geometry"])
-            full_df = pd.concat([parent_gdf, child_gdf], ignore_index=True)
-            full_df = (
-                full_df.melt(
-                    id_vars=["path", "parent_path"],
-                    var_name="column_name",
-                    value_name="value",
-                )
-                .sort_values(["parent_path", "path", "column_name"])
-                .reset_index()
+        logger.info(f"Building tabular parquet from {parent_layer} and {child_layer}.")
+        parent_layer = _local_path(parent_layer)
+        child_layer = _local_path(child_layer)
+        if parent_child is not None:
+            parent_child = _local_path(parent_child)
+
+        con = duckdb.connect(database=":memory:")
+        try:
+            con.execute("INSTALL spatial; LOAD spatial;")
+            # Spill the final sort to scratch rather than holding it in memory.
+            con.execute(f"SET temp_directory='{settings.OUT_SCRATCH / 'duckdb_tmp'}'")
+            parents = f"st_read('{parent_layer}')"
+            children = f"st_read('{child_layer}')"
+            query = long_format_query(
+                parents=parents,
+                children=children,
+                parent_geometry=_geometry_column(con, parents),
+                child_geometry=_geometry_column(con, children),
+                parent_child=_read_table(parent_child) if parent_child else None,
             )
-            full_df.to_parquet(
-                settings.OUT_SCRATCH
-                / out_path.replace(".parquet", "_temp_long.parquet")
+            logger.info(f"Outputting data to {out_path}.")
+            reader = con.execute(query).fetch_record_batch(ROW_GROUP_SIZE)
+            write_parquet(
+                reader,
+                out_file,
+                cluster_column="parent_path",
+                sort_columns=["parent_path", "path", "column_name"],
             )
-            logger.info("Transformed data to long format.")
-            return full_df
+        finally:
+            con.close()
 
-    @classmethod
-    def output_parquet(cls, df: pd.DataFrame | None, out_path: str) -> None:
-        if df is None:
-            return
-        con = duckdb.connect(database=":memory:")
-        con.sql(
-            f"""
-          CREATE TABLE data AS SELECT * FROM read_parquet('{settings.OUT_SCRATCH / out_path.replace(".parquet", "_temp_long.parquet")}')
-          """
-        )
-        logger.info(f"Outputting data to {out_path}.")
-        con.execute("SET threads=1;")
-        con.sql(
-            f"""
-              COPY (
-                  SELECT
-                      parent_path,
-                      path,
-                      column_name,
-                      value
-                  FROM data
-              )
-              TO '{settings.OUT_SCRATCH / out_path}'
-              (
-                  FORMAT 'parquet',
-                  COMPRESSION 'zstd',
-                  COMPRESSION_LEVEL 12,
-                  OVERWRITE_OR_IGNORE true,
-                  ROW_GROUP_SIZE 10_000
-              );
-            """
-        )
-        logger.info(f"Output {out_path} to {settings.OUT_SCRATCH / out_path}.")
-        con.close()
+        logger.info(f"Output {out_path} to {out_file}.")
+        return str(out_file)
 
-    def create_all(self, replace: bool = False, data_dir: str | None = None):
-        for dataset in self.datasets.values():
+    def create_all(
+        self,
+        replace: bool = False,
+        data_dir: str | None = None,
+        jobs: int | None = None,
+    ):
+        """Build parquets whose inputs changed since the last run (see core.runner)."""
+        logger.info(f"Data dir: {data_dir}")
+        tasks = []
+        for key, dataset in self.datasets.items():
             parent_layer = dataset.parent_gpkg
             child_layer = dataset.child_gpkg
-            out_path = dataset.out_path
-
-            logger.info(
-                f"Creating tabular parquet from {parent_layer} and {child_layer}."
-            )
-            logger.info(f"Data dir: {data_dir}")
+            parent_child = dataset.parent_child
             if data_dir is not None:
                 parent_layer = os.path.join(data_dir, parent_layer)
                 child_layer = os.path.join(data_dir, child_layer)
-            df = self.merge_and_melt_df(parent_layer, child_layer, out_path, replace)
-            self.output_parquet(df, out_path)
+                if parent_child is not None:
+                    parent_child = os.path.join(data_dir, parent_child)
+            tasks.append(
+                PipelineTask(
+                    key=key,
+                    func=build_tabular_entry,
+                    inputs={
+                        "parent_layer": parent_layer,
+                        "child_layer": child_layer,
+                        "parent_child": parent_child,
+                    },
+                    outputs=[
+                        str(settings.OUT_SCRATCH / dataset.out_path),
+                        str(sidecar_path(settings.OUT_SCRATCH / dataset.out_path)),
+                    ],
+                    params={"out_path": dataset.out_path},
+                )
+            )
+        run_tasks("tabular", tasks, replace=replace, jobs=jobs)
 
     def upload_all(self):
         s3_client = settings.get_s3_client()
@@ -130,10 +143,152 @@ class TabularBatch(Config):
         if not s3_client:
             raise ValueError("Failed to get S3 client")
         for dataset in self.datasets.values():
-            out_path = dataset.out_path
-            s3_client.upload_file(
-                settings.OUT_SCRATCH / out_path,
-                settings.S3_BUCKET,
-                f"{S3_TABULAR_PREFIX}/{out_path}",
+            upload_tabular(s3_client, dataset.out_path)
+            logger.info(f"Uploaded {dataset.out_path}")
+
+
+def build_tabular_entry(
+    parent_layer: str,
+    child_layer: str,
+    out_path: str,
+    replace: bool = False,
+    parent_child: str | None = None,
+) -> list[str]:
+    """Build one TabularBatch parquet; runs in a core.runner worker."""
+    TabularBatch.build_parquet(
+        parent_layer, child_layer, out_path, replace, parent_child=parent_child
+    )
+    return [str(settings.OUT_SCRATCH / out_path)]
+
+
+def upload_tabular(s3_client, out_path: str) -> None:
+    """Upload a tabular parquet and its sidecar index to S3."""
+    for path in (Path(out_path), sidecar_path(out_path)):
+        s3_client.upload_file(
+            settings.OUT_SCRATCH / path,
+            settings.S3_BUCKET,
+            f"{S3_TABULAR_PREFIX}/{path}",
+        )
+
+
+def _local_path(path: str) -> str:
+    """Local path for ``path``, downloading it first if it is an S3 URI."""
+    url = urlparse(path)
+    if url.scheme != "s3":
+        return path
+    s3 = settings.get_s3_client()
+    assert s3, "S3 client is not available"
+    return download_file_from_s3(s3, url)
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _geometry_column(con: duckdb.DuckDBPyConnection, relation: str) -> str:
+    """Name of the geometry column of ``relation`` (``geom`` or ``geometry`` in
+    practice, depending on the tool that wrote the GeoPackage)."""
+    for name, column_type, *_ in con.execute(
+        f"DESCRIBE SELECT * FROM {relation}"
+    ).fetchall():
+        if column_type == "GEOMETRY":
+            return name
+    raise ValueError(f"No geometry column found in {relation}")
+
+
+def _read_table(path: str) -> str:
+    if path.endswith(".parquet"):
+        return f"read_parquet('{path}')"
+    return f"read_csv('{path}', header = true)"
+
+
+def long_format_query(
+    parents: str,
+    children: str,
+    parent_geometry: str | None = None,
+    child_geometry: str | None = None,
+    parent_child: str | None = None,
+) -> str:
+    """
+    DuckDB query producing the long (parent_path, path, column_name, value)
+    table for a parent and child layer.
+
+    Parent rows get parent_path `PARENT_PATH`; child rows get the path of the
+    parent they lie within (NULL if none), looked up in ``parent_child`` when
+    given and by spatial join on the geometry columns otherwise. Every other
+    column of either layer is unpivoted, nulls included, so a column present
+    in only one layer yields NULL values for the other. Rows are sorted by
+    parent_path, path and column_name.
+
+    Args:
+        parents: SQL relation for the parent layer, e.g. ``st_read('...')``.
+        children: SQL relation for the child layer.
+        parent_geometry: Geometry column of ``parents``, dropped from the output.
+        child_geometry: Geometry column of ``children``, dropped from the output.
+        parent_child: SQL relation with ``path`` and ``parent_path`` columns.
+    """
+
+    def exclude(*columns: str | None) -> str:
+        names = [_quote(column) for column in columns if column]
+        return f"EXCLUDE ({', '.join(names)})" if names else ""
+
+    if parent_child is not None:
+        children_with_parent = f"""
+            SELECT c.* {exclude(child_geometry)}, pc.parent_path
+            FROM {children} AS c
+            LEFT JOIN (SELECT path, parent_path FROM {parent_child}) AS pc
+                USING (path)
+        """
+    else:
+        if not parent_geometry or not child_geometry:
+            raise ValueError(
+                "Geometry columns are required when no parent-child table is given"
             )
-            logger.info(f"Uploaded {out_path}")
+        child_geom = _quote(child_geometry)
+        parent_geom = _quote(parent_geometry)
+        # The bounding-box comparisons are implied by ST_Within; they let
+        # DuckDB run an inequality join instead of testing every pair.
+        children_with_parent = f"""
+            SELECT
+                c.* {exclude(child_geometry, "_xmin", "_ymin", "_xmax", "_ymax")},
+                p.parent_path
+            FROM (
+                SELECT
+                    *,
+                    ST_XMin({child_geom}) AS _xmin,
+                    ST_YMin({child_geom}) AS _ymin,
+                    ST_XMax({child_geom}) AS _xmax,
+                    ST_YMax({child_geom}) AS _ymax
+                FROM {children}
+            ) AS c
+            LEFT JOIN (
+                SELECT
+                    path AS parent_path,
+                    {parent_geom} AS _geom,
+                    ST_XMin({parent_geom}) AS _xmin,
+                    ST_YMin({parent_geom}) AS _ymin,
+                    ST_XMax({parent_geom}) AS _xmax,
+                    ST_YMax({parent_geom}) AS _ymax
+                FROM {parents}
+            ) AS p
+                ON p._xmin <= c._xmin
+                AND p._ymin <= c._ymin
+                AND p._xmax >= c._xmax
+                AND p._ymax >= c._ymax
+                AND ST_Within(c.{child_geom}, p._geom)
+        """
+
+    return f"""
+        WITH wide AS (
+            SELECT * {exclude(parent_geometry)}, '{PARENT_PATH}' AS parent_path
+            FROM {parents}
+            UNION ALL BY NAME
+            {children_with_parent}
+        )
+        SELECT parent_path, path, column_name, value
+        FROM wide
+        UNPIVOT INCLUDE NULLS (
+            value FOR column_name IN (COLUMNS(* EXCLUDE (path, parent_path)))
+        )
+        ORDER BY parent_path NULLS LAST, path, column_name
+    """
@@ -0,0 +1,133 @@
+"""Tests for pipelines/core/parquet.py."""
+
+import json
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from core.parquet import build_sidecar_index, sidecar_path, write_parquet
+
+
+def _long_table(sizes: dict[str, int]) -> pa.Table:
+    """Sorted long-format rows, ``sizes[parent]`` rows per parent."""
+    parents, paths, values = [], [], []
+    for parent, size in sorted(sizes.items()):
+        for i in range(size):
+            parents.append(parent)
+            paths.append(f"{parent}_{i:05d}")
+            values.append(float(i))
+    return pa.table({"parent_path": parents, "path": paths, "value": values})
+
+
+def _batches(table: pa.Table, size: int = 7):
+    return table.to_batches(max_chunksize=size)
+
+
+def test_sidecar_path():
+    assert sidecar_path("/tmp/foo.parquet") == Path("/tmp/foo.index.json")
+
+
+def test_write_parquet_clusters_row_groups_on_parent(tmp_path: Path):
+    sizes = {"a": 30, "b": 45, "c": 5, "d": 120, "e": 10}
+    table = _long_table(sizes)
+    out = tmp_path / "out.parquet"
+
+    write_parquet(
+        _batches(table),
+        out,
+        schema=table.schema,
+        cluster_column="parent_path",
+        sort_columns=["parent_path", "path"],
+        row_group_size=50,
+        max_row_group_size=100,
+    )
+
+    assert pq.read_table(out).equals(table)
+    metadata = pq.read_metadata(out)
+    groups = [
+        pq.ParquetFile(out).read_row_group(i)["parent_path"].unique().to_pylist()
+        for i in range(metadata.num_row_groups)
+    ]
+    # Parents are never split unless larger than max_row_group_size.
+    assert groups == [["a"], ["b", "c"], ["d"], ["d", "e"]]
+    assert metadata.row_group(0).sorting_columns[0].column_index == 0
+    assert metadata.row_group(0).column(1).is_stats_set
+
+    index = json.loads(sidecar_path(out).read_text())
+    assert index["column"] == "parent_path"
+    assert index["num_rows"] == len(table)
+    assert index["file_size"] == out.stat().st_size
+    assert index["values"]["d"]["row_groups"] == [2, 3]
+    # Ranges cover whole row groups.
+    assert index["values"]["d"]["rows"] == [80, 210]
+    assert index["values"]["e"]["rows"] == [180, 210]
+
+
+def test_sidecar_byte_ranges_contain_row_groups(tmp_path: Path):
+    table = _long_table({"a": 30, "b": 45, "c": 60})
+    out = tmp_path / "out.parquet"
+    write_parquet(
+        _batches(table),
+        out,
+        schema=table.schema,
+        cluster_column="parent_path",
+        row_group_size=50,
+    )
+
+    index = json.loads(sidecar_path(out).read_text())
+    data = out.read_bytes()
+    footer_start, footer_end = index["footer"]
+    assert footer_end == len(data)
+    assert data[footer_end - 4 :] == b"PAR1"
+
+    # Reading only a value's byte range plus the footer is enough to decode it.
+    start, end = index["values"]["b"]["bytes"]
+    sparse = bytearray(len(data))
+    sparse[start:end] = data[start:end]
+    sparse[footer_start:] = data[footer_start:]
+    row_group = index["values"]["b"]["row_groups"][0]
+    rows = pq.ParquetFile(pa.BufferReader(bytes(sparse))).read_row_group(row_group)
+    assert set(rows["parent_path"].to_pylist()) == {"b"}
+
+
+def test_write_parquet_writes_bloom_filter_and_page_index(tmp_path: Path):
+    table = _long_table({"a": 20})
+    out = tmp_path / "points.parquet"
+    write_parquet(_batches(table), out, schema=table.schema, row_group_size=8)
+
+    metadata = pq.read_metadata(out)
+    assert [metadata.row_group(i).num_rows for i in range(3)] == [8, 8, 4]
+    path_column = metadata.row_group(0).column(1)
+    assert path_column.has_column_index
+    assert path_column.has_offset_index
+    assert path_column.to_dict()["bloom_filter_offset"] is not None
+    # No cluster column, no sidecar.
+    assert not sidecar_path(out).exists()
+
+
+def test_build_sidecar_index_skips_null_values(tmp_path: Path):
+    table = pa.table({"parent_path": ["a", None], "path": ["x", "y"]})
+    out = tmp_path / "out.parquet"
+    pq.write_table(table, out)
+
+    index = build_sidecar_index(out, "parent_path", [["a"]])
+    assert list(index["values"]) == ["a"]
+    assert index["values"]["a"]["rows"] == [0, 2]
+
+
+@pytest.mark.parametrize("rows", [0, 1])
+def test_write_parquet_small_inputs(tmp_path: Path, rows: int):
+    table = _long_table({"a": rows}) if rows else _long_table({})
+    schema = pa.schema(
+        [("parent_path", pa.string()), ("path", pa.string()), ("value", pa.float64())]
+    )
+    out = tmp_path / "out.parquet"
+    write_parquet(
+        table.cast(schema).to_batches(),
+        out,
+        schema=schema,
+        cluster_column="parent_path",
+    )
+    assert pq.read_table(out).num_rows == rows
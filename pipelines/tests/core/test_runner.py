@@ -0,0 +1,141 @@
+"""Tests for pipelines/core/runner.py."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from core import runner
+from core.runner import PipelineTask, run_tasks
+
+
+@pytest.fixture(autouse=True)
+def scratch(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(runner.settings, "OUT_SCRATCH", tmp_path / "scratch")
+    return tmp_path
+
+
+def concat_entry(source: str, out: str, suffix: str = "", replace: bool = False):
+    """Task function: write ``source``'s text plus ``suffix`` to ``out``."""
+    text = Path(source).read_text() + suffix
+    Path(out).write_text(text)
+    with open(Path(out).parent / "calls.log", "a") as f:
+        f.write(f"{out}\n")
+    return [out, text]
+
+
+def failing_entry(source: str, replace: bool = False):
+    raise ValueError("boom")
+
+
+def _calls(tmp_path: Path) -> list[str]:
+    log = tmp_path / "calls.log"
+    return log.read_text().split() if log.exists() else []
+
+
+def _task(tmp_path: Path, key: str, out: str | None = None, suffix: str = ""):
+    out_path = str(tmp_path / (out or f"{key}.out"))
+    return PipelineTask(
+        key=key,
+        func=concat_entry,
+        inputs={"source": str(tmp_path / f"{key}.in")},
+        outputs=[out_path],
+        params={"out": out_path, "suffix": suffix},
+    )
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_run_tasks_rebuilds_only_changed_entries(scratch: Path, jobs: int):
+    for key in ("a", "b"):
+        (scratch / f"{key}.in").write_text(key)
+    tasks = [_task(scratch, "a"), _task(scratch, "b")]
+
+    results = run_tasks("test", tasks, jobs=jobs)
+    assert results == {
+        "a": [str(scratch / "a.out"), "a"],
+        "b": [str(scratch / "b.out"), "b"],
+    }
+    assert sorted(_calls(scratch)) == [str(scratch / "a.out"), str(scratch / "b.out")]
+
+    # Nothing changed: results come from the manifest
+    assert run_tasks("test", tasks, jobs=jobs) == {
+        "a": [str(scratch / "a.out"), "a"],
+        "b": [str(scratch / "b.out"), "b"],
+    }
+    assert len(_calls(scratch)) == 2
+
+    # Changed input content
+    (scratch / "a.in").write_text("a2")
+    run_tasks("test", tasks, jobs=jobs)
+    assert _calls(scratch)[2:] == [str(scratch / "a.out")]
+
+    # Changed parameters
+    tasks[1] = _task(scratch, "b", suffix="!")
+    run_tasks("test", tasks, jobs=jobs)
+    assert _calls(scratch)[3:] == [str(scratch / "b.out")]
+    assert (scratch / "b.out").read_text() == "b!"
+
+    # Missing output
+    (scratch / "a.out").unlink()
+    run_tasks("test", tasks, jobs=jobs)
+    assert _calls(scratch)[4:] == [str(scratch / "a.out")]
+
+    # replace=True rebuilds everything
+    run_tasks("test", tasks, replace=True, jobs=jobs)
+    assert len(_calls(scratch)) == 7
+
+
+def test_run_tasks_records_manifest(scratch: Path):
+    (scratch / "a.in").write_text("a")
+    run_tasks("test", [_task(scratch, "a")], jobs=1)
+
+    manifest = json.loads(runner.manifest_path("test").read_text())
+    entry = manifest["entries"]["a"]
+    assert entry["outputs"] == [str(scratch / "a.out")]
+    assert entry["results"] == [str(scratch / "a.out"), "a"]
+
+    inputs = json.loads(runner.manifest_path(runner.INPUTS_MANIFEST).read_text())
+    assert inputs["hashes"][str(scratch / "a.in")]["sha256"] == runner.file_sha256(
+        scratch / "a.in"
+    )
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_run_tasks_failure_does_not_block_other_entries(scratch: Path, jobs: int):
+    for key in ("a", "bad"):
+        (scratch / f"{key}.in").write_text(key)
+    tasks = [
+        PipelineTask(
+            key="bad",
+            func=failing_entry,
+            inputs={"source": str(scratch / "bad.in")},
+            outputs=[str(scratch / "bad.out")],
+        ),
+        _task(scratch, "a"),
+    ]
+
+    with pytest.raises(RuntimeError, match="bad"):
+        run_tasks("test", tasks, jobs=jobs)
+
+    entries = runner.Manifest("test").entries
+    assert set(entries) == {"a"}
+
+
+def test_group_by_outputs_serializes_shared_outputs(scratch: Path):
+    tasks = [
+        _task(scratch, "a", out="shared.out"),
+        _task(scratch, "b"),
+        _task(scratch, "c", out="shared.out"),
+    ]
+    groups = runner._group_by_outputs(tasks)
+    assert [[t.key for t in group] for group in groups] == [["a", "c"], ["b"]]
+
+
+def test_run_tasks_respects_memory_budget(scratch: Path):
+    """With a budget below one entry's estimate, entries still run, one at a time."""
+    for key in ("a", "b", "c"):
+        (scratch / f"{key}.in").write_text(key)
+    tasks = [_task(scratch, key) for key in ("a", "b", "c")]
+
+    assert run_tasks("test", tasks, jobs=3, memory_budget=1).keys() == {"a", "b", "c"}
+    assert len(_calls(scratch)) == 3
@@ -0,0 +1,111 @@
+"""Tests for the DuckDB tabular parquet build in pipelines/tabular/models.py."""
+
+from pathlib import Path
+
+import duckdb
+import geopandas as gpd
+import pandas as pd
+import pytest
+
+from tabular import models
+from tabular.models import PARENT_PATH, TabularBatch, long_format_query
+
+
+def _reference_long_format(
+    parents: pd.DataFrame, children: pd.DataFrame
+) -> pd.DataFrame:
+    """The pandas concat/melt/sort the DuckDB query replaces."""
+    parents = parents.assign(parent_path=PARENT_PATH)
+    full_df = pd.concat([parents, children], ignore_index=True)
+    return (
+        full_df.melt(
+            id_vars=["path", "parent_path"],
+            var_name="column_name",
+            value_name="value",
+        )
+        .sort_values(["parent_path", "path", "column_name"])
+        .reset_index(drop=True)[["parent_path", "path", "column_name", "value"]]
+    )
+
+
+@pytest.fixture
+def layers():
+    parents = pd.DataFrame(
+        {"path": ["vtd_B", "vtd_A"], "total_pop": [30, 12], "vap": [20, 9]}
+    )
+    children = pd.DataFrame(
+        {
+            "path": ["block_10", "block_00", "block_01", "block_99"],
+            "total_pop": [30, 5, 7, 0],
+            "vap": [20, 4, 5, 0],
+            "area": [1.5, 2.0, 0.5, 1.0],
+        }
+    )
+    parent_child = pd.DataFrame(
+        {
+            "path": ["block_00", "block_01", "block_10"],
+            "parent_path": ["vtd_A", "vtd_A", "vtd_B"],
+        }
+    )
+    return parents, children, parent_child
+
+
+def test_long_format_query_matches_pandas_melt(layers):
+    parents, children, parent_child = layers
+    con = duckdb.connect()
+    con.register("parents", parents)
+    con.register("children", children)
+    con.register("parent_child", parent_child)
+
+    result = con.execute(
+        long_format_query("parents", "children", parent_child="parent_child")
+    ).df()
+
+    expected = _reference_long_format(
+        parents, children.merge(parent_child, on="path", how="left")
+    )
+    # NULL parent_path (block_99 has no parent) sorts last, like pandas NaN.
+    assert pd.isna(result["parent_path"].iloc[-1])
+    pd.testing.assert_frame_equal(
+        result.fillna(-1), expected.fillna(-1), check_dtype=False
+    )
+
+
+def test_long_format_query_requires_geometry_for_spatial_join():
+    with pytest.raises(ValueError, match="Geometry columns are required"):
+        long_format_query("parents", "children")
+
+
+@pytest.fixture
+def spatial_extension():
+    try:
+        duckdb.connect().execute("INSTALL spatial; LOAD spatial;")
+    except duckdb.Error as e:
+        pytest.skip(f"DuckDB spatial extension unavailable: {e}")
+
+
+@pytest.mark.usefixtures("spatial_extension")
+def test_build_parquet_spatial_join(normal_gpkgs, tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(models.settings, "OUT_SCRATCH", tmp_path)
+    child_path, parent_path = normal_gpkgs
+    children = gpd.read_file(child_path)
+    children["total_pop"] = range(len(children))
+    children.to_file(child_path, layer="simple_child", driver="GPKG")
+
+    out = TabularBatch.build_parquet(str(parent_path), str(child_path), "out.parquet")
+
+    result = pd.read_parquet(out)
+    child_rows = result[result["parent_path"] != PARENT_PATH]
+    assert dict(zip(child_rows["path"], child_rows["parent_path"])) == {
+        "block_00": "vtd_A",
+        "block_01": "vtd_A",
+        "block_10": "vtd_B",
+        "block_11": "vtd_B",
+        "block_20": "vtd_C",
+        "block_21": "vtd_C",
+    }
+    assert set(result["column_name"]) == {"total_pop"}
+    assert (
+        TabularBatch.build_parquet(str(parent_path), str(child_path), "out.parquet")
+        is None
+    )
@@ -5,15 +5,25 @@ Covers:
 - _annotate_graph_with_parents_from_gpkg: parent annotation via spatial join,
   including the nearest-parent fallback for geographical mismatch
 - _build_combined_graph: dual-level graph structure and non-contiguous parent detection
-- build_combined_graph_from_gpkg: end-to-end integration
+- build_combined_graph_from_gpkg: end-to-end integration, including the
+  per-node EPSG:4326 bounds stored on the graph
+- parent_child_mapping / write_parent_child_artifact: the parquet artifact the
+  backend loads into parentchildedges
 - Orphaned nodes: graph edges referencing blocks with no corresponding geometry
 """
 
+import random
 import sqlite3
 from pathlib import Path
 
+import pandas as pd
 import pytest
-from networkx import Graph
+from networkx import (
+    Graph,
+    grid_2d_graph,
+    number_connected_components,
+    relabel_nodes,
+)
 
 from transforms.graph import (
     _annotate_graph_with_parents_from_gpkg,
@@ -21,6 +31,8 @@ from transforms.graph import (
     _gpkg_layer_name,
     build_combined_graph_from_gpkg,
     graph_from_gpkg,
+    parent_child_mapping,
+    write_parent_child_artifact,
 )
 
 
@@ -102,9 +114,9 @@ def test_annotate_geographical_mismatch_leaves_block_without_parent(mismatch_gpk
         parent_layer_name="mismatch_parent",
     )
 
-    assert (
-        "parent" not in G.nodes["block_00"]
-    ), "block_00 should be unmatched (mismatch)"
+    assert "parent" not in G.nodes["block_00"], (
+        "block_00 should be unmatched (mismatch)"
+    )
     # Other blocks are still matched normally
     assert G.nodes["block_10"]["parent"] == "vtd_B"
     assert G.nodes["block_20"]["parent"] == "vtd_C"
@@ -277,6 +289,72 @@ def test_build_combined_graph_non_contiguous_parent_detected():
     assert "vtd_C" not in G.graph["non_contiguous_parents"]
 
 
+def _reference_build_combined_graph(G):
+    """Edge-by-edge construction the vectorized _build_combined_graph must match."""
+    G.graph["weighted_edges"] = {}
+    for u, v in list(G.edges()):
+        p_u = G.nodes[u]["parent"]
+        p_v = G.nodes[v]["parent"]
+        if p_u != p_v:
+            G.add_edge(u, p_v)
+            G.add_edge(v, p_u)
+            key = (p_u, p_v) if p_u < p_v else (p_v, p_u)
+            G.graph["weighted_edges"][key] = G.graph["weighted_edges"].get(key, 0) + 1
+    for p_u, p_v in G.graph["weighted_edges"]:
+        G.add_edge(p_u, p_v)
+    for node, data in list(G.nodes(data=True)):
+        parent = data.get("parent")
+        if parent:
+            G.nodes[parent].setdefault("children", set()).add(node)
+    G.graph["non_contiguous_parents"] = {
+        node
+        for node, data in G.nodes(data=True)
+        if data.get("children")
+        and number_connected_components(G.subgraph(data["children"])) > 1
+    }
+
+
+def _random_annotated_grid(seed: int, size: int = 12, num_parents: int = 7):
+    rng = random.Random(seed)
+    G = grid_2d_graph(size, size)
+    G = relabel_nodes(G, {node: f"block_{node[0]:02d}_{node[1]:02d}" for node in G})
+    for node in G.nodes:
+        G.nodes[node]["parent"] = f"vtd_{rng.randrange(num_parents)}"
+    return G
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_build_combined_graph_matches_reference(seed):
+    expected = _random_annotated_grid(seed)
+    actual = _random_annotated_grid(seed)
+    _reference_build_combined_graph(expected)
+    _build_combined_graph(actual)
+
+    assert list(actual.nodes(data=True)) == list(expected.nodes(data=True))
+    assert [(n, list(nbrs)) for n, nbrs in actual.adjacency()] == [
+        (n, list(nbrs)) for n, nbrs in expected.adjacency()
+    ]
+    assert list(actual.graph["weighted_edges"].items()) == list(
+        expected.graph["weighted_edges"].items()
+    )
+    assert all(type(w) is int for w in actual.graph["weighted_edges"].values())
+    assert actual.graph == expected.graph
+    assert expected.graph["non_contiguous_parents"]
+
+
+def test_build_combined_graph_parent_without_boundary():
+    """A parent whose blocks touch no other parent still gets a node."""
+    G = _make_annotated_graph()
+    G.add_edge("block_island_0", "block_island_1")
+    G.nodes["block_island_0"]["parent"] = "vtd_island"
+    G.nodes["block_island_1"]["parent"] = "vtd_island"
+    _build_combined_graph(G)
+
+    assert G.nodes["vtd_island"]["children"] == {"block_island_0", "block_island_1"}
+    assert G.degree("vtd_island") == 0
+    assert "vtd_island" not in G.graph["non_contiguous_parents"]
+
+
 # ---------------------------------------------------------------------------
 # build_combined_graph_from_gpkg (integration)
 # ---------------------------------------------------------------------------
@@ -297,6 +375,13 @@ def test_build_combined_graph_from_gpkg_normal(normal_gpkgs):
     assert G.nodes["vtd_A"]["children"] == {"block_00", "block_01"}
     assert len(G.graph["non_contiguous_parents"]) == 0
 
+    bounds = dict(
+        zip(G.graph["bounds_4326"]["paths"], G.graph["bounds_4326"]["bounds"].tolist())
+    )
+    assert set(bounds) == set(G.nodes)
+    assert bounds["block_10"] == pytest.approx([1, 0, 2, 1])
+    assert bounds["vtd_A"] == pytest.approx([0, 0, 1, 2])
+
 
 def test_build_combined_graph_from_gpkg_non_contiguous(non_contiguous_gpkgs):
     child_path, parent_path = non_contiguous_gpkgs
@@ -308,3 +393,57 @@ def test_build_combined_graph_from_gpkg_non_contiguous(non_contiguous_gpkgs):
     )
 
     assert "vtd_A" in G.graph["non_contiguous_parents"]
+
+
+# ---------------------------------------------------------------------------
+# parent_child_mapping / write_parent_child_artifact
+# ---------------------------------------------------------------------------
+
+
+def test_parent_child_mapping(normal_gpkgs):
+    child_path, parent_path = normal_gpkgs
+    mapping = parent_child_mapping(
+        child_path,
+        parent_path,
+        child_layer_name="simple_child",
+        parent_layer_name="simple_parent",
+    )
+
+    assert list(mapping.columns) == ["parent_path", "path"]
+    assert list(mapping.itertuples(index=False, name=None)) == [
+        ("vtd_A", "block_00"),
+        ("vtd_A", "block_01"),
+        ("vtd_B", "block_10"),
+        ("vtd_B", "block_11"),
+        ("vtd_C", "block_20"),
+        ("vtd_C", "block_21"),
+    ]
+
+
+def test_parent_child_mapping_omits_children_without_parent(mismatch_gpkgs):
+    child_path, parent_path = mismatch_gpkgs
+    mapping = parent_child_mapping(
+        child_path,
+        parent_path,
+        child_layer_name="mismatch_child",
+        parent_layer_name="mismatch_parent",
+    )
+
+    # The shrunk vtd_A contains neither block in the left column.
+    assert set(mapping["path"]) == {"block_10", "block_11", "block_20", "block_21"}
+
+
+def test_write_parent_child_artifact_round_trips(normal_gpkgs, tmp_path: Path):
+    child_path, parent_path = normal_gpkgs
+    mapping = parent_child_mapping(
+        child_path,
+        parent_path,
+        child_layer_name="simple_child",
+        parent_layer_name="simple_parent",
+    )
+
+    path = write_parent_child_artifact(
+        mapping, "simple", out_path=tmp_path / "pc" / "simple.parquet"
+    )
+
+    pd.testing.assert_frame_equal(pd.read_parquet(path), mapping)
@@ -0,0 +1,137 @@
+"""Tests for pipelines/transforms/synthetic.py.
+
+Covers:
+- generate_state: gerrydb path formats, block/VTD nesting, sums and coverage
+- _tessellate: tiled Voronoi diagrams match a single diagram
+- write_state: artifacts readable by the graph pipeline (parent_child_mapping,
+  graph_from_gpkg) and deterministic for a seed
+"""
+
+import pickle
+
+import msgpack
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.settings import settings
+from transforms.graph import graph_from_gpkg, parent_child_mapping
+from transforms.synthetic import (
+    SyntheticStateConfig,
+    _draw_points,
+    _tessellate,
+    generate_state,
+    write_state,
+)
+
+CONFIG = SyntheticStateConfig(name="synth", num_blocks=2_000, blocks_per_vtd=40)
+
+
+@pytest.fixture(scope="module")
+def state():
+    return generate_state(CONFIG)
+
+
+@pytest.fixture
+def written(state, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "OUT_SCRATCH", tmp_path)
+    return write_state(state)
+
+
+def test_paths(state):
+    assert state.blocks["path"].str.fullmatch(r"99\d{13}").all()
+    assert state.vtds["path"].str.fullmatch(r"vtd:99\d{9}").all()
+    assert state.blocks["path"].is_unique and state.vtds["path"].is_unique
+    # Blocks nest in their VTD's county and tract.
+    mapping = state.parent_child
+    assert (mapping["path"].str[:11] == mapping["parent_path"].str[4:]).all()
+    assert len(mapping) == CONFIG.num_blocks
+    assert set(mapping["parent_path"]) == set(state.vtds["path"])
+
+
+def test_vtd_columns_sum_blocks(state):
+    by_vtd = (
+        state.blocks.drop(columns="geometry")
+        .merge(state.parent_child, on="path")
+        .drop(columns="path")
+        .groupby("parent_path")
+        .sum()
+    )
+    vtds = state.vtds.drop(columns="geometry").set_index("path").loc[by_vtd.index]
+    pd.testing.assert_frame_equal(by_vtd, vtds, check_names=False)
+
+    blocks = state.blocks
+    race_pop = [c for c in blocks if c.endswith("pop_20") and c != "total_pop_20"]
+    race_vap = [c for c in blocks if c.endswith("vap_20") and c != "total_vap_20"]
+    assert (blocks[race_pop].sum(axis=1) == blocks["total_pop_20"]).all()
+    assert (blocks[race_vap].sum(axis=1) == blocks["total_vap_20"]).all()
+    assert (blocks["total_vap_20"] <= blocks["total_pop_20"]).all()
+    votes = blocks["pres_2020_dem"] + blocks["pres_2020_rep"]
+    assert (votes <= blocks["total_vap_20"]).all()
+
+
+def test_blocks_cover_extent(state):
+    assert state.blocks.is_valid.all()
+    area = CONFIG.width * CONFIG.height
+    assert state.blocks.area.sum() == pytest.approx(area)
+    assert state.vtds.area.sum() == pytest.approx(area)
+    assert state.blocks.total_bounds == pytest.approx(
+        [
+            CONFIG.origin[0],
+            CONFIG.origin[1],
+            CONFIG.origin[0] + CONFIG.width,
+            CONFIG.origin[1] + CONFIG.height,
+        ]
+    )
+
+
+def test_tiled_tessellation_matches_single_diagram():
+    config = CONFIG.model_copy(update={"tile_blocks": 200})
+    points = _draw_points(config, np.random.default_rng(0))
+    cells, edges, perimeters = _tessellate(points, CONFIG)
+    tiled_cells, tiled_edges, tiled_perimeters = _tessellate(points, config)
+
+    order, tiled_order = np.lexsort(edges.T), np.lexsort(tiled_edges.T)
+    np.testing.assert_array_equal(edges[order], tiled_edges[tiled_order])
+    np.testing.assert_allclose(perimeters[order], tiled_perimeters[tiled_order])
+    np.testing.assert_allclose([c.area for c in cells], [c.area for c in tiled_cells])
+
+
+def test_write_state(state, written, tmp_path):
+    block_gpkg = written["gpkgs"]["synth_block_districtr_view"]
+    vtd_gpkg = written["gpkgs"]["synth_vtd_districtr_view"]
+
+    # The spatial join the graph pipeline uses recovers the generated nesting.
+    mapping = parent_child_mapping(block_gpkg, vtd_gpkg)
+    pd.testing.assert_frame_equal(mapping, state.parent_child)
+    assert pd.read_parquet(written["parent_child"]).equals(state.parent_child)
+
+    G = graph_from_gpkg(block_gpkg)
+    assert G.number_of_edges() == len(state.block_edges)
+    assert graph_from_gpkg(vtd_gpkg).number_of_edges() == len(state.vtd_edges)
+
+    with open(written["graphs"]["synth_districtr_view"], "rb") as f:
+        combined = pickle.load(f)
+    assert combined.number_of_nodes() == len(state.blocks) + len(state.vtds)
+    assert len(combined.graph["bounds_4326"]["paths"]) == combined.number_of_nodes()
+
+    with open(written["plan"], "rb") as f:
+        plan = msgpack.unpackb(f.read())
+    assert {path for path, _ in plan} == set(state.vtds["path"])
+    assert {zone for _, zone in plan} == set(range(1, CONFIG.num_districts + 1))
+    assert (tmp_path / "synthetic" / "synth_manifest.json").exists()
+
+
+def test_deterministic(state):
+    again = generate_state(CONFIG)
+    pd.testing.assert_frame_equal(again.blocks, state.blocks)
+    pd.testing.assert_frame_equal(again.block_edges, state.block_edges)
+    other = generate_state(CONFIG.model_copy(update={"seed": 1}))
+    assert not other.blocks.geometry.geom_equals(state.blocks.geometry).all()
+
+
+def test_config_limits():
+    with pytest.raises(ValueError):
+        SyntheticStateConfig(num_blocks=100)
+    assert SyntheticStateConfig(num_blocks=1_000).num_counties == 3
+    assert SyntheticStateConfig(num_blocks=10_000_000).num_counties == 250
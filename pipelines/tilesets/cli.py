@@ -109,17 +109,29 @@ def merge_gerrydb_tilesets(
 )
 @click.option("--replace", "-f", help="Replace files they exist", is_flag=True)
 @click.option("--upload", "-u", help="Upload tileset results to S3", is_flag=True)
+@click.option(
+    "--jobs",
+    "-j",
+    type=int,
+    default=None,
+    help="Maximum entries built in parallel (default: CPU count, capped by memory)",
+)
 def batch_create_tilesets(
-    config_path: str, data_dir: str | None, replace: bool, upload: bool
+    config_path: str,
+    data_dir: str | None,
+    replace: bool,
+    upload: bool,
+    jobs: int | None,
 ) -> None:
     """
     Batch create tilesets from a config file. Does not upload the tileset to S3. Use the s3 cli for that.
+    Only entries whose inputs changed since the last run are rebuilt.
     """
     if not os.path.exists(settings.OUT_SCRATCH):
         os.makedirs(settings.OUT_SCRATCH)
 
     tileset_batch = TilesetBatch.from_file(file_path=config_path)
-    tileset_batch.create_all(replace=replace, data_dir=data_dir)
+    tileset_batch.create_all(replace=replace, data_dir=data_dir, jobs=jobs)
 
     if upload:
         tileset_batch.upload_results()
@@ -9,6 +9,8 @@ from core.settings import settings
 from core.io import download_file_from_s3
 from tilesets.utils import merge_tilesets
 from core.constants import S3_TILESETS_PREFIX
+from core.runner import PipelineTask, run_tasks
+from core.parquet import ROW_GROUP_SIZE, write_parquet
 from pathlib import Path
 
 import geopandas as gpd
@@ -38,6 +40,14 @@ class GerryDBTileset(BaseModel):
     def target_layer_name(self) -> str:
         return self.new_layer_name or self.layer_name
 
+    def output_paths(self) -> list[str]:
+        """Files written by generate_tiles and generate_points."""
+        return [
+            f"{settings.OUT_SCRATCH}/{self.layer_name}.fgb",
+            f"{settings.OUT_SCRATCH}/{self.layer_name}.pmtiles",
+            f"{settings.OUT_SCRATCH}/{self.layer_name}_points.parquet",
+        ]
+
     def generate_tiles(self, replace: bool = False) -> str:
         """Generate GerryDB tileset.
 
@@ -151,27 +161,18 @@ class GerryDBTileset(BaseModel):
         # save to parquet using duckdb
         con = duckdb.connect()
         con.sql("CREATE TABLE points AS SELECT * FROM gdf")
-        con.execute("SET threads=1;")
-        con.sql(
+        reader = con.execute(
             f"""
-              COPY (
-                  SELECT
-                      path,
-                      x,
-                      y,
-                      {", ".join(pop_columns)}
-                  FROM points
-              )
-              TO '{settings.OUT_SCRATCH / f"{self.layer_name}_points.parquet"}'
-              (
-                  FORMAT 'parquet',
-                  COMPRESSION 'zstd',
-                  COMPRESSION_LEVEL 12,
-                  OVERWRITE_OR_IGNORE true,
-                  ROW_GROUP_SIZE 10_000
-              );
+              SELECT
+                  path,
+                  x,
+                  y,
+                  {", ".join(pop_columns)}
+              FROM points
+              ORDER BY path
             """
-        )
+        ).fetch_record_batch(ROW_GROUP_SIZE)
+        write_parquet(reader, out_path, sort_columns=["path"])
         con.close()
         return f"{settings.OUT_SCRATCH}/{self.layer_name}_points.parquet"
 
@@ -183,42 +184,41 @@ class TilesetBatch(Config):
     def add_result(self, file_path: str, s3_key: str):
         self._results.append(ResultOutput(file_path=file_path, s3_key=s3_key))
 
-    def create_all(self, replace: bool = False, data_dir: str | None = None):
-        for k, tilesets in self.tilesets.items():
-            (parent_tileset, child_tileset) = tilesets
-
-            if data_dir is not None:
-                parent_tileset.gpkg = os.path.join(data_dir, parent_tileset.gpkg)
-            out_parent_tiles = parent_tileset.generate_tiles(replace=replace)
-
-            out_parent_points = parent_tileset.generate_points(replace=replace)
-            self.add_result(
-                out_parent_points,
-                f"{S3_TILESETS_PREFIX}/{parent_tileset.layer_name}_points.parquet",
-            )
-
-            if not child_tileset:
-                self.add_result(out_parent_tiles, f"{S3_TILESETS_PREFIX}/{k}.pmtiles")
-                continue
-
-            logger.info(f"Generating tiles for parent-child layer {k}")
-
+    def create_all(
+        self,
+        replace: bool = False,
+        data_dir: str | None = None,
+        jobs: int | None = None,
+    ):
+        """Build tilesets whose inputs changed since the last run (see core.runner)."""
+        tasks = []
+        for k, (parent_tileset, child_tileset) in self.tilesets.items():
+            inputs = {"parent_gpkg": parent_tileset.gpkg}
+            params = {"key": k, "parent": _tileset_params(parent_tileset)}
+            outputs = parent_tileset.output_paths()
+            if child_tileset:
+                inputs["child_gpkg"] = child_tileset.gpkg
+                params["child"] = _tileset_params(child_tileset)
+                outputs += child_tileset.output_paths()
+                outputs.append(f"{settings.OUT_SCRATCH}/{k}.pmtiles")
             if data_dir is not None:
-                child_tileset.gpkg = os.path.join(data_dir, child_tileset.gpkg)
-            out_child_tiles = child_tileset.generate_tiles(replace=replace)
-
-            out_child_points = child_tileset.generate_points(replace=replace)
-            self.add_result(
-                out_child_points,
-                f"{S3_TILESETS_PREFIX}/{child_tileset.layer_name}_points.parquet",
+                inputs = {
+                    arg: os.path.join(data_dir, gpkg) for arg, gpkg in inputs.items()
+                }
+            tasks.append(
+                PipelineTask(
+                    key=k,
+                    func=build_tileset_entry,
+                    inputs=inputs,
+                    outputs=outputs,
+                    params=params,
+                )
             )
 
-            result = merge_tilesets(
-                parent_layer=out_parent_tiles,
-                child_layer=out_child_tiles,
-                out_name=k,
-            )
-            self.add_result(result, f"{S3_TILESETS_PREFIX}/{k}.pmtiles")
+        results = run_tasks("tilesets", tasks, replace=replace, jobs=jobs)
+        for task in tasks:
+            for file_path, s3_key in results[task.key]:
+                self.add_result(file_path, s3_key)
 
     def upload_results(self):
         logger.info("Uploading results to S3")
@@ -230,3 +230,60 @@ class TilesetBatch(Config):
             s3_client.upload_file(result.file_path, settings.S3_BUCKET, result.s3_key)
 
             logger.info(f"Uploaded {result.file_path} to {result.s3_key}")
+
+
+def _tileset_params(tileset: GerryDBTileset) -> dict:
+    """Everything but the gpkg, which core.runner fingerprints by content."""
+    return {
+        "layer_name": tileset.layer_name,
+        "new_layer_name": tileset.new_layer_name,
+        "columns": list(tileset.columns),
+    }
+
+
+def build_tileset_entry(
+    key: str,
+    parent: dict,
+    parent_gpkg: str,
+    child: dict | None = None,
+    child_gpkg: str | None = None,
+    replace: bool = False,
+) -> list[tuple[str, str]]:
+    """Build one TilesetBatch entry; runs in a core.runner worker.
+
+    Returns ``(file_path, s3_key)`` pairs for `TilesetBatch.add_result`.
+    """
+    results = []
+    parent_tileset = GerryDBTileset(gpkg=parent_gpkg, **parent)
+    out_parent_tiles = parent_tileset.generate_tiles(replace=replace)
+    out_parent_points = parent_tileset.generate_points(replace=replace)
+    results.append(
+        (
+            out_parent_points,
+            f"{S3_TILESETS_PREFIX}/{parent_tileset.layer_name}_points.parquet",
+        )
+    )
+
+    if child is None:
+        results.append((out_parent_tiles, f"{S3_TILESETS_PREFIX}/{key}.pmtiles"))
+        return results
+
+    logger.info(f"Generating tiles for parent-child layer {key}")
+    child_tileset = GerryDBTileset(gpkg=child_gpkg, **child)
+    out_child_tiles = child_tileset.generate_tiles(replace=replace)
+    out_child_points = child_tileset.generate_points(replace=replace)
+    results.append(
+        (
+            out_child_points,
+            f"{S3_TILESETS_PREFIX}/{child_tileset.layer_name}_points.parquet",
+        )
+    )
+
+    result = merge_tilesets(
+        parent_layer=out_parent_tiles,
+        child_layer=out_child_tiles,
+        out_name=key,
+        replace=replace,
+    )
+    results.append((result, f"{S3_TILESETS_PREFIX}/{key}.pmtiles"))
+    return results
@@ -1,7 +1,14 @@
 import click
 import logging
 from transforms.models import AggregateConfig
-from transforms.graph import build_combined_graph_from_gpkg, write_graph, GraphBatch
+from transforms.graph import (
+    build_combined_graph_from_gpkg,
+    parent_child_mapping,
+    write_graph,
+    write_parent_child_artifact,
+    GraphBatch,
+)
+from transforms.synthetic import SyntheticStateConfig, generate_state, write_state
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -185,6 +192,72 @@ def create_graph(
     logger.info("Done. Graph written to %s", path)
 
 
+@transforms.command("create-parent-child-artifact")
+@click.option(
+    "--child-gpkg",
+    "-c",
+    help="Path or S3 URI to block-level GeoPackage",
+    required=True,
+)
+@click.option(
+    "--parent-gpkg",
+    "-p",
+    help="Path or S3 URI to parent-level GeoPackage",
+    required=True,
+)
+@click.option(
+    "--gerrydb-name",
+    "-g",
+    help="GerryDB table name for the map (used as the output filename)",
+    required=True,
+)
+@click.option(
+    "--child-layer-name",
+    default=None,
+    help="Layer name in child GeoPackage (default: gpkg filename stem)",
+)
+@click.option(
+    "--parent-layer-name",
+    default=None,
+    help="Layer name in parent GeoPackage (default: gpkg filename stem)",
+)
+@click.option(
+    "--out-path",
+    "-o",
+    default=None,
+    help="Override output path (default: OUT_SCRATCH/parent_child/<gerrydb-name>.parquet)",
+)
+@click.option(
+    "--upload",
+    "-u",
+    is_flag=True,
+    default=False,
+    help="Upload the artifact to S3 after writing",
+)
+def create_parent_child_artifact(
+    child_gpkg: str,
+    parent_gpkg: str,
+    gerrydb_name: str,
+    child_layer_name: str | None,
+    parent_layer_name: str | None,
+    out_path: str | None,
+    upload: bool,
+) -> None:
+    """Write the child -> parent mapping of a shatterable map as parquet.
+
+    Load it into the database with the backend's
+    ``create-parent-child-edges --from-artifact``. ``batch-create-graphs``
+    writes the same artifact for every shatterable map.
+    """
+    mapping = parent_child_mapping(
+        child_gpkg, parent_gpkg, child_layer_name, parent_layer_name
+    )
+    path = write_parent_child_artifact(
+        mapping, gerrydb_name, out_path=out_path, upload_to_s3=upload
+    )
+    logger.info("Done. Parent-child artifact written to %s", path)
+
+
 @transforms.command("batch-create-graphs")
 @click.option("--config-path", required=True, help="Path to graph batch config YAML")
 @click.option("--data-dir", default=None, help="Directory containing gpkg files")
@@ -198,9 +271,86 @@ def create_graph(
     default=False,
     help="Upload graphs to S3 after building",
 )
+@click.option(
+    "--jobs",
+    "-j",
+    type=int,
+    default=None,
+    help="Maximum entries built in parallel (default: CPU count, capped by memory)",
+)
 def batch_create_graphs(
-    config_path: str, data_dir: str | None, replace: bool, upload: bool
+    config_path: str,
+    data_dir: str | None,
+    replace: bool,
+    upload: bool,
+    jobs: int | None,
 ) -> None:
-    """Build dual-level graph pkls for all maps in a batch config file."""
+    """Build dual-level graph pkls for all maps in a batch config file.
+
+    Shatterable maps also get a parent-child artifact (see
+    create-parent-child-artifact). Only maps whose inputs changed since the last run are rebuilt.
+    """
     batch = GraphBatch.from_file(file_path=config_path)
-    batch.create_all(data_dir=data_dir, replace=replace, upload=upload)
+    batch.create_all(data_dir=data_dir, replace=replace, upload=upload, jobs=jobs)
+
+
+@transforms.command("create-synthetic-state")
+@click.option("--name", default="synthetic", help="Name prefix of the layers")
+@click.option("--num-blocks", "-n", type=int, required=True, help="Number of blocks")
+@click.option("--blocks-per-vtd", type=int, default=50, help="Mean blocks per VTD")
+@click.option(
+    "--num-counties",
+    type=int,
+    default=None,
+    help="Number of counties (default: one per 40k blocks)",
+)
+@click.option(
+    "--num-districts",
+    type=int,
+    default=14,
+    help="Districts in the generated stress-test plan",
+)
+@click.option("--seed", type=int, default=0, help="Random seed")
+@click.option(
+    "--out-dir",
+    "-o",
+    default=None,
+    help="Directory for the GeoPackages, plan and manifest (default: OUT_SCRATCH/synthetic)",
+)
+@click.option(
+    "--no-graph",
+    is_flag=True,
+    default=False,
+    help="Skip writing the graph pkls",
+)
+def create_synthetic_state(
+    name: str,
+    num_blocks: int,
+    blocks_per_vtd: int,
+    num_counties: int | None,
+    num_districts: int,
+    seed: int,
+    out_dir: str | None,
+    no_graph: bool,
+) -> None:
+    """Generate a synthetic block/VTD state for scale testing.
+
+    Writes gerrydb-style GeoPackages, graphs, a parent-child artifact and a
+    stress-test plan; no production data or database access required.
+    """
+    config = SyntheticStateConfig(
+        name=name,
+        num_blocks=num_blocks,
+        blocks_per_vtd=blocks_per_vtd,
+        num_counties=num_counties,
+        num_districts=num_districts,
+        seed=seed,
+    )
+    state = generate_state(config)
+    manifest = write_state(state, out_dir=out_dir, write_graphs=not no_graph)
+    logger.info(
+        "Done. %d blocks, %d VTDs written to %s",
+        manifest["blocks"],
+        manifest["vtds"],
+        manifest["gpkgs"][config.block_layer],
+    )
@@ -13,17 +13,22 @@ from pathlib import Path
 from urllib.parse import urlparse
 
 import geopandas as gpd
+import numpy as np
 import pandas as pd
-from networkx import Graph, number_connected_components
+from networkx import Graph
 from pydantic import BaseModel
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
 
 from core.io import download_file_from_s3
 from core.models import Config
+from core.runner import PipelineTask, run_tasks
 from core.settings import settings
 
 LOGGER = logging.getLogger(__name__)
 
 _S3_GRAPH_PREFIX = "graphs"
+_S3_PARENT_CHILD_PREFIX = "parent_child"
 _SAFE_IDENT_RE = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*$")
 
 
@@ -80,19 +85,21 @@ def _gpkg_layer_name(gpkg_path: str | Path) -> str:
     return Path(url.path).stem
 
 
-def _annotate_graph_with_parents_from_gpkg(
-    G: Graph,
+def parent_child_mapping(
     child_gpkg: str | Path,
     parent_gpkg: str | Path,
     child_layer_name: str | None = None,
     parent_layer_name: str | None = None,
-) -> None:
-    """Attach parent node attributes to block nodes via GeoPackage spatial join.
+) -> pd.DataFrame:
+    """Child -> parent mapping derived from a GeoPackage spatial join.
+
+    Uses representative_point + within predicate, matching the PostGIS
+    ST_PointOnSurface/ST_Contains procedure. Layer names default to the gpkg
+    filename stem (GerryDB convention).
 
-    Replaces the parentchildedges DB query in the backend. Uses representative_point
-    + within predicate, matching the PostGIS ST_PointOnSurface/ST_Contains procedure.
-    Layer names default to the gpkg filename stem (GerryDB convention).
-    Mutates G in place.
+    Returns a DataFrame with ``parent_path`` and ``path`` (the child) columns,
+    sorted by both, with one row per containing parent. Children within no
+    parent are omitted.
     """
     child_local = _resolve_path(child_gpkg)
     parent_local = _resolve_path(parent_gpkg)
@@ -101,7 +108,6 @@ def _annotate_graph_with_parents_from_gpkg(
     parent_layer = parent_layer_name or _gpkg_layer_name(parent_gpkg)
 
     child_gdf = gpd.read_file(child_local, layer=child_layer)[["path", "geometry"]]
-    child_gdf = child_gdf[child_gdf["path"].isin(G.nodes)]
 
     parent_gdf = gpd.read_file(parent_local, layer=parent_layer)[
         ["path", "geometry"]
@@ -117,24 +123,87 @@ def _annotate_graph_with_parents_from_gpkg(
     joined = gpd.sjoin(
         child_points[["path", "geometry"]],
         parent_gdf[["parent_path", "geometry"]],
-        how="left",
+        how="inner",
         predicate="within",
     )
+    return (
+        pd.DataFrame(joined[["parent_path", "path"]])
+        .sort_values(["parent_path", "path"])
+        .reset_index(drop=True)
+    )
+
 
-    parent_map = joined.set_index("path")["parent_path"].to_dict()
-    matched = 0
+def write_parent_child_artifact(
+    mapping: pd.DataFrame,
+    gerrydb_name: str,
+    out_path: str | Path | None = None,
+    upload_to_s3: bool = False,
+) -> Path:
+    """Write a `parent_child_mapping` to OUT_SCRATCH/parent_child/<name>.parquet.
+
+    The backend loads it with ``create-parent-child-edges --from-artifact``
+    instead of recomputing the join in PostGIS, and the tabular pipeline can
+    use it in place of its own spatial join. Optionally uploaded to S3 under
+    the same prefix.
+    """
+    path = Path(
+        out_path
+        or Path(settings.OUT_SCRATCH)
+        / _S3_PARENT_CHILD_PREFIX
+        / f"{gerrydb_name}.parquet"
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    mapping[["parent_path", "path"]].to_parquet(path, index=False, compression="zstd")
+    LOGGER.info("Parent-child artifact (%d rows) written to %s", len(mapping), path)
+
+    if upload_to_s3:
+        s3 = settings.get_s3_client()
+        assert s3, "S3 client is not available"
+        s3_key = f"{_S3_PARENT_CHILD_PREFIX}/{gerrydb_name}.parquet"
+        s3.upload_file(str(path), settings.S3_BUCKET, s3_key)
+        LOGGER.info("Uploaded to s3://%s/%s", settings.S3_BUCKET, s3_key)
+
+    return path
+
+
+def _annotate_graph_with_parents(G: Graph, mapping: pd.DataFrame) -> None:
+    """Set the ``parent`` attribute of the block nodes in ``mapping``.
+
+    Children of ``mapping`` that are not nodes of G are ignored. Mutates G in
+    place.
+    """
+    mapping = mapping[mapping["path"].isin(G.nodes)]
+    parent_map = dict(zip(mapping["path"], mapping["parent_path"]))
     for child_path, parent_path in parent_map.items():
-        if pd.notna(parent_path):
-            G.nodes[child_path]["parent"] = parent_path
-            matched += 1
+        G.nodes[child_path]["parent"] = parent_path
 
     LOGGER.info(
         "Annotated %d/%d block nodes with parents via spatial join",
-        matched,
+        len(parent_map),
         len(G.nodes),
     )
 
 
+def _annotate_graph_with_parents_from_gpkg(
+    G: Graph,
+    child_gpkg: str | Path,
+    parent_gpkg: str | Path,
+    child_layer_name: str | None = None,
+    parent_layer_name: str | None = None,
+) -> None:
+    """Attach parent node attributes to block nodes via GeoPackage spatial join.
+
+    Replaces the parentchildedges DB query in the backend; see
+    `parent_child_mapping`. Mutates G in place.
+    """
+    _annotate_graph_with_parents(
+        G,
+        parent_child_mapping(
+            child_gpkg, parent_gpkg, child_layer_name, parent_layer_name
+        ),
+    )
+
+
 def _build_combined_graph(G: Graph) -> None:
     """Extend an annotated block graph (child level) in-place into a dual-level combined graph.
 
@@ -158,8 +227,6 @@ def _build_combined_graph(G: Graph) -> None:
         to their block children during contiguity evaluation so that geographic
         disconnection is not hidden by the single-node representation.
     """
-    G.graph["weighted_edges"] = {}
-
     unannotated = [n for n, d in G.nodes(data=True) if "parent" not in d]
     if unannotated:
         raise ValueError(
@@ -168,28 +235,72 @@ def _build_combined_graph(G: Graph) -> None:
             f"Unannotated: {unannotated}"
         )
 
-    for u, v in list(G.edges()):
-        p_u = G.nodes[u]["parent"]
-        p_v = G.nodes[v]["parent"]
-        if p_u != p_v:
-            G.add_edge(u, p_v)
-            G.add_edge(v, p_u)
-            key = (p_u, p_v) if p_u < p_v else (p_v, p_u)
-            G.graph["weighted_edges"][key] = G.graph["weighted_edges"].get(key, 0) + 1
-
-    for p_u, p_v in G.graph["weighted_edges"]:
-        G.add_edge(p_u, p_v)
-
-    for node, data in list(G.nodes(data=True)):
-        parent = data.get("parent")
-        if parent:
-            G.nodes[parent].setdefault("children", set()).add(node)
-
-    non_contiguous = set()
-    for node, data in G.nodes(data=True):
-        children = data.get("children")
-        if children and number_connected_components(G.subgraph(children)) > 1:
-            non_contiguous.add(node)
+    # Work on integer codes: node i of the block graph belongs to parent
+    # parent_names[parent_codes[i]]. Object arrays are built with fromiter so
+    # tuple-labelled nodes stay scalars.
+    node_array = np.fromiter(G.nodes, dtype=object, count=G.number_of_nodes())
+    nodes = pd.Index(node_array, dtype=object, tupleize_cols=False)
+    parent_codes, parent_names = pd.factorize(
+        pd.Series([parent for _, parent in G.nodes(data="parent")], dtype=object)
+    )
+    parent_names = np.asarray(parent_names, dtype=object)
+
+    edge_list = list(G.edges)
+    edge_u = np.fromiter((u for u, _ in edge_list), dtype=object, count=len(edge_list))
+    edge_v = np.fromiter((v for _, v in edge_list), dtype=object, count=len(edge_list))
+    u_idx = nodes.get_indexer(edge_u)
+    v_idx = nodes.get_indexer(edge_v)
+    p_u = parent_codes[u_idx]
+    p_v = parent_codes[v_idx]
+    cross = p_u != p_v
+
+    # Cross-level boundary edges u–parent(v) and v–parent(u), interleaved per
+    # block edge so adjacency order matches adding them one edge at a time.
+    boundary = np.empty((2 * int(cross.sum()), 2), dtype=object)
+    boundary[0::2, 0] = edge_u[cross]
+    boundary[0::2, 1] = parent_names[p_v[cross]]
+    boundary[1::2, 0] = edge_v[cross]
+    boundary[1::2, 1] = parent_names[p_u[cross]]
+    G.add_edges_from(boundary.tolist())
+
+    # Parent-parent weights, keyed by canonical (min, max) name pairs in order
+    # of first appearance.
+    names_u = parent_names[p_u[cross]]
+    names_v = parent_names[p_v[cross]]
+    swap = names_v < names_u
+    pairs = pd.DataFrame(
+        {
+            "lo": np.where(swap, names_v, names_u),
+            "hi": np.where(swap, names_u, names_v),
+        }
+    )
+    weights = pairs.groupby(["lo", "hi"], sort=False).size()
+    G.graph["weighted_edges"] = dict(zip(weights.index.tolist(), weights.tolist()))
+    G.add_edges_from(G.graph["weighted_edges"])
+
+    children = pd.Series(node_array, dtype=object).groupby(parent_codes, sort=False)
+    for code, members in children:
+        # Parents without any boundary edge are not in G yet.
+        G.add_node(parent_names[code], children=set(members.tolist()))
+
+    # One connected-components pass over within-parent block edges: a parent
+    # is non-contiguous when its children carry more than one component label.
+    within = ~cross
+    n = len(node_array)
+    _, labels = connected_components(
+        coo_matrix(
+            (np.ones(int(within.sum()), dtype=np.int8), (u_idx[within], v_idx[within])),
+            shape=(n, n),
+        ),
+        directed=False,
+    )
+    components = (
+        pd.DataFrame({"parent": parent_codes, "component": labels})
+        .drop_duplicates()
+        .groupby("parent")
+        .size()
+    )
+    non_contiguous = set(parent_names[components.index[components > 1]].tolist())
     G.graph["non_contiguous_parents"] = non_contiguous
 
     LOGGER.info(
@@ -202,22 +313,80 @@ def _build_combined_graph(G: Graph) -> None:
     )
 
 
+def _annotate_graph_with_bounds_from_gpkg(
+    G: Graph, layers: list[tuple[str | Path, str | None]]
+) -> None:
+    """Attach per-node EPSG:4326 bounding boxes to ``G.graph["bounds_4326"]``.
+
+    Stored as parallel arrays so the backend can load them straight into its
+    graph index and reduce component bboxes without touching PostGIS:
+
+        ``{"paths": <str ndarray (n,)>, "bounds": <float64 ndarray (n, 4)>}``
+
+    with bounds ordered ``minx, miny, maxx, maxy``. Each unit's envelope is
+    reprojected (not the full geometry), matching what the API used to do per
+    component. ``layers`` holds ``(gpkg_path, layer_name)`` pairs; layer names
+    default to the gpkg filename stem. Mutates G in place.
+    """
+    _annotate_graph_with_bounds(
+        G,
+        [
+            gpd.read_file(
+                _resolve_path(gpkg_path),
+                layer=layer_name or _gpkg_layer_name(gpkg_path),
+            )[["path", "geometry"]]
+            for gpkg_path, layer_name in layers
+        ],
+    )
+
+
+def _annotate_graph_with_bounds(G: Graph, layers: list[gpd.GeoDataFrame]) -> None:
+    """Attach ``G.graph["bounds_4326"]`` from in-memory layers with ``path`` and
+    ``geometry`` columns; see `_annotate_graph_with_bounds_from_gpkg`."""
+    frames = []
+    for gdf in layers:
+        gdf = gdf[gdf["path"].isin(G.nodes)]
+        frames.append(gdf.set_geometry(gdf.envelope).to_crs("EPSG:4326"))
+
+    units = pd.concat(frames, ignore_index=True)
+    G.graph["bounds_4326"] = {
+        "paths": units["path"].to_numpy(dtype=str),
+        "bounds": np.asarray(units.geometry.bounds, dtype=np.float64),
+    }
+    LOGGER.info("Annotated %d/%d nodes with EPSG:4326 bounds", len(units), len(G.nodes))
+
+
 def build_combined_graph_from_gpkg(
     child_gpkg: str | Path,
     parent_gpkg: str | Path,
     child_layer_name: str | None = None,
     parent_layer_name: str | None = None,
     graph_edge_layer: str = "gerrydb_graph_edge",
+    mapping: pd.DataFrame | None = None,
 ) -> Graph:
     """Build a dual-level combined graph from GeoPackage files without DB access.
 
-    Chains graph_from_gpkg → annotate (spatial join) → build_combined_graph.
+    Chains graph_from_gpkg → annotate (spatial join) → build_combined_graph,
+    then attaches per-node EPSG:4326 bounds for both levels. Pass ``mapping``
+    (from `parent_child_mapping`) to reuse an already computed spatial join.
     """
     G = graph_from_gpkg(child_gpkg, layer_name=graph_edge_layer)
-    _annotate_graph_with_parents_from_gpkg(
-        G, child_gpkg, parent_gpkg, child_layer_name, parent_layer_name
-    )
+    if mapping is None:
+        mapping = parent_child_mapping(
+            child_gpkg, parent_gpkg, child_layer_name, parent_layer_name
+        )
+    _annotate_graph_with_parents(G, mapping)
     _build_combined_graph(G)
+    _annotate_graph_with_bounds_from_gpkg(
+        G, [(child_gpkg, child_layer_name), (parent_gpkg, parent_layer_name)]
+    )
+    return G
+
+
+def build_graph_from_gpkg(gpkg_path: str | Path) -> Graph:
+    """Build a single-level graph for a non-shatterable map, with node bounds."""
+    G = graph_from_gpkg(gpkg_path)
+    _annotate_graph_with_bounds_from_gpkg(G, [(gpkg_path, None)])
     return G
 
 
@@ -247,6 +416,30 @@ def write_graph(
     return path
 
 
+def build_graph_entry(
+    gerrydb_name: str,
+    parent_gpkg: str,
+    child_gpkg: str | None = None,
+    upload: bool = False,
+    replace: bool = False,
+) -> list[str]:
+    """Build and write one GraphBatch entry; runs in a core.runner worker.
+
+    Shatterable entries also write their parent-child artifact.
+    """
+    LOGGER.info("Building graph for %r", gerrydb_name)
+    if child_gpkg is None:
+        G = build_graph_from_gpkg(parent_gpkg)
+        return [str(write_graph(G, gerrydb_name, upload_to_s3=upload))]
+
+    mapping = parent_child_mapping(child_gpkg, parent_gpkg)
+    G = build_combined_graph_from_gpkg(child_gpkg, parent_gpkg, mapping=mapping)
+    return [
+        str(write_graph(G, gerrydb_name, upload_to_s3=upload)),
+        str(write_parent_child_artifact(mapping, gerrydb_name, upload_to_s3=upload)),
+    ]
+
+
 class GraphConfig(BaseModel):
     """Config for one graph entry.
 
@@ -271,37 +464,60 @@ class GraphBatch(Config):
         data_dir: str | None = None,
         replace: bool = False,
         upload: bool = False,
+        jobs: int | None = None,
     ) -> None:
+        """Build graphs whose inputs changed since the last run (see core.runner)."""
+        tasks = []
         for gerrydb_name, cfg in self.graphs.items():
-            out = Path(settings.OUT_SCRATCH) / _S3_GRAPH_PREFIX / f"{gerrydb_name}.pkl"
-            if not replace and out.exists():
-                LOGGER.info("Graph %s already exists, skipping", gerrydb_name)
-                continue
             parent = (
                 cfg.parent_gpkg
                 if data_dir is None
                 else os.path.join(data_dir, cfg.parent_gpkg)
             )
-            LOGGER.info("Building graph for %r", gerrydb_name)
-            if cfg.is_shatterable():
-                assert cfg.child_gpkg is not None
-                child = (
-                    cfg.child_gpkg
-                    if data_dir is None
-                    else os.path.join(data_dir, cfg.child_gpkg)
+            child = cfg.child_gpkg
+            if child is not None and data_dir is not None:
+                child = os.path.join(data_dir, child)
+            outputs = [
+                str(
+                    Path(settings.OUT_SCRATCH)
+                    / _S3_GRAPH_PREFIX
+                    / f"{gerrydb_name}.pkl"
+                )
+            ]
+            if child is not None:
+                outputs.append(
+                    str(
+                        Path(settings.OUT_SCRATCH)
+                        / _S3_PARENT_CHILD_PREFIX
+                        / f"{gerrydb_name}.parquet"
+                    )
                 )
-                G = build_combined_graph_from_gpkg(child, parent)
-            else:
-                G = graph_from_gpkg(parent)
-            write_graph(G, gerrydb_name, upload_to_s3=upload)
+            tasks.append(
+                PipelineTask(
+                    key=gerrydb_name,
+                    func=build_graph_entry,
+                    inputs={"parent_gpkg": parent, "child_gpkg": child},
+                    outputs=outputs,
+                    params={"gerrydb_name": gerrydb_name},
+                    options={"upload": upload},
+                )
+            )
+        run_tasks("graphs", tasks, replace=replace, jobs=jobs)
 
     def upload_all(self) -> None:
         s3 = settings.get_s3_client()
         assert s3, "S3 client is not available"
-        for gerrydb_name in self.graphs:
-            path = Path(settings.OUT_SCRATCH) / _S3_GRAPH_PREFIX / f"{gerrydb_name}.pkl"
-            s3_key = f"{_S3_GRAPH_PREFIX}/{gerrydb_name}.pkl"
-            s3.upload_file(str(path), settings.S3_BUCKET, s3_key)
-            LOGGER.info(
-                "Uploaded %s to s3://%s/%s", gerrydb_name, settings.S3_BUCKET, s3_key
-            )
+        for gerrydb_name, cfg in self.graphs.items():
+            files = [(_S3_GRAPH_PREFIX, f"{gerrydb_name}.pkl")]
+            if cfg.is_shatterable():
+                files.append((_S3_PARENT_CHILD_PREFIX, f"{gerrydb_name}.parquet"))
+            for prefix, file_name in files:
+                path = Path(settings.OUT_SCRATCH) / prefix / file_name
+                s3_key = f"{prefix}/{file_name}"
+                s3.upload_file(str(path), settings.S3_BUCKET, s3_key)
+                LOGGER.info(
+                    "Uploaded %s to s3://%s/%s",
+                    gerrydb_name,
+                    settings.S3_BUCKET,
+                    s3_key,
+                )
@@ -0,0 +1,572 @@
+"""Synthetic gerrydb "states" for scale testing without production data.
+
+Generates a block layer and a VTD layer with the gerrydb ``districtr_view``
+schema, and writes the same artifacts the pipelines produce from real
+GeoPackages:
+
+- ``<name>_block_districtr_view.gpkg`` and ``<name>_vtd_districtr_view.gpkg``,
+  each with its ``gerrydb_graph_edge`` adjacency table (input to the importer,
+  tilesets, tabular and graph pipelines);
+- the combined graph ``graphs/<name>_districtr_view.pkl`` and the VTD graph
+  ``graphs/<name>_vtd_districtr_view.pkl``;
+- the parent-child artifact ``parent_child/<name>_districtr_view.parquet``;
+- a VTD-level plan ``<name>_districtr_view_plan.msgpack`` in the format of the
+  stress-test fixtures (``[[geo_id, zone], ...]``).
+
+Blocks are the Voronoi cells of points drawn partly around population centers
+(small, dense urban blocks) and partly uniformly (large rural ones). VTDs are
+groups of nearby blocks within a county, so block paths nest under county
+GEOIDs and every block lies in exactly one VTD. Demographic and election counts
+are drawn per block and summed into the VTDs.
+
+Large states are tessellated in tiles: each tile's Voronoi diagram includes a
+halo of the neighbouring points, so cells and adjacencies match those of a
+single diagram while memory stays bounded.
+"""
+
+import json
+import logging
+import math
+import sqlite3
+from pathlib import Path
+
+import geopandas as gpd
+import msgpack
+import numpy as np
+import pandas as pd
+import shapely
+from networkx import Graph
+from pydantic import BaseModel, Field, model_validator
+from scipy.spatial import Voronoi, cKDTree
+
+from core.settings import settings
+from transforms.graph import (
+    _annotate_graph_with_bounds,
+    _annotate_graph_with_parents,
+    _build_combined_graph,
+    write_graph,
+    write_parent_child_artifact,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+GRAPH_EDGE_LAYER = "gerrydb_graph_edge"
+# Census block GEOIDs number blocks within a tract with 4 digits; each VTD is
+# also the block's tract here.
+MAX_BLOCKS_PER_VTD = 9999
+RACE_COLUMNS = ["white", "hpop", "bpop", "asian_nhpi", "amin", "other"]
+ELECTIONS = [
+    "pres_2016",
+    "pres_2020",
+    "pres_2024",
+    "sen_2016",
+    "sen_2018",
+    "sen_2020",
+    "sen_2022",
+]
+
+
+def _pop_column(race: str) -> str:
+    return f"{race}_20" if race.endswith("pop") else f"{race}_pop_20"
+
+
+def _vap_column(race: str) -> str:
+    return (
+        f"{race.removesuffix('pop')}vap_20"
+        if race.endswith("pop")
+        else f"{race}_vap_20"
+    )
+
+
+class SyntheticStateConfig(BaseModel):
+    """Shape of a synthetic state. Defaults resemble a mid-sized state."""
+
+    name: str = "synthetic"
+    num_blocks: int = Field(ge=1_000, le=10_000_000)
+    blocks_per_vtd: int = Field(default=50, ge=2, le=2_000)
+    # Default: one county per ~40k blocks, between 3 and 254 (Texas).
+    num_counties: int | None = Field(default=None, ge=1, le=499)
+    # Population centers; default one per ~50k blocks, at least 3.
+    num_clusters: int | None = Field(default=None, ge=1)
+    # Share of blocks drawn around population centers rather than uniformly.
+    cluster_share: float = Field(default=0.7, ge=0, le=1)
+    num_districts: int = Field(default=14, ge=1)
+    statefp: str = Field(default="99", pattern=r"^\d{2}$")
+    # Extent in meters of the state rectangle, placed in ``crs``.
+    width: float = 400_000
+    height: float = 300_000
+    crs: str = "EPSG:26914"
+    origin: tuple[float, float] = (200_000, 4_100_000)
+    # Blocks per Voronoi tile; larger states are tessellated in tiles.
+    tile_blocks: int = Field(default=500_000, ge=100)
+    seed: int = 0
+
+    @model_validator(mode="after")
+    def _defaults(self) -> "SyntheticStateConfig":
+        if self.num_counties is None:
+            self.num_counties = min(254, max(3, self.num_blocks // 40_000))
+        if self.num_clusters is None:
+            self.num_clusters = max(3, self.num_blocks // 50_000)
+        return self
+
+    @property
+    def gerrydb_name(self) -> str:
+        return f"{self.name}_districtr_view"
+
+    @property
+    def block_layer(self) -> str:
+        return f"{self.name}_block_districtr_view"
+
+    @property
+    def vtd_layer(self) -> str:
+        return f"{self.name}_vtd_districtr_view"
+
+
+class SyntheticState(BaseModel):
+    """Generated layers; see `generate_state`."""
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    config: SyntheticStateConfig
+    blocks: gpd.GeoDataFrame
+    vtds: gpd.GeoDataFrame
+    block_edges: pd.DataFrame
+    vtd_edges: pd.DataFrame
+    # ``parent_path``/``path`` mapping, as `transforms.graph.parent_child_mapping`.
+    parent_child: pd.DataFrame
+
+
+def _draw_points(config: SyntheticStateConfig, rng: np.random.Generator) -> np.ndarray:
+    """Distinct block generator points in local [0, width) x [0, height)."""
+    extent = np.array([config.width, config.height])
+    n = config.num_blocks
+    n_clustered = int(n * config.cluster_share)
+
+    centers = rng.uniform(0, 1, size=(config.num_clusters, 2)) * extent
+    # Heavy-tailed city sizes; the spread grows with the square root of size.
+    weights = rng.pareto(1.5, size=config.num_clusters) + 1
+    weights /= weights.sum()
+    spread = np.sqrt(weights) * min(config.width, config.height) * 0.15
+    cluster = rng.choice(config.num_clusters, size=n_clustered, p=weights)
+    clustered = (
+        centers[cluster] + rng.normal(size=(n_clustered, 2)) * spread[cluster, None]
+    )
+    points = np.concatenate(
+        [
+            np.mod(clustered, extent),
+            rng.uniform(0, 1, size=(n - n_clustered, 2)) * extent,
+        ]
+    )
+
+    # Coincident points have no Voronoi cell of their own; replace them.
+    points = np.unique(points, axis=0)
+    while len(points) < n:
+        extra = rng.uniform(0, 1, size=(n - len(points), 2)) * extent
+        points = np.unique(np.concatenate([points, extra]), axis=0)
+    return rng.permutation(points)
+
+
+def _cell_polygons(vor: Voronoi, generators: np.ndarray, count: int) -> np.ndarray:
+    """Polygons of the (bounded, convex) Voronoi cells of the first ``count``
+    input points, with vertices ordered by angle around their generator."""
+    regions = [vor.regions[r] for r in vor.point_region[:count]]
+    lengths = np.fromiter((len(r) for r in regions), dtype=np.int64, count=count)
+    vertex_idx = np.fromiter(
+        (v for r in regions for v in r), dtype=np.int64, count=int(lengths.sum())
+    )
+    owner = np.repeat(np.arange(count), lengths)
+    coords = vor.vertices[vertex_idx]
+    offset = coords - generators[owner]
+    order = np.lexsort((np.arctan2(offset[:, 1], offset[:, 0]), owner))
+    coords = coords[order]
+
+    # Close each ring by repeating its first vertex.
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    ring_coords = np.insert(coords, np.cumsum(lengths), coords[starts], axis=0)
+    ring_offsets = np.concatenate([[0], np.cumsum(lengths + 1)])
+    return shapely.from_ragged_array(
+        shapely.GeometryType.POLYGON,
+        ring_coords,
+        (ring_offsets, np.arange(count + 1)),
+    )
+
+
+def _tessellate(
+    points: np.ndarray, config: SyntheticStateConfig
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Voronoi cells of ``points`` clipped to the state rectangle, their
+    adjacency as (i, j) index pairs with i < j, and the length of each shared
+    boundary."""
+    extent = shapely.box(0, 0, config.width, config.height)
+    tiles = max(1, math.ceil(math.sqrt(len(points) / config.tile_blocks)))
+    tile_w, tile_h = config.width / tiles, config.height / tiles
+    halo = 0.5 * max(tile_w, tile_h) if tiles > 1 else 0.0
+    far = 10 * max(config.width, config.height)
+    # Sentinels outside the state keep every real cell bounded.
+    sentinels = np.array([[-far, -far], [-far, far], [far, -far], [far, far]])
+
+    cells = np.empty(len(points), dtype=object)
+    edges = []
+    perimeters = []
+    tile_x = np.minimum((points[:, 0] // tile_w).astype(int), tiles - 1)
+    tile_y = np.minimum((points[:, 1] // tile_h).astype(int), tiles - 1)
+    for tx in range(tiles):
+        for ty in range(tiles):
+            own = np.flatnonzero((tile_x == tx) & (tile_y == ty))
+            if not len(own):
+                continue
+            x0, y0 = tx * tile_w - halo, ty * tile_h - halo
+            x1, y1 = (tx + 1) * tile_w + halo, (ty + 1) * tile_h + halo
+            near = np.flatnonzero(
+                (points[:, 0] >= x0)
+                & (points[:, 0] < x1)
+                & (points[:, 1] >= y0)
+                & (points[:, 1] < y1)
+                & ~((tile_x == tx) & (tile_y == ty))
+            )
+            index = np.concatenate([own, near, np.full(len(sentinels), -1)])
+            local = np.concatenate([points[own], points[near], sentinels])
+            vor = Voronoi(local)
+
+            polygons = _cell_polygons(vor, local, len(own))
+            xmin, ymin, xmax, ymax = shapely.bounds(polygons).T
+            outside = (
+                (xmin < 0) | (ymin < 0) | (xmax > config.width) | (ymax > config.height)
+            )
+            polygons[outside] = shapely.intersection(polygons[outside], extent)
+            cells[own] = polygons
+
+            # Each ridge is emitted by the tile owning its lower-index point.
+            pairs = index[vor.ridge_points]
+            ridge_ends = vor.vertices[np.asarray(vor.ridge_vertices)]
+            keep = (pairs >= 0).all(axis=1)
+            lo = pairs.min(axis=1)
+            owned = np.zeros(len(points), dtype=bool)
+            owned[own] = True
+            keep &= owned[np.where(lo >= 0, lo, 0)]
+            # Shared boundary length; ridges leaving the state are clipped,
+            # and ridges entirely outside it (length 0) dropped.
+            lengths = np.linalg.norm(ridge_ends[:, 0] - ridge_ends[:, 1], axis=1)
+            contained = (
+                (ridge_ends[..., 0] >= 0)
+                & (ridge_ends[..., 0] <= config.width)
+                & (ridge_ends[..., 1] >= 0)
+                & (ridge_ends[..., 1] <= config.height)
+            ).all(axis=1)
+            clip = keep & ~contained
+            if clip.any():
+                segments = shapely.linestrings(ridge_ends[clip])
+                lengths[clip] = shapely.length(shapely.intersection(segments, extent))
+            keep &= lengths > 0
+            edges.append(np.sort(pairs[keep], axis=1))
+            perimeters.append(lengths[keep])
+            LOGGER.info(
+                "Tile %d/%d: %d cells (+%d halo)",
+                tx * tiles + ty + 1,
+                tiles**2,
+                len(own),
+                len(near),
+            )
+
+    return cells, np.concatenate(edges), np.concatenate(perimeters)
+
+
+def _assign_hierarchy(
+    points: np.ndarray, config: SyntheticStateConfig, rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray]:
+    """County index and VTD index of every block.
+
+    Counties are the nearest of uniformly placed seats; VTDs are the nearest of
+    seeds sampled from the blocks themselves (so they are smaller where blocks
+    are dense), searched within the block's county so VTDs nest in counties.
+    """
+    n = len(points)
+    seats = rng.uniform(0, 1, size=(config.num_counties, 2)) * [
+        config.width,
+        config.height,
+    ]
+    county = cKDTree(seats).query(points)[1]
+
+    num_vtds = max(1, n // config.blocks_per_vtd)
+    seeds = rng.choice(n, size=num_vtds, replace=False)
+    # Every county gets at least one VTD.
+    first_block = pd.Series(np.arange(n)).groupby(county).first()
+    seeds = np.union1d(
+        seeds, first_block[~first_block.index.isin(county[seeds])].to_numpy()
+    )
+
+    vtd = np.empty(n, dtype=np.int64)
+    for c in np.unique(county):
+        blocks = np.flatnonzero(county == c)
+        county_seeds = seeds[county[seeds] == c]
+        vtd[blocks] = county_seeds[
+            cKDTree(points[county_seeds]).query(points[blocks])[1]
+        ]
+    # Renumber VTDs 0..k-1.
+    _, vtd = np.unique(vtd, return_inverse=True)
+    return county, vtd
+
+
+def _block_paths(
+    config: SyntheticStateConfig, county: np.ndarray, vtd: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """15-digit block GEOIDs (state, county, tract = VTD, block) and the
+    ``vtd:`` path of each block's VTD."""
+    vtd_county = pd.Series(county).groupby(vtd).first().to_numpy()
+    # VTD code within its county.
+    vtd_code = pd.Series(np.arange(len(vtd_county))).groupby(vtd_county).cumcount()
+    block_number = pd.Series(np.arange(len(vtd))).groupby(vtd).cumcount().to_numpy()
+    if block_number.max() >= MAX_BLOCKS_PER_VTD:
+        raise ValueError(
+            f"A VTD has more than {MAX_BLOCKS_PER_VTD} blocks; lower blocks_per_vtd"
+        )
+
+    county_fips = np.char.zfill((2 * vtd_county + 1).astype(str), 3)
+    vtd_paths = np.char.add(
+        f"vtd:{config.statefp}",
+        np.char.add(
+            county_fips, np.char.zfill((vtd_code + 1).to_numpy().astype(str), 6)
+        ),
+    )
+    # Strip the "vtd:" prefix to get state + county + tract for each block.
+    tracts = np.char.replace(vtd_paths[vtd], "vtd:", "")
+    block_paths = np.char.add(tracts, np.char.zfill((block_number + 1).astype(str), 4))
+    return block_paths.astype(object), vtd_paths.astype(object)
+
+
+def _demographics(
+    config: SyntheticStateConfig,
+    county: np.ndarray,
+    clustered: np.ndarray,
+    rng: np.random.Generator,
+) -> pd.DataFrame:
+    """Population, VAP by race and two-party election results per block.
+
+    Race mix varies by county, turnout and partisanship by county and
+    urbanity; every count is an integer and sub-totals add up.
+    """
+    n = len(county)
+    total_pop = rng.poisson(np.where(clustered, 60, 30)) * (rng.uniform(size=n) > 0.25)
+
+    mix = rng.dirichlet([8, 2, 1.5, 0.8, 0.3, 0.4], size=config.num_counties)
+    race_pop = _multinomial_rows(total_pop, mix[county], rng)
+    race_vap = rng.binomial(race_pop, 0.77)
+
+    columns: dict[str, np.ndarray] = {"total_pop_20": total_pop}
+    for i, race in enumerate(RACE_COLUMNS):
+        columns[_pop_column(race)] = race_pop[:, i]
+    columns["total_vap_20"] = race_vap.sum(axis=1)
+    for i, race in enumerate(RACE_COLUMNS):
+        columns[_vap_column(race)] = race_vap[:, i]
+
+    county_lean = rng.normal(0, 0.4, size=config.num_counties)
+    block_lean = county_lean[county] + np.where(clustered, 0.5, -0.4)
+    block_lean += rng.normal(0, 0.3, size=n)
+    for election in ELECTIONS:
+        swing = rng.normal(0, 0.15)
+        turnout = rng.binomial(columns["total_vap_20"], rng.uniform(0.45, 0.7))
+        dem_share = 1 / (1 + np.exp(-(block_lean + swing)))
+        dem = rng.binomial(turnout, dem_share)
+        # A few percent go to third parties.
+        rep = rng.binomial(turnout - dem, 0.95)
+        columns[f"{election}_dem"] = dem
+        columns[f"{election}_rep"] = rep
+    return pd.DataFrame({k: v.astype(np.int64) for k, v in columns.items()})
+
+
+def _multinomial_rows(
+    counts: np.ndarray, probabilities: np.ndarray, rng: np.random.Generator
+) -> np.ndarray:
+    """Row-wise multinomial draws as a chain of binomials (vectorized)."""
+    result = np.zeros(probabilities.shape, dtype=np.int64)
+    remaining = counts.astype(np.int64)
+    mass = np.ones(len(counts))
+    for i in range(probabilities.shape[1] - 1):
+        p = np.clip(probabilities[:, i] / np.maximum(mass, 1e-12), 0, 1)
+        result[:, i] = rng.binomial(remaining, p)
+        remaining -= result[:, i]
+        mass -= probabilities[:, i]
+    result[:, -1] = remaining
+    return result
+
+
+def generate_state(config: SyntheticStateConfig) -> SyntheticState:
+    """Generate the block and VTD layers, adjacencies and parent-child mapping."""
+    rng = np.random.default_rng(config.seed)
+    points = _draw_points(config, rng)
+    # Points drawn around a center are denser than the uniform background.
+    density = cKDTree(points).query(points, k=2)[0][:, 1]
+    clustered = density < np.median(density)
+
+    county, vtd = _assign_hierarchy(points, config, rng)
+    block_paths, vtd_paths = _block_paths(config, county, vtd)
+    cells, edges, perimeters = _tessellate(points, config)
+    LOGGER.info("Tessellated %d blocks, %d adjacencies", len(cells), len(edges))
+
+    demographics = _demographics(config, county, clustered, rng)
+    # Rounding to the millimeter makes vertices shared by cells of different
+    # tiles identical, so the cells form an exact coverage.
+    cells = shapely.transform(
+        cells, lambda xy: np.round(xy + np.asarray(config.origin), 3)
+    )
+
+    blocks = gpd.GeoDataFrame(
+        demographics.assign(path=block_paths, vtd=vtd),
+        geometry=cells,
+        crs=config.crs,
+    )
+    numeric = list(demographics.columns)
+    vtds = blocks[["vtd", *numeric]].groupby("vtd").sum().reset_index(drop=True)
+    order = np.argsort(vtd, kind="stable")
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(vtd))])
+    vtd_geometry = [
+        shapely.coverage_union_all(cells[order[start:end]])
+        for start, end in zip(bounds[:-1], bounds[1:])
+    ]
+    vtds = gpd.GeoDataFrame(
+        vtds.assign(path=vtd_paths), geometry=vtd_geometry, crs=config.crs
+    )[["path", *numeric, "geometry"]]
+
+    block_edges = pd.DataFrame(
+        {
+            "path_1": block_paths[edges[:, 0]],
+            "path_2": block_paths[edges[:, 1]],
+            "shared_perim": perimeters,
+        }
+    )
+    # Blocks in different VTDs make their VTDs adjacent; the VTDs' shared
+    # boundary is the sum of the blocks'.
+    cross = vtd[edges[:, 0]] != vtd[edges[:, 1]]
+    vtd_pairs = np.sort(vtd[edges[cross]], axis=1)
+    vtd_edges = (
+        pd.DataFrame(
+            {
+                "path_1": vtd_paths[vtd_pairs[:, 0]],
+                "path_2": vtd_paths[vtd_pairs[:, 1]],
+                "shared_perim": perimeters[cross],
+            }
+        )
+        .groupby(["path_1", "path_2"], as_index=False)
+        .sum()
+    )
+    parent_child = (
+        pd.DataFrame({"parent_path": vtd_paths[vtd], "path": block_paths})
+        .sort_values(["parent_path", "path"])
+        .reset_index(drop=True)
+    )
+    return SyntheticState(
+        config=config,
+        blocks=blocks[["path", *numeric, "geometry"]],
+        vtds=vtds,
+        block_edges=block_edges,
+        vtd_edges=vtd_edges,
+        parent_child=parent_child,
+    )
+
+
+def _write_gpkg(
+    gdf: gpd.GeoDataFrame, edges: pd.DataFrame, layer: str, out_dir: Path
+) -> Path:
+    """Write a layer and its ``gerrydb_graph_edge`` table, as exported by
+    gerrydb: the gpkg is named after the layer."""
+    path = out_dir / f"{layer}.gpkg"
+    path.unlink(missing_ok=True)
+    gdf.to_file(path, layer=layer, driver="GPKG")
+
+    weights = [json.dumps({"shared_perim": perim}) for perim in edges["shared_perim"]]
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute(
+            f"""CREATE TABLE {GRAPH_EDGE_LAYER} (
+                path_1  TEXT NOT NULL REFERENCES {layer}(path),
+                path_2  TEXT NOT NULL REFERENCES {layer}(path),
+                weights TEXT,
+                CONSTRAINT unique_edges UNIQUE (path_1, path_2)
+            )"""
+        )
+        conn.executemany(
+            f"INSERT INTO {GRAPH_EDGE_LAYER} VALUES (?, ?, ?)",
+            zip(edges["path_1"], edges["path_2"], weights),
+        )
+    conn.close()
+    LOGGER.info("Wrote %d features, %d edges to %s", len(gdf), len(edges), path)
+    return path
+
+
+def _district_plan(state: SyntheticState) -> list[list]:
+    """A VTD-level plan of ``num_districts`` population-balanced vertical
+    strips, in the stress-test fixture format."""
+    vtds = state.vtds
+    x = vtds.geometry.centroid.x.to_numpy()
+    order = np.argsort(x, kind="stable")
+    cumulative = np.cumsum(vtds["total_pop_20"].to_numpy()[order])
+    total = max(int(cumulative[-1]), 1)
+    zone = np.empty(len(vtds), dtype=np.int64)
+    zone[order] = (
+        np.minimum(
+            cumulative * state.config.num_districts // total,
+            state.config.num_districts - 1,
+        )
+        + 1
+    )
+    return [[path, int(z)] for path, z in zip(vtds["path"], zone)]
+
+
+def write_state(
+    state: SyntheticState,
+    out_dir: str | Path | None = None,
+    write_graphs: bool = True,
+) -> dict:
+    """Write the GeoPackages, graphs, parent-child artifact and stress-test plan
+    of a synthetic state. Graphs and the parent-child artifact go where the
+    graph pipeline writes them (OUT_SCRATCH/graphs, OUT_SCRATCH/parent_child).
+
+    Returns the manifest, also written as ``<name>_manifest.json``.
+    """
+    config = state.config
+    out_dir = Path(out_dir or Path(settings.OUT_SCRATCH) / "synthetic")
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    block_gpkg = _write_gpkg(
+        state.blocks, state.block_edges, config.block_layer, out_dir
+    )
+    vtd_gpkg = _write_gpkg(state.vtds, state.vtd_edges, config.vtd_layer, out_dir)
+    parent_child = write_parent_child_artifact(state.parent_child, config.gerrydb_name)
+
+    graphs = {}
+    if write_graphs:
+        G = Graph()
+        G.add_nodes_from(state.blocks["path"])
+        G.add_edges_from(zip(state.block_edges["path_1"], state.block_edges["path_2"]))
+        _annotate_graph_with_parents(G, state.parent_child)
+        _build_combined_graph(G)
+        _annotate_graph_with_bounds(G, [state.blocks, state.vtds])
+        graphs[config.gerrydb_name] = str(write_graph(G, config.gerrydb_name))
+
+        vtd_graph = Graph()
+        vtd_graph.add_nodes_from(state.vtds["path"])
+        vtd_graph.add_edges_from(
+            zip(state.vtd_edges["path_1"], state.vtd_edges["path_2"])
+        )
+        _annotate_graph_with_bounds(vtd_graph, [state.vtds])
+        graphs[config.vtd_layer] = str(write_graph(vtd_graph, config.vtd_layer))
+
+    plan = out_dir / f"{config.gerrydb_name}_plan.msgpack"
+    plan.write_bytes(msgpack.packb(_district_plan(state)))
+
+    manifest = {
+        "config": config.model_dump(),
+        "blocks": len(state.blocks),
+        "vtds": len(state.vtds),
+        "block_edges": len(state.block_edges),
+        "vtd_edges": len(state.vtd_edges),
+        "total_pop_20": int(state.blocks["total_pop_20"].sum()),
+        "gpkgs": {config.block_layer: str(block_gpkg), config.vtd_layer: str(vtd_gpkg)},
+        "graphs": graphs,
+        "parent_child": str(parent_child),
+        "plan": str(plan),
+    }
+    (out_dir / f"{config.name}_manifest.json").write_text(
+        json.dumps(manifest, indent=2)
+    )
+    return manifest